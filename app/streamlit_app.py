@@ -6,8 +6,8 @@ FIAP Global Solution - Front End & Mobile Development
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+import hashlib
+from itertools import islice
 import json
 from pathlib import Path
 import sys
@@ -17,12 +17,28 @@ sys.path.append(str(Path(__file__).parent))
 
 from utils.data_loader import (
     load_occupations_data,
-    load_skills_data,
-    load_occupation_skills_matrix,
-    get_all_skills,
-    get_skills_for_occupation
+    get_skills_for_occupation,
+    get_skill_occupation_counts,
+    get_occupation_details,
+    get_cache_path
+)
+from utils.recommender import get_similar_occupations
+from utils.career_paths import load_career_graph
+from utils.index_artifact import get_serving_index
+from utils.explore import get_occupation_query_index
+from utils.result_cache import get_cached_recommendations, get_recommendation_cache, index_version
+from utils.skill_gap import get_skill_gap_engine
+from utils.warmup import start_warm_up
+from utils.tracing import (
+    enable_tracing,
+    memory_summary,
+    memory_tracing_enabled,
+    prometheus_text,
+    reset_tracing,
+    span,
+    span_summary,
+    tracing_enabled
 )
-from utils.recommender import get_recommendations
 
 # ============================================================================
 # CONFIGURAÇÃO DA PÁGINA
@@ -35,6 +51,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Fragmentos reexecutam só parte da página (Streamlit >= 1.33); sem eles, a função roda normalmente
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
 # CSS customizado
 st.markdown("""
 <style>
@@ -83,18 +102,164 @@ st.markdown("""
 # FUNÇÕES AUXILIARES
 # ============================================================================
 
-@st.cache_data
-def load_all_data():
-    """Carrega todos os dados necessários"""
-    occupations = load_occupations_data()
-    skills = load_skills_data()
-    skills_matrix = load_occupation_skills_matrix()
-    all_skills = get_all_skills()
-    
-    return occupations, skills, skills_matrix, all_skills
+def load_page_occupations():
+    """
+    Ocupações usadas pelas páginas (compartilhadas pelo catálogo de dados)
+    
+    Cada página carrega só o que usa: o índice de recomendação, o índice de
+    consultas e o grafo de carreiras são pedidos pelas próprias páginas e já
+    estão sendo carregados em segundo plano pelo aquecimento.
+    """
+    with span('streamlit.load_occupations', memory=True):
+        return load_occupations_data()
+
+def load_recommender_index():
+    """
+    Índice de recomendação compartilhado entre sessões
+    
+    Servido a partir do artefato publicado em app/model/, que é trocado
+    automaticamente quando um novo artefato é publicado.
+    """
+    return get_serving_index()
+
+def load_recommendation_cache():
+    """
+    Cache de recomendações compartilhado entre sessões
+    
+    Mantém os rankings mais usados em memória (LRU) e em data/.cache/,
+    de onde são recuperados após reiniciar o app.
+    """
+    return get_recommendation_cache(disk_path=get_cache_path() / 'recommendations')
+
+def select_skills(vocabulary, n_suggestions=20):
+    """
+    Seleção de habilidades com busca por prefixo no vocabulário do índice
+    
+    Só as sugestões da busca (nomes ou sinônimos que começam com o texto
+    digitado) e as habilidades já escolhidas são enviadas ao multiselect,
+    em vez do vocabulário inteiro. Sem busca, sugere as habilidades
+    exigidas por mais ocupações.
+    
+    Args:
+        vocabulary (SkillVocabulary): Vocabulário do índice de recomendação
+        n_suggestions (int): Número de sugestões exibidas
+        
+    Returns:
+        list: Nomes canônicos das habilidades selecionadas
+    """
+    chosen = st.session_state.setdefault('user_skills', [])
+    query = st.text_input(
+        "Buscar habilidade", key="skill_query", placeholder="ex.: machine, liderança, sql"
+    )
+    if query:
+        suggestions = vocabulary.complete(query, limit=n_suggestions)
+        if not suggestions:
+            st.caption(f"Nenhuma habilidade encontrada para \"{query}\".")
+    else:
+        popular = (skill for skill in get_skill_occupation_counts().index if skill in vocabulary.skill_to_id)
+        suggestions = list(islice(popular, n_suggestions))
+    
+    selected = st.multiselect(
+        "Suas habilidades", list(dict.fromkeys(chosen + suggestions)), default=chosen,
+        help="Digite acima para buscar entre todas as habilidades; as sugestões aparecem nesta lista."
+    )
+    st.session_state['user_skills'] = selected
+    return selected
+
+def recommendation_query_key(selected_skills, top_n, future_only, min_salary, index):
+    """Hash da consulta de recomendação (habilidades, parâmetros e versão do índice)"""
+    payload = json.dumps([sorted(set(selected_skills)), top_n, future_only, min_salary, index_version(index)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-def display_occupation_card(occ_data, similarity_score=None):
-    """Exibe card com informações da ocupação"""
+def build_recommendation_result(query_key, recommendations, selected_skills, index):
+    """
+    Monta gráficos, CSV e lacunas de habilidades das recomendações, uma única vez
+    
+    O resultado fica em st.session_state e é reutilizado nas reexecuções
+    seguintes enquanto a consulta não mudar.
+    """
+    import plotly.express as px  # plotly só é importado pelas páginas com gráficos
+    
+    with span('streamlit.figures'):
+        # Gráfico de scores
+        fig = px.bar(
+            recommendations.head(10),
+            x='similarity_score',
+            y='occupation_title',
+            orientation='h',
+            title='Top 10 Profissões por Compatibilidade',
+            labels={'similarity_score': 'Score de Compatibilidade (%)', 
+                   'occupation_title': 'Profissão',
+                   'median_salary': 'Salário Anual (USD)'},
+            color='projected_growth',
+            color_continuous_scale='RdYlGn',
+            hover_data=['median_salary']
+        )
+        fig.update_layout(height=500, yaxis={'categoryorder':'total ascending'})
+    
+        # Scatter plot: Salário vs Crescimento
+        fig2 = px.scatter(
+            recommendations,
+            x='median_salary',
+            y='projected_growth',
+            size='similarity_score',
+            color='similarity_score',
+            hover_data=['occupation_title'],
+            title='Oportunidades: Salário Anual vs Crescimento',
+            labels={
+                'median_salary': 'Salário Anual (USD)',
+                'projected_growth': 'Crescimento Projetado (%)',
+                'similarity_score': 'Compatibilidade (%)'
+            },
+            color_continuous_scale='Viridis'
+        )
+        fig2.update_layout(height=500)
+    
+        csv = recommendations.to_csv(index=False).encode('utf-8')
+    
+    # Lacunas das ocupações recomendadas, calculadas de uma vez sobre a matriz do índice
+    gap_report = get_skill_gap_engine(index).report(
+        selected_skills, rows=np.flatnonzero(np.isin(index.occupation_codes, recommendations['occupation_code']))
+    ).set_index('occupation_code')
+    
+    return {
+        'query_key': query_key,
+        'recommendations': recommendations,
+        'selected_skills': list(selected_skills),
+        'gap_report': gap_report,
+        'figures': (fig, fig2),
+        'csv': csv,
+    }
+
+@fragment
+def display_recommendation_cards(result, page_size=5):
+    """Exibe os cards de recomendações paginados (apenas a página atual é renderizada)"""
+    recommendations = result['recommendations']
+    n_pages = max(1, -(-len(recommendations) // page_size))
+    page_number = 1
+    if n_pages > 1:
+        page_number = st.number_input(
+            "Página:", min_value=1, max_value=n_pages, value=1, step=1,
+            key=f"cards_page_{result['query_key'][:12]}"
+        )
+        st.caption(f"Página {page_number} de {n_pages}")
+    
+    start = (page_number - 1) * page_size
+    with span('streamlit.cards'):
+        for _, row in recommendations.iloc[start:start + page_size].iterrows():
+            display_occupation_card(
+                row, similarity_score=row['similarity_score'],
+                selected_skills=result.get('selected_skills'), gap_report=result.get('gap_report')
+            )
+
+def display_occupation_card(occ_data, similarity_score=None, selected_skills=None, gap_report=None):
+    """
+    Exibe card com informações da ocupação
+    
+    Com as habilidades do usuário, a lista de habilidades mostra as que ele
+    já tem, as que faltam e a próxima habilidade sugerida (do relatório de
+    lacunas).
+    """
     with st.container():
         col1, col2 = st.columns([3, 1])
         
@@ -126,10 +291,34 @@ def display_occupation_card(occ_data, similarity_score=None):
                 st.markdown('<span class="future-job-badge">Profissão do Futuro</span>', 
                            unsafe_allow_html=True)
         
+        # Carreiras próximas: fatia da tabela pré-calculada (utils.neighbors)
+        similar = get_similar_occupations(occ_data['occupation_code'], top_n=3)
+        if similar:
+            st.caption("Carreiras próximas: " + ", ".join(
+                f"{get_occupation_details(entry['occupation_code']).get('occupation_title', entry['occupation_code'])} "
+                f"({entry['similarity']:.0f}%)"
+                for entry in similar
+            ))
+        
         # Habilidades necessárias
         if st.checkbox(f"Ver habilidades - {occ_data['occupation_code']}", key=f"skills_{occ_data['occupation_code']}"):
             skills_info = get_skills_for_occupation(occ_data['occupation_code'])
-            if skills_info:
+            if skills_info and selected_skills:
+                # Ordem de importância na ocupação
+                user_skills = set(selected_skills)
+                matched = [s['skill'] for s in skills_info if s['skill'] in user_skills]
+                missing = [s['skill'] for s in skills_info if s['skill'] not in user_skills]
+                st.write(f"**Você já tem ({len(matched)}):** {', '.join(matched) or '-'}")
+                st.write(f"**Faltam ({len(missing)}):** {', '.join(missing) or '-'}")
+                gap = None
+                if gap_report is not None and occ_data['occupation_code'] in gap_report.index:
+                    gap = gap_report.loc[occ_data['occupation_code']]
+                if gap is not None and gap['best_next_skill'] is not None:
+                    st.info(
+                        f"Próxima habilidade sugerida: **{gap['best_next_skill']}** "
+                        f"(compatibilidade de {gap['similarity_score']:.1f}% para {gap['score_after']:.1f}%)"
+                    )
+            elif skills_info:
                 st.write("**Principais habilidades:**")
                 skills_list = [s['skill'] for s in skills_info[:10]]
                 st.write(", ".join(skills_list))
@@ -138,6 +327,8 @@ def display_occupation_card(occ_data, similarity_score=None):
 
 def create_radar_chart(user_skills, occ_skills, occ_title):
     """Cria gráfico radar comparando habilidades"""
+    import plotly.graph_objects as go
+    
     # Selecionar até 8 habilidades para o radar
     all_relevant_skills = list(set(user_skills + occ_skills))[:8]
     
@@ -168,14 +359,55 @@ def create_radar_chart(user_skills, occ_skills, occ_title):
     
     return fig
 
+def debug_panel_requested():
+    """O painel de diagnóstico só aparece com ?debug=1 na URL"""
+    if hasattr(st, 'query_params'):
+        return st.query_params.get('debug') == '1'
+    return st.experimental_get_query_params().get('debug') == ['1']
+
+def display_debug_panel():
+    """Painel de diagnóstico na barra lateral: tempos dos spans, memória e métricas"""
+    with st.sidebar.expander("Diagnóstico", expanded=True):
+        st.caption("As opções abaixo valem para todo o processo (todas as sessões), não só para esta.")
+        enabled = st.checkbox("Medir tempos (todo o processo)", value=tracing_enabled(), key="debug_tracing")
+        memory = st.checkbox(
+            "Medir memória (tracemalloc; deixa todas as sessões ~2,5x mais lentas)",
+            value=memory_tracing_enabled(), key="debug_memory", disabled=not enabled
+        )
+        if enabled != tracing_enabled() or (enabled and memory != memory_tracing_enabled()):
+            enable_tracing(enabled, memory=enabled and memory)
+        if st.button("Limpar medições", key="debug_reset"):
+            reset_tracing()
+        
+        st.markdown("**Spans (ms)**")
+        st.dataframe(span_summary().round(3), hide_index=True, use_container_width=True)
+        
+        spans_memory, snapshot = memory_summary()
+        st.markdown("**Memória das cargas (MB)**")
+        st.dataframe(spans_memory.round(2), hide_index=True, use_container_width=True)
+        if not snapshot.empty:
+            st.markdown("**Maiores alocações (tracemalloc)**")
+            st.dataframe(snapshot.round(2), hide_index=True, use_container_width=True)
+        
+        st.download_button(
+            label="Métricas (Prometheus)",
+            data=prometheus_text(),
+            file_name="metrics.prom",
+            mime="text/plain"
+        )
+
 # ============================================================================
 # INTERFACE PRINCIPAL
 # ============================================================================
 
 def main():
+    # Aquecimento em segundo plano (uma vez por processo): artefatos carregados
+    # em paralelo e índices pré-construídos antes de serem pedidos pelas páginas
+    start_warm_up()
+    
     # Carregar dados
     try:
-        occupations_df, skills_df, skills_matrix, all_skills_list = load_all_data()
+        occupations_df = load_page_occupations()
         
         # Verificar se os dados foram carregados
         if occupations_df.empty:
@@ -197,7 +429,7 @@ def main():
     
     st.sidebar.title("Navegação")
     page = st.sidebar.radio("Escolha uma página:", 
-                            ["Início", "Recomendações", "Explorar Dados", "Sobre"])
+                            ["Início", "Recomendações", "Explorar Dados", "Transição de Carreira", "Sobre"])
     
     st.sidebar.markdown("---")
     st.sidebar.markdown("### Integrantes")
@@ -281,38 +513,10 @@ def main():
         
         # Seleção de habilidades
         st.markdown("### Suas Habilidades")
-        st.write("Selecione as habilidades que você possui marcando as caixas abaixo:")
-        
-        # Categorizar habilidades
-        tech_skills = ['Programming', 'Data Analysis', 'Machine Learning', 'Cloud Computing', 
-                      'Cybersecurity', 'Web Development', 'Mobile Development', 'AI/Deep Learning',
-                      'Database Management', 'DevOps', 'Data Visualization', 'Statistical Analysis']
-        business_skills = ['Leadership', 'Project Management', 'Business Analysis', 
-                         'Marketing', 'Sales', 'HR Management', 'Financial Analysis']
-        soft_skills = ['Communication', 'Problem Solving', 'Critical Thinking', 'Creativity', 
-                      'Teamwork', 'Adaptability', 'Time Management']
-        other_skills = ['Research', 'Technical Writing', 'Design', 'Healthcare Knowledge',
-                       'Customer Service', 'Renewable Energy', 'Sustainability']
-        
-        col1, col2, col3, col4 = st.columns(4)
+        st.write("Busque pelo nome (em inglês ou português) e adicione as habilidades que você possui:")
         
-        with col1:
-            st.markdown("**💻 Técnicas**")
-            tech_selected = [skill for skill in tech_skills if st.checkbox(skill, key=f"tech_{skill}")]
-        
-        with col2:
-            st.markdown("**💼 Negócios**")
-            biz_selected = [skill for skill in business_skills if st.checkbox(skill, key=f"biz_{skill}")]
-        
-        with col3:
-            st.markdown("**🤝 Soft Skills**")
-            soft_selected = [skill for skill in soft_skills if st.checkbox(skill, key=f"soft_{skill}")]
-        
-        with col4:
-            st.markdown("**🔧 Outras**")
-            other_selected = [skill for skill in other_skills if st.checkbox(skill, key=f"other_{skill}")]
-        
-        selected_skills = tech_selected + biz_selected + soft_selected + other_selected
+        recommender_index = load_recommender_index()
+        selected_skills = select_skills(recommender_index.vocabulary)
         
         # Mostrar habilidades selecionadas
         if selected_skills:
@@ -325,135 +529,125 @@ def main():
             num_recommendations = st.slider("Número de recomendações:", 5, 20, 10)
             filter_future_only = st.checkbox("Mostrar apenas profissões do futuro (crescimento > 15%)")
             min_salary = st.slider("Salário mínimo anual (USD):", 0, 200000, 0, 10000)
+            cache_stats = load_recommendation_cache().stats()
+            st.caption(
+                f"Cache de recomendações: {cache_stats['hit_rate']:.0%} de acertos, "
+                f"{cache_stats['entries']} entradas, {cache_stats['evictions']} remoções"
+            )
         
         # Botão de recomendação
+        query_key = recommendation_query_key(
+            selected_skills, num_recommendations, filter_future_only, min_salary, recommender_index
+        )
+        result = st.session_state.get('recommendation_result')
+        
         if st.button("Obter Recomendações", type="primary"):
             if not selected_skills:
                 st.error("Por favor, selecione pelo menos uma habilidade!")
-            else:
+            elif result is None or result['query_key'] != query_key:
                 with st.spinner("Analisando e gerando recomendações..."):
-                    # Obter recomendações
-                    recommendations = get_recommendations(
-                        selected_skills, 
-                        skills_matrix, 
-                        occupations_df,
-                        top_n=num_recommendations
-                    )
-                    
-                    # Aplicar filtros
-                    if filter_future_only:
-                        recommendations = recommendations[recommendations['is_future_job']]
-                    
-                    if min_salary > 0:
-                        recommendations = recommendations[recommendations['median_salary'] >= min_salary]
-                    
-                    if recommendations.empty:
-                        st.warning("Nenhuma profissão encontrada com os filtros aplicados. Tente ajustar os critérios.")
-                    else:
-                        st.success(f"Encontradas {len(recommendations)} recomendações!")
-                        
-                        # Visualização geral
-                        st.markdown("### Visão Geral das Recomendações")
-                        
-                        # Gráfico de scores
-                        fig = px.bar(
-                            recommendations.head(10),
-                            x='similarity_score',
-                            y='occupation_title',
-                            orientation='h',
-                            title='Top 10 Profissões por Compatibilidade',
-                            labels={'similarity_score': 'Score de Compatibilidade (%)', 
-                                   'occupation_title': 'Profissão',
-                                   'median_salary': 'Salário Anual (USD)'},
-                            color='projected_growth',
-                            color_continuous_scale='RdYlGn',
-                            hover_data=['median_salary']
-                        )
-                        fig.update_layout(height=500, yaxis={'categoryorder':'total ascending'})
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Scatter plot: Salário vs Crescimento
-                        fig2 = px.scatter(
-                            recommendations,
-                            x='median_salary',
-                            y='projected_growth',
-                            size='similarity_score',
-                            color='similarity_score',
-                            hover_data=['occupation_title'],
-                            title='Oportunidades: Salário Anual vs Crescimento',
-                            labels={
-                                'median_salary': 'Salário Anual (USD)',
-                                'projected_growth': 'Crescimento Projetado (%)',
-                                'similarity_score': 'Compatibilidade (%)'
-                            },
-                            color_continuous_scale='Viridis'
-                        )
-                        fig2.update_layout(height=500)
-                        st.plotly_chart(fig2, use_container_width=True)
-                        
-                        st.markdown("---")
-                        st.markdown("### Detalhes das Recomendações")
-                        
-                        # Exibir cards de recomendações
-                        for idx, row in recommendations.iterrows():
-                            display_occupation_card(row, similarity_score=row['similarity_score'])
-                        
-                        # Opção de download
-                        st.markdown("---")
-                        csv = recommendations.to_csv(index=False)
-                        st.download_button(
-                            label="Baixar Recomendações (CSV)",
-                            data=csv,
-                            file_name="recomendacoes_profissoes.csv",
-                            mime="text/csv"
+                    # Obter recomendações (filtros aplicados sobre o ranking em cache)
+                    with span('streamlit.recommend'):
+                        recommendations = get_cached_recommendations(
+                            selected_skills,
+                            recommender_index,
+                            top_n=num_recommendations,
+                            future_only=filter_future_only,
+                            min_salary=min_salary,
+                            cache=load_recommendation_cache()
                         )
+                    result = build_recommendation_result(
+                        query_key, recommendations, selected_skills, recommender_index
+                    )
+                    st.session_state['recommendation_result'] = result
+        
+        # Resultados guardados na sessão sobrevivem às reexecuções do script
+        if result is not None:
+            recommendations = result['recommendations']
+            if result['query_key'] != query_key:
+                st.caption("Resultados da consulta anterior. Clique em \"Obter Recomendações\" para atualizar.")
+            
+            if recommendations.empty:
+                st.warning("Nenhuma profissão encontrada com os filtros aplicados. Tente ajustar os critérios.")
+            else:
+                st.success(f"Encontradas {len(recommendations)} recomendações!")
+                
+                # Visualização geral
+                st.markdown("### Visão Geral das Recomendações")
+                fig, fig2 = result['figures']
+                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig2, use_container_width=True)
+                
+                st.markdown("---")
+                st.markdown("### Detalhes das Recomendações")
+                
+                # Exibir cards de recomendações
+                display_recommendation_cards(result)
+                
+                # Opção de download
+                st.markdown("---")
+                st.download_button(
+                    label="Baixar Recomendações (CSV)",
+                    data=result['csv'],
+                    file_name="recomendacoes_profissoes.csv",
+                    mime="text/csv"
+                )
     
     # ========================================================================
     # PÁGINA: EXPLORAR DADOS
     # ========================================================================
     
     elif page == "Explorar Dados":
+        import plotly.express as px
+        
         st.title("Explorar Profissões")
         st.info("**Nota**: Os salários são valores anuais em dólares americanos (USD).")
         
         # Filtros
         st.sidebar.markdown("### Filtros")
         
+        # Índice de consultas: filtros viram buscas binárias e máscaras, sem copiar o DataFrame
+        query_index = get_occupation_query_index()
+        
         # Filtro por crescimento
         min_growth = st.sidebar.slider("Crescimento mínimo (%):", 0, 50, 0)
         
         # Filtro por salário
+        min_salary, max_salary = (int(value) for value in query_index.column_range('median_salary'))
         salary_range = st.sidebar.slider(
             "Faixa de salário anual (USD):",
-            int(occupations_df['median_salary'].min()),
-            int(occupations_df['median_salary'].max()),
-            (int(occupations_df['median_salary'].min()), int(occupations_df['median_salary'].max()))
+            min_salary,
+            max_salary,
+            (min_salary, max_salary)
         )
         
         # Filtro de profissões do futuro
         only_future = st.sidebar.checkbox("Apenas profissões do futuro")
         
         # Aplicar filtros
-        filtered_df = occupations_df.copy()
-        filtered_df = filtered_df[filtered_df['projected_growth'] >= min_growth]
-        filtered_df = filtered_df[
-            (filtered_df['median_salary'] >= salary_range[0]) & 
-            (filtered_df['median_salary'] <= salary_range[1])
-        ]
-        
-        if only_future:
-            filtered_df = filtered_df[filtered_df['is_future_job']]
+        selected = query_index.select(
+            min_growth=min_growth, salary_range=salary_range, future_only=only_future
+        )
+        n_selected = int(np.count_nonzero(selected))
         
-        st.info(f"Exibindo {len(filtered_df)} de {len(occupations_df)} profissões")
+        st.info(f"Exibindo {n_selected} de {len(occupations_df)} profissões")
         
         # Tabs para diferentes visualizações
         tab1, tab2, tab3 = st.tabs(["Lista", "Gráficos", "Habilidades"])
         
         with tab1:
-            # Tabela interativa
+            # Tabela paginada: apenas a página visível é materializada
+            page_size = 50
+            n_pages = max(1, -(-n_selected // page_size))
+            page_number = st.number_input("Página:", min_value=1, max_value=n_pages, value=1, step=1)
+            st.caption(f"Página {page_number} de {n_pages}")
             st.dataframe(
-                filtered_df[['occupation_title', 'median_salary', 'projected_growth', 
-                            'is_future_job']].sort_values('projected_growth', ascending=False),
+                query_index.page(
+                    query_index.top_rows(selected, 'projected_growth'),
+                    page_number,
+                    page_size,
+                    columns=['occupation_title', 'median_salary', 'projected_growth', 'is_future_job']
+                ),
                 use_container_width=True,
                 hide_index=True
             )
@@ -465,7 +659,7 @@ def main():
             with col1:
                 # Top 10 por salário
                 fig1 = px.bar(
-                    filtered_df.nlargest(10, 'median_salary'),
+                    query_index.frame(query_index.top_rows(selected, 'median_salary', 10)),
                     x='median_salary',
                     y='occupation_title',
                     orientation='h',
@@ -480,7 +674,7 @@ def main():
             with col2:
                 # Top 10 por crescimento
                 fig2 = px.bar(
-                    filtered_df.nlargest(10, 'projected_growth'),
+                    query_index.frame(query_index.top_rows(selected, 'projected_growth', 10)),
                     x='projected_growth',
                     y='occupation_title',
                     orientation='h',
@@ -493,11 +687,10 @@ def main():
             
             # Distribuição
             fig3 = px.histogram(
-                filtered_df,
-                x='median_salary',
+                x=query_index.values(selected, 'median_salary'),
                 nbins=20,
                 title='Distribuição de Salários Anuais',
-                labels={'median_salary': 'Salário Anual (USD)'}
+                labels={'x': 'Salário Anual (USD)'}
             )
             st.plotly_chart(fig3, use_container_width=True)
         
@@ -505,7 +698,7 @@ def main():
             # Análise de habilidades
             st.markdown("### Habilidades Mais Demandadas")
             
-            skill_counts = skills_df['skill_name'].value_counts().head(20)
+            skill_counts = get_skill_occupation_counts().head(20)
             
             fig = px.bar(
                 x=skill_counts.values,
@@ -517,6 +710,55 @@ def main():
             fig.update_layout(height=600)
             st.plotly_chart(fig, use_container_width=True)
     
+    # ========================================================================
+    # PÁGINA: TRANSIÇÃO DE CARREIRA
+    # ========================================================================
+    
+    elif page == "Transição de Carreira":
+        st.title("Transição de Carreira")
+        st.markdown("Descubra por quais profissões passar para chegar a uma profissão do futuro, "
+                    "adquirindo o menor número de habilidades em cada etapa.")
+        
+        # Grafo pré-calculado (utils.career_paths): consultas sem recalcular similaridades
+        career_graph = load_career_graph()
+        if career_graph is None:
+            st.warning("Grafo de carreiras não encontrado ou desatualizado. Execute: python -m utils.career_paths build")
+        else:
+            titles = occupations_df.set_index('occupation_code')['occupation_title'].to_dict()
+            codes = [code for code in occupations_df['occupation_code'] if code in career_graph.code_to_row]
+            future_codes = [
+                code for code, future in zip(occupations_df['occupation_code'], occupations_df['is_future_job'])
+                if future and code in career_graph.code_to_row
+            ]
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                source_code = st.selectbox("Profissão atual:", codes, format_func=lambda code: titles.get(code, code))
+            with col2:
+                only_future = st.checkbox("Apenas profissões do futuro", value=True)
+                target_options = [
+                    code for code in (future_codes if only_future and future_codes else codes) if code != source_code
+                ]
+                target_code = st.selectbox(
+                    "Profissão desejada:", target_options, format_func=lambda code: titles.get(code, code)
+                )
+            n_paths = st.slider("Número de caminhos:", 1, 5, 3)
+            
+            if target_code is not None:
+                paths = career_graph.k_shortest_paths(source_code, target_code, n_paths=n_paths)
+                if not paths:
+                    st.warning("Nenhum caminho encontrado entre essas profissões.")
+                for number, path in enumerate(paths, 1):
+                    st.markdown(
+                        f"#### Caminho {number}: {path['cost']} habilidades a adquirir, "
+                        f"{len(path['steps'])} etapa(s)"
+                    )
+                    for step in path['steps']:
+                        st.write(
+                            f"**{titles.get(step['from'], step['from'])}** → **{titles.get(step['to'], step['to'])}**: "
+                            f"{', '.join(step['skills_to_acquire']) or 'nenhuma habilidade nova'}"
+                        )
+    
     # ========================================================================
     # PÁGINA: SOBRE
     # ========================================================================
@@ -594,6 +836,10 @@ def main():
         """)
         
         st.info("**Dica**: Use o menu lateral para explorar as funcionalidades do sistema!")
+    
+    # Exibido por último para incluir os spans desta execução
+    if debug_panel_requested():
+        display_debug_panel()
 
 # ============================================================================
 # EXECUÇÃO
@@ -0,0 +1,135 @@
+"""
+Fixtures compartilhadas pelos testes
+
+Cada teste roda sobre uma cópia de data/ e um diretório de modelo vazio em
+tmp_path, de modo que caches, artefatos e segmentos gravados pelos testes
+nunca tocam os arquivos do repositório.
+"""
+
+import importlib
+import pkgutil
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+from utils.data_loader import DATA_DIR_ENV, get_catalog, load_occupation_skills_matrix, load_occupations_data
+from utils.recommender import build_recommender_index, calculate_similarity, create_user_skills_vector
+from utils.vocabulary import SkillVocabulary, load_skill_aliases
+
+REPO_DATA_DIR = Path(__file__).resolve().parent.parent.parent / 'data'
+
+# Importa todos os módulos de utils para que get_model_path possa ser
+# substituído onde quer que tenha sido importado por nome
+UTILS_MODULES = [
+    importlib.import_module(f'utils.{module.name}') for module in pkgutil.iter_modules(utils.__path__)
+]
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Cópia de data/ apontada por GS2_DATA_DIR"""
+    path = tmp_path / 'data'
+    shutil.copytree(REPO_DATA_DIR, path, ignore=shutil.ignore_patterns('.cache', '.gitkeep'))
+    monkeypatch.setenv(DATA_DIR_ENV, str(path))
+    get_catalog().clear()
+    yield path
+    get_catalog().clear()
+
+@pytest.fixture(autouse=True)
+def model_dir(tmp_path, monkeypatch):
+    """Diretório de modelo vazio no lugar de app/model"""
+    path = tmp_path / 'model'
+    path.mkdir()
+    for module in UTILS_MODULES:
+        if hasattr(module, 'get_model_path'):
+            monkeypatch.setattr(module, 'get_model_path', lambda: path)
+    for module, name, value in _process_state():
+        monkeypatch.setattr(module, name, value)
+    return path
+
+def _process_state():
+    """Estado global dos módulos, restaurado ao fim de cada teste"""
+    from utils import index_artifact, recommender, result_cache, segments, warmup
+    return [
+        (index_artifact, '_serving_index', None),
+        (segments, '_pending', {}),
+        (segments, 'PENDING_CHECK_INTERVAL', 0.0),
+        (result_cache, '_cache', None),
+        (recommender, '_stale_warnings', set()),
+        (warmup, '_started', None),
+    ]
+
+@pytest.fixture
+def synthetic_dir(data_dir):
+    """Substitui a cópia de data/ por um conjunto sintético maior"""
+    from utils.synthetic import write_synthetic_dataset
+    for path in data_dir.iterdir():
+        path.unlink()
+    write_synthetic_dataset(data_dir, n_occupations=400, n_skills=150, mean_skills=12, seed=7)
+    get_catalog().clear()
+    return data_dir
+
+@pytest.fixture
+def index():
+    """Índice denso construído a partir dos arquivos de dados"""
+    return build_recommender_index()
+
+@pytest.fixture
+def profiles(index):
+    """Perfis determinísticos, incluindo vazio, desconhecido e sinônimo"""
+    rng = np.random.default_rng(0)
+    profiles = [
+        rng.choice(index.skills, size=rng.integers(1, 9), replace=False).tolist()
+        for _ in range(60)
+    ]
+    return profiles + [[], ['Habilidade Inexistente'], ['SQL', index.skills[0]]]
+
+def baseline_scores(skills):
+    """
+    Scores (%) da implementação densa original: scikit-learn sobre o DataFrame
+
+    Args:
+        skills (list): Habilidades selecionadas
+
+    Returns:
+        pd.Series: Scores por código de ocupação
+    """
+    matrix = load_occupation_skills_matrix()
+    vocabulary = SkillVocabulary(matrix.columns.tolist(), aliases=load_skill_aliases())
+    user_vector = create_user_skills_vector(skills, vocabulary)
+    return calculate_similarity(user_vector, matrix) * 100
+
+def baseline_recommendations(skills, top_n):
+    """Recomendações da implementação densa original (nlargest + merge)"""
+    occupations = load_occupations_data().set_index('occupation_code')
+    top = baseline_scores(skills).nlargest(top_n)
+    top = top[top.index.isin(occupations.index)]
+    return pd.DataFrame({'occupation_code': top.index, 'similarity_score': top.values})
+
+def assert_matches_baseline(codes, scores, skills, top_n, candidates=None):
+    """
+    Verifica um top-k contra a força bruta densa
+
+    Empates podem ser ordenados de forma diferente entre float32 e float64,
+    então a comparação é feita pelos scores: os valores retornados devem ser
+    os top_n maiores, e cada código deve ter o score de referência.
+
+    Args:
+        codes (list): Códigos retornados
+        scores (list): Scores retornados (%)
+        skills (list): Habilidades da consulta
+        top_n (int): Número de recomendações pedido
+        candidates (pd.Index, optional): Restringe a referência a estes códigos
+    """
+    reference = baseline_scores(skills)
+    if candidates is not None:
+        reference = reference[reference.index.isin(candidates)]
+    expected = reference.nlargest(top_n)
+    codes = list(codes)
+    assert len(codes) == len(expected)
+    assert len(set(codes)) == len(codes)
+    np.testing.assert_allclose(np.asarray(scores, dtype=np.float64), expected.values, atol=1e-3)
+    np.testing.assert_allclose(reference.loc[codes].values, np.asarray(scores, dtype=np.float64), atol=1e-3)
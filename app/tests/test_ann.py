@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.ann import ANN_INDEX_FILE, LSHIndex, evaluate_recall, get_ann_index, load_ann_index, main, sample_queries
+from utils.recommender import _top_k_indices, build_recommender_index
+from utils.result_cache import index_version
+
+@pytest.fixture
+def large_index(synthetic_dir):
+    return build_recommender_index(backend='sparse')
+
+def test_query_scores_are_exact(large_index):
+    ann_index = LSHIndex(n_tables=4, n_bits=6, seed=1).fit(large_index.matrix)
+    for skills in sample_queries(large_index.skills, n_queries=30, seed=2):
+        vector = large_index.user_vector(skills)
+        rows, scores = ann_index.query(vector, k=10, n_probes=1)
+        assert len(rows) == 10 and len(set(rows.tolist())) == 10
+        np.testing.assert_allclose(scores, large_index.matrix[rows] @ vector, atol=1e-6)
+        assert np.all(np.diff(scores) <= 0)
+        assert set(rows.tolist()) <= set(ann_index.candidates(vector, n_probes=1).tolist())
+
+def test_recall_grows_with_probes(large_index):
+    ann_index = LSHIndex(n_tables=16, n_bits=6, seed=0).fit(large_index.matrix)
+    queries = sample_queries(large_index.skills, n_queries=100, seed=3)
+    report = evaluate_recall(large_index, ann_index, queries, k=10, probes=(0, 2, 4))
+    recall = report['recall@10'].to_numpy()
+    candidates = report['avg_candidates'].to_numpy()
+    assert np.all(np.diff(recall) >= 0) and np.all(np.diff(candidates) >= 0)
+    assert recall[-1] >= 0.95
+    assert candidates[-1] < large_index.matrix.shape[0]
+
+def test_all_probes_on_one_bit_is_exact(large_index):
+    ann_index = LSHIndex(n_tables=1, n_bits=1).fit(large_index.matrix)
+    for skills in sample_queries(large_index.skills, n_queries=20, seed=4):
+        vector = large_index.user_vector(skills)
+        rows, scores = ann_index.query(vector, k=10, n_probes=1)
+        exact = large_index.matrix @ vector
+        np.testing.assert_array_equal(rows, _top_k_indices(exact, 10))
+
+def test_few_candidates_fall_back_to_brute_force(index):
+    ann_index = LSHIndex(n_tables=1, n_bits=12).fit(index.matrix)
+    vector = index.user_vector(index.skills[:3])
+    rows, scores = ann_index.query(vector, k=index.matrix.shape[0], n_probes=0)
+    exact = index.matrix @ vector
+    np.testing.assert_array_equal(rows, _top_k_indices(exact, index.matrix.shape[0]))
+
+def test_save_load_round_trip(tmp_path, large_index):
+    ann_index = LSHIndex(n_tables=3, n_bits=7, seed=5).fit(large_index.matrix, 'v1')
+    ann_index.save(tmp_path / ANN_INDEX_FILE)
+    loaded = LSHIndex.load(tmp_path / ANN_INDEX_FILE)
+    assert loaded.index_version == 'v1'
+    with pytest.raises(ValueError):
+        loaded.query(large_index.user_vector(large_index.skills[:2]))
+    loaded.attach(large_index.matrix, 'v1')
+    for skills in sample_queries(large_index.skills, n_queries=10, seed=6):
+        vector = large_index.user_vector(skills)
+        for expected, actual in zip(ann_index.query(vector, n_probes=2), loaded.query(vector, n_probes=2)):
+            np.testing.assert_array_equal(expected, actual)
+
+def test_attach_rejects_other_matrix_or_version(index):
+    ann_index = LSHIndex(n_tables=2, n_bits=4).fit(index.matrix, 'v1')
+    with pytest.raises(ValueError):
+        ann_index.attach(index.matrix[:-1])
+    with pytest.raises(ValueError):
+        ann_index.attach(index.matrix, 'v2')
+    ann_index.attach(index.matrix)
+
+def test_n_bits_is_validated():
+    with pytest.raises(ValueError):
+        LSHIndex(n_bits=0)
+    with pytest.raises(ValueError):
+        LSHIndex(n_bits=32)
+
+def test_load_ann_index_checks_source_version(model_dir, index, data_dir, capsys):
+    assert load_ann_index(index) is None
+    LSHIndex(n_tables=2, n_bits=4).fit(index.matrix, index_version(index)).save(model_dir / ANN_INDEX_FILE)
+    assert load_ann_index(index) is not None
+
+    matrix = pd.read_csv(data_dir / 'occupation_skills_matrix.csv', index_col=0)
+    matrix.iloc[0, 0] = 1 - matrix.iloc[0, 0]
+    matrix.to_csv(data_dir / 'occupation_skills_matrix.csv')
+    changed = build_recommender_index()
+    assert load_ann_index(changed) is None
+    assert 'Índice ANN ignorado' in capsys.readouterr().out
+
+def test_get_ann_index_is_loaded_once_per_index(model_dir, index):
+    LSHIndex(n_tables=2, n_bits=4).fit(index.matrix, index_version(index)).save(model_dir / ANN_INDEX_FILE)
+    ann_index = get_ann_index(index)
+    assert ann_index is not None
+    (model_dir / ANN_INDEX_FILE).unlink()
+    assert get_ann_index(index) is ann_index
+
+def test_recommend_with_ann_index(large_index):
+    ann_index = LSHIndex(n_tables=1, n_bits=1).fit(large_index.matrix)
+    skills = large_index.skills[:4]
+    pd.testing.assert_frame_equal(
+        large_index.recommend(skills, top_n=5, ann_index=ann_index, n_probes=1),
+        large_index.recommend(skills, top_n=5)
+    )
+
+def test_cli_build_and_benchmark(model_dir, capsys):
+    assert main(['build', '--tables', '2', '--bits', '4']) == 0
+    assert (model_dir / ANN_INDEX_FILE).exists()
+    assert main(['benchmark', '--queries', '5', '--k', '3', '--probes', '0', '1']) == 0
+    assert 'recall@3' in capsys.readouterr().out
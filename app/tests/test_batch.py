@@ -0,0 +1,97 @@
+import csv
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import assert_matches_baseline
+from utils.batch import iter_profile_chunks, main, score_profiles_file
+from utils.recommender import create_user_skills_matrix, get_recommendations_batch
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1024])
+def test_batch_matches_dense_baseline(index, profiles, chunk_size):
+    user_matrix = create_user_skills_matrix(profiles, index.vocabulary)
+    codes, scores = get_recommendations_batch(user_matrix, index, top_n=5, chunk_size=chunk_size)
+    assert codes.shape == scores.shape == (len(profiles), 5)
+    for skills, user_codes, user_scores in zip(profiles, codes, scores):
+        assert_matches_baseline(user_codes, user_scores, skills, 5)
+
+def test_batch_matches_single_queries(index, profiles):
+    user_matrix = create_user_skills_matrix(profiles, index.vocabulary)
+    codes, scores = get_recommendations_batch(user_matrix, index, top_n=8)
+    for skills, user_codes, user_scores in zip(profiles, codes, scores):
+        single = index.recommend(skills, top_n=8)
+        assert single['occupation_code'].tolist() == user_codes.tolist()
+        np.testing.assert_allclose(single['similarity_score'], user_scores, atol=1e-4)
+
+def test_batch_top_n_is_capped_by_occupations(index):
+    user_matrix = create_user_skills_matrix([index.skills[:2]], index.vocabulary)
+    codes, _ = get_recommendations_batch(user_matrix, index, top_n=10_000)
+    assert codes.shape == (1, index.matrix.shape[0])
+
+def test_recommend_batch_per_profile_top_n(index, profiles):
+    top_ns = [1 + i % 6 for i in range(len(profiles))]
+    frames = index.recommend_batch(profiles, top_n=top_ns)
+    records = index.recommend_batch(profiles, top_n=top_ns, as_records=True)
+    for skills, n, frame, rows in zip(profiles, top_ns, frames, records):
+        expected = index.recommend(skills, top_n=n)
+        pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+        assert [row['occupation_code'] for row in rows] == expected['occupation_code'].tolist()
+
+def test_user_matrix_resolves_aliases(index):
+    user_matrix = create_user_skills_matrix([['SQL'], ['sql', 'Desconhecida']], index.vocabulary)
+    column = index.skill_to_col['Database Management']
+    assert user_matrix.toarray().tolist() == [
+        [1.0 if col == column else 0.0 for col in range(len(index.skills))]
+    ] * 2
+
+def test_iter_profile_chunks_reads_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / 'perfis.csv'
+    csv_path.write_text('user_id,skills\nu1,Programming; Communication\nu2,\nu3,Design\n', encoding='utf-8')
+    jsonl_path = tmp_path / 'perfis.jsonl'
+    jsonl_path.write_text(
+        '{"user_id": "u1", "skills": ["Programming", "Communication"]}\n\n'
+        '{"user_id": "u2"}\n{"user_id": "u3", "skills": ["Design"]}\n',
+        encoding='utf-8'
+    )
+    for path in (csv_path, jsonl_path):
+        chunks = list(iter_profile_chunks(path, chunk_size=2))
+        assert chunks == [
+            (['u1', 'u2'], [['Programming', 'Communication'], []]),
+            (['u3'], [['Design']]),
+        ]
+
+@pytest.mark.parametrize('suffix', ['.csv', '.jsonl'])
+def test_score_profiles_file_streams_results(tmp_path, index, profiles, suffix):
+    input_path = tmp_path / 'perfis.jsonl'
+    with open(input_path, 'w', encoding='utf-8') as f:
+        for i, skills in enumerate(profiles):
+            f.write(json.dumps({'user_id': f'u{i}', 'skills': skills}) + '\n')
+    output_path = tmp_path / f'saida{suffix}'
+
+    assert score_profiles_file(input_path, output_path, index, top_n=3, chunk_size=10) == len(profiles)
+
+    if suffix == '.csv':
+        with open(output_path, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        results = {}
+        for row in rows:
+            results.setdefault(row['user_id'], []).append(row['occupation_code'])
+        assert [row['rank'] for row in rows[:3]] == ['1', '2', '3']
+    else:
+        with open(output_path, encoding='utf-8') as f:
+            results = {
+                record['user_id']: [item['occupation_code'] for item in record['recommendations']]
+                for record in map(json.loads, f)
+            }
+    for i, skills in enumerate(profiles):
+        assert results[f'u{i}'] == index.recommend(skills, top_n=3)['occupation_code'].tolist()
+
+def test_cli_scores_csv_profiles(tmp_path, capsys):
+    input_path = tmp_path / 'perfis.csv'
+    input_path.write_text('user_id,skills\nu1,Programming;Data Analysis\n', encoding='utf-8')
+    output_path = tmp_path / 'saida.csv'
+    assert main([str(input_path), str(output_path), '--top-n', '2', '--backend', 'sparse']) == 0
+    assert '1 perfis pontuados' in capsys.readouterr().out
+    assert len(output_path.read_text(encoding='utf-8').splitlines()) == 3
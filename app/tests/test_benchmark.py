@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from utils import benchmark
+from utils.benchmark import compare, measure, parse_scale, time_operation
+
+OPERATIONS = [
+    'load_first_csv', 'load_occupations_data', 'load_skills_data', 'load_occupation_skills_matrix_sparse',
+    'load_occupation_skills_matrix', 'build_index', 'create_user_skills_vector', 'calculate_similarity',
+    'get_recommendations', 'get_skills_for_occupation',
+]
+
+def test_parse_scale():
+    assert parse_scale('1000x500') == (1000, 500)
+    assert parse_scale('20X38') == (20, 38)
+    with pytest.raises(ValueError):
+        parse_scale('1000')
+
+def test_time_operation_counts_calls():
+    calls = []
+    stats = time_operation(calls.append, ['a', 'b', 'c'], repeat=10, warmup=2)
+    assert calls == ['a', 'b'] + ['a', 'b', 'c'] * 3 + ['a']
+    assert stats['n'] == 10 and 0 <= stats['p50_ms'] <= stats['p99_ms'] and stats['throughput'] > 0
+
+def test_compare_flags_regressions_on_repeated_operations():
+    baseline = [
+        {'scale': '20x38', 'operation': 'calculate_similarity', 'p50_ms': 1.0, 'n': 200},
+        {'scale': '20x38', 'operation': 'get_recommendations', 'p50_ms': 1.0, 'n': 200},
+        {'scale': '20x38', 'operation': 'build_index', 'p50_ms': 1.0, 'n': 1},
+    ]
+    results = [
+        {'scale': '20x38', 'operation': 'calculate_similarity', 'p50_ms': 1.1, 'n': 200},
+        {'scale': '20x38', 'operation': 'get_recommendations', 'p50_ms': 1.5, 'n': 200},
+        {'scale': '20x38', 'operation': 'build_index', 'p50_ms': 9.0, 'n': 1},
+    ]
+    comparison = compare(results, baseline, tolerance=0.2)
+    assert comparison.set_index('operation')['regression'].to_dict() == {
+        'calculate_similarity': False, 'get_recommendations': True,
+    }
+
+def test_measure_reports_every_operation(data_dir):
+    results = measure(repeat=5, load_repeat=2, n_queries=10)
+    assert [result['operation'] for result in results] == OPERATIONS
+    assert all(result['p50_ms'] >= 0 and result['peak_rss_mb'] > 0 for result in results)
+
+def test_measure_without_dense_csv(synthetic_dir):
+    (synthetic_dir / 'occupation_skills_matrix.csv').unlink()
+    operations = [result['operation'] for result in measure(repeat=5, load_repeat=2, n_queries=10)]
+    assert 'load_sparse_matrix_npz' in operations and 'load_occupation_skills_matrix' not in operations
+
+def test_run_saves_and_compares_baseline(tmp_path, capsys):
+    baseline_path = tmp_path / 'baseline.json'
+    args = ['run', '--scales', '20x38', '--work-dir', str(tmp_path / 'work'), '--repeat', '5', '--load-repeat', '2']
+    assert benchmark.main(args + ['--save', str(baseline_path)]) == 0
+    saved = json.loads(baseline_path.read_text(encoding='utf-8'))
+    assert {result['operation'] for result in saved['results']} == set(OPERATIONS)
+    assert all(result['scale'] == '20x38' for result in saved['results'])
+
+    # Uma baseline muito mais rápida faz a comparação falhar
+    for result in saved['results']:
+        result['p50_ms'] = 1e-9
+    baseline_path.write_text(json.dumps(saved), encoding='utf-8')
+    assert benchmark.main(args + ['--compare', str(baseline_path)]) == 1
+    assert 'regrediram' in capsys.readouterr().err
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+
+from conftest import assert_matches_baseline, baseline_scores
+from utils.bitset import BitsetSkillIndex, pack_rows, popcount
+from utils.data_loader import load_occupation_skills_matrix, load_occupation_skills_matrix_sparse
+from utils.recommender import build_recommender_index, calculate_match_percentage
+
+def _occupation_skill_sets(matrix):
+    return {code: set(matrix.columns[row > 0]) for code, row in zip(matrix.index, matrix.to_numpy())}
+
+def test_popcount_matches_python_bit_count():
+    rng = np.random.default_rng(0)
+    words = rng.integers(0, np.iinfo(np.uint64).max, size=(5, 3), dtype=np.uint64, endpoint=True)
+    expected = np.vectorize(lambda word: bin(int(word)).count('1'))(words)
+    np.testing.assert_array_equal(popcount(words), expected)
+
+def test_popcount_table_fallback(monkeypatch):
+    words = np.array([0, 1, 0xFF, np.iinfo(np.uint64).max], dtype=np.uint64)
+    monkeypatch.delattr(np, 'bitwise_count', raising=False)
+    np.testing.assert_array_equal(popcount(words), [0, 1, 8, 64])
+
+def test_pack_rows_dense_and_sparse_agree():
+    rng = np.random.default_rng(1)
+    binary = (rng.random((17, 150)) < 0.2).astype(np.uint8)
+    packed = pack_rows(binary)
+    assert packed.shape == (17, 3) and packed.dtype == np.uint64
+    np.testing.assert_array_equal(pack_rows(sp.csr_matrix(binary)), packed)
+    unpacked = np.unpackbits(packed.view(np.uint8), axis=1, bitorder='little')[:, :150]
+    np.testing.assert_array_equal(unpacked, binary)
+
+def test_cosine_matches_dense_baseline(profiles):
+    bitset = BitsetSkillIndex(load_occupation_skills_matrix(), block_size=4)
+    for skills in profiles:
+        np.testing.assert_allclose(bitset.scores(skills) * 100, baseline_scores(skills).values, atol=1e-9)
+
+def test_sparse_input_and_from_index_agree():
+    dense = BitsetSkillIndex(load_occupation_skills_matrix())
+    sparse = BitsetSkillIndex(load_occupation_skills_matrix_sparse())
+    from_index = BitsetSkillIndex.from_index(build_recommender_index())
+    for other in (sparse, from_index):
+        np.testing.assert_array_equal(other.bits, dense.bits)
+        np.testing.assert_array_equal(other.occupation_codes, dense.occupation_codes)
+        assert other.skills == dense.skills
+
+def test_match_percentages_and_jaccard_match_sets(synthetic_dir):
+    matrix = load_occupation_skills_matrix()
+    bitset = BitsetSkillIndex(matrix, block_size=64)
+    occupation_skills = _occupation_skill_sets(matrix)
+    rng = np.random.default_rng(3)
+    for _ in range(10):
+        user_skills = set(rng.choice(matrix.columns, size=rng.integers(1, 20), replace=False))
+        match = bitset.match_percentages(user_skills)
+        jaccard = bitset.scores(user_skills, metric='jaccard')
+        for code, value, jaccard_value in zip(match.index, match.values, jaccard):
+            skills = occupation_skills[code]
+            assert value == pytest.approx(calculate_match_percentage(user_skills, skills))
+            assert jaccard_value == pytest.approx(len(user_skills & skills) / len(user_skills | skills))
+
+def test_top_k_matches_dense_baseline(synthetic_dir):
+    bitset = BitsetSkillIndex(load_occupation_skills_matrix_sparse())
+    rng = np.random.default_rng(4)
+    for _ in range(20):
+        skills = rng.choice(bitset.skills, size=rng.integers(1, 10), replace=False).tolist()
+        codes, scores = bitset.top_k(skills, k=10)
+        assert_matches_baseline(codes, scores * 100, skills, 10)
+
+def test_queries_resolve_aliases():
+    bitset = BitsetSkillIndex(load_occupation_skills_matrix())
+    np.testing.assert_array_equal(bitset.scores(['SQL']), bitset.scores(['Database Management']))
+    assert bitset.pack_query(['sql', 'Desconhecida'])[1] == 1
+
+def test_unknown_metric_is_rejected():
+    bitset = BitsetSkillIndex(load_occupation_skills_matrix())
+    with pytest.raises(ValueError):
+        bitset.scores(['Programming'], metric='dice')
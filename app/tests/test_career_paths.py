@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from utils import index_artifact
+from utils.career_paths import CAREER_GRAPH_FILE, HOP_COST, CareerGraph, load_career_graph, main
+from utils.index_artifact import load_index_artifact, publish_index_artifact
+from utils.recommender import RecommenderIndex, build_recommender_index
+from utils.segments import SegmentedIndex, load_segments, retire_occupation
+from utils.synthetic import generate_dataset
+
+@pytest.fixture(scope='module')
+def graph():
+    occupations, _, sparse_matrix = generate_dataset(300, 120, mean_skills=10, seed=3)
+    return CareerGraph.from_index(RecommenderIndex(sparse_matrix, occupations), k=4, landmarks=8)
+
+def _random_graph(n_nodes=8, n_skills=10, density=0.35, seed=0):
+    """Grafo pequeno com custos coerentes com as habilidades de cada nó"""
+    rng = np.random.default_rng(seed)
+    node_skills = rng.random((n_nodes, n_skills)) < 0.4
+    edges = rng.random((n_nodes, n_nodes)) < density
+    np.fill_diagonal(edges, False)
+    indptr, indices, costs = [0], [], []
+    for source in range(n_nodes):
+        for target in np.flatnonzero(edges[source]):
+            indices.append(target)
+            costs.append(int((node_skills[target] & ~node_skills[source]).sum()))
+        indptr.append(len(indices))
+    skill_indptr = np.concatenate([[0], np.cumsum(node_skills.sum(axis=1))])
+    return CareerGraph(
+        [f'{i:02d}-0000.00' for i in range(n_nodes)], [f'Skill {i}' for i in range(n_skills)],
+        indptr, indices, costs, skill_indptr, np.flatnonzero(node_skills.ravel()) % n_skills
+    )
+
+def _path_weight(graph, codes):
+    rows = [graph.code_to_row[code] for code in codes]
+    matrix = graph.weight_matrix()
+    return sum(matrix[source, target] for source, target in zip(rows[:-1], rows[1:]))
+
+def _simple_paths(graph, source, target):
+    """Todos os caminhos sem ciclos (força bruta, só para grafos pequenos)"""
+    paths, stack = [], [[source]]
+    while stack:
+        path = stack.pop()
+        if path[-1] == target:
+            paths.append(path)
+            continue
+        node = path[-1]
+        for successor in graph.indices[graph.indptr[node]:graph.indptr[node + 1]].tolist():
+            if successor not in path:
+                stack.append(path + [successor])
+    return paths
+
+def test_edges_are_symmetric_with_skill_costs(graph):
+    matrix = graph.weight_matrix()
+    assert (matrix != 0).sum() == graph.n_edges
+    assert ((matrix != 0) != (matrix.T != 0)).nnz == 0
+    skills = graph.node_skills.toarray() > 0
+    for source in range(0, len(graph.occupation_codes), 7):
+        for target, cost in zip(graph.indices[graph.indptr[source]:graph.indptr[source + 1]],
+                                graph.costs[graph.indptr[source]:graph.indptr[source + 1]]):
+            assert cost == (skills[target] & ~skills[source]).sum()
+
+def test_heuristic_is_admissible(graph):
+    reverse = graph.weight_matrix(reverse=True)
+    for target in range(0, len(graph.occupation_codes), 37):
+        distances = dijkstra(reverse, indices=target)
+        h = graph.heuristic(target)
+        reachable = np.isfinite(distances)
+        assert (h[reachable] <= distances[reachable] + 1e-6).all()
+
+def test_shortest_path_matches_dijkstra(graph):
+    distances = dijkstra(graph.weight_matrix(), indices=np.arange(0, len(graph.occupation_codes), 29))
+    rng = np.random.default_rng(0)
+    for row, source in enumerate(range(0, len(graph.occupation_codes), 29)):
+        for target in rng.choice(len(graph.occupation_codes), size=10, replace=False):
+            result = graph.shortest_path(graph.occupation_codes[source], graph.occupation_codes[target])
+            if not np.isfinite(distances[row, target]):
+                assert result is None
+                continue
+            assert result['path'][0] == graph.occupation_codes[source]
+            assert result['path'][-1] == graph.occupation_codes[target]
+            assert _path_weight(graph, result['path']) == pytest.approx(distances[row, target], abs=1e-6)
+            hops = len(result['path']) - 1
+            assert result['cost'] == pytest.approx(distances[row, target] - hops * HOP_COST, abs=1e-6)
+
+def test_popular_targets_use_the_shortest_path_tree(graph):
+    source, target = graph.occupation_codes[1], graph.occupation_codes[200]
+    results = [graph.shortest_path(source, target) for _ in range(5)]
+    assert graph._targets[graph.code_to_row[target]]['tree'] is not None
+    assert all(result['cost'] == results[0]['cost'] for result in results)
+    assert len({len(result['path']) for result in results}) == 1
+
+def test_paths_without_landmarks():
+    graph = _random_graph(n_nodes=12, seed=1)
+    distances = dijkstra(graph.weight_matrix())
+    graph.select_landmarks(0)
+    assert len(graph.landmark_from) == 0
+    for source in range(12):
+        for target in range(12):
+            result = graph.shortest_path(graph.occupation_codes[source], graph.occupation_codes[target])
+            if np.isfinite(distances[source, target]):
+                assert _path_weight(graph, result['path']) == pytest.approx(distances[source, target], abs=1e-6)
+            else:
+                assert result is None
+
+@pytest.mark.parametrize('seed', range(5))
+def test_k_shortest_paths_match_enumeration(seed):
+    graph = _random_graph(seed=seed)
+    graph.select_landmarks(3)
+    source, target = 0, 7
+    expected = sorted(_path_weight(graph, graph.occupation_codes[path]) for path in _simple_paths(graph, source, target))
+    paths = graph.k_shortest_paths(graph.occupation_codes[source], graph.occupation_codes[target], n_paths=4)
+    assert len(paths) == min(4, len(expected))
+    weights = [_path_weight(graph, path['path']) for path in paths]
+    np.testing.assert_allclose(weights, expected[:len(paths)], atol=1e-9)
+    assert len({tuple(path['path']) for path in paths}) == len(paths)
+    assert all(len(set(path['path'])) == len(path['path']) for path in paths)
+
+def test_unknown_codes_and_empty_requests(graph):
+    code = graph.occupation_codes[0]
+    assert graph.shortest_path(code, '00-0000.00') is None
+    assert graph.k_shortest_paths('00-0000.00', code) == []
+    assert graph.k_shortest_paths(code, graph.occupation_codes[1], n_paths=0) == []
+    assert graph.shortest_path(code, code) == {'path': [code], 'cost': 0, 'steps': []}
+
+def test_save_and_load(graph, tmp_path):
+    graph.save(tmp_path / 'grafo.npz')
+    loaded = CareerGraph.load(tmp_path / 'grafo.npz')
+    np.testing.assert_array_equal(loaded.indices, graph.indices)
+    np.testing.assert_array_equal(loaded.costs, graph.costs)
+    np.testing.assert_array_equal(loaded.landmark_from, graph.landmark_from)
+    assert loaded.header == graph.header
+    source, target = graph.occupation_codes[3], graph.occupation_codes[150]
+    assert loaded.shortest_path(source, target) == graph.shortest_path(source, target)
+
+def test_retired_occupations_have_no_edges(index):
+    retire_occupation(index.occupation_codes[0])
+    graph = CareerGraph.from_index(SegmentedIndex(index, load_segments()), k=3, landmarks=2)
+    assert graph.indptr[1] == graph.indptr[0]
+    assert 0 not in graph.indices
+    assert graph.shortest_path(index.occupation_codes[1], index.occupation_codes[0]) is None
+
+def test_graph_is_served_only_for_its_index(index, data_dir, model_dir, monkeypatch, capsys):
+    assert load_career_graph() is None
+    publish_index_artifact(index)
+    CareerGraph.from_index(load_index_artifact(), k=3, landmarks=2).save(model_dir / CAREER_GRAPH_FILE)
+    assert load_career_graph() is not None
+
+    path = data_dir / 'occupation_skills_matrix.csv'
+    matrix = pd.read_csv(path, index_col=0)
+    matrix.iloc[0, :] = 1 - matrix.iloc[0, :]
+    matrix.to_csv(path)
+    publish_index_artifact(build_recommender_index())
+    # Sem esperar o intervalo de verificação do índice em produção
+    monkeypatch.setattr(index_artifact, '_serving_index', None)
+    assert load_career_graph() is None
+    assert 'foi gerado de outro índice' in capsys.readouterr().out
+
+def test_cli(index, capsys):
+    source, target = index.occupation_codes[0], index.occupation_codes[5]
+    assert main(['path', source, target]) == 1
+    assert main(['build', '--k', '3']) == 0
+    assert main(['path', source, target, '--paths', '2']) == 0
+    output = capsys.readouterr().out
+    assert output.count(f'{source} -> ') >= 1 and 'habilidades)' in output
+    assert main(['path', source, '00-0000.00']) == 1
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import data_loader
+from utils.data_loader import (
+    CACHE_FORMAT_VERSION,
+    DataCatalog,
+    SkillAdjacency,
+    _load_matrix,
+    _load_table,
+    get_all_skills,
+    get_cache_path,
+    get_occupation_details,
+    get_occupations_for_skill,
+    get_skill_adjacency,
+    get_skill_occupation_counts,
+    get_skills_for_occupation,
+    load_occupations_data,
+    load_skills_data,
+)
+
+def _bump_mtime(path, seconds=10):
+    """Avança o mtime do arquivo, independente da resolução do sistema de arquivos"""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+def _is_memory_mapped(values):
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, 'base', None)
+    return False
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return path.read_text(encoding='utf-8')
+
+def test_catalog_loads_each_version_once(tmp_path):
+    path = tmp_path / 'arquivo.txt'
+    path.write_text('v1', encoding='utf-8')
+    catalog = DataCatalog()
+    loader = CountingLoader()
+    assert catalog.get(path, loader) == 'v1'
+    assert catalog.get(path, loader) == 'v1'
+    assert loader.calls == 1
+
+    path.write_text('v2 maior', encoding='utf-8')
+    _bump_mtime(path)
+    assert catalog.get(path, loader) == 'v2 maior'
+    assert loader.calls == 2
+
+def test_catalog_keeps_entry_when_only_mtime_changes(tmp_path):
+    path = tmp_path / 'arquivo.txt'
+    path.write_text('v1', encoding='utf-8')
+    catalog = DataCatalog()
+    loader = CountingLoader()
+    catalog.get(path, loader)
+    _bump_mtime(path)
+    catalog.get(path, loader)
+    _bump_mtime(path)
+    catalog.get(path, loader)
+    assert loader.calls == 1
+
+def test_derived_structures_follow_file_version(tmp_path):
+    path = tmp_path / 'arquivo.txt'
+    path.write_text('abc', encoding='utf-8')
+    catalog = DataCatalog()
+    loader = CountingLoader()
+    builds = []
+
+    def build(value):
+        builds.append(value)
+        return value.upper()
+
+    assert catalog.derived(path, loader, 'upper', build) == 'ABC'
+    assert catalog.derived(path, loader, 'upper', build) == 'ABC'
+    path.write_text('xyz', encoding='utf-8')
+    _bump_mtime(path)
+    assert catalog.derived(path, loader, 'upper', build) == 'XYZ'
+    assert builds == ['abc', 'xyz']
+
+def test_concurrent_first_access_loads_once(tmp_path):
+    path = tmp_path / 'arquivo.txt'
+    path.write_text('v1', encoding='utf-8')
+    catalog = DataCatalog()
+    loader = CountingLoader()
+    barrier = threading.Barrier(8)
+
+    def read():
+        barrier.wait()
+        catalog.get(path, loader)
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.calls == 1
+
+def test_loaders_are_memoized_and_invalidated(data_dir):
+    occupations = load_occupations_data()
+    assert load_occupations_data() is occupations
+    assert load_skills_data() is load_skills_data()
+
+    path = data_dir / 'occupations_processed.csv'
+    changed = pd.read_csv(path)
+    changed.loc[0, 'occupation_title'] = 'Título Alterado'
+    changed.to_csv(path, index=False)
+    _bump_mtime(path)
+    reloaded = load_occupations_data()
+    assert reloaded is not occupations
+    assert reloaded.loc[0, 'occupation_title'] == 'Título Alterado'
+    assert get_occupation_details(reloaded.loc[0, 'occupation_code'])['occupation_title'] == 'Título Alterado'
+
+def test_derived_skill_lists_are_invalidated(data_dir):
+    skills = get_all_skills()
+    path = data_dir / 'skills_processed.csv'
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('15-1252.00,Habilidade Nova,50,3\n')
+    _bump_mtime(path)
+    assert set(get_all_skills()) == set(skills) | {'Habilidade Nova'}
+
+def test_missing_files_return_empty_results(data_dir, capsys):
+    (data_dir / 'occupations_processed.csv').unlink()
+    (data_dir / 'skills_processed.csv').unlink()
+    assert load_occupations_data().empty
+    assert get_occupation_details('15-1252.00') == {}
+    assert get_all_skills() == []
+    assert 'não encontrado' in capsys.readouterr().out
+
+def test_matrix_cache_is_memory_mapped_and_equal_to_csv(data_dir):
+    csv_path = data_dir / 'occupation_skills_matrix.csv'
+    expected = pd.read_csv(csv_path, index_col=0)
+    first = _load_matrix(csv_path)
+    cache_path = get_cache_path() / 'occupation_skills_matrix.npy'
+    assert cache_path.exists() and cache_path.with_name(cache_path.name + '.json').exists()
+
+    cached = _load_matrix(csv_path)
+    assert _is_memory_mapped(cached.to_numpy())
+    for matrix in (first, cached):
+        pd.testing.assert_frame_equal(matrix, expected)
+
+def test_matrix_cache_is_rebuilt_when_csv_changes(data_dir):
+    csv_path = data_dir / 'occupation_skills_matrix.csv'
+    _load_matrix(csv_path)
+    changed = pd.read_csv(csv_path, index_col=0)
+    changed = changed.drop(columns=changed.columns[0])
+    changed.to_csv(csv_path)
+    _bump_mtime(csv_path)
+    pd.testing.assert_frame_equal(_load_matrix(csv_path), changed)
+
+def test_touched_csv_keeps_cache(data_dir):
+    csv_path = data_dir / 'occupation_skills_matrix.csv'
+    _load_matrix(csv_path)
+    cache_path = get_cache_path() / 'occupation_skills_matrix.npy'
+    cache_mtime = cache_path.stat().st_mtime_ns
+    _bump_mtime(csv_path)
+    _load_matrix(csv_path)
+    manifest = json.loads(cache_path.with_name(cache_path.name + '.json').read_text(encoding='utf-8'))
+    assert manifest['source']['mtime_ns'] == csv_path.stat().st_mtime_ns
+    assert cache_path.stat().st_mtime_ns == cache_mtime
+
+@pytest.mark.parametrize('manifest', ['{corrompido', '{"format_version": -1}'])
+def test_invalid_manifest_rebuilds_cache(data_dir, manifest):
+    csv_path = data_dir / 'occupations_processed.csv'
+    _load_table(csv_path)
+    manifest_path = get_cache_path() / 'occupations_processed.feather.json'
+    manifest_path.write_text(manifest, encoding='utf-8')
+    pd.testing.assert_frame_equal(_load_table(csv_path), pd.read_csv(csv_path))
+    assert json.loads(manifest_path.read_text(encoding='utf-8'))['format_version'] == CACHE_FORMAT_VERSION
+
+def test_table_cache_round_trip(data_dir):
+    pytest.importorskip('pyarrow')
+    csv_path = data_dir / 'skills_processed.csv'
+    expected = pd.read_csv(csv_path)
+    pd.testing.assert_frame_equal(_load_table(csv_path), expected)
+    assert (get_cache_path() / 'skills_processed.feather').exists()
+    pd.testing.assert_frame_equal(_load_table(csv_path), expected)
+
+def test_table_without_pyarrow_reads_csv(data_dir, monkeypatch):
+    monkeypatch.setattr(data_loader, '_has_pyarrow', lambda: False)
+    csv_path = data_dir / 'skills_processed.csv'
+    pd.testing.assert_frame_equal(_load_table(csv_path), pd.read_csv(csv_path))
+    assert not get_cache_path().exists()
+
+def _baseline_skills_for_occupation(skills_df, occupation_code):
+    """Implementação original: filtro do DataFrame e ordenação por importância"""
+    rows = skills_df[skills_df['occupation_code'] == occupation_code]
+    skills = [
+        {'skill': row['skill_name'], 'level': row['level'], 'importance': row['importance']}
+        for _, row in rows.iterrows()
+    ]
+    return sorted(skills, key=lambda skill: skill['importance'], reverse=True)
+
+def test_adjacency_matches_dataframe_filters(synthetic_dir):
+    skills_df = load_skills_data()
+    for code in skills_df['occupation_code'].unique()[:50]:
+        assert get_skills_for_occupation(code) == _baseline_skills_for_occupation(skills_df, code)
+    for skill in skills_df['skill_name'].unique()[:50]:
+        expected = skills_df.loc[skills_df['skill_name'] == skill, 'occupation_code'].unique().tolist()
+        assert sorted(get_occupations_for_skill(skill)) == sorted(expected)
+    counts = get_skill_occupation_counts()
+    expected_counts = skills_df.groupby('skill_name')['occupation_code'].nunique()
+    assert counts.to_dict() == expected_counts.to_dict()
+    assert counts.is_monotonic_decreasing
+    assert get_all_skills() == sorted(skills_df['skill_name'].unique())
+
+def test_adjacency_unknown_keys_are_empty():
+    adjacency = get_skill_adjacency()
+    assert len(adjacency.skills_for_occupation('00-0000.00')[0]) == 0
+    assert len(adjacency.occupations_for_skill('Habilidade Inexistente')) == 0
+    assert adjacency.occupation_count('Habilidade Inexistente') == 0
+    assert get_skills_for_occupation('00-0000.00') == []
+
+def test_adjacency_ignores_rows_without_keys():
+    skills_df = pd.DataFrame({
+        'occupation_code': ['A', 'A', None, 'B', 'B'],
+        'skill_name': ['x', 'y', 'x', None, 'x'],
+        'importance': [10, 90, 50, 40, 30],
+        'level': [1, 2, 3, np.nan, 5],
+    })
+    adjacency = SkillAdjacency.from_skills_frame(skills_df)
+    assert adjacency.skills == ['x', 'y']
+    skill_ids, importance, level = adjacency.skills_for_occupation('A')
+    assert [adjacency.skills[i] for i in skill_ids] == ['y', 'x']
+    assert importance.tolist() == [90, 10] and level.tolist() == [2, 1]
+    assert adjacency.occupations_for_skill('x').tolist() == ['A', 'B']
+    assert adjacency.skill_counts().to_dict() == {'x': 2, 'y': 1}
+
+def test_missing_importance_and_level_become_none(data_dir):
+    path = data_dir / 'skills_processed.csv'
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('15-1252.00,Habilidade Sem Nível,,\n')
+    _bump_mtime(path)
+    skills = get_skills_for_occupation('15-1252.00')
+    assert {'skill': 'Habilidade Sem Nível', 'level': None, 'importance': None} in skills
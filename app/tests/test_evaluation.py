@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.evaluation import (
+    EvaluationContext,
+    evaluate,
+    evaluate_chunk,
+    holdout_profiles,
+    main,
+    merge_results,
+    random_profiles,
+    summarize,
+)
+from utils.recommender import build_recommender_index
+from utils.segments import SegmentedIndex, load_segments, retire_occupation
+
+@pytest.fixture
+def large_index(synthetic_dir):
+    return build_recommender_index()
+
+def _recommended_rows(index, profile, k):
+    skills = [index.skills[col] for col in profile.indices]
+    codes = index.recommend(skills, top_n=k)['occupation_code']
+    return pd.Index(index.occupation_codes).get_indexer(codes)
+
+@pytest.mark.parametrize('n_skills', [50, 5000])
+def test_random_profiles_have_distinct_skills(n_skills):
+    profiles = random_profiles(np.random.default_rng(0), 300, n_skills, 6)
+    assert profiles.shape == (300, n_skills)
+    assert (profiles.getnnz(axis=1) == 6).all()
+    assert (profiles.data == 1).all()
+
+def test_holdout_profiles_split_source_skills(large_index):
+    context = EvaluationContext(large_index)
+    observed, hidden, targets = holdout_profiles(np.random.default_rng(0), context, 500, holdout=0.3)
+    assert (observed.getnnz(axis=1) >= 1).all() and (hidden.getnnz(axis=1) >= 1).all()
+    assert observed.multiply(hidden).nnz == 0
+    assert ((observed + hidden) != context.binary[targets]).nnz == 0
+    assert 0.2 < hidden.nnz / (observed.nnz + hidden.nnz) < 0.4
+
+def test_random_chunk_matches_per_profile_recommendations(large_index):
+    context = EvaluationContext(large_index)
+    result = evaluate_chunk(context, 3, 200, k=5, skills_per_profile=4, seed=11)
+    profiles = random_profiles(np.random.default_rng([11, 3]), 200, context.n_skills, 4)
+
+    recommended = np.zeros(context.n_rows, dtype=np.int64)
+    future_rates = []
+    for profile in profiles:
+        rows = _recommended_rows(large_index, profile, 5)
+        recommended[rows] += 1
+        future_rates.append(context.future[rows].mean())
+    np.testing.assert_array_equal(result['recommended'], recommended)
+    total, total_sq, n = result['future_job_rate']
+    assert n == 200
+    assert total == pytest.approx(sum(future_rates))
+    assert total_sq == pytest.approx(sum(rate ** 2 for rate in future_rates))
+
+def test_holdout_chunk_matches_per_profile_metrics(large_index):
+    context = EvaluationContext(large_index)
+    result = evaluate_chunk(context, 0, 150, k=5, mode='holdout', holdout=0.3, seed=2)
+    observed, hidden, targets = holdout_profiles(np.random.default_rng([2, 0]), context, 150, 0.3)
+
+    precisions, recalls, hits = [], [], []
+    for profile, hidden_row, target in zip(observed, hidden, targets):
+        rows = _recommended_rows(large_index, profile, 5)
+        suggested = set(context.binary[rows].indices) - set(profile.indices)
+        correct = len(suggested & set(hidden_row.indices))
+        if suggested:
+            precisions.append(correct / len(suggested))
+        recalls.append(correct / hidden_row.nnz)
+        hits.append(float(target in rows))
+    assert result['precision'][0] == pytest.approx(sum(precisions)) and result['precision'][2] == len(precisions)
+    assert result['recall'][0] == pytest.approx(sum(recalls))
+    assert result['target_hit_rate'][0] == sum(hits)
+
+def test_result_does_not_depend_on_workers(large_index):
+    for mode in ('random', 'holdout'):
+        options = {'n_profiles': 3000, 'k': 5, 'mode': mode, 'chunk_size': 1000, 'seed': 4}
+        single = evaluate(large_index, workers=1, **options)
+        pd.testing.assert_frame_equal(evaluate(large_index, workers=2, **options), single)
+        pd.testing.assert_frame_equal(evaluate(large_index, workers=1, **options), single)
+        assert set(single['metric']) >= {'future_job_rate', 'avg_growth', 'coverage'}
+        assert (single.loc[single['metric'] != 'coverage', 'n'] > 0).all()
+
+def test_summarize_confidence_interval():
+    values = np.array([1.0, 2.0, 3.0, 4.0])
+    merged = merge_results([
+        {'recommended': np.array([1, 0]), 'metric': (float(values[:2].sum()), float(np.square(values[:2]).sum()), 2)},
+        {'recommended': np.array([2, 0]), 'metric': (float(values[2:].sum()), float(np.square(values[2:]).sum()), 2)},
+    ])
+    np.testing.assert_array_equal(merged['recommended'], [3, 0])
+    summary = summarize(merged, confidence=0.95).set_index('metric')
+    half_width = 1.959964 * values.std(ddof=1) / 2
+    assert summary.loc['metric', 'mean'] == 2.5
+    assert summary.loc['metric', 'ci_low'] == pytest.approx(2.5 - half_width)
+    assert summary.loc['metric', 'ci_high'] == pytest.approx(2.5 + half_width)
+    assert summary.loc['coverage', 'mean'] == 0.5
+
+def test_retired_rows_are_never_recommended(index):
+    for code in index.occupation_codes[:5]:
+        retire_occupation(code)
+    segmented = SegmentedIndex(index, load_segments())
+    context = EvaluationContext(segmented)
+    assert context.n_live == len(index.occupation_codes) - 5
+    result = evaluate_chunk(context, 0, 500, k=len(index.occupation_codes), seed=0)
+    assert not result['recommended'][:5].any()
+    assert (result['recommended'][5:] == 500).all()
+
+def test_unknown_mode_is_rejected(index):
+    with pytest.raises(ValueError):
+        evaluate(index, n_profiles=10, mode='outro')
+
+def test_cli(capsys):
+    assert main(['--profiles', '500', '--k', '3', '--mode', 'holdout', '--chunk-size', '200']) == 0
+    output = capsys.readouterr().out
+    assert 'target_hit_rate' in output and '500 perfis' in output
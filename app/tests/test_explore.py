@@ -0,0 +1,94 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.explore import OccupationQueryIndex, get_occupation_query_index
+
+@pytest.fixture
+def occupations():
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        'occupation_code': [f'{i:02d}-{i:04d}.00' for i in range(n)],
+        # Valores arredondados para gerar empates
+        'median_salary': rng.integers(30, 150, n) * 1000.0,
+        'projected_growth': np.round(rng.normal(10, 8, n)),
+        'is_future_job': rng.random(n) < 0.3,
+    })
+    df.loc[[3, 40, 41], 'median_salary'] = np.nan
+    df.loc[[7, 41], 'projected_growth'] = np.nan
+    return df
+
+def _pandas_mask(df, min_growth, salary_range, future_only):
+    mask = pd.Series(True, index=df.index)
+    if min_growth is not None:
+        mask &= df['projected_growth'] >= min_growth
+    if salary_range is not None:
+        mask &= df['median_salary'].between(*salary_range)
+    if future_only:
+        mask &= df['is_future_job']
+    return mask.to_numpy()
+
+@pytest.mark.parametrize('min_growth, salary_range, future_only', list(itertools.product(
+    [None, -5, 10, 30], [None, (50000, 90000), (90000, 90000), (0, 10 ** 7)], [False, True]
+)))
+def test_select_matches_pandas(occupations, min_growth, salary_range, future_only):
+    query_index = OccupationQueryIndex(occupations)
+    mask = query_index.select(min_growth=min_growth, salary_range=salary_range, future_only=future_only)
+    np.testing.assert_array_equal(mask, _pandas_mask(occupations, min_growth, salary_range, future_only))
+
+@pytest.mark.parametrize('column', ['median_salary', 'projected_growth'])
+def test_top_rows_match_nlargest(occupations, column):
+    query_index = OccupationQueryIndex(occupations)
+    mask = query_index.select(min_growth=0, future_only=True)
+    expected = occupations[mask].nlargest(20, column).index.to_numpy()
+    np.testing.assert_array_equal(query_index.top_rows(mask, column, n=20), expected)
+    all_rows = query_index.top_rows(mask, column)
+    assert sorted(all_rows.tolist()) == np.flatnonzero(mask).tolist()
+
+def test_selections_are_cached_and_read_only(occupations):
+    query_index = OccupationQueryIndex(occupations, max_cached_queries=2)
+    mask = query_index.select(min_growth=10)
+    assert query_index.select(min_growth=10) is mask
+    with pytest.raises(ValueError):
+        mask[0] = True
+    query_index.select(min_growth=11)
+    query_index.select(min_growth=12)
+    assert query_index.select(min_growth=10) is not mask
+
+def test_page_and_frame_copy_only_requested_rows(occupations):
+    query_index = OccupationQueryIndex(occupations)
+    rows = query_index.top_rows(query_index.select(), 'median_salary')
+    page = query_index.page(rows, page=2, page_size=25, columns=['occupation_code', 'median_salary'])
+    pd.testing.assert_frame_equal(page, occupations.iloc[rows[25:50]][['occupation_code', 'median_salary']])
+    assert query_index.page(rows, page=100, page_size=25).empty
+    pd.testing.assert_frame_equal(query_index.frame(rows[:3]), occupations.iloc[rows[:3]])
+
+def test_values_and_column_range(occupations):
+    query_index = OccupationQueryIndex(occupations)
+    mask = query_index.select(future_only=True)
+    np.testing.assert_array_equal(
+        query_index.values(mask, 'median_salary'), occupations.loc[mask, 'median_salary'].to_numpy()
+    )
+    assert query_index.column_range('median_salary') == (
+        occupations['median_salary'].min(), occupations['median_salary'].max()
+    )
+
+def test_shared_query_index_follows_csv(data_dir):
+    query_index = get_occupation_query_index()
+    assert get_occupation_query_index() is query_index
+    path = data_dir / 'occupations_processed.csv'
+    df = pd.read_csv(path)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(','.join(str(value) for value in df.iloc[0].tolist()) + '\n')
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10 ** 10))
+    assert get_occupation_query_index().n_rows == query_index.n_rows + 1
+
+def test_missing_csv_gives_empty_index(data_dir, capsys):
+    (data_dir / 'occupations_processed.csv').unlink()
+    query_index = get_occupation_query_index()
+    assert query_index.n_rows == 0
+    assert query_index.column_range('median_salary') == (0, 0)
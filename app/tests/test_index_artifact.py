@@ -0,0 +1,140 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.index_artifact import (
+    ARTIFACT_FILE,
+    SCHEMA_VERSION,
+    ServingIndex,
+    get_serving_index,
+    load_index_artifact,
+    main,
+    publish_index_artifact,
+    read_index_artifact,
+    validate_index_artifact,
+)
+from utils.recommender import build_recommender_index
+
+def _rewrite_artifact(path, header, arrays):
+    header_bytes = np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+    with open(path, 'wb') as f:
+        np.savez(f, header=header_bytes, **arrays)
+
+def _change_matrix(data_dir):
+    path = data_dir / 'occupation_skills_matrix.csv'
+    matrix = pd.read_csv(path, index_col=0)
+    matrix.iloc[0] = 1 - matrix.iloc[0]
+    matrix.to_csv(path)
+
+@pytest.mark.parametrize('backend', ['dense', 'sparse'])
+def test_published_artifact_serves_same_recommendations(model_dir, profiles, backend):
+    index = build_recommender_index(backend=backend)
+    header = publish_index_artifact(index)
+    assert header['schema_version'] == SCHEMA_VERSION
+    assert header['storage'] == ('csr' if backend == 'sparse' else 'dense')
+    assert header['skills_list'] == index.skills
+    assert not list(model_dir.glob('*.tmp'))
+
+    loaded = load_index_artifact()
+    assert loaded.header['content_hash'] == header['content_hash']
+    for skills in profiles:
+        pd.testing.assert_frame_equal(loaded.recommend(skills, top_n=7), index.recommend(skills, top_n=7))
+
+def test_tampered_content_is_rejected(model_dir, index):
+    publish_index_artifact(index)
+    header, arrays = read_index_artifact()
+    arrays['matrix'] = arrays['matrix'][::-1].copy()
+    _rewrite_artifact(model_dir / ARTIFACT_FILE, header, arrays)
+    with pytest.raises(ValueError, match='hash'):
+        load_index_artifact()
+
+def test_unknown_schema_is_rejected(index):
+    publish_index_artifact(index)
+    header, arrays = read_index_artifact()
+    header['schema_version'] = SCHEMA_VERSION + 1
+    with pytest.raises(ValueError, match='esquema'):
+        validate_index_artifact(header, arrays)
+
+def test_artifact_of_other_data_is_rejected(data_dir, index):
+    publish_index_artifact(index)
+    _change_matrix(data_dir)
+    with pytest.raises(ValueError, match='desatualizado'):
+        load_index_artifact()
+    assert load_index_artifact(validate=False).matrix.shape == index.matrix.shape
+
+def test_serving_index_builds_from_csv_without_artifact(model_dir):
+    serving = ServingIndex(check_interval=0)
+    index = serving.get()
+    assert not index.empty
+    assert not hasattr(index, 'header')
+
+def test_serving_index_swaps_on_publish(data_dir, model_dir):
+    serving = ServingIndex(check_interval=0)
+    publish_index_artifact(build_recommender_index())
+    first = serving.get()
+    assert serving.get() is first
+
+    _change_matrix(data_dir)
+    changed = build_recommender_index()
+    header = publish_index_artifact(changed)
+    swapped = serving.get()
+    assert swapped is not first
+    assert swapped.header['content_hash'] == header['content_hash']
+    np.testing.assert_array_equal(swapped.matrix, changed.matrix)
+
+def test_serving_index_keeps_current_on_invalid_artifact(model_dir, index, capsys):
+    serving = ServingIndex(check_interval=0)
+    publish_index_artifact(index)
+    current = serving.get()
+    (model_dir / ARTIFACT_FILE).write_bytes(b'parcial')
+    assert serving.get() is current
+    assert 'Artefato do índice ignorado' in capsys.readouterr().out
+
+def test_serving_index_respects_check_interval(data_dir, index):
+    serving = ServingIndex(check_interval=3600)
+    publish_index_artifact(index)
+    first = serving.get()
+    _change_matrix(data_dir)
+    publish_index_artifact(build_recommender_index())
+    assert serving.get() is first
+
+def test_queries_during_swap_see_a_whole_index(data_dir, index):
+    serving = ServingIndex(check_interval=0)
+    publish_index_artifact(index)
+    serving.get()
+    skills = index.skills[:3]
+    errors = []
+    stop = threading.Event()
+
+    def query():
+        while not stop.is_set():
+            current = serving.get()
+            result = current.recommend(skills, top_n=5)
+            if len(result) != 5 or current.matrix.shape[0] != len(current.occupation_codes):
+                errors.append(result)
+
+    threads = [threading.Thread(target=query) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    _change_matrix(data_dir)
+    for backend in ('sparse', 'dense', 'sparse'):
+        publish_index_artifact(build_recommender_index(backend=backend))
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+def test_get_serving_index_is_shared(model_dir, index):
+    publish_index_artifact(index)
+    assert get_serving_index() is get_serving_index()
+    assert get_serving_index().header['content_hash']
+
+def test_cli_publish_and_verify(data_dir, model_dir, capsys):
+    assert main(['publish', '--backend', 'sparse']) == 0
+    assert main(['verify']) == 0
+    assert '"storage": "csr"' in capsys.readouterr().out
+    _change_matrix(data_dir)
+    assert main(['verify']) == 1
@@ -0,0 +1,187 @@
+import csv
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import assert_matches_baseline
+from utils.data_loader import (
+    load_occupation_skills_matrix,
+    load_occupation_skills_matrix_sparse,
+    load_occupations_data,
+    load_skills_data,
+)
+from utils.ingest import ingest, load_bls_projections, main
+from utils.recommender import build_recommender_index
+
+ELEMENT_COLUMNS = ['O*NET-SOC Code', 'Element ID', 'Element Name', 'Scale ID', 'Data Value', 'N',
+                   'Recommend Suppress', 'Not Relevant']
+
+SKILLS_ROWS = [
+    ('15-1252.00', 'Programming', 'IM', '4.28', 'N', 'n/a'),
+    ('15-1252.00', 'Programming', 'LV', '4.10', 'N', 'N'),
+    ('15-1252.00', 'Programming', 'CX', '9.00', 'N', 'n/a'),
+    ('15-1252.00', 'Writing', 'IM', '2.50', 'N', 'n/a'),
+    ('15-1252.00', 'Writing', 'LV', '3.00', 'N', 'N'),
+    ('15-1252.00', 'Critical Thinking', 'IM', '3.00', 'N', 'n/a'),
+    ('15-1252.00', 'Critical Thinking', 'LV', '5.20', 'Y', 'N'),
+    ('15-1252.01', 'Programming', 'IM', '3.40', 'N', 'n/a'),
+    ('15-1252.01', 'Programming', 'LV', '3.60', 'N', 'N'),
+    ('29-1141.00', 'Critical Thinking', 'IM', '4.00', 'N', 'n/a'),
+    ('29-1141.00', 'Critical Thinking', 'LV', '4.40', 'N', 'N'),
+    ('29-1141.00', 'Programming', 'IM', '3.20', 'N', 'n/a'),
+    ('29-1141.00', 'Programming', 'LV', '1.00', 'N', 'Y'),
+    ('11-1011.00', 'Writing', 'IM', '1.50', 'N', 'n/a'),
+    ('99-9999.00', 'Programming', 'IM', '5.00', 'N', 'n/a'),
+]
+
+KNOWLEDGE_ROWS = [
+    ('29-1141.00', 'Medicine', 'IM', '4.60', 'N', 'n/a'),
+    ('29-1141.00', 'Medicine', 'LV', '5.00', 'N', 'N'),
+    ('15-1252.00', 'Programming', 'IM', '3.00', 'N', 'n/a'),
+]
+
+TECHNOLOGY_ROWS = [
+    ('15-1252.00', 'Python', '1', 'Object oriented development software', 'Y'),
+    ('15-1252.00', 'Java', '1', 'Object oriented development software', 'N'),
+    ('15-1252.01', 'Git', '2', 'Version control software', 'N'),
+]
+
+BLS_ROWS = [
+    ['Table 1.2 Occupational projections, 2023-33'],
+    [],
+    ['2023 National Employment Matrix title', '2023 National Employment Matrix code', 'Occupation type',
+     'Employment, 2023', 'Employment, 2033', 'Employment change, numeric, 2023–33',
+     'Employment change, percent, 2023–33', 'Median annual wage, dollars, 2023[1]'],
+    ['Total, all occupations', '00-0000', 'Summary', '167,849.8', '174,589.0', '6,739.2', '4.0', '48,060'],
+    ['Computer occupations', '15-1200', 'Summary', '5,000.0', '5,500.0', '500.0', '10.0', '100,000'],
+    ['Chief executives', '11-1011', 'Line item', '200.0', '190.0', '-10.0', '-5.0', '>=239,200'],
+    ['Software developers', '15-1252', 'Line item', '1,847.9', '2,322.8', '474.9', '25.7', '132,270'],
+    ['Registered nurses', '29-1141', 'Line item', '3,300.0', '3,477.0', '177.0', '5.4', '86,070'],
+]
+
+# Pares retidos: importância (1-5 -> 0-100) e nível arredondado, vazio quando ausente
+EXPECTED_SKILLS = [
+    ('15-1252.00', 'Object oriented development software', 100, None),
+    ('15-1252.00', 'Programming', 82, 4),
+    ('15-1252.00', 'Critical Thinking', 50, None),
+    ('15-1252.01', 'Programming', 60, 4),
+    ('15-1252.01', 'Version control software', 50, None),
+    ('29-1141.00', 'Medicine', 90, 5),
+    ('29-1141.00', 'Critical Thinking', 75, 4),
+    ('29-1141.00', 'Programming', 55, None),
+]
+
+def _write_tsv(path, columns, rows):
+    pd.DataFrame(rows, columns=columns).to_csv(path, sep='\t', index=False)
+
+@pytest.fixture
+def onet_dir(tmp_path):
+    onet_dir = tmp_path / 'onet'
+    onet_dir.mkdir()
+    _write_tsv(onet_dir / 'Occupation Data.txt', ['O*NET-SOC Code', 'Title', 'Description'], [
+        ('15-1252.00', 'Software Developers', 'Develop software'),
+        ('15-1252.01', 'Web Developers', 'Develop websites'),
+        ('29-1141.00', 'Registered Nurses', 'Care for patients'),
+        ('11-1011.00', 'Chief Executives', 'Direct organizations'),
+        ('99-9999.00', 'Sem Projeção', 'Ausente do BLS'),
+    ])
+    for name, rows in (('Skills.txt', SKILLS_ROWS), ('Knowledge.txt', KNOWLEDGE_ROWS)):
+        _write_tsv(onet_dir / name, ELEMENT_COLUMNS, [
+            (code, '1.A', element, scale, value, '8', suppress, relevant)
+            for code, element, scale, value, suppress, relevant in rows
+        ])
+    _write_tsv(
+        onet_dir / 'Technology Skills.txt',
+        ['O*NET-SOC Code', 'Example', 'Commodity Code', 'Commodity Title', 'Hot Technology'],
+        TECHNOLOGY_ROWS
+    )
+    with open(onet_dir / 'bls.csv', 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(BLS_ROWS)
+    return onet_dir
+
+def _skill_pairs(skills_df):
+    return sorted(
+        (row.occupation_code, row.skill_name, int(row.importance), None if pd.isna(row.level) else int(row.level))
+        for row in skills_df.itertuples()
+    )
+
+def test_load_bls_projections_keeps_line_items(onet_dir):
+    projections = load_bls_projections(onet_dir / 'bls.csv')
+    assert projections['soc_code'].tolist() == ['11-1011', '15-1252', '29-1141']
+    assert projections['median_salary'].tolist() == [239200, 132270, 86070]
+    assert projections['projected_growth'].tolist() == [-5.0, 25.7, 5.4]
+    assert projections['num_jobs_2024'].tolist() == [200000, 1847900, 3300000]
+    assert projections['num_jobs_2034'].tolist() == [190000, 2322800, 3477000]
+
+def test_ingest_writes_data_files(onet_dir, data_dir):
+    summary = ingest(onet_dir, onet_dir / 'bls.csv')
+    assert summary == {'occupations': 3, 'skills': 5, 'pairs': 8}
+
+    occupations = load_occupations_data()
+    assert occupations['occupation_code'].tolist() == ['15-1252.00', '15-1252.01', '29-1141.00']
+    assert occupations['median_salary'].tolist() == [132270, 132270, 86070]
+    assert occupations['is_future_job'].tolist() == [True, True, False]
+
+    skills_df = load_skills_data()
+    assert _skill_pairs(skills_df) == sorted(EXPECTED_SKILLS)
+    # Ordenada por ocupação e importância decrescente
+    assert skills_df.equals(skills_df.sort_values(['occupation_code', 'importance'], ascending=[True, False]))
+
+def test_missing_levels_are_written_empty(onet_dir, data_dir):
+    ingest(onet_dir, onet_dir / 'bls.csv')
+    lines = (data_dir / 'skills_processed.csv').read_text(encoding='utf-8').splitlines()
+    assert '15-1252.00,Critical Thinking,50,' in lines
+    assert '15-1252.00,Programming,82,4' in lines
+
+def test_matrix_matches_skill_pairs(onet_dir, data_dir):
+    ingest(onet_dir, onet_dir / 'bls.csv')
+    skills_df = load_skills_data()
+    expected = pd.crosstab(skills_df['occupation_code'], skills_df['skill_name'])
+    matrix = load_occupation_skills_matrix()
+    pd.testing.assert_frame_equal(
+        matrix, expected.reindex(index=matrix.index, columns=matrix.columns), check_names=False, check_dtype=False
+    )
+    assert list(matrix.columns) == sorted(matrix.columns)
+
+    sparse_matrix = load_occupation_skills_matrix_sparse()
+    np.testing.assert_array_equal(sparse_matrix.matrix.toarray(), matrix.to_numpy())
+    assert list(sparse_matrix.occupation_codes) == matrix.index.tolist()
+    assert list(sparse_matrix.skills) == matrix.columns.tolist()
+
+def test_ingested_data_matches_dense_baseline(onet_dir, data_dir):
+    ingest(onet_dir, onet_dir / 'bls.csv')
+    index = build_recommender_index()
+    for skills in (['Programming'], ['Critical Thinking', 'Medicine'], ['Version control software', 'Programming']):
+        recommendations = index.recommend(skills, top_n=3)
+        assert_matches_baseline(
+            recommendations['occupation_code'], recommendations['similarity_score'], skills, 3
+        )
+
+def test_output_does_not_depend_on_chunksize(onet_dir, tmp_path):
+    ingest(onet_dir, onet_dir / 'bls.csv', output_dir=tmp_path / 'grande')
+    # Blocos de uma linha: IM e LV do mesmo par chegam em blocos diferentes e a compactação periódica é exercitada
+    ingest(onet_dir, onet_dir / 'bls.csv', output_dir=tmp_path / 'pequeno', chunksize=1)
+    for name in ('occupations_processed.csv', 'skills_processed.csv', 'occupation_skills_matrix.csv'):
+        assert (tmp_path / 'grande' / name).read_bytes() == (tmp_path / 'pequeno' / name).read_bytes()
+
+def test_ingest_options(onet_dir, tmp_path):
+    summary = ingest(onet_dir, onet_dir / 'bls.csv', output_dir=tmp_path / 'out', technology=False, min_importance=4.0)
+    assert summary == {'occupations': 2, 'skills': 3, 'pairs': 3}
+    skills_df = pd.read_csv(tmp_path / 'out' / 'skills_processed.csv')
+    assert set(skills_df['skill_name']) == {'Programming', 'Critical Thinking', 'Medicine'}
+
+    ingest(onet_dir, onet_dir / 'bls.csv', output_dir=tmp_path / 'exemplos', technology_column='Example')
+    skills_df = pd.read_csv(tmp_path / 'exemplos' / 'skills_processed.csv')
+    assert {'Python', 'Java', 'Git'} <= set(skills_df['skill_name'])
+
+def test_cli(onet_dir, tmp_path, capsys):
+    args = ['--onet-dir', str(onet_dir), '--bls', str(onet_dir / 'bls.csv')]
+    assert main(args + ['--output-dir', str(tmp_path / 'out')]) == 0
+    assert '3 ocupações, 5 habilidades, 8 pares' in capsys.readouterr().out
+
+    assert main(['--onet-dir', str(onet_dir), '--bls', str(onet_dir / 'ausente.csv')]) == 1
+    assert 'Falha na ingestão' in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main(args + ['--output-dir', str(tmp_path / 'out'), '--publish'])
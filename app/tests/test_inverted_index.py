@@ -0,0 +1,90 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+
+from utils.ann import sample_queries
+from utils.inverted_index import InvertedSkillIndex, benchmark, main
+from utils.recommender import _top_k_indices, build_recommender_index
+
+@pytest.fixture
+def large_index(synthetic_dir):
+    return build_recommender_index(backend='sparse')
+
+def _exact_top_k(matrix, vector, k):
+    scores = np.asarray(matrix @ vector, dtype=np.float32).ravel()
+    return _top_k_indices(scores, k)
+
+@pytest.mark.parametrize('k', [1, 10, 50, 1000])
+def test_query_matches_brute_force_ranking(large_index, k):
+    inverted_index = InvertedSkillIndex(large_index.matrix)
+    for skills in sample_queries(large_index.skills, n_queries=100, min_skills=1, max_skills=12, seed=k):
+        vector = large_index.user_vector(skills)
+        rows, scores = inverted_index.query(vector, k=k)
+        expected = _exact_top_k(large_index.matrix, vector, k)
+        np.testing.assert_array_equal(rows, expected)
+        np.testing.assert_allclose(scores, large_index.matrix[rows] @ vector, atol=1e-6)
+
+def test_query_matches_brute_force_on_weighted_matrix():
+    rng = np.random.default_rng(0)
+    matrix = sp.random(300, 80, density=0.05, random_state=1, format='csr', dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix = sp.csr_matrix(sp.diags(1 / norms) @ matrix, dtype=np.float32)
+    inverted_index = InvertedSkillIndex(matrix)
+    for _ in range(50):
+        vector = np.zeros(80, dtype=np.float32)
+        vector[rng.choice(80, size=rng.integers(1, 6), replace=False)] = rng.random()
+        rows, _ = inverted_index.query(vector, k=10)
+        np.testing.assert_array_equal(rows, _exact_top_k(matrix, vector, 10))
+
+def test_empty_and_unknown_profiles_return_zero_rows(index):
+    inverted_index = InvertedSkillIndex(index.matrix)
+    for skills in ([], ['Habilidade Inexistente']):
+        rows, scores = inverted_index.query(index.user_vector(skills), k=5)
+        np.testing.assert_array_equal(rows, np.arange(5))
+        assert not scores.any()
+
+def test_recommend_with_inverted_index(index, profiles):
+    inverted_index = InvertedSkillIndex(index.matrix)
+    for skills in profiles:
+        pd.testing.assert_frame_equal(
+            index.recommend(skills, top_n=7, inverted_index=inverted_index),
+            index.recommend(skills, top_n=7)
+        )
+
+def test_candidates_bound_every_pruned_row(large_index):
+    inverted_index = InvertedSkillIndex(large_index.matrix)
+    pruned_queries = 0
+    for skills in sample_queries(large_index.skills, n_queries=100, seed=1):
+        vector = large_index.user_vector(skills)
+        rows, n_postings = inverted_index.candidates(vector, k=5)
+        scores = large_index.matrix @ vector
+        outside = np.ones(len(scores), dtype=bool)
+        outside[rows] = False
+        kth = np.sort(scores[rows])[-5]
+        assert np.all(scores[outside] <= kth + 1e-6)
+        cols = np.flatnonzero(vector)
+        pruned_queries += n_postings < (inverted_index.offsets[cols + 1] - inverted_index.offsets[cols]).sum()
+    assert pruned_queries > 0
+
+def test_concurrent_queries_are_isolated(large_index):
+    inverted_index = InvertedSkillIndex(large_index.matrix)
+    vectors = [large_index.user_vector(skills) for skills in sample_queries(large_index.skills, n_queries=200, seed=2)]
+    expected = [_exact_top_k(large_index.matrix, vector, 10) for vector in vectors]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda vector: inverted_index.query(vector, k=10)[0], vectors))
+    for rows, expected_rows in zip(results, expected):
+        np.testing.assert_array_equal(rows, expected_rows)
+
+def test_benchmark_reports_no_mismatches(large_index):
+    report = benchmark(large_index, InvertedSkillIndex(large_index.matrix), sample_queries(large_index.skills, 50), k=10)
+    assert report['mismatches'].item() == 0
+    assert report['avg_postings'].item() > 0
+
+@pytest.mark.parametrize('backend', ['dense', 'sparse'])
+def test_cli_benchmark(capsys, backend):
+    assert main(['benchmark', '--queries', '20', '--k', '3', '--backend', backend]) == 0
+    assert 'mismatches' in capsys.readouterr().out
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import index_artifact
+from utils.index_artifact import load_index_artifact, publish_index_artifact
+from utils.neighbors import compute_neighbor_table, main
+from utils.recommender import (
+    NEIGHBORS_FILE,
+    NeighborTable,
+    build_recommender_index,
+    get_similar_occupations,
+    load_neighbor_table,
+)
+from utils.segments import SegmentedIndex, load_segments, retire_occupation
+
+@pytest.fixture
+def large_index(synthetic_dir):
+    return build_recommender_index(backend='sparse')
+
+def _brute_similarities(index):
+    matrix = index.matrix.toarray() if hasattr(index.matrix, 'toarray') else np.asarray(index.matrix)
+    similarities = matrix @ matrix.T
+    np.fill_diagonal(similarities, -np.inf)
+    return similarities
+
+def test_neighbors_match_brute_force(large_index):
+    table = compute_neighbor_table(large_index, k=10)
+    similarities = _brute_similarities(large_index)
+    assert table.neighbors.shape == (similarities.shape[0], 10) and table.k == 10
+    for row in range(similarities.shape[0]):
+        neighbors = table.neighbors[row]
+        assert row not in neighbors
+        # Empates podem trocar vizinhos de mesma similaridade: compara os valores
+        expected = np.sort(similarities[row])[::-1][:10]
+        np.testing.assert_allclose(similarities[row, neighbors], expected, atol=1e-6)
+        np.testing.assert_allclose(table.similarities[row].astype(np.float32), expected, atol=2e-3)
+        assert (np.diff(similarities[row, neighbors]) <= 1e-6).all()
+
+def test_blocks_and_workers_do_not_change_the_table(large_index):
+    reference = compute_neighbor_table(large_index, k=5)
+    for options in ({'block_size': 1}, {'block_size': 37}, {'block_size': 50, 'workers': 2}):
+        table = compute_neighbor_table(large_index, k=5, **options)
+        np.testing.assert_array_equal(table.neighbors, reference.neighbors)
+        np.testing.assert_array_equal(table.similarities, reference.similarities)
+
+def test_dense_and_sparse_indexes_agree(index):
+    dense = compute_neighbor_table(index, k=5)
+    sparse = compute_neighbor_table(build_recommender_index(backend='sparse'), k=5)
+    np.testing.assert_allclose(
+        dense.similarities.astype(np.float32), sparse.similarities.astype(np.float32), atol=2e-3
+    )
+
+def test_missing_neighbors_are_padded(index):
+    n_rows = len(index.occupation_codes)
+    table = compute_neighbor_table(index, k=n_rows + 5)
+    assert table.k == n_rows
+    assert (table.neighbors[:, -1] == -1).all() and (table.similarities[:, -1] == 0).all()
+    codes, similarities = table.lookup(index.occupation_codes[0])
+    assert len(codes) == len(similarities) == n_rows - 1
+
+def test_retired_rows_are_not_neighbors(index):
+    retired = index.occupation_codes[:3].tolist()
+    for code in retired:
+        retire_occupation(code)
+    segmented = SegmentedIndex(index, load_segments())
+    table = compute_neighbor_table(segmented, k=5)
+    assert not np.isin(table.neighbors, [0, 1, 2]).any()
+    for code in segmented.occupation_codes[3:]:
+        assert not set(table.lookup(code)[0]) & set(retired)
+
+def test_save_load_and_lookup(index, tmp_path):
+    table = compute_neighbor_table(index, k=4)
+    table.save(tmp_path / 'vizinhos.npz')
+    loaded = NeighborTable.load(tmp_path / 'vizinhos.npz')
+    np.testing.assert_array_equal(loaded.neighbors, table.neighbors)
+    np.testing.assert_array_equal(loaded.similarities, table.similarities)
+    assert loaded.header == table.header
+
+    code = index.occupation_codes[0]
+    codes, similarities = loaded.lookup(code, top_n=2)
+    assert codes.tolist() == index.occupation_codes[table.neighbors[0, :2]].tolist()
+    assert similarities.dtype == np.float16
+    assert len(loaded.lookup('00-0000.00')[0]) == 0
+
+def test_similar_occupations_follow_serving_index(index, data_dir, model_dir, capsys, monkeypatch):
+    publish_index_artifact(index)
+    assert get_similar_occupations(index.occupation_codes[0]) == []
+    table = compute_neighbor_table(load_index_artifact(), k=5)
+    table.save(model_dir / NEIGHBORS_FILE)
+    similar = get_similar_occupations(index.occupation_codes[0], top_n=3)
+    assert [entry['occupation_code'] for entry in similar] == table.lookup(index.occupation_codes[0], 3)[0].tolist()
+    assert all(0 < entry['similarity'] <= 100 for entry in similar)
+
+    # Um novo índice publicado torna a tabela antiga obsoleta
+    path = data_dir / 'occupation_skills_matrix.csv'
+    matrix = pd.read_csv(path, index_col=0)
+    matrix.iloc[0, :] = 1 - matrix.iloc[0, :]
+    matrix.to_csv(path)
+    publish_index_artifact(build_recommender_index())
+    # Sem esperar o intervalo de verificação do índice em produção
+    monkeypatch.setattr(index_artifact, '_serving_index', None)
+    assert load_neighbor_table() is None
+    assert get_similar_occupations(index.occupation_codes[0]) == []
+    assert capsys.readouterr().out.count('foi gerado de outro índice') == 1
+
+def test_cli(index, capsys):
+    assert main(['show', index.occupation_codes[0]]) == 1
+    assert main(['build', '--k', '3']) == 0
+    assert main(['show', index.occupation_codes[0], '--top', '2']) == 0
+    assert len(capsys.readouterr().out.strip().splitlines()) == 3
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import assert_matches_baseline, baseline_recommendations
+from utils.data_loader import load_occupation_skills_matrix, load_occupations_data
+from utils.recommender import RecommenderIndex, _top_k_indices, build_recommender_index, get_recommendations
+
+@pytest.mark.parametrize('top_n', [1, 5, 10, 100])
+def test_recommend_matches_dense_baseline(index, profiles, top_n):
+    for skills in profiles:
+        result = index.recommend(skills, top_n=top_n)
+        assert_matches_baseline(result['occupation_code'], result['similarity_score'], skills, top_n)
+
+def test_recommend_matches_dense_baseline_at_scale(synthetic_dir):
+    index = build_recommender_index()
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        skills = rng.choice(index.skills, size=rng.integers(1, 15), replace=False).tolist()
+        result = index.recommend(skills, top_n=20)
+        assert_matches_baseline(result['occupation_code'], result['similarity_score'], skills, 20)
+
+def test_get_recommendations_matches_original_order(profiles):
+    matrix = load_occupation_skills_matrix()
+    occupations = load_occupations_data()
+    for skills in profiles:
+        expected = baseline_recommendations(skills, 10)
+        result = get_recommendations(skills, matrix, occupations, top_n=10)
+        assert result['occupation_code'].tolist() == expected['occupation_code'].tolist()
+        np.testing.assert_allclose(result['similarity_score'], expected['similarity_score'], atol=1e-3)
+
+def test_get_recommendations_reuses_prebuilt_index(index):
+    matrix = load_occupation_skills_matrix()
+    occupations = load_occupations_data()
+    skills = index.skills[:4]
+    with_index = get_recommendations(skills, matrix, occupations, top_n=5, index=index)
+    without_index = get_recommendations(skills, matrix, occupations, top_n=5)
+    pd.testing.assert_frame_equal(with_index, without_index)
+
+def test_recommend_keeps_occupation_columns(index):
+    result = index.recommend(index.skills[:3], top_n=3)
+    expected_columns = load_occupations_data().columns.tolist() + ['similarity_score']
+    assert result.columns.tolist() == expected_columns
+
+def test_index_rows_have_unit_norm(index):
+    norms = np.linalg.norm(np.asarray(index.matrix, dtype=np.float64), axis=1)
+    nonzero = norms > 0
+    np.testing.assert_allclose(norms[nonzero], 1, atol=1e-6)
+
+def test_empty_index_returns_empty_frame():
+    index = RecommenderIndex(pd.DataFrame(), load_occupations_data())
+    assert index.recommend(['Programming']).empty
+
+@pytest.mark.parametrize('k', [0, 1, 3, 7, 20])
+def test_top_k_indices_breaks_ties_by_row(k):
+    scores = np.array([0.5, 0.9, 0.5, 0.1, 0.9, 0.5, 0.0], dtype=np.float32)
+    expected = pd.Series(scores).nlargest(k).index.to_numpy()
+    np.testing.assert_array_equal(_top_k_indices(scores, k), expected)
+
+def _qualified_codes(min_salary=None, min_growth=None, future_only=False):
+    occupations = load_occupations_data()
+    keep = pd.Series(True, index=occupations.index)
+    if min_salary is not None:
+        keep &= occupations['median_salary'] >= min_salary
+    if min_growth is not None:
+        keep &= occupations['projected_growth'] >= min_growth
+    if future_only:
+        keep &= occupations['is_future_job'] == 1
+    return pd.Index(occupations.loc[keep, 'occupation_code'])
+
+FILTERS = [
+    {'future_only': True},
+    {'min_salary': 80000},
+    {'min_growth': 20},
+    {'min_salary': 60000, 'min_growth': 10, 'future_only': True},
+    {'min_salary': 10 ** 9},
+]
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_filtered_recommend_matches_filtered_baseline(index, profiles, filters):
+    qualified = _qualified_codes(**filters)
+    for skills in profiles:
+        result = index.recommend(skills, top_n=5, **filters)
+        assert result['occupation_code'].isin(qualified).all()
+        assert_matches_baseline(
+            result['occupation_code'], result['similarity_score'], skills, 5, candidates=qualified
+        )
+
+@pytest.mark.parametrize('filters', FILTERS[:3])
+def test_filtered_recommend_matches_at_scale(synthetic_dir, filters):
+    index = build_recommender_index(backend='sparse')
+    qualified = _qualified_codes(**filters)
+    rng = np.random.default_rng(5)
+    for _ in range(20):
+        skills = rng.choice(index.skills, size=rng.integers(1, 10), replace=False).tolist()
+        result = index.recommend(skills, top_n=10, **filters)
+        assert len(result) == min(10, len(qualified))
+        assert_matches_baseline(
+            result['occupation_code'], result['similarity_score'], skills, 10, candidates=qualified
+        )
+
+def test_filter_mask_is_cached_and_read_only(index):
+    assert index.filter_mask() is None
+    mask = index.filter_mask(min_salary=80000, future_only=True)
+    assert index.filter_mask(min_salary=80000, future_only=True) is mask
+    with pytest.raises(ValueError):
+        mask[0] = not mask[0]
+    qualified = _qualified_codes(min_salary=80000, future_only=True)
+    assert set(index.occupation_codes[mask]) == set(qualified)
+
+def test_get_recommendations_passes_filters(index):
+    matrix = load_occupation_skills_matrix()
+    occupations = load_occupations_data()
+    skills = index.skills[:5]
+    pd.testing.assert_frame_equal(
+        get_recommendations(skills, matrix, occupations, top_n=4, index=index, min_growth=20),
+        index.recommend(skills, top_n=4, min_growth=20)
+    )
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.index_artifact import load_index_artifact, publish_index_artifact
+from utils.recommender import build_recommender_index
+from utils.result_cache import (
+    RecommendationCache,
+    get_cached_recommendations,
+    get_recommendation_cache,
+    index_version,
+)
+
+def _ranking(n):
+    return np.arange(n), np.linspace(1, 0, n)
+
+def test_key_is_canonical():
+    assert RecommendationCache.make_key([3, 1, 1], 10, 'v') == RecommendationCache.make_key((1, 3), 10, 'v')
+    assert RecommendationCache.make_key([1], 10, 'v') != RecommendationCache.make_key([1], 5, 'v')
+    assert RecommendationCache.make_key([1], 10, 'v') != RecommendationCache.make_key([1], 10, 'w')
+
+def test_lru_eviction_by_entries():
+    cache = RecommendationCache(max_entries=2)
+    for name in 'abc':
+        if name == 'c':
+            assert cache.get(('a',)) is not None  # 'a' passa a ser a mais recente
+        cache.put((name,), *_ranking(3))
+    assert cache.get(('b',)) is None
+    assert cache.get(('a',)) is not None and cache.get(('c',)) is not None
+    assert cache.stats()['evictions'] == 1
+
+def test_lru_eviction_by_bytes():
+    entry_bytes = sum(array.nbytes for array in RecommendationCache().put('x', *_ranking(10)))
+    cache = RecommendationCache(max_bytes=2 * entry_bytes)
+    for name in 'abc':
+        cache.put(name, *_ranking(10))
+    assert cache.stats()['bytes'] == 2 * entry_bytes
+    assert cache.get('a') is None
+    cache.put('grande', *_ranking(1000))
+    assert cache.get('grande') is None and cache.stats()['entries'] == 2
+
+def test_cached_arrays_are_read_only():
+    rows, scores = RecommendationCache().put('a', *_ranking(3))
+    with pytest.raises(ValueError):
+        rows[0] = 1
+    with pytest.raises(ValueError):
+        scores[0] = 1
+
+def test_disk_layer_survives_restart(tmp_path):
+    key = RecommendationCache.make_key([2, 5], 5, 'v1')
+    cache = RecommendationCache(disk_path=tmp_path / 'cache')
+    cache.put(key, *_ranking(5))
+    restarted = RecommendationCache(disk_path=tmp_path / 'cache')
+    assert restarted.get(RecommendationCache.make_key([2, 5], 5, 'v2')) is None
+    rows, scores = restarted.get(RecommendationCache.make_key([5, 2], 5, 'v1'))
+    np.testing.assert_array_equal(rows, np.arange(5))
+    assert restarted.stats()['disk_hits'] == 1
+    assert restarted.get(key) is not None and restarted.stats()['hits'] == 1
+
+def test_disk_layer_is_pruned(tmp_path):
+    cache = RecommendationCache(disk_path=tmp_path / 'cache', max_disk_bytes=3000)
+    for i in range(20):
+        cache.put(RecommendationCache.make_key([i], 50, 'v1'), *_ranking(50))
+    assert sum(f.stat().st_size for f in (tmp_path / 'cache').glob('*.npz')) <= 3000
+
+def test_index_version_is_stable_and_content_based(data_dir, index):
+    assert index_version(index) == index_version(build_recommender_index())
+    assert index_version(index).startswith('mem-')
+
+    header = publish_index_artifact(index)
+    assert index_version(load_index_artifact()) == header['content_hash']
+
+    path = data_dir / 'occupation_skills_matrix.csv'
+    matrix = pd.read_csv(path, index_col=0)
+    matrix.iloc[0, 0] = 1 - matrix.iloc[0, 0]
+    matrix.to_csv(path)
+    assert index_version(build_recommender_index()) != index_version(index)
+
+def test_cached_recommendations_match_uncached(index, profiles):
+    cache = RecommendationCache()
+    for skills in profiles:
+        expected = index.recommend(skills, top_n=6)
+        for _ in range(2):
+            pd.testing.assert_frame_equal(get_cached_recommendations(skills, index, top_n=6, cache=cache), expected)
+    stats = cache.stats()
+    assert stats['misses'] <= len(profiles) and stats['hits'] >= len(profiles)
+
+def test_equivalent_skill_sets_share_an_entry(index):
+    cache = RecommendationCache()
+    get_cached_recommendations(['Programming', 'SQL'], index, cache=cache)
+    get_cached_recommendations(['database management', 'Programming', 'Programming'], index, cache=cache)
+    assert cache.stats()['hits'] == 1 and cache.stats()['entries'] == 1
+
+@pytest.mark.parametrize('filters', [
+    {'future_only': True},
+    {'min_salary': 80000},
+    {'min_salary': 60000, 'min_growth': 10, 'future_only': True},
+])
+def test_filtered_results_reuse_full_ranking(index, profiles, filters):
+    cache = RecommendationCache()
+    for skills in profiles[:20]:
+        expected = index.recommend(
+            skills, top_n=5, future_only=filters.get('future_only', False),
+            min_salary=filters.get('min_salary'), min_growth=filters.get('min_growth')
+        )
+        result = get_cached_recommendations(skills, index, top_n=5, cache=cache, **filters)
+        pd.testing.assert_frame_equal(result, expected)
+
+def test_shared_cache_is_created_once():
+    assert get_recommendation_cache(max_entries=3) is get_recommendation_cache()
+    assert get_recommendation_cache().max_entries == 3
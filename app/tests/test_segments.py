@@ -0,0 +1,214 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import compaction, segments
+from utils.compaction import LOCK_FILE, LOCK_TIMEOUT, _acquire_lock, compact_segments
+from utils.data_loader import get_occupation_details, get_skills_for_occupation
+from utils.index_artifact import ServingIndex, publish_index_artifact
+from utils.recommender import _top_k_indices, build_recommender_index
+from utils.segments import (
+    SegmentedIndex,
+    get_deltas_path,
+    list_segments,
+    load_segments,
+    pending_updates,
+    retire_occupation,
+    upsert_occupation,
+    write_delta_segment,
+)
+
+NEW_CODE = '99-0001.00'
+NEW_METADATA = {
+    'occupation_title': 'Quantum Developer', 'median_salary': 150000, 'projected_growth': 40,
+    'num_jobs_2024': 100, 'num_jobs_2034': 140,
+}
+
+@pytest.fixture
+def base(index):
+    publish_index_artifact(index)
+    return index
+
+@pytest.fixture
+def updated(base):
+    """Escreve segmentos com inclusão, alteração, retirada e reinclusão"""
+    codes = base.occupation_codes.tolist()
+    upsert_occupation(NEW_CODE, ['Programming', 'Quantum Widgets', 'Critical Thinking'], NEW_METADATA)
+    upsert_occupation(codes[0], ['Programming', 'Mathematics'], {'median_salary': 123456})
+    retire_occupation(codes[1])
+    upsert_occupation(codes[2], base.skills[:3])
+    retire_occupation(codes[2])
+    upsert_occupation(codes[2], [{'skill': skill, 'importance': 70, 'level': 3} for skill in base.skills[3:6]])
+    return codes
+
+@pytest.fixture
+def queries(base):
+    rng = np.random.default_rng(0)
+    queries = [
+        rng.choice(base.skills, size=rng.integers(1, 7), replace=False).tolist() + (['Quantum Widgets'] if i % 3 == 0 else [])
+        for i in range(40)
+    ]
+    return queries + [[], ['Quantum Widgets']]
+
+def _ranking(index, queries):
+    results = []
+    for skills in queries:
+        for filters in ({}, {'min_salary': 80000, 'future_only': True}):
+            recommendations = index.recommend(skills, top_n=10, **filters)
+            results.append(list(zip(recommendations['occupation_code'], recommendations['similarity_score'].round(4))))
+    return results
+
+def test_serving_index_combines_segments(updated):
+    index = ServingIndex(check_interval=0).get()
+    assert isinstance(index, SegmentedIndex)
+    live_codes = index.occupations_df['occupation_code'].tolist()
+    assert updated[1] not in live_codes
+    assert NEW_CODE in live_codes and updated[0] in live_codes
+
+    recommendations = index.recommend(['Quantum Widgets'], top_n=3)
+    assert recommendations['occupation_code'].tolist()[0] == NEW_CODE
+    top = recommendations.iloc[0]
+    assert top['occupation_title'] == 'Quantum Developer' and top['is_future_job']
+
+    changed = index.recommend(['Mathematics', 'Programming'], top_n=1).iloc[0]
+    assert changed['occupation_code'] == updated[0] and changed['median_salary'] == 123456
+
+def test_segmented_index_matches_brute_force(updated, queries):
+    index = ServingIndex(check_interval=0).get()
+    matrix = index.matrix
+    assert matrix.shape == (len(index.occupation_codes), len(index.skills))
+    assert not np.asarray(matrix[:index.n_base_rows][index.tombstones]).any()
+    live = np.flatnonzero(index.live_rows)
+    for skills in queries:
+        scores = np.asarray(matrix @ index.user_vector(skills), dtype=np.float32).ravel()
+        expected = live[_top_k_indices(scores[live], 10)]
+        recommendations = index.recommend(skills, top_n=10)
+        assert recommendations['occupation_code'].tolist() == index.occupation_codes[expected].tolist()
+        np.testing.assert_allclose(recommendations['similarity_score'], scores[expected] * 100, atol=1e-3)
+
+def test_batch_matches_single_queries(updated, queries):
+    index = ServingIndex(check_interval=0).get()
+    for skills, records in zip(queries, index.recommend_batch(queries, top_n=10, as_records=True, chunk_size=7)):
+        expected = index.recommend(skills, top_n=10)
+        assert [record['occupation_code'] for record in records] == expected['occupation_code'].tolist()
+        np.testing.assert_allclose([record['similarity_score'] for record in records], expected['similarity_score'], atol=1e-4)
+
+def test_compaction_round_trip(updated, queries, tmp_path):
+    serving = ServingIndex(check_interval=0)
+    before = _ranking(serving.get(), queries)
+    backup = tmp_path / 'segmentos'
+    shutil.copytree(get_deltas_path(), backup)
+
+    assert compact_segments() == {'segments': 6, 'upserted': 3, 'retired': 1}
+    assert not load_segments()
+
+    compacted = serving.get()
+    assert not isinstance(compacted, SegmentedIndex)
+    assert _ranking(compacted, queries) == before
+    # Reconstrução a partir dos CSVs reescritos
+    assert _ranking(build_recommender_index(), queries) == before
+    # Reaplicar os mesmos segmentos sobre a nova base é idempotente
+    assert _ranking(SegmentedIndex(compacted, load_segments(backup)), queries) == before
+
+def test_compaction_writes_skill_rows(updated, data_dir):
+    compact_segments()
+    skills_df = pd.read_csv(data_dir / 'skills_processed.csv', dtype={'level': 'Int64'})
+    new_rows = skills_df[skills_df['occupation_code'] == NEW_CODE]
+    assert sorted(new_rows['skill_name']) == ['Critical Thinking', 'Programming', 'Quantum Widgets']
+    assert new_rows['importance'].isna().all() and new_rows['level'].isna().all()
+    changed = skills_df[skills_df['occupation_code'] == updated[2]]
+    assert changed['importance'].tolist() == [70] * 3 and changed['level'].tolist() == [3] * 3
+    assert updated[1] not in set(skills_df['occupation_code'])
+
+def test_pending_segments_reach_data_loader(base, updated):
+    assert get_occupation_details(NEW_CODE)['occupation_title'] == 'Quantum Developer'
+    assert get_occupation_details(updated[1]) == {}
+    assert [skill['skill'] for skill in get_skills_for_occupation(updated[2])] == list(base.skills[3:6])
+
+def test_pending_updates_are_checked_once_per_interval(base, monkeypatch):
+    monkeypatch.setattr(segments, 'PENDING_CHECK_INTERVAL', 3600.0)
+    assert pending_updates() == ({}, set())
+    retire_occupation(base.occupation_codes[0])
+    assert pending_updates() == ({}, set())
+    monkeypatch.setattr(segments, 'PENDING_CHECK_INTERVAL', 0.0)
+    assert pending_updates()[1] == {base.occupation_codes[0]}
+
+def test_concurrent_writers_get_distinct_segments(base):
+    threads = [threading.Thread(target=retire_occupation, args=(code,)) for code in base.occupation_codes[:8]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    paths = list_segments()
+    assert [path.name for path in paths] == [f'segment-{seq:08d}.json' for seq in range(1, 9)]
+    assert pending_updates()[1] == set(base.occupation_codes[:8])
+
+def test_invalid_segments_are_ignored(base, capsys):
+    write_delta_segment(retire=[base.occupation_codes[0]])
+    (get_deltas_path() / 'segment-00000002.json').write_text('{', encoding='utf-8')
+    (get_deltas_path() / 'segment-00000003.json').write_text(json.dumps({'schema_version': 99}), encoding='utf-8')
+    assert len(load_segments()) == 1
+    assert 'ignorado' in capsys.readouterr().out
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+def _write_lock(path, **info):
+    path.write_text(json.dumps(info), encoding='utf-8')
+
+@pytest.mark.parametrize('info, acquired', [
+    (lambda: {'pid': os.getpid(), 'host': socket.gethostname(), 'created_at': time.time()}, False),
+    (lambda: {'pid': _dead_pid(), 'host': socket.gethostname(), 'created_at': time.time()}, True),
+    (lambda: {'pid': 1, 'host': 'outra-maquina', 'created_at': time.time()}, False),
+    (lambda: {'pid': 1, 'host': 'outra-maquina', 'created_at': time.time() - LOCK_TIMEOUT - 1}, True),
+])
+def test_lock_staleness(tmp_path, info, acquired, capsys):
+    lock_path = tmp_path / LOCK_FILE
+    _write_lock(lock_path, **info())
+    assert _acquire_lock(lock_path) is acquired
+    if acquired:
+        assert json.loads(lock_path.read_text(encoding='utf-8'))['pid'] == os.getpid()
+        assert 'abandonada' in capsys.readouterr().out
+
+def test_unreadable_lock_uses_file_age(tmp_path):
+    lock_path = tmp_path / LOCK_FILE
+    lock_path.write_text('lixo', encoding='utf-8')
+    assert not _acquire_lock(lock_path)
+    old = time.time() - LOCK_TIMEOUT - 1
+    os.utime(lock_path, (old, old))
+    assert _acquire_lock(lock_path)
+
+def test_locked_compaction_is_skipped(updated):
+    assert _acquire_lock(get_deltas_path() / LOCK_FILE)
+    assert compact_segments() is None
+    assert len(load_segments()) == 6
+
+def test_lock_is_released_after_failure(updated, monkeypatch):
+    def fail():
+        raise OSError('falha simulada')
+
+    monkeypatch.setattr(compaction, 'load_occupations_data', fail)
+    with pytest.raises(OSError):
+        compact_segments()
+    assert not (get_deltas_path() / LOCK_FILE).exists()
+    assert len(load_segments()) == 6
+
+def test_cli(base, capsys):
+    assert segments.main(['upsert', NEW_CODE, '--skills', 'Programming, SQL', '--metadata', '{"occupation_title": "X"}']) == 0
+    assert segments.main(['retire', base.occupation_codes[0]]) == 0
+    assert segments.main(['upsert', NEW_CODE, '--skills', 'SQL', '--metadata', '{']) == 1
+    assert segments.main(['list']) == 0
+    assert '2 segmentos: 1 ocupações incluídas/alteradas, 1 retiradas' in capsys.readouterr().out
+    assert compaction.main(['run']) == 0
+    assert not list_segments()
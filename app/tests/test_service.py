@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+
+import numpy as np
+import pytest
+
+from utils import service
+from utils.service import MAX_BODY_BYTES, RecommendationService, request_json
+
+def _run(scenario, **kwargs):
+    """Inicia o serviço em uma porta livre, executa o cenário e para o serviço"""
+    async def main():
+        svc = await RecommendationService(port=0, **kwargs).start()
+        try:
+            return await scenario(svc)
+        finally:
+            await asyncio.wait_for(svc.stop(), timeout=5)
+    return asyncio.run(main())
+
+async def _connect(svc):
+    return await asyncio.open_connection('127.0.0.1', svc.port)
+
+async def _raw(svc, data):
+    """Envia bytes crus e retorna (status, corpo JSON) da resposta"""
+    reader, writer = await _connect(svc)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+def test_recommendations_match_index(index, profiles):
+    async def scenario(svc):
+        reader, writer = await _connect(svc)
+        responses = [
+            await request_json(reader, writer, 'POST', '/recommendations', {'skills': skills, 'top_n': 5})
+            for skills in profiles[:20]
+        ]
+        writer.close()
+        return responses
+
+    for skills, (status, body) in zip(profiles, _run(scenario)):
+        expected = index.recommend(skills, top_n=5)
+        assert status == 200
+        recommendations = body['recommendations']
+        assert [item['occupation_code'] for item in recommendations] == expected['occupation_code'].tolist()
+        np.testing.assert_allclose(
+            [item['similarity_score'] for item in recommendations], expected['similarity_score'], atol=1e-4
+        )
+
+def test_concurrent_requests_are_micro_batched(index, profiles):
+    async def scenario(svc):
+        async def client(skills):
+            reader, writer = await _connect(svc)
+            try:
+                return await request_json(reader, writer, 'POST', '/recommendations', {'skills': skills, 'top_n': 3})
+            finally:
+                writer.close()
+
+        responses = await asyncio.gather(*(client(skills) for skills in profiles[:24]))
+        reader, writer = await _connect(svc)
+        health = await request_json(reader, writer, 'GET', '/health')
+        writer.close()
+        return responses, health
+
+    responses, (_, health) = _run(scenario, window_ms=200)
+    for skills, (status, body) in zip(profiles, responses):
+        assert status == 200
+        codes = [item['occupation_code'] for item in body['recommendations']]
+        assert codes == index.recommend(skills, top_n=3)['occupation_code'].tolist()
+    assert health['requests'] == 24
+    assert health['batches'] < 24 and health['avg_batch_size'] > 1
+
+def test_occupation_endpoints(index):
+    code = index.occupation_codes[0]
+
+    async def scenario(svc):
+        reader, writer = await _connect(svc)
+        results = {
+            path: await request_json(reader, writer, 'GET', path)
+            for path in (
+                f'/occupations/{code}', f'/occupations/{code}/skills', '/occupations/00-0000.00',
+                '/skills?q=prog&limit=3', '/skills?limit=x', '/desconhecida', f'/occupations/{code}/paths/{code}',
+            )
+        }
+        writer.close()
+        return results
+
+    results = _run(scenario)
+    status, details = results[f'/occupations/{code}']
+    assert status == 200 and details['occupation_code'] == code
+    status, skills = results[f'/occupations/{code}/skills']
+    assert status == 200 and skills['skills']
+    assert results['/occupations/00-0000.00'][0] == 404
+    status, completions = results['/skills?q=prog&limit=3']
+    assert status == 200 and 'Programming' in completions['skills']
+    assert results['/skills?limit=x'][0] == 400
+    assert results['/desconhecida'][0] == 404
+    # Sem grafo de carreiras publicado no diretório de modelo do teste
+    assert results[f'/occupations/{code}/paths/{code}'][0] == 503
+
+@pytest.mark.parametrize('payload', [{'skills': 'Programming'}, {'skills': [1]}, {'top_n': 'x'}, []])
+def test_invalid_recommendation_body_is_rejected(payload):
+    async def scenario(svc):
+        reader, writer = await _connect(svc)
+        response = await request_json(reader, writer, 'POST', '/recommendations', payload)
+        writer.close()
+        return response
+
+    status, body = _run(scenario)
+    assert status == 400 and 'error' in body
+
+def test_malformed_requests_are_rejected():
+    async def scenario(svc):
+        return [
+            await _raw(svc, b'GET\r\n\r\n'),
+            await _raw(svc, b'POST /recommendations HTTP/1.1\r\nContent-Length: abc\r\n\r\n'),
+            await _raw(svc, f'POST /recommendations HTTP/1.1\r\nContent-Length: {MAX_BODY_BYTES + 1}\r\n\r\n'.encode()),
+        ]
+
+    assert [status for status, _ in _run(scenario)] == [400, 400, 413]
+
+def test_handler_errors_return_500_and_keep_connection(monkeypatch, capsys):
+    def fail(occupation_code):
+        raise RuntimeError('falha simulada')
+
+    monkeypatch.setattr(service, 'get_occupation_details', fail)
+
+    async def scenario(svc):
+        reader, writer = await _connect(svc)
+        error = await request_json(reader, writer, 'GET', '/occupations/15-1252.00')
+        health = await request_json(reader, writer, 'GET', '/health')
+        writer.close()
+        return error, health
+
+    (status, body), (health_status, _) = _run(scenario)
+    assert status == 500 and body == {'error': 'Erro interno'}
+    assert health_status == 200
+    assert 'falha simulada' in capsys.readouterr().err
+
+def test_stop_closes_idle_keep_alive_connections(caplog):
+    async def scenario(svc):
+        reader, writer = await _connect(svc)
+        await request_json(reader, writer, 'GET', '/health')
+        return reader, writer
+
+    with caplog.at_level(logging.ERROR, logger='asyncio'):
+        _run(scenario)
+    assert not caplog.records
+
+def test_metrics_are_plain_text():
+    async def scenario(svc):
+        reader, writer = await _connect(svc)
+        writer.write(b'GET /metrics HTTP/1.1\r\nConnection: close\r\n\r\n')
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        return response
+
+    head, _, _ = _run(scenario).partition(b'\r\n\r\n')
+    assert head.startswith(b'HTTP/1.1 200') and b'text/plain' in head
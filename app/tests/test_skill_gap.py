@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from conftest import baseline_scores
+from utils.recommender import build_recommender_index
+from utils.segments import SegmentedIndex, load_segments, retire_occupation, upsert_occupation
+from utils.skill_gap import SkillGapEngine, get_skill_gap_engine
+
+@pytest.fixture
+def large_index(synthetic_dir):
+    return build_recommender_index(backend='sparse')
+
+def _dense(engine):
+    return engine.matrix.toarray()
+
+def _brute_scores(engine, skills):
+    mask = engine.user_mask(skills)
+    n_selected = mask.sum()
+    return _dense(engine) @ mask / np.sqrt(n_selected) if n_selected else np.zeros(engine.matrix.shape[0])
+
+def test_scores_match_dense_baseline(index, profiles):
+    engine = SkillGapEngine(index)
+    for skills in profiles:
+        expected = baseline_scores(skills).reindex(index.occupation_codes).to_numpy()
+        np.testing.assert_allclose(engine.scores(skills) * 100, expected, atol=1e-3)
+
+def test_counts_and_masks_match_dense(large_index):
+    engine = SkillGapEngine(large_index)
+    binary = _dense(engine) > 0
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        skills = rng.choice(large_index.skills, size=rng.integers(0, 15), replace=False).tolist()
+        mask = engine.user_mask(skills)
+        matched, missing, percentage = engine.counts(skills)
+        np.testing.assert_array_equal(matched, (binary & mask).sum(axis=1))
+        np.testing.assert_array_equal(missing, (binary & ~mask).sum(axis=1))
+        np.testing.assert_allclose(percentage, matched / binary.sum(axis=1) * 100)
+
+        rows = rng.choice(binary.shape[0], size=30, replace=False)
+        matched_mask, missing_mask = engine.masks(skills, rows=rows)
+        np.testing.assert_array_equal(matched_mask.toarray(), binary[rows] & mask)
+        np.testing.assert_array_equal(missing_mask.toarray(), binary[rows] & ~mask)
+
+def test_rank_one_update_equals_recompute(large_index):
+    engine = SkillGapEngine(large_index)
+    skills = large_index.skills[:4]
+    for skill in large_index.skills[4:40]:
+        np.testing.assert_allclose(
+            engine.rank_one_update(skills, skill), engine.scores(skills + [skill]), atol=1e-6
+        )
+    # Habilidade já selecionada ou desconhecida não muda os scores
+    scores = engine.scores(skills)
+    assert engine.rank_one_update(skills, skills[0], scores=scores) is scores
+    assert engine.rank_one_update(skills, 'Habilidade Inexistente', scores=scores) is scores
+    np.testing.assert_allclose(engine.rank_one_update([], skills[0]), engine.scores([skills[0]]), atol=1e-6)
+
+def test_skill_gains_match_brute_force(large_index):
+    engine = SkillGapEngine(large_index)
+    skills = large_index.skills[10:13]
+    scores = _brute_scores(engine, skills)
+    top = np.argsort(-scores, kind='stable')[:10]
+    gains = engine.skill_gains(skills, k=10)
+    mask = engine.user_mask(skills)
+    assert np.isneginf(gains[mask]).all()
+    for col in np.flatnonzero(~mask)[:50]:
+        after = _brute_scores(engine, skills + [large_index.skills[col]])
+        assert gains[col] == pytest.approx(after[top].mean() - scores[top].mean(), abs=1e-6)
+
+def test_report_best_next_skill_is_largest_missing_weight(large_index):
+    engine = SkillGapEngine(large_index)
+    skills = large_index.skills[:6]
+    report = engine.report(skills)
+    dense = _dense(engine)
+    mask = engine.user_mask(skills)
+    gains = engine.skill_gains(skills)
+    assert len(report) == dense.shape[0]
+    for row in np.random.default_rng(1).choice(dense.shape[0], size=60, replace=False):
+        entry = report.iloc[row]
+        missing = np.flatnonzero((dense[row] > 0) & ~mask)
+        if len(missing) == 0:
+            assert entry['best_next_skill'] is None
+            assert entry['score_after'] == pytest.approx(entry['similarity_score'])
+            continue
+        best = max(missing, key=lambda col: (dense[row, col], gains[col], -col))
+        assert entry['best_next_skill'] == large_index.skills[best]
+        after = _brute_scores(engine, skills + [large_index.skills[best]])[row] * 100
+        assert entry['score_after'] == pytest.approx(after, abs=1e-3)
+
+def test_occupation_gap(index):
+    engine = get_skill_gap_engine(index)
+    assert get_skill_gap_engine(index) is engine
+    code = index.occupation_codes[0]
+    row_skills = [index.skills[col] for col in np.flatnonzero(_dense(engine)[0])]
+    gap = engine.occupation_gap(row_skills[:1], code)
+    assert gap['matched'] == row_skills[:1] and gap['missing'] == row_skills[1:]
+    assert gap['match_percentage'] == pytest.approx(100 / len(row_skills))
+    assert gap['best_next_skill'] in row_skills[1:]
+    assert engine.occupation_gap(['Programming'], '00-0000.00') is None
+
+def test_segmented_index_uses_live_rows(index):
+    retired = index.occupation_codes[0]
+    changed = index.occupation_codes[1]
+    retire_occupation(retired)
+    upsert_occupation(changed, ['Programming', 'Quantum Widgets'])
+    engine = SkillGapEngine(SegmentedIndex(index, load_segments()))
+
+    report = engine.report(['Programming'])
+    assert retired not in set(report['occupation_code'])
+    assert report['occupation_code'].tolist().count(changed) == 1
+    gap = engine.occupation_gap(['Programming'], changed)
+    assert gap['matched'] == ['Programming'] and gap['missing'] == ['Quantum Widgets']
+    assert gap['best_next_skill'] == 'Quantum Widgets' and gap['score_after'] == pytest.approx(100, abs=1e-3)
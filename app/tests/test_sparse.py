@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import assert_matches_baseline
+from utils.data_loader import (
+    SparseSkillsMatrix,
+    get_cache_path,
+    load_occupation_skills_matrix,
+    load_occupation_skills_matrix_sparse,
+)
+from utils.recommender import build_recommender_index, calculate_similarity, create_user_skills_vector
+
+@pytest.mark.parametrize('chunksize', [1, 3, 5000])
+def test_sparse_loader_matches_dense_matrix(chunksize):
+    dense = load_occupation_skills_matrix()
+    sparse_matrix = load_occupation_skills_matrix_sparse(chunksize=chunksize)
+    assert sparse_matrix.matrix.dtype == np.uint8
+    pd.testing.assert_frame_equal(sparse_matrix.to_dataframe(), dense, check_dtype=False)
+
+def test_sparse_loader_reuses_cache():
+    first = load_occupation_skills_matrix_sparse()
+    assert (get_cache_path() / 'occupation_skills_matrix.csr.npz').exists()
+    second = load_occupation_skills_matrix_sparse()
+    assert (first.matrix != second.matrix).nnz == 0
+    assert second.skills == first.skills
+    np.testing.assert_array_equal(second.occupation_codes, first.occupation_codes)
+
+def test_sparse_cache_is_rebuilt_when_csv_changes(data_dir):
+    load_occupation_skills_matrix_sparse()
+    matrix_path = data_dir / 'occupation_skills_matrix.csv'
+    dense = pd.read_csv(matrix_path, index_col=0)
+    dense.iloc[0] = 1
+    dense.to_csv(matrix_path)
+    assert load_occupation_skills_matrix_sparse().matrix[0].nnz == dense.shape[1]
+
+def test_save_load_round_trip_keeps_weights(tmp_path):
+    weights = pd.DataFrame(
+        [[0.0, 2.5, 0.0], [1.0, 0.0, 0.25]],
+        index=pd.Index(['11-1011.00', '15-1252.00'], name='occupation_code'),
+        columns=['A', 'B', 'C']
+    )
+    sparse_matrix = SparseSkillsMatrix.from_dataframe(weights)
+    assert sparse_matrix.matrix.dtype == np.float32
+    sparse_matrix.save(tmp_path / 'matrix.npz')
+    loaded = SparseSkillsMatrix.load(tmp_path / 'matrix.npz')
+    pd.testing.assert_frame_equal(loaded.to_dataframe(), weights, check_dtype=False)
+
+def test_sparse_backend_matches_dense_baseline(profiles):
+    sparse_index = build_recommender_index(backend='sparse')
+    dense_index = build_recommender_index(backend='dense')
+    assert sparse_index.is_sparse and not dense_index.is_sparse
+    for skills in profiles:
+        result = sparse_index.recommend(skills, top_n=10)
+        assert_matches_baseline(result['occupation_code'], result['similarity_score'], skills, 10)
+        np.testing.assert_allclose(sparse_index.scores(skills), dense_index.scores(skills), atol=1e-6)
+
+def test_sparse_backend_matches_dense_at_scale(synthetic_dir):
+    sparse_index = build_recommender_index(backend='sparse')
+    dense_index = build_recommender_index(backend='dense')
+    rng = np.random.default_rng(2)
+    for _ in range(30):
+        skills = rng.choice(dense_index.skills, size=rng.integers(1, 12), replace=False).tolist()
+        pd.testing.assert_frame_equal(
+            sparse_index.recommend(skills, top_n=15), dense_index.recommend(skills, top_n=15)
+        )
+
+def test_calculate_similarity_accepts_sparse_matrix():
+    dense = load_occupation_skills_matrix()
+    sparse_matrix = SparseSkillsMatrix.from_dataframe(dense)
+    vector = create_user_skills_vector(dense.columns[:3].tolist(), dense.columns.tolist())
+    pd.testing.assert_series_equal(
+        calculate_similarity(vector, sparse_matrix), calculate_similarity(vector, dense)
+    )
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        build_recommender_index(backend='gpu')
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+
+from utils import warmup
+from utils.tracing import enable_tracing, reset_tracing, tracing_enabled
+
+AppTest = pytest.importorskip('streamlit.testing.v1').AppTest
+
+APP_FILE = Path(__file__).resolve().parent.parent / 'streamlit_app.py'
+
+SKILLS = ['Programming', 'Data Analysis', 'Problem Solving']
+
+@pytest.fixture
+def app():
+    app = AppTest.from_file(str(APP_FILE), default_timeout=60)
+    app.run()
+    assert not app.exception
+    yield app
+    # O aquecimento em segundo plano termina antes de os diretórios do teste serem restaurados
+    if warmup._started is not None:
+        warmup._started.join()
+
+def _open_page(app, page):
+    app.sidebar.radio[0].set_value(page).run()
+    assert not app.exception
+    return app
+
+def _card_keys(app):
+    return [checkbox.key for checkbox in app.checkbox if checkbox.key and checkbox.key.startswith('skills_')]
+
+@pytest.fixture
+def recommended(app):
+    _open_page(app, 'Recomendações')
+    app.multiselect[0].set_value(SKILLS).run()
+    app.button[0].click().run()
+    assert not app.exception
+    return app
+
+def test_recommendations_page_shows_first_page_of_cards(recommended, index):
+    result = recommended.session_state['recommendation_result']
+    expected = index.recommend(SKILLS, top_n=10)['occupation_code'].tolist()
+    assert result['recommendations']['occupation_code'].tolist() == expected
+    assert _card_keys(recommended) == [f'skills_{code}' for code in expected[:5]]
+
+def test_result_and_figures_survive_reruns(recommended, index):
+    result = recommended.session_state['recommendation_result']
+    figures = result['figures']
+    recommended.number_input[0].set_value(2).run()
+    assert not recommended.exception
+    assert recommended.session_state['recommendation_result'] is result
+    assert recommended.session_state['recommendation_result']['figures'] is figures
+    expected = result['recommendations']['occupation_code'].tolist()
+    assert _card_keys(recommended) == [f'skills_{code}' for code in expected[5:10]]
+
+def test_changed_query_keeps_previous_results_until_requested(recommended):
+    result = recommended.session_state['recommendation_result']
+    recommended.slider[0].set_value(5).run()
+    captions = [caption.value for caption in recommended.caption]
+    assert any('consulta anterior' in caption for caption in captions)
+    assert recommended.session_state['recommendation_result'] is result
+
+    recommended.button[0].click().run()
+    updated = recommended.session_state['recommendation_result']
+    assert updated is not result and len(updated['recommendations']) == 5
+    assert len(_card_keys(recommended)) == 5
+
+def test_same_query_reuses_result(recommended):
+    result = recommended.session_state['recommendation_result']
+    recommended.button[0].click().run()
+    assert recommended.session_state['recommendation_result'] is result
+
+@pytest.mark.parametrize('page', ['Início', 'Explorar Dados', 'Sobre'])
+def test_pages_render_without_errors(app, page):
+    _open_page(app, page)
+    assert not app.error
+
+def test_debug_panel_requires_query_param(app):
+    assert 'debug_tracing' not in [checkbox.key for checkbox in app.checkbox]
+
+def test_debug_panel_toggles_tracing():
+    app = AppTest.from_file(str(APP_FILE), default_timeout=60)
+    app.query_params['debug'] = '1'
+    app.run()
+    try:
+        assert not app.exception
+        app.checkbox(key='debug_tracing').check().run()
+        assert tracing_enabled()
+        app.run()
+        assert not app.exception and not app.sidebar.dataframe[0].value.empty
+    finally:
+        enable_tracing(False)
+        reset_tracing()
+        if warmup._started is not None:
+            warmup._started.join()
@@ -0,0 +1,80 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from conftest import assert_matches_baseline
+from utils.data_loader import (
+    CACHE_DIR,
+    SparseSkillsMatrix,
+    load_occupation_skills_matrix,
+    load_occupation_skills_matrix_sparse,
+    load_occupations_data,
+    load_skills_data,
+)
+from utils.recommender import build_recommender_index
+from utils.synthetic import generate_dataset, main, synthetic_occupation_codes, write_synthetic_dataset
+
+def test_occupation_codes_are_unique_soc_codes():
+    codes = synthetic_occupation_codes(250000)
+    assert len(set(codes)) == len(codes)
+    assert all(re.fullmatch(r'\d{2}-\d{4}\.\d{2}', code) for code in codes[::997])
+
+def test_dataset_is_consistent():
+    occupations, skills_df, sparse_matrix = generate_dataset(500, 200, mean_skills=15, seed=3)
+    assert len(occupations) == 500 and sparse_matrix.shape == (500, 200)
+    assert list(sparse_matrix.occupation_codes) == occupations['occupation_code'].tolist()
+    assert occupations['occupation_code'].is_unique
+
+    # Tabela longa e matriz descrevem os mesmos pares, sem repetição
+    assert not skills_df.duplicated(['occupation_code', 'skill_name']).any()
+    expected = pd.crosstab(skills_df['occupation_code'], skills_df['skill_name'])
+    expected = expected.reindex(index=sparse_matrix.occupation_codes, columns=sparse_matrix.skills, fill_value=0)
+    np.testing.assert_array_equal(sparse_matrix.matrix.toarray(), expected.to_numpy())
+
+    counts = np.diff(sparse_matrix.matrix.indptr)
+    assert counts.min() >= 1 and 10 <= np.median(counts) <= 20
+    assert skills_df['importance'].between(50, 100).all() and skills_df['level'].between(1, 7).all()
+
+def test_skill_popularity_is_skewed():
+    _, _, sparse_matrix = generate_dataset(2000, 500, mean_skills=20, seed=0)
+    popularity = np.sort(np.asarray(sparse_matrix.matrix.sum(axis=0)).ravel())[::-1]
+    # Os 10% mais populares concentram bem mais que 10% dos pares
+    assert popularity[:50].sum() > 0.3 * popularity.sum()
+
+def test_generation_is_deterministic_by_seed():
+    first = generate_dataset(300, 100, seed=5)
+    second = generate_dataset(300, 100, seed=5)
+    other = generate_dataset(300, 100, seed=6)
+    pd.testing.assert_frame_equal(first[0], second[0])
+    pd.testing.assert_frame_equal(first[1], second[1])
+    assert (first[2].matrix != second[2].matrix).nnz == 0
+    assert (first[2].matrix != other[2].matrix).nnz > 0
+
+def test_written_dataset_loads_like_real_data(data_dir):
+    summary = write_synthetic_dataset(data_dir, 300, 120, mean_skills=10, seed=1)
+    assert summary['matrix_csv'] and summary['occupations'] == 300
+
+    occupations = load_occupations_data()
+    assert len(occupations) == 300 and {'salary_category', 'growth_category', 'is_future_job'} <= set(occupations)
+    assert len(load_skills_data()) == summary['pairs']
+    dense = load_occupation_skills_matrix()
+    sparse_matrix = load_occupation_skills_matrix_sparse()
+    assert dense.shape == (300, 120) and sparse_matrix.matrix.nnz == summary['pairs']
+    np.testing.assert_array_equal(sparse_matrix.matrix.toarray(), dense.to_numpy())
+
+    index = build_recommender_index(backend='sparse')
+    for skills in ([dense.columns[0]], list(dense.columns[5:9])):
+        recommendations = index.recommend(skills, top_n=10)
+        assert_matches_baseline(recommendations['occupation_code'], recommendations['similarity_score'], skills, 10)
+
+def test_large_datasets_skip_dense_csv(tmp_path):
+    summary = write_synthetic_dataset(tmp_path, 200, 100, seed=2, max_dense_cells=1000)
+    assert not summary['matrix_csv']
+    assert not (tmp_path / 'occupation_skills_matrix.csv').exists()
+    cached = SparseSkillsMatrix.load(tmp_path / CACHE_DIR / 'occupation_skills_matrix.csr.npz')
+    assert cached.shape == (200, 100) and cached.matrix.nnz == summary['pairs']
+
+def test_cli(tmp_path, capsys):
+    assert main(['--occupations', '50', '--skills', '30', '--output', str(tmp_path), '--max-dense-cells', '10']) == 0
+    assert '(matriz apenas em CSR)' in capsys.readouterr().out
@@ -0,0 +1,132 @@
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from utils import tracing
+from utils.tracing import (
+    BUCKETS_MS,
+    SpanHistogram,
+    enable_tracing,
+    memory_summary,
+    memory_tracing_enabled,
+    prometheus_text,
+    record_span,
+    reset_tracing,
+    span,
+    span_summary,
+    traced,
+    tracing_enabled,
+)
+
+@pytest.fixture(autouse=True)
+def clean_tracing():
+    enable_tracing(False)
+    reset_tracing()
+    yield
+    enable_tracing(False)
+    reset_tracing()
+
+@traced('teste.dobro')
+def _double(value):
+    return value * 2
+
+@traced()
+def _fail():
+    raise ValueError('falha')
+
+def test_disabled_tracing_records_nothing():
+    assert not tracing_enabled()
+    assert span('teste.bloco') is span('outro')
+    with span('teste.bloco'):
+        pass
+    assert _double(2) == 4
+    assert span_summary().empty
+
+def test_spans_and_traced_functions_are_recorded():
+    enable_tracing()
+    for _ in range(3):
+        with span('teste.bloco'):
+            pass
+    assert _double(2) == 4
+    with pytest.raises(ValueError):
+        _fail()
+    summary = span_summary().set_index('span')
+    assert summary.loc['teste.bloco', 'count'] == 3
+    assert summary.loc['teste.dobro', 'count'] == 1
+    # Nome padrão: módulo.função; chamadas que falham também são medidas
+    assert summary.loc['test_tracing._fail', 'count'] == 1
+
+def test_recommendation_hot_path_is_traced(index):
+    enable_tracing()
+    index.recommend(['Programming'], top_n=5)
+    assert 'recommender.similarity' in set(span_summary()['span'])
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = SpanHistogram()
+    for duration_ms in [0.3] * 90 + [7.0] * 9 + [20000.0]:
+        histogram.observe(duration_ms)
+    assert histogram.count == 100 and histogram.max_ms == 20000.0
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(0.95) == 10
+    assert histogram.quantile(1.0) == 20000.0
+    assert SpanHistogram().quantile(0.5) == 0.0
+
+def test_prometheus_histogram_is_cumulative():
+    for duration_ms in (0.3, 7.0, 7.0, 20000.0):
+        record_span('teste"span', duration_ms)
+    lines = prometheus_text().splitlines()
+    buckets = [line for line in lines if line.startswith('gs2_span_duration_seconds_bucket')]
+    assert len(buckets) == len(BUCKETS_MS) + 1
+    counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+    assert counts == sorted(counts) and counts[-1] == 4
+    assert 'gs2_span_duration_seconds_bucket{span="teste\\"span",le="0.0005"} 1' in lines
+    assert 'gs2_span_duration_seconds_bucket{span="teste\\"span",le="0.01"} 3' in lines
+    assert 'gs2_span_duration_seconds_count{span="teste\\"span"} 4' in lines
+    sum_line = next(line for line in lines if line.startswith('gs2_span_duration_seconds_sum'))
+    assert float(sum_line.rsplit(' ', 1)[1]) == pytest.approx(20.0143)
+
+def test_concurrent_records_are_not_lost():
+    threads = [
+        threading.Thread(target=lambda: [record_span('teste.concorrente', 1.0) for _ in range(1000)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert span_summary().loc[0, 'count'] == 8000
+
+def test_log_mode_emits_json(caplog):
+    enable_tracing(log=True)
+    with caplog.at_level('INFO', logger='gs2.tracing'):
+        _double(1)
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['span'] == 'teste.dobro' and record['duration_ms'] >= 0
+    enable_tracing(False)
+    assert not tracing._log_spans
+
+def test_memory_tracing_is_opt_in():
+    was_tracing = tracemalloc.is_tracing()
+    enable_tracing()
+    assert memory_tracing_enabled() == was_tracing
+
+    enable_tracing(memory=True)
+    assert memory_tracing_enabled()
+    with span('teste.memoria', memory=True):
+        buffer = bytearray(4 << 20)
+    spans, snapshot = memory_summary()
+    assert spans.loc[0, 'span'] == 'teste.memoria' and spans.loc[0, 'allocated_mb'] >= 4
+    assert not snapshot.empty
+    assert 'gs2_span_allocated_bytes{span="teste.memoria"}' in prometheus_text()
+    del buffer
+
+    enable_tracing(False)
+    assert tracemalloc.is_tracing() == was_tracing
+
+def test_reset_discards_measurements():
+    record_span('teste.bloco', 1.0)
+    reset_tracing()
+    assert span_summary().empty
+    assert memory_summary()[0].empty
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.recommender import build_recommender_index, create_user_skills_matrix
+from utils.vocabulary import DEFAULT_ALIASES, SkillVocabulary, load_skill_aliases, normalize_skill
+
+@pytest.mark.parametrize('name, key', [
+    ('AI/Deep  Learning', 'ai deep learning'),
+    ('Programação', 'programacao'),
+    ('  Pensamento   Crítico ', 'pensamento critico'),
+    ('C++', 'c++'),
+    ('C#', 'c#'),
+    ('Node.js', 'node js'),
+    ('---', ''),
+])
+def test_normalize_skill(name, key):
+    assert normalize_skill(name) == key
+
+def test_resolve_names_spellings_and_aliases():
+    vocabulary = SkillVocabulary(
+        ['AI/Deep Learning', 'Programming', 'C', 'C++', 'Data Analysis'],
+        aliases={'Coding': 'Programming', 'IA': 'AI/Deep Learning', 'Fora': 'Inexistente', 'c': 'Programming'}
+    )
+    assert vocabulary.resolve('Programming') == 1
+    assert vocabulary.resolve('programming ') == 1
+    assert vocabulary.resolve('ai-deep learning') == 0
+    assert vocabulary.resolve('CODING') == 1
+    assert vocabulary.resolve('c++') == 3
+    # Nomes canônicos têm precedência sobre sinônimos com a mesma chave
+    assert vocabulary.resolve('c') == 2
+    assert vocabulary.resolve('Fora') is None and vocabulary.resolve('') is None
+    assert 'ia' in vocabulary and 'Inexistente' not in vocabulary
+    assert vocabulary.canonical('coding') == 'Programming'
+
+    assert vocabulary.ids(['Coding', 'Data Analysis', 'programming', 'x']) == [1, 4]
+    assert vocabulary.split(['Coding', 'x', 'PROGRAMMING', 'data analysis']) == (
+        ['Programming', 'Data Analysis'], ['x']
+    )
+
+def _expected_completions(vocabulary, prefix, limit):
+    """Referência por força bruta: nomes e sinônimos que começam com o prefixo, depois palavras"""
+    key = normalize_skill(prefix)
+    keys = vocabulary._key_to_id()
+    full = sorted((name, skill_id) for name, skill_id in keys.items() if name.startswith(key))
+    words = sorted(
+        (name[start + 1:], skill_id)
+        for name, skill_id in keys.items()
+        for start in [i for i, char in enumerate(name) if char == ' ']
+        if name[start + 1:].startswith(key)
+    )
+    found = {}
+    for _, skill_id in full + words:
+        if len(found) >= limit:
+            break
+        found.setdefault(skill_id, None)
+    return [vocabulary.skills[skill_id] for skill_id in found]
+
+def test_complete_matches_brute_force():
+    rng = np.random.default_rng(0)
+    words = ['data', 'machine', 'learning', 'cloud', 'análise', 'gestão', 'design', 'web', 'mobile', 'dev']
+    skills = list(dict.fromkeys(
+        ' '.join(rng.choice(words, size=rng.integers(1, 4))).title() + f' {i % 50}' for i in range(3000)
+    ))
+    aliases = {f'Alias {i}': skills[i] for i in range(0, len(skills), 7)}
+    vocabulary = SkillVocabulary(skills, aliases=aliases)
+    for prefix in ['d', 'da', 'Data M', 'learn', 'ANALISE', 'gestao w', 'alias 1', '4', 'zzz', 'mobile 1']:
+        for limit in (1, 5, 50):
+            assert vocabulary.complete(prefix, limit=limit) == _expected_completions(vocabulary, prefix, limit)
+    assert vocabulary.complete('  ') == []
+
+def test_complete_on_bundled_skills(index):
+    assert index.vocabulary.complete('learn') == ['AI/Deep Learning', 'Machine Learning']
+    assert index.vocabulary.complete('prog')[0] == 'Programming'
+    assert index.vocabulary.complete('banco') == ['Database Management']
+
+def test_aliases_file_extends_defaults(data_dir):
+    assert load_skill_aliases() == DEFAULT_ALIASES
+    pd.DataFrame({'alias': ['Py', 'SQL'], 'skill': ['Programming', 'Data Analysis']}).to_csv(
+        data_dir / 'skill_aliases.csv', index=False
+    )
+    aliases = load_skill_aliases()
+    assert aliases['Py'] == 'Programming' and aliases['SQL'] == 'Data Analysis'
+    index = build_recommender_index()
+    assert index.vocabulary.canonical('py') == 'Programming'
+    assert index.vocabulary.canonical('sql') == 'Data Analysis'
+
+    pd.DataFrame({'nome': ['Py']}).to_csv(data_dir / 'skill_aliases.csv', index=False)
+    assert load_skill_aliases() == DEFAULT_ALIASES
+
+def test_aliases_give_the_same_recommendations(index):
+    pd.testing.assert_frame_equal(
+        index.recommend(['Coding', 'sql', 'estatística'], top_n=5),
+        index.recommend(['Programming', 'Database Management', 'Statistical Analysis'], top_n=5)
+    )
+
+def test_user_matrix_uses_the_vocabulary(index, profiles):
+    matrix = create_user_skills_matrix(profiles + [['Coding', 'Programming', 'programming']], index.vocabulary)
+    assert matrix.shape == (len(profiles) + 1, len(index.skills))
+    for row, skills in enumerate(profiles):
+        np.testing.assert_array_equal(matrix[row].toarray().ravel() > 0, index.user_vector(skills) > 0)
+    assert matrix[len(profiles)].nnz == 1
+    with pytest.raises(TypeError):
+        create_user_skills_matrix(profiles, index.skill_to_col)
@@ -0,0 +1,89 @@
+import threading
+
+import pytest
+
+from utils import warmup
+from utils.index_artifact import get_serving_index
+from utils.skill_gap import get_skill_gap_engine
+from utils.tracing import enable_tracing, reset_tracing, span_summary
+from utils.warmup import INDEX_TASKS, LOAD_TASKS, main, start_warm_up, warm_up
+
+@pytest.fixture
+def clean_tracing():
+    enable_tracing(False)
+    reset_tracing()
+    yield
+    enable_tracing(False)
+    reset_tracing()
+
+def _fail(*args):
+    raise RuntimeError('sem dados')
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_warm_up_times_every_task(workers):
+    timings = warm_up(workers=workers)
+    assert list(timings) == [*LOAD_TASKS, *INDEX_TASKS, 'total']
+    assert all(seconds is not None and seconds >= 0 for seconds in timings.values())
+    assert timings['total'] >= max(timings[name] for name in LOAD_TASKS)
+
+def test_index_structures_are_built_on_the_serving_index():
+    warm_up(workers=2)
+    index = get_serving_index()
+    engine = get_skill_gap_engine(index)
+    assert get_skill_gap_engine(get_serving_index()) is engine
+
+def test_failures_are_reported_without_stopping_other_tasks(monkeypatch, capsys):
+    monkeypatch.setitem(LOAD_TASKS, 'career_graph', _fail)
+    monkeypatch.setitem(INDEX_TASKS, 'skill_gap_engine', _fail)
+    timings = warm_up(workers=2)
+    assert timings['career_graph'] is None and timings['skill_gap_engine'] is None
+    assert timings['occupations'] is not None and timings['skill_vocabulary'] is not None
+    error = capsys.readouterr().err
+    assert 'Aquecimento de career_graph falhou: sem dados' in error
+    assert 'Aquecimento de skill_gap_engine falhou' in error
+
+def test_index_tasks_wait_for_the_serving_index(monkeypatch):
+    calls = []
+    monkeypatch.setitem(LOAD_TASKS, 'serving_index', _fail)
+    monkeypatch.setitem(INDEX_TASKS, 'skill_vocabulary', calls.append)
+    timings = warm_up(workers=2)
+    assert timings['serving_index'] is None
+    assert not set(INDEX_TASKS) & set(timings)
+    assert calls == []
+
+def test_tasks_are_traced(clean_tracing):
+    enable_tracing()
+    warm_up(workers=2)
+    spans = set(span_summary()['span'])
+    assert {f'warmup.{name}' for name in [*LOAD_TASKS, *INDEX_TASKS]} <= spans
+
+def test_background_warm_up_starts_once(monkeypatch):
+    calls, release = [], threading.Event()
+
+    def fake_warm_up(workers):
+        calls.append(workers)
+        release.wait(5)
+
+    monkeypatch.setattr(warmup, 'warm_up', fake_warm_up)
+    threads = []
+    workers = [threading.Thread(target=lambda: threads.append(start_warm_up(workers=2))) for _ in range(8)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    assert len(set(threads)) == 1 and threads[0].daemon
+    release.set()
+    threads[0].join()
+    assert calls == [2]
+    assert start_warm_up() is threads[0]
+    assert calls == [2]
+
+def test_cli(monkeypatch, capsys):
+    assert main(['--workers', '2']) == 0
+    output = capsys.readouterr().out
+    assert all(name in output for name in [*LOAD_TASKS, *INDEX_TASKS, 'total'])
+    assert 'falhou' not in output
+
+    monkeypatch.setitem(LOAD_TASKS, 'neighbor_table', _fail)
+    assert main(['--workers', '1']) == 1
+    assert 'neighbor_table' in capsys.readouterr().out
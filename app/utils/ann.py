@@ -0,0 +1,394 @@
+"""
+Índice aproximado de vizinhos mais próximos (LSH por hiperplanos aleatórios)
+
+Cada tabela projeta os vetores normalizados das ocupações em n_bits
+hiperplanos aleatórios e agrupa as ocupações pela assinatura de sinais. Uma
+consulta visita o bucket da sua assinatura e, opcionalmente, os n_probes
+buckets vizinhos (bits com projeção mais próxima de zero invertidos), e só os
+candidatos encontrados são pontuados de forma exata.
+
+O app e o serviço usam a busca exata (adequada aos catálogos do O*NET). Para
+catálogos grandes, construa o índice sobre o índice em produção e passe
+``ann_index=get_ann_index(index)`` para get_recommendations/recommend; o
+arquivo guarda a versão do índice de origem e é ignorado (busca exata) se
+ela não for a do índice informado.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.ann build --tables 8 --bits 12
+    python -m utils.ann benchmark --queries 1000 --k 10
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from .index_artifact import load_index_artifact
+from .recommender import _top_k_indices, build_recommender_index, get_model_path
+from .result_cache import index_version
+
+ANN_INDEX_FILE = 'ann_index.npz'
+
+class LSHIndex:
+    """
+    Índice LSH por hiperplanos aleatórios para similaridade do cosseno
+
+    Args:
+        n_tables (int): Número de tabelas hash (mais tabelas = mais recall)
+        n_bits (int): Bits por assinatura (mais bits = buckets menores)
+        seed (int): Semente dos hiperplanos aleatórios
+    """
+
+    def __init__(self, n_tables=8, n_bits=12, seed=0):
+        if not 1 <= n_bits <= 31:
+            raise ValueError("n_bits deve estar entre 1 e 31")
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        self.hyperplanes = None
+        self.shape = (0, 0)
+        # Por tabela: linhas ordenadas por bucket, códigos dos buckets e offsets
+        self.bucket_rows = []
+        self.bucket_codes = []
+        self.bucket_offsets = []
+        # Versão do índice de recomendação de origem (result_cache.index_version)
+        self.index_version = None
+        self._matrix = None
+
+    def fit(self, matrix, version=None):
+        """
+        Constrói as tabelas a partir da matriz normalizada de ocupações
+
+        Args:
+            matrix (np.array | sp.csr_matrix): Matriz ocupações x habilidades
+                normalizada (ex.: ``RecommenderIndex.matrix``)
+            version (str, optional): Versão do índice de origem
+                (result_cache.index_version), gravada por save() e
+                conferida por attach()
+
+        Returns:
+            LSHIndex: O próprio índice
+        """
+        self.index_version = version
+        rng = np.random.default_rng(self.seed)
+        self.shape = matrix.shape
+        self.hyperplanes = rng.standard_normal(
+            (self.n_tables, self.n_bits, matrix.shape[1])
+        ).astype(np.float32)
+
+        self.bucket_rows, self.bucket_codes, self.bucket_offsets = [], [], []
+        for table in range(self.n_tables):
+            projections = matrix @ self.hyperplanes[table].T
+            codes = self._signatures(np.asarray(projections))
+            rows = np.argsort(codes, kind='stable').astype(np.int32)
+            unique_codes, starts = np.unique(codes[rows], return_index=True)
+            self.bucket_rows.append(rows)
+            self.bucket_codes.append(unique_codes)
+            self.bucket_offsets.append(np.append(starts, len(rows)).astype(np.int64))
+
+        self._matrix = matrix
+        return self
+
+    def attach(self, matrix, version=None):
+        """
+        Associa a matriz normalizada usada na pontuação exata dos candidatos
+
+        Args:
+            matrix (np.array | sp.csr_matrix): Mesma matriz usada em fit()
+            version (str, optional): Versão do índice dono da matriz;
+                conferida com a gravada em fit() quando ambas existem
+
+        Raises:
+            ValueError: Se a matriz ou a versão não forem as do índice de origem
+        """
+        if matrix.shape != tuple(self.shape):
+            raise ValueError(
+                f"Índice ANN construído para a matriz {tuple(self.shape)}, "
+                f"mas recebeu {matrix.shape}. Reconstrua o índice."
+            )
+        if version and self.index_version and version != self.index_version:
+            raise ValueError(
+                f"Índice ANN construído para o índice {self.index_version[:12]}, "
+                f"mas recebeu {version[:12]}. Reconstrua o índice."
+            )
+        self._matrix = matrix
+        return self
+
+    def _signatures(self, projections):
+        """Converte projeções (n x n_bits) em códigos inteiros de bucket"""
+        weights = (1 << np.arange(self.n_bits)).astype(np.int64)
+        return (projections > 0).astype(np.int64) @ weights
+
+    def candidates(self, query_vector, n_probes=0):
+        """
+        Retorna as linhas candidatas para um vetor de consulta
+
+        Args:
+            query_vector (np.array): Vetor normalizado do usuário
+            n_probes (int): Buckets vizinhos visitados por tabela, além do
+                bucket da própria assinatura (ajuste de recall x latência)
+
+        Returns:
+            np.array: Linhas candidatas (sem repetição)
+        """
+        n_probes = min(max(n_probes, 0), self.n_bits)
+        found = []
+        for table in range(self.n_tables):
+            projection = self.hyperplanes[table] @ query_vector
+            code = int(self._signatures(projection[None, :])[0])
+            # Multi-probe: inverte os bits com projeção mais próxima de zero
+            flips = np.argsort(np.abs(projection))[:n_probes]
+            probes = np.array([code] + [code ^ (1 << int(bit)) for bit in flips], dtype=np.int64)
+
+            codes = self.bucket_codes[table]
+            positions = np.searchsorted(codes, probes)
+            found_bucket = positions < len(codes)
+            found_bucket[found_bucket] = codes[positions[found_bucket]] == probes[found_bucket]
+            for position in positions[found_bucket]:
+                start, stop = self.bucket_offsets[table][position:position + 2]
+                found.append(self.bucket_rows[table][start:stop])
+
+        if not found:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(found))
+
+    def query(self, query_vector, k=10, n_probes=0):
+        """
+        Busca aproximada das k ocupações mais similares
+
+        Os candidatos são pontuados de forma exata; se houver menos de k
+        candidatos, a busca recai para a força bruta.
+
+        Args:
+            query_vector (np.array): Vetor normalizado do usuário
+            k (int): Número de ocupações a retornar
+            n_probes (int): Buckets vizinhos visitados por tabela
+
+        Returns:
+            tuple: (linhas, scores) em ordem decrescente de similaridade
+        """
+        if self._matrix is None:
+            raise ValueError("Índice ANN sem matriz associada. Use fit() ou attach().")
+
+        rows = self.candidates(query_vector, n_probes=n_probes)
+        if len(rows) < k:
+            scores = self._matrix @ query_vector
+            top = _top_k_indices(scores, k)
+            return top, scores[top]
+
+        scores = self._matrix[rows] @ query_vector
+        top = _top_k_indices(scores, k)
+        return rows[top], scores[top]
+
+    def save(self, path):
+        """
+        Persiste o índice em um arquivo .npz (sem objetos pickle)
+
+        Args:
+            path (Path): Caminho do arquivo de destino
+        """
+        header = {'index_content_hash': self.index_version}
+        arrays = {
+            'header': np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8),
+            'params': np.array([self.n_tables, self.n_bits, self.seed, *self.shape], dtype=np.int64),
+            'hyperplanes': self.hyperplanes,
+        }
+        for table in range(self.n_tables):
+            arrays[f'rows_{table}'] = self.bucket_rows[table]
+            arrays[f'codes_{table}'] = self.bucket_codes[table]
+            arrays[f'offsets_{table}'] = self.bucket_offsets[table]
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carrega um índice persistido com save()
+
+        Args:
+            path (Path): Caminho do arquivo .npz
+
+        Returns:
+            LSHIndex: Índice carregado (sem matriz associada; ver attach())
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            n_tables, n_bits, seed, n_rows, n_cols = npz['params'].tolist()
+            index = cls(n_tables=n_tables, n_bits=n_bits, seed=seed)
+            index.shape = (n_rows, n_cols)
+            index.hyperplanes = npz['hyperplanes']
+            # Arquivos anteriores ao cabeçalho não têm a versão do índice de origem
+            if 'header' in npz.files:
+                index.index_version = json.loads(npz['header'].tobytes().decode('utf-8')).get('index_content_hash')
+            for table in range(n_tables):
+                index.bucket_rows.append(npz[f'rows_{table}'])
+                index.bucket_codes.append(npz[f'codes_{table}'])
+                index.bucket_offsets.append(npz[f'offsets_{table}'])
+        return index
+
+def load_ann_index(recommender_index=None):
+    """
+    Carrega o índice ANN salvo em app/model/
+
+    Args:
+        recommender_index (RecommenderIndex, optional): Índice cuja matriz será
+            associada ao índice ANN para a pontuação exata dos candidatos
+
+    Returns:
+        LSHIndex: Índice carregado, ou None se o arquivo não existir ou tiver
+            sido construído para outro índice
+    """
+    try:
+        ann_index = LSHIndex.load(get_model_path() / ANN_INDEX_FILE)
+    except FileNotFoundError:
+        print("Índice ANN não encontrado. Execute: python -m utils.ann build")
+        return None
+
+    if recommender_index is not None:
+        try:
+            ann_index.attach(recommender_index.matrix, index_version(recommender_index))
+        except ValueError as e:
+            print(f"Índice ANN ignorado: {e}")
+            return None
+    return ann_index
+
+_ann_lock = threading.Lock()
+
+def get_ann_index(recommender_index):
+    """
+    Índice ANN associado ao índice de recomendação (carregado na primeira chamada)
+
+    Args:
+        recommender_index (RecommenderIndex): Índice de recomendação
+
+    Returns:
+        LSHIndex: Índice guardado no próprio índice de recomendação, ou None
+            (busca exata) se o arquivo não existir ou for de outro índice
+    """
+    with _ann_lock:
+        if '_ann_index' not in recommender_index.__dict__:
+            recommender_index._ann_index = load_ann_index(recommender_index)
+        return recommender_index._ann_index
+
+def sample_queries(skills, n_queries=1000, min_skills=3, max_skills=8, seed=0):
+    """
+    Gera perfis aleatórios de usuários para o benchmark
+
+    Args:
+        skills (list): Vocabulário de habilidades
+        n_queries (int): Número de perfis
+        min_skills (int): Mínimo de habilidades por perfil
+        max_skills (int): Máximo de habilidades por perfil
+        seed (int): Semente do gerador
+
+    Returns:
+        list: Lista de listas de habilidades
+    """
+    rng = np.random.default_rng(seed)
+    max_skills = min(max_skills, len(skills))
+    min_skills = min(min_skills, max_skills)
+    return [
+        rng.choice(skills, size=rng.integers(min_skills, max_skills + 1), replace=False).tolist()
+        for _ in range(n_queries)
+    ]
+
+def evaluate_recall(recommender_index, ann_index, queries, k=10, probes=(0, 1, 2, 4)):
+    """
+    Mede recall@k e latência do índice ANN em relação à força bruta
+
+    Um resultado aproximado conta como acerto quando seu score exato é pelo
+    menos o k-ésimo score da força bruta, para não penalizar empates.
+
+    Args:
+        recommender_index (RecommenderIndex): Índice exato
+        ann_index (LSHIndex): Índice aproximado associado à mesma matriz
+        queries (list): Lista de listas de habilidades
+        k (int): Tamanho do top-k avaliado
+        probes (tuple): Valores de n_probes avaliados
+
+    Returns:
+        pd.DataFrame: Uma linha por n_probes com recall@k, latências médias
+            (ms) e número médio de candidatos
+    """
+    vectors = [recommender_index.user_vector(query) for query in queries]
+
+    start = time.perf_counter()
+    thresholds = []
+    for vector in vectors:
+        scores = recommender_index.matrix @ vector
+        thresholds.append(scores[_top_k_indices(scores, k)].min())
+    exact_ms = (time.perf_counter() - start) * 1000 / len(vectors)
+
+    results = []
+    for n_probes in probes:
+        hits = 0
+        n_candidates = 0
+        start = time.perf_counter()
+        approximate = [ann_index.query(vector, k=k, n_probes=n_probes) for vector in vectors]
+        ann_ms = (time.perf_counter() - start) * 1000 / len(vectors)
+
+        for vector, threshold, (_, scores) in zip(vectors, thresholds, approximate):
+            hits += int(np.count_nonzero(scores >= threshold - 1e-6))
+            n_candidates += len(ann_index.candidates(vector, n_probes=n_probes))
+
+        results.append({
+            'n_probes': n_probes,
+            f'recall@{k}': hits / (k * len(vectors)),
+            'ann_ms': ann_ms,
+            'exact_ms': exact_ms,
+            'avg_candidates': n_candidates / len(vectors),
+        })
+
+    return pd.DataFrame(results)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Índice ANN (LSH) de ocupações")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help="Constrói e salva o índice em app/model/")
+    build.add_argument('--tables', type=int, default=8)
+    build.add_argument('--bits', type=int, default=12)
+    build.add_argument('--seed', type=int, default=0)
+
+    benchmark = subparsers.add_parser('benchmark', help="Recall@k contra a força bruta")
+    benchmark.add_argument('--queries', type=int, default=1000)
+    benchmark.add_argument('--k', type=int, default=10)
+    benchmark.add_argument('--probes', type=int, nargs='+', default=[0, 1, 2, 4])
+
+    for subparser in (build, benchmark):
+        subparser.add_argument('--backend', choices=['dense', 'sparse'], default=None,
+                               help="Constrói o índice a partir dos CSVs (padrão: o artefato publicado)")
+
+    args = parser.parse_args(argv)
+
+    if args.backend is None:
+        try:
+            recommender_index = load_index_artifact()
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            recommender_index = build_recommender_index()
+    else:
+        recommender_index = build_recommender_index(backend=args.backend)
+    if recommender_index.empty:
+        print("Dados não encontrados. Execute o notebook primeiro.", file=sys.stderr)
+        return 1
+
+    if args.command == 'build':
+        ann_index = LSHIndex(n_tables=args.tables, n_bits=args.bits, seed=args.seed)
+        ann_index.fit(recommender_index.matrix, index_version(recommender_index))
+        path = get_model_path() / ANN_INDEX_FILE
+        ann_index.save(path)
+        print(f"Índice ANN salvo em {path}")
+    else:
+        ann_index = load_ann_index(recommender_index)
+        if ann_index is None:
+            return 1
+        queries = sample_queries(recommender_index.skills, n_queries=args.queries)
+        report = evaluate_recall(recommender_index, ann_index, queries, k=args.k, probes=args.probes)
+        print(report.to_string(index=False))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Pontuação em lote de perfis de usuários a partir da linha de comando
+
+Lê um arquivo CSV (colunas ``user_id`` e ``skills``, com habilidades separadas
+por ``;``) ou JSONL (objetos com ``user_id`` e a lista ``skills``) em blocos de
+tamanho limitado e grava as recomendações de forma incremental.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.batch perfis.csv recomendacoes.csv --top-n 10
+"""
+
+import argparse
+import csv
+import json
+import sys
+from itertools import islice
+from pathlib import Path
+
+import pandas as pd
+
+from .recommender import (
+    build_recommender_index,
+    create_user_skills_matrix,
+    get_recommendations_batch
+)
+
+SKILLS_SEPARATOR = ';'
+
+def iter_profile_chunks(input_path, chunk_size):
+    """
+    Lê os perfis em blocos sem carregar o arquivo inteiro em memória
+
+    Args:
+        input_path (Path): Arquivo CSV ou JSONL de perfis
+        chunk_size (int): Número de perfis por bloco
+
+    Yields:
+        tuple: (lista de user_ids, lista de listas de habilidades)
+    """
+    input_path = Path(input_path)
+
+    if input_path.suffix.lower() in ('.jsonl', '.json'):
+        with open(input_path, encoding='utf-8') as f:
+            lines = (line for line in f if line.strip())
+            while True:
+                records = [json.loads(line) for line in islice(lines, chunk_size)]
+                if not records:
+                    break
+                yield (
+                    [record['user_id'] for record in records],
+                    [record.get('skills', []) for record in records]
+                )
+    else:
+        reader = pd.read_csv(
+            input_path,
+            dtype={'user_id': str, 'skills': str},
+            keep_default_na=False,
+            chunksize=chunk_size
+        )
+        for chunk in reader:
+            yield (
+                chunk['user_id'].tolist(),
+                [
+                    [skill.strip() for skill in skills.split(SKILLS_SEPARATOR) if skill.strip()]
+                    for skills in chunk['skills']
+                ]
+            )
+
+class ResultWriter:
+    """
+    Grava recomendações incrementalmente em CSV (formato longo) ou JSONL
+
+    Args:
+        output_path (Path): Arquivo de saída; a extensão define o formato
+    """
+
+    def __init__(self, output_path):
+        output_path = Path(output_path)
+        self.jsonl = output_path.suffix.lower() in ('.jsonl', '.json')
+        self._file = open(output_path, 'w', encoding='utf-8', newline='')
+        if not self.jsonl:
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(['user_id', 'rank', 'occupation_code', 'similarity_score'])
+
+    def write(self, user_ids, codes, scores):
+        """Grava as recomendações de um bloco de usuários"""
+        for user_id, user_codes, user_scores in zip(user_ids, codes, scores):
+            if self.jsonl:
+                self._file.write(json.dumps({
+                    'user_id': user_id,
+                    'recommendations': [
+                        {'occupation_code': code, 'similarity_score': round(float(score), 4)}
+                        for code, score in zip(user_codes, user_scores)
+                    ]
+                }) + '\n')
+            else:
+                self._csv.writerows(
+                    (user_id, rank, code, f'{score:.4f}')
+                    for rank, (code, score) in enumerate(zip(user_codes, user_scores), start=1)
+                )
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def score_profiles_file(input_path, output_path, index, top_n=10, chunk_size=10000):
+    """
+    Pontua todos os perfis de um arquivo e grava os resultados em blocos
+
+    Args:
+        input_path (Path): Arquivo CSV ou JSONL de perfis
+        output_path (Path): Arquivo CSV ou JSONL de saída
+        index (RecommenderIndex): Índice de recomendação pré-construído
+        top_n (int): Número de recomendações por usuário
+        chunk_size (int): Número de perfis lidos e pontuados por bloco
+
+    Returns:
+        int: Número de perfis pontuados
+    """
+    n_profiles = 0
+    with ResultWriter(output_path) as writer:
+        for user_ids, profiles in iter_profile_chunks(input_path, chunk_size):
+            user_matrix = create_user_skills_matrix(profiles, index.vocabulary)
+            codes, scores = get_recommendations_batch(user_matrix, index, top_n=top_n)
+            writer.write(user_ids, codes, scores)
+            n_profiles += len(user_ids)
+    return n_profiles
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recomendações de profissões em lote")
+    parser.add_argument('input', type=Path, help="Arquivo de perfis (.csv ou .jsonl)")
+    parser.add_argument('output', type=Path, help="Arquivo de saída (.csv ou .jsonl)")
+    parser.add_argument('--top-n', type=int, default=10, help="Recomendações por usuário")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="Perfis por bloco")
+    parser.add_argument('--backend', choices=['dense', 'sparse'], default='dense',
+                        help="Formato da matriz de ocupações")
+    args = parser.parse_args(argv)
+
+    index = build_recommender_index(backend=args.backend)
+    if index.empty:
+        print("Dados não encontrados. Execute o notebook primeiro.", file=sys.stderr)
+        return 1
+
+    n_profiles = score_profiles_file(
+        args.input, args.output, index, top_n=args.top_n, chunk_size=args.chunk_size
+    )
+    print(f"{n_profiles} perfis pontuados -> {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Micro-benchmarks dos caminhos quentes do carregamento e da recomendação
+
+Para cada escala (ocupações x habilidades), gera dados sintéticos
+(utils.synthetic) e mede, em um subprocesso apontado para eles por
+GS2_DATA_DIR, a latência (p50/p99), a vazão e o pico de memória (RSS) de:
+
+    load_*                      cargas do data_loader (catálogo vazio a cada repetição)
+    create_user_skills_vector   vetor do usuário
+    calculate_similarity        similaridade com todas as ocupações
+    get_recommendations         recomendação com o índice pré-construído
+    get_skills_for_occupation   habilidades de uma ocupação
+
+Cada escala roda em um processo próprio para que o pico de RSS seja o dela.
+Os resultados podem ser salvos como baseline e comparados com execuções
+posteriores; uma operação regride quando o p50 excede o da baseline pela
+tolerância.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.benchmark run --scales 20x38,10000x2000 --save baseline.json
+    python -m utils.benchmark run --scales 20x38,10000x2000 --compare baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .ann import sample_queries
+from .data_loader import (
+    CACHE_DIR,
+    DATA_DIR_ENV,
+    MATRIX_FILE,
+    SparseSkillsMatrix,
+    get_catalog,
+    get_data_path,
+    get_skills_for_occupation,
+    load_occupation_skills_matrix,
+    load_occupation_skills_matrix_sparse,
+    load_occupations_data,
+    load_skills_data,
+)
+from .recommender import RecommenderIndex, calculate_similarity, create_user_skills_vector, get_recommendations
+from .synthetic import MAX_DENSE_CELLS, write_synthetic_dataset
+
+DEFAULT_SCALES = '20x38,1000x500,10000x2000'
+
+def parse_scale(scale):
+    """Converte '1000x500' em (1000, 500)"""
+    n_occupations, n_skills = scale.lower().split('x')
+    return int(n_occupations), int(n_skills)
+
+def time_operation(operation, inputs, repeat, warmup=3):
+    """
+    Mede a latência de uma operação sobre entradas rotativas
+
+    Args:
+        operation (callable): Função de um argumento
+        inputs (list): Entradas usadas em rodízio
+        repeat (int): Número de chamadas medidas
+        warmup (int): Chamadas descartadas antes da medição
+
+    Returns:
+        dict: p50 e p99 (ms), vazão (chamadas/s) e número de chamadas
+    """
+    for i in range(warmup):
+        operation(inputs[i % len(inputs)])
+
+    timings = np.empty(repeat)
+    for i in range(repeat):
+        argument = inputs[i % len(inputs)]
+        start = time.perf_counter_ns()
+        operation(argument)
+        timings[i] = time.perf_counter_ns() - start
+
+    timings /= 1e6
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p99_ms': float(np.percentile(timings, 99)),
+        'throughput': float(repeat / (timings.sum() / 1000)) if timings.sum() else float('inf'),
+        'n': repeat,
+    }
+
+def _cold(loader):
+    """Carga com o catálogo vazio (os caches binários em disco continuam válidos)"""
+    def load(_):
+        get_catalog().clear()
+        return loader()
+    return load
+
+def measure(repeat=200, load_repeat=10, n_queries=200, seed=0):
+    """
+    Mede as operações sobre o diretório de dados atual (get_data_path)
+
+    Returns:
+        list: Um dicionário de resultados por operação
+    """
+    data_path = get_data_path()
+    dense = (data_path / MATRIX_FILE).exists()
+    results = []
+
+    def record(operation, stats):
+        results.append({'operation': operation, **stats})
+
+    # A primeira carga lê os CSVs e grava os caches; as seguintes usam os caches
+    start = time.perf_counter()
+    load_occupations_data()
+    load_skills_data()
+    record('load_first_csv', {'p50_ms': (time.perf_counter() - start) * 1000, 'p99_ms': None, 'throughput': None, 'n': 1})
+
+    record('load_occupations_data', time_operation(_cold(load_occupations_data), [None], load_repeat, warmup=1))
+    record('load_skills_data', time_operation(_cold(load_skills_data), [None], load_repeat, warmup=1))
+    if dense:
+        record('load_occupation_skills_matrix_sparse',
+               time_operation(_cold(load_occupation_skills_matrix_sparse), [None], load_repeat, warmup=1))
+        matrix = load_occupation_skills_matrix_sparse()
+    else:
+        cache_path = data_path / CACHE_DIR / f'{Path(MATRIX_FILE).stem}.csr.npz'
+        record('load_sparse_matrix_npz',
+               time_operation(lambda _: SparseSkillsMatrix.load(cache_path), [None], load_repeat, warmup=1))
+        matrix = SparseSkillsMatrix.load(cache_path)
+    if dense and matrix.shape[0] * matrix.shape[1] <= MAX_DENSE_CELLS:
+        record('load_occupation_skills_matrix',
+               time_operation(_cold(load_occupation_skills_matrix), [None], load_repeat, warmup=1))
+        matrix = load_occupation_skills_matrix()
+
+    occupations_df = load_occupations_data()
+    skills = matrix.columns.tolist() if isinstance(matrix, pd.DataFrame) else list(matrix.skills)
+    queries = sample_queries(skills, n_queries=n_queries, seed=seed)
+    vectors = [create_user_skills_vector(query, skills) for query in queries]
+
+    start = time.perf_counter()
+    index = RecommenderIndex(matrix, occupations_df)
+    record('build_index', {'p50_ms': (time.perf_counter() - start) * 1000, 'p99_ms': None, 'throughput': None, 'n': 1})
+
+    record('create_user_skills_vector',
+           time_operation(lambda query: create_user_skills_vector(query, skills), queries, repeat))
+    record('calculate_similarity',
+           time_operation(lambda vector: calculate_similarity(vector, matrix), vectors, repeat))
+    record('get_recommendations',
+           time_operation(lambda query: get_recommendations(query, matrix, occupations_df, index=index), queries, repeat))
+
+    rng = np.random.default_rng(seed)
+    codes = rng.choice(np.asarray(index.occupation_codes), size=min(n_queries, len(index.occupation_codes))).tolist()
+    get_skills_for_occupation(codes[0])  # constrói a adjacência fora da medição
+    record('get_skills_for_occupation', time_operation(get_skills_for_occupation, codes, repeat))
+
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+    for result in results:
+        result['peak_rss_mb'] = peak_rss_mb
+    return results
+
+def run_scale(scale, work_dir, repeat=200, load_repeat=10, seed=0):
+    """
+    Gera (ou reaproveita) os dados de uma escala e a mede em um subprocesso
+
+    Returns:
+        list: Resultados de measure, com a escala
+    """
+    n_occupations, n_skills = parse_scale(scale)
+    data_dir = Path(work_dir) / f'{n_occupations}x{n_skills}-{seed}'
+    if not (data_dir / 'occupations_processed.csv').exists():
+        print(f"Gerando {scale}...", file=sys.stderr)
+        write_synthetic_dataset(data_dir, n_occupations, n_skills, seed=seed)
+    # Descarta os caches Feather/.npy de execuções anteriores para que load_first_csv leia os CSVs
+    for cache_file in (data_dir / CACHE_DIR).glob('*'):
+        if '.feather' in cache_file.name or '.npy' in cache_file.name:
+            cache_file.unlink()
+
+    env = dict(os.environ, **{DATA_DIR_ENV: str(data_dir)})
+    command = [
+        sys.executable, '-m', 'utils.benchmark', 'measure',
+        '--repeat', str(repeat), '--load-repeat', str(load_repeat), '--seed', str(seed)
+    ]
+    output = subprocess.run(
+        command, env=env, cwd=Path(__file__).parent.parent, check=True, capture_output=True, text=True
+    ).stdout
+    return [{'scale': scale, **result} for result in json.loads(output.splitlines()[-1])]
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Compara os p50 com os de uma baseline (apenas operações com várias chamadas)
+
+    Args:
+        results (list): Resultados atuais
+        baseline (list): Resultados salvos
+        tolerance (float): Aumento relativo tolerado do p50
+
+    Returns:
+        pd.DataFrame: p50 atual e da baseline, razão e se houve regressão
+    """
+    current = pd.DataFrame(results)[['scale', 'operation', 'p50_ms']]
+    saved = pd.DataFrame(baseline)
+    # Medições únicas (primeira carga, construção do índice) são ruidosas demais para comparar
+    saved = saved[saved['n'] > 1][['scale', 'operation', 'p50_ms']]
+    merged = current.merge(saved, on=['scale', 'operation'], suffixes=('', '_baseline'))
+    merged['ratio'] = merged['p50_ms'] / merged['p50_ms_baseline']
+    merged['regression'] = merged['ratio'] > 1 + tolerance
+    return merged
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks do carregamento e da recomendação")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run = subparsers.add_parser('run', help="Gera os dados e mede cada escala")
+    run.add_argument('--scales', default=DEFAULT_SCALES, help="Escalas ocupaçõesxhabilidades separadas por vírgula")
+    run.add_argument('--work-dir', default=Path(tempfile.gettempdir()) / 'gs2-benchmark',
+                     help="Onde os dados sintéticos são gerados e reaproveitados")
+    run.add_argument('--save', help="Salva os resultados como baseline (JSON)")
+    run.add_argument('--compare', help="Compara com uma baseline salva")
+    run.add_argument('--tolerance', type=float, default=0.2)
+
+    measure_parser = subparsers.add_parser('measure', help="Mede o diretório de dados atual (uso interno)")
+    for subparser in (run, measure_parser):
+        subparser.add_argument('--repeat', type=int, default=200)
+        subparser.add_argument('--load-repeat', type=int, default=10)
+        subparser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'measure':
+        print(json.dumps(measure(repeat=args.repeat, load_repeat=args.load_repeat, seed=args.seed)))
+        return 0
+
+    results = []
+    for scale in args.scales.split(','):
+        results.extend(run_scale(scale.strip(), args.work_dir, args.repeat, args.load_repeat, args.seed))
+
+    columns = ['scale', 'operation', 'p50_ms', 'p99_ms', 'throughput', 'peak_rss_mb']
+    print(pd.DataFrame(results)[columns].to_string(index=False, float_format=lambda value: f'{value:.3f}'))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2)
+        print(f"Baseline salva em {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        comparison = compare(results, baseline, tolerance=args.tolerance)
+        print(comparison.to_string(index=False, float_format=lambda value: f'{value:.3f}'))
+        if comparison['regression'].any():
+            print(f"{int(comparison['regression'].sum())} operações regrediram", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
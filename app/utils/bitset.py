@@ -0,0 +1,215 @@
+"""
+Motor de pontuação para vetores binários de habilidades empacotados em bits
+
+Cada ocupação e cada consulta são empacotadas em palavras uint64 (uma
+habilidade por bit). As interseções com todas as ocupações são calculadas com
+AND bit a bit e popcount de forma vetorizada, e cosseno, Jaccard e a
+porcentagem de match são derivados dessas contagens. O SkillGapEngine
+(utils.skill_gap) usa estas contagens para as habilidades atendidas e a
+porcentagem de match de todas as ocupações.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .data_loader import SparseSkillsMatrix
+from .recommender import _top_k_indices
+from .vocabulary import SkillVocabulary, load_skill_aliases
+
+WORD_BITS = 64
+
+# Tabela de popcount por byte, usada quando np.bitwise_count não existe (NumPy < 2.0)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+METRICS = ('cosine', 'jaccard', 'match_percentage')
+
+def popcount(words):
+    """
+    Conta os bits ligados de cada palavra uint64
+
+    Args:
+        words (np.array): Array de palavras uint64
+
+    Returns:
+        np.array: Array uint8 com o mesmo formato de words
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    counts = _POPCOUNT_TABLE[words.view(np.uint8)]
+    return counts.reshape(*words.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+def _n_words(n_bits):
+    return max(1, -(-n_bits // WORD_BITS))
+
+def pack_rows(binary_matrix):
+    """
+    Empacota as linhas de uma matriz binária em palavras uint64
+
+    A coluna j de cada linha vai para o bit j % 64 da palavra j // 64.
+
+    Args:
+        binary_matrix (np.array | sp.spmatrix): Matriz n x m (valores > 0 são 1)
+
+    Returns:
+        np.array: Matriz uint64 n x ceil(m / 64), contígua por linha
+    """
+    n_rows, n_cols = binary_matrix.shape
+    packed = np.zeros((n_rows, _n_words(n_cols) * 8), dtype=np.uint8)
+
+    if sp.issparse(binary_matrix):
+        coo = sp.coo_matrix(binary_matrix)
+        nonzero = coo.data > 0
+        rows, cols = coo.row[nonzero], coo.col[nonzero]
+        np.bitwise_or.at(packed, (rows, cols // 8), (1 << (cols % 8)).astype(np.uint8))
+    else:
+        row_bytes = np.packbits(np.asarray(binary_matrix) > 0, axis=1, bitorder='little')
+        packed[:, :row_bytes.shape[1]] = row_bytes
+
+    return np.ascontiguousarray(packed).view('<u8').astype(np.uint64, copy=False)
+
+class BitsetSkillIndex:
+    """
+    Índice de ocupações com habilidades empacotadas em bits
+
+    Ocupa 1 bit por habilidade (64x menos que float64) e pontua todas as
+    ocupações com AND + popcount em blocos de linhas que cabem em cache.
+
+    As habilidades das consultas são resolvidas pelo SkillVocabulary (nomes,
+    sinônimos e grafias equivalentes), o mesmo dos vetorizadores do índice.
+
+    Args:
+        occupation_skills_matrix (pd.DataFrame | SparseSkillsMatrix): Matriz
+            ocupações x habilidades (valores > 0 indicam a habilidade)
+        block_size (int): Número de ocupações processadas por bloco
+        vocabulary (SkillVocabulary, optional): Vocabulário com as colunas
+            da matriz (padrão: um novo, com os sinônimos configurados)
+    """
+
+    def __init__(self, occupation_skills_matrix, block_size=65536, vocabulary=None):
+        if isinstance(occupation_skills_matrix, SparseSkillsMatrix):
+            occupation_codes = occupation_skills_matrix.occupation_codes
+            skills = occupation_skills_matrix.skills
+            bits = pack_rows(occupation_skills_matrix.matrix)
+        else:
+            occupation_codes = occupation_skills_matrix.index.to_numpy()
+            skills = occupation_skills_matrix.columns.tolist()
+            bits = pack_rows(occupation_skills_matrix.to_numpy())
+        self._set_structures(bits, occupation_codes, skills, vocabulary, block_size)
+
+    @classmethod
+    def from_index(cls, index, block_size=65536):
+        """
+        Empacota a matriz de um índice de recomendação, com o seu vocabulário
+
+        Args:
+            index (RecommenderIndex): Índice de recomendação (inclusive
+                SegmentedIndex, cujas linhas removidas ficam sem habilidades)
+            block_size (int): Número de ocupações processadas por bloco
+
+        Returns:
+            BitsetSkillIndex: Índice na ordem das linhas de ``index``
+        """
+        bitset = cls.__new__(cls)
+        bitset._set_structures(
+            pack_rows(index.matrix), index.occupation_codes, index.skills, index.vocabulary, block_size
+        )
+        return bitset
+
+    def _set_structures(self, bits, occupation_codes, skills, vocabulary, block_size):
+        self.bits = bits
+        self.occupation_codes = np.asarray(occupation_codes)
+        self.skills = list(skills)
+        self.vocabulary = vocabulary or SkillVocabulary(self.skills, aliases=load_skill_aliases())
+        self.row_counts = popcount(self.bits).sum(axis=1, dtype=np.int64)
+        self.block_size = block_size
+
+    def pack_query(self, selected_skills):
+        """
+        Empacota as habilidades do usuário em palavras uint64
+
+        Args:
+            selected_skills (list): Lista de habilidades selecionadas
+
+        Returns:
+            tuple: (palavras uint64 da consulta, número de habilidades reconhecidas)
+        """
+        cols = self.vocabulary.ids(selected_skills)
+        query = np.zeros((1, len(self.skills)), dtype=np.uint8)
+        query[0, cols] = 1
+        return pack_rows(query)[0], len(cols)
+
+    def intersection_counts(self, query_bits):
+        """
+        Conta as habilidades em comum entre a consulta e cada ocupação
+
+        Args:
+            query_bits (np.array): Consulta empacotada (ver pack_query)
+
+        Returns:
+            np.array: Contagens int64, uma por ocupação
+        """
+        counts = np.empty(self.bits.shape[0], dtype=np.int64)
+        for start in range(0, self.bits.shape[0], self.block_size):
+            block = self.bits[start:start + self.block_size]
+            counts[start:start + block.shape[0]] = popcount(block & query_bits).sum(axis=1, dtype=np.int64)
+        return counts
+
+    def scores(self, selected_skills, metric='cosine'):
+        """
+        Pontua todas as ocupações a partir das contagens de interseção
+
+        Args:
+            selected_skills (list): Lista de habilidades selecionadas
+            metric (str): 'cosine', 'jaccard' ou 'match_percentage'
+
+        Returns:
+            np.array: Scores float64 na ordem das linhas da matriz
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrica desconhecida: {metric}")
+
+        query_bits, query_count = self.pack_query(selected_skills)
+        intersection = self.intersection_counts(query_bits)
+
+        if metric == 'cosine':
+            denominator = np.sqrt(self.row_counts * float(query_count))
+        elif metric == 'jaccard':
+            denominator = (self.row_counts + query_count - intersection).astype(np.float64)
+        else:
+            denominator = self.row_counts / 100.0
+
+        scores = np.zeros(intersection.shape[0], dtype=np.float64)
+        np.divide(intersection, denominator, out=scores, where=denominator > 0)
+        return scores
+
+    def match_percentages(self, user_skills):
+        """
+        Versão vetorizada de calculate_match_percentage para todas as ocupações
+
+        Args:
+            user_skills (set): Set de habilidades do usuário
+
+        Returns:
+            pd.Series: Porcentagem de match por código de ocupação
+        """
+        return pd.Series(
+            self.scores(user_skills, metric='match_percentage'),
+            index=self.occupation_codes
+        )
+
+    def top_k(self, selected_skills, k=10, metric='cosine'):
+        """
+        Retorna as k ocupações com maior score
+
+        Args:
+            selected_skills (list): Lista de habilidades selecionadas
+            k (int): Número de ocupações a retornar
+            metric (str): 'cosine', 'jaccard' ou 'match_percentage'
+
+        Returns:
+            tuple: (códigos das ocupações, scores) em ordem decrescente
+        """
+        scores = self.scores(selected_skills, metric=metric)
+        rows = _top_k_indices(scores, k)
+        return self.occupation_codes[rows], scores[rows]
@@ -0,0 +1,492 @@
+"""
+Caminhos de transição de carreira sobre um grafo pré-calculado de ocupações
+
+O grafo liga cada ocupação às suas k ocupações mais similares (utils.neighbors),
+nos dois sentidos, e é guardado em CSR. O custo de ir de i para j é o número
+de habilidades de j que i não tem (habilidades a adquirir). Os caminhos mais
+baratos entre duas ocupações são encontrados com A*, usando como heurística
+o maior de dois limites inferiores consistentes: o número de habilidades da
+ocupação alvo que faltam ao nó atual (cada uma precisa ser adquirida em
+alguma transição do caminho) e a desigualdade triangular sobre as
+distâncias pré-calculadas de/para algumas ocupações de referência
+(landmarks, ALT). Os k melhores caminhos usam o algoritmo de Yen sobre o
+mesmo A*.
+
+Alvos consultados com frequência ganham uma árvore de caminhos mínimos
+completa (Dijkstra no grafo reverso, em scipy), guardada em cache LRU: a
+partir dela, o caminho de qualquer origem é lido em O(comprimento).
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.career_paths build --k 10 --workers 0
+    python -m utils.career_paths path 43-9199.01 15-1252.00 --paths 3
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+
+from .data_loader import _atomic_write, get_catalog
+from .index_artifact import load_index_artifact
+from .neighbors import compute_neighbor_table
+from .recommender import _matches_serving_index, build_recommender_index, get_model_path
+from .skill_gap import occupation_matrix
+from .tracing import traced
+
+CAREER_GRAPH_FILE = 'career_graph.npz'
+# Custo extra por transição: desempata caminhos de mesmo custo em favor dos
+# mais curtos e mantém os pesos positivos (scipy ignora arestas de peso 0)
+HOP_COST = 1e-3
+# Consultas a um alvo antes de calcular a sua árvore de caminhos mínimos
+POPULAR_TARGET_QUERIES = 3
+# Folga dos limites ALT, que são guardados em float32
+LANDMARK_MARGIN = 1e-4
+
+class CareerGraph:
+    """
+    Grafo de transições entre ocupações em CSR
+
+    Args:
+        occupation_codes (np.array): Códigos das ocupações (nós)
+        skills (list): Vocabulário de habilidades
+        indptr (np.array): Início das arestas de cada nó (n_nós + 1)
+        indices (np.array): Destinos das arestas (int32)
+        costs (np.array): Habilidades a adquirir em cada aresta (int32)
+        skill_indptr (np.array): Início das habilidades de cada nó
+        skill_indices (np.array): Habilidades de cada nó, concatenadas (int32)
+        landmark_from (np.array, optional): Distâncias float32 landmarks x nós
+            (de cada landmark até o nó)
+        landmark_to (np.array, optional): Distâncias float32 landmarks x nós
+            (do nó até cada landmark)
+        header (dict, optional): Metadados (k, data, hash do índice de origem)
+        max_cached_targets (int): Árvores de caminhos mínimos mantidas em cache
+    """
+
+    def __init__(self, occupation_codes, skills, indptr, indices, costs, skill_indptr, skill_indices,
+                 landmark_from=None, landmark_to=None, header=None, max_cached_targets=32):
+        self.occupation_codes = np.asarray(occupation_codes).astype(str)
+        self.skills = list(skills)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.costs = np.asarray(costs, dtype=np.int32)
+        self.weights = self.costs + HOP_COST
+        self.header = header or {}
+        self.code_to_row = {code: row for row, code in enumerate(self.occupation_codes.tolist())}
+
+        n_nodes = len(self.occupation_codes)
+        self.node_skills = sp.csr_matrix(
+            (np.ones(len(skill_indices), dtype=np.float32), np.asarray(skill_indices, dtype=np.int32),
+             np.asarray(skill_indptr, dtype=np.int64)),
+            shape=(n_nodes, len(self.skills))
+        )
+        self.skill_counts = np.diff(self.node_skills.indptr)
+        empty = np.empty((0, n_nodes), dtype=np.float32)
+        self.landmark_from = empty if landmark_from is None else np.asarray(landmark_from, dtype=np.float32)
+        self.landmark_to = empty if landmark_to is None else np.asarray(landmark_to, dtype=np.float32)
+
+        self.max_cached_targets = max_cached_targets
+        self._targets = OrderedDict()
+        self._lock = threading.Lock()
+        self._forward = None
+        self._reverse = None
+
+    @classmethod
+    def from_index(cls, index, k=10, workers=1, landmarks=16):
+        """
+        Constrói o grafo a partir dos k vizinhos de cada ocupação
+
+        Args:
+            index (RecommenderIndex): Índice de recomendação
+            k (int): Vizinhos por ocupação (arestas de saída antes da simetrização)
+            workers (int): Processos usados no cálculo dos vizinhos
+            landmarks (int): Ocupações de referência da heurística ALT
+
+        Returns:
+            CareerGraph: Grafo com custos em habilidades a adquirir
+        """
+        binary = occupation_matrix(index)
+        binary.data[:] = 1
+        binary.sort_indices()
+        n_nodes = binary.shape[0]
+
+        table = compute_neighbor_table(index, k=k, workers=workers)
+        sources = np.repeat(np.arange(n_nodes, dtype=np.int64), table.neighbors.shape[1])
+        targets = table.neighbors.ravel().astype(np.int64)
+        live = index.metadata_rows >= 0
+        valid = (targets >= 0) & live[sources]
+        # Arestas nos dois sentidos (cada sentido tem o seu custo), sem repetição
+        pairs = np.unique(np.concatenate([
+            sources[valid] * n_nodes + targets[valid], targets[valid] * n_nodes + sources[valid]
+        ]))
+        sources, targets = pairs // n_nodes, pairs % n_nodes
+
+        shared = np.asarray(binary[sources].multiply(binary[targets]).sum(axis=1)).ravel()
+        costs = np.diff(binary.indptr)[targets] - np.rint(shared).astype(np.int64)
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(sources, minlength=n_nodes))])
+        header = dict(table.header, k=int(k), n_edges=int(len(pairs)))
+        graph = cls(
+            index.occupation_codes, index.skills, indptr, targets, costs,
+            binary.indptr, binary.indices, header=header
+        )
+        graph.select_landmarks(landmarks, candidates=np.flatnonzero(live))
+        return graph
+
+    def weight_matrix(self, reverse=False):
+        """Matriz de adjacência CSR com os pesos (custo + HOP_COST), ou a do grafo reverso"""
+        if self._forward is None:
+            self._forward = sp.csr_matrix(
+                (self.weights, self.indices, self.indptr), shape=(len(self.occupation_codes),) * 2
+            )
+        if not reverse:
+            return self._forward
+        if self._reverse is None:
+            self._reverse = self._forward.T.tocsr()
+        return self._reverse
+
+    def select_landmarks(self, n_landmarks=16, candidates=None, seed=0):
+        """
+        Escolhe as landmarks (a mais distante das já escolhidas a cada passo)
+        e calcula as distâncias de/para todas as ocupações
+
+        Args:
+            n_landmarks (int): Número de landmarks
+            candidates (np.array, optional): Nós elegíveis (padrão: todos)
+            seed (int): Semente da primeira landmark
+        """
+        n_nodes = len(self.occupation_codes)
+        candidates = np.arange(n_nodes) if candidates is None else np.asarray(candidates)
+        chosen = []
+        if n_nodes and len(candidates) and n_landmarks > 0:
+            chosen.append(int(np.random.default_rng(seed).choice(candidates)))
+            nearest = np.full(n_nodes, np.inf)
+            while len(chosen) < min(n_landmarks, len(candidates)):
+                distances = dijkstra(self.weight_matrix(), indices=chosen[-1])
+                nearest = np.minimum(nearest, distances)
+                # Nós inalcançáveis não servem como referência
+                spread = np.where(np.isfinite(nearest), nearest, -1)[candidates]
+                if spread.max() <= 0:
+                    break
+                chosen.append(int(candidates[spread.argmax()]))
+
+        landmarks = np.asarray(chosen, dtype=np.int64)
+        self.landmark_from = dijkstra(self.weight_matrix(), indices=landmarks).astype(np.float32).reshape(-1, n_nodes)
+        self.landmark_to = dijkstra(self.weight_matrix(reverse=True), indices=landmarks).astype(np.float32).reshape(-1, n_nodes)
+        self.header['landmarks'] = landmarks.tolist()
+
+    def save(self, path):
+        """
+        Persiste o grafo em um arquivo .npz (sem objetos pickle), de forma atômica
+
+        Args:
+            path (Path): Caminho do arquivo de destino
+        """
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    header=np.frombuffer(json.dumps(self.header).encode('utf-8'), dtype=np.uint8),
+                    occupation_codes=self.occupation_codes,
+                    skills=np.asarray(self.skills, dtype=str),
+                    indptr=self.indptr,
+                    indices=self.indices,
+                    costs=self.costs,
+                    skill_indptr=self.node_skills.indptr,
+                    skill_indices=self.node_skills.indices,
+                    landmark_from=self.landmark_from,
+                    landmark_to=self.landmark_to
+                )
+        _atomic_write(Path(path), write)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Carrega um grafo persistido com save()
+
+        Args:
+            path (Path): Caminho do arquivo .npz
+
+        Returns:
+            CareerGraph: Grafo carregado
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(
+                npz['occupation_codes'], npz['skills'].tolist(), npz['indptr'], npz['indices'], npz['costs'],
+                npz['skill_indptr'], npz['skill_indices'], npz['landmark_from'], npz['landmark_to'],
+                header=json.loads(npz['header'].tobytes().decode('utf-8'))
+            )
+
+    @property
+    def n_edges(self):
+        return len(self.indices)
+
+    def heuristic(self, target):
+        """
+        Limite inferior do peso de cada nó até o alvo
+
+        Returns:
+            np.array: Máximo entre as habilidades do alvo que faltam ao nó e os
+                limites ALT (inf se o nó comprovadamente não alcança o alvo)
+        """
+        target_skills = np.zeros(len(self.skills), dtype=np.float32)
+        target_skills[self.node_skills.indices[self.node_skills.indptr[target]:self.node_skills.indptr[target + 1]]] = 1
+        shared = np.rint(self.node_skills @ target_skills).astype(np.int64)
+        bound = (self.skill_counts[target] - shared).astype(np.float32)
+        if len(self.landmark_from) == 0:
+            return bound
+
+        # d(v, t) >= d(v, L) - d(t, L), para as landmarks alcançáveis a partir
+        # de t (se v não alcança L, também não alcança t e o limite é inf);
+        # as demais viram -inf ou NaN, ignorados por fmax
+        to_target = self.landmark_to[:, target]
+        to_target = np.where(np.isfinite(to_target), to_target, np.inf)[:, None]
+        with np.errstate(invalid='ignore'):
+            alt = np.fmax.reduce(self.landmark_to - to_target, axis=0)
+        # d(v, t) >= d(L, t) - d(L, v), para as landmarks que alcançam t
+        from_target = self.landmark_from[:, target]
+        from_target = np.where(np.isfinite(from_target), from_target, -np.inf)[:, None]
+        alt = np.fmax(alt, (from_target - self.landmark_from).max(axis=0))
+        return np.maximum(bound, alt - LANDMARK_MARGIN)
+
+    def _astar(self, source, target, h, banned_nodes=None, banned_edges=None):
+        """
+        A* de source até target
+
+        Args:
+            banned_nodes (np.array, optional): Máscara de nós proibidos
+            banned_edges (dict, optional): Nó -> conjunto de destinos proibidos
+
+        Returns:
+            tuple: (lista de nós, peso total), ou (None, inf) sem caminho
+        """
+        n_nodes = len(self.occupation_codes)
+        g = np.full(n_nodes, np.inf)
+        parent = np.full(n_nodes, -1, dtype=np.int64)
+        closed = np.zeros(n_nodes, dtype=bool) if banned_nodes is None else banned_nodes.copy()
+        g[source] = 0
+        heap = [(h[source], source)]
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if closed[node]:
+                continue
+            if node == target:
+                path = [node]
+                while path[-1] != source:
+                    path.append(int(parent[path[-1]]))
+                return path[::-1], g[target]
+            closed[node] = True
+
+            start, stop = self.indptr[node], self.indptr[node + 1]
+            successors = self.indices[start:stop]
+            candidate = g[node] + self.weights[start:stop]
+            better = (candidate < g[successors]) & ~closed[successors]
+            if banned_edges and node in banned_edges:
+                better &= ~np.isin(successors, list(banned_edges[node]))
+            for successor, cost in zip(successors[better].tolist(), candidate[better].tolist()):
+                g[successor] = cost
+                parent[successor] = node
+                heapq.heappush(heap, (cost + h[successor], successor))
+        return None, np.inf
+
+    def _target_entry(self, target):
+        """Entrada do cache de um alvo (heurística, consultas e árvore, se popular)"""
+        with self._lock:
+            entry = self._targets.get(target)
+            if entry is not None:
+                self._targets.move_to_end(target)
+                entry['queries'] += 1
+                if entry['tree'] is not None or entry['queries'] < POPULAR_TARGET_QUERIES:
+                    return entry
+
+        if entry is None:
+            entry = {'heuristic': self.heuristic(target), 'queries': 1, 'tree': None}
+        else:
+            # Alvo popular: caminhos mínimos de todos os nós até ele, de uma vez
+            distances, successors = dijkstra(self.weight_matrix(reverse=True), indices=target, return_predecessors=True)
+            entry['tree'] = (distances, successors)
+
+        with self._lock:
+            self._targets[target] = entry
+            self._targets.move_to_end(target)
+            while len(self._targets) > self.max_cached_targets:
+                self._targets.popitem(last=False)
+        return entry
+
+    def _describe(self, nodes):
+        """Caminho de nós como dicionário com códigos, custo e habilidades de cada passo"""
+        steps = []
+        for source, target in zip(nodes[:-1], nodes[1:]):
+            have = self.node_skills.indices[self.node_skills.indptr[source]:self.node_skills.indptr[source + 1]]
+            need = self.node_skills.indices[self.node_skills.indptr[target]:self.node_skills.indptr[target + 1]]
+            acquire = np.setdiff1d(need, have, assume_unique=True)
+            steps.append({
+                'from': self.occupation_codes[source],
+                'to': self.occupation_codes[target],
+                'skills_to_acquire': [self.skills[col] for col in acquire],
+            })
+        return {
+            'path': [self.occupation_codes[node] for node in nodes],
+            'cost': sum(len(step['skills_to_acquire']) for step in steps),
+            'steps': steps,
+        }
+
+    @traced('career_paths.shortest_path')
+    def shortest_path(self, source_code, target_code):
+        """
+        Caminho de menor custo (habilidades a adquirir) entre duas ocupações
+
+        Args:
+            source_code (str): Ocupação atual
+            target_code (str): Ocupação desejada
+
+        Returns:
+            dict: path (códigos), cost (habilidades a adquirir) e steps (de,
+                para e habilidades de cada transição), ou None se não houver
+                caminho ou a ocupação não existir
+        """
+        source, target = self.code_to_row.get(source_code), self.code_to_row.get(target_code)
+        if source is None or target is None:
+            return None
+
+        entry = self._target_entry(target)
+        if entry['tree'] is not None:
+            distances, successors = entry['tree']
+            if not np.isfinite(distances[source]):
+                return None
+            nodes = [source]
+            while nodes[-1] != target:
+                nodes.append(int(successors[nodes[-1]]))
+            return self._describe(nodes)
+
+        nodes, _ = self._astar(source, target, entry['heuristic'])
+        return None if nodes is None else self._describe(nodes)
+
+    @traced('career_paths.k_shortest_paths')
+    def k_shortest_paths(self, source_code, target_code, n_paths=3):
+        """
+        Os n_paths caminhos sem ciclos de menor custo (algoritmo de Yen)
+
+        Args:
+            source_code (str): Ocupação atual
+            target_code (str): Ocupação desejada
+            n_paths (int): Número de caminhos
+
+        Returns:
+            list: Caminhos no formato de shortest_path, do mais barato ao
+                mais caro (pode ter menos de n_paths)
+        """
+        source, target = self.code_to_row.get(source_code), self.code_to_row.get(target_code)
+        if source is None or target is None or n_paths <= 0:
+            return []
+
+        h = self._target_entry(target)['heuristic']
+        best, _ = self._astar(source, target, h)
+        if best is None:
+            return []
+
+        def path_weight(nodes):
+            total = 0.0
+            for node, successor in zip(nodes[:-1], nodes[1:]):
+                start, stop = self.indptr[node], self.indptr[node + 1]
+                total += self.weights[start + np.searchsorted(self.indices[start:stop], successor)]
+            return total
+
+        found = [best]
+        candidates = []
+        seen = {tuple(best)}
+        n_nodes = len(self.occupation_codes)
+        while len(found) < n_paths:
+            previous = found[-1]
+            for i in range(len(previous) - 1):
+                root = previous[:i + 1]
+                banned_edges = {}
+                for path in found:
+                    if path[:i + 1] == root and len(path) > i + 1:
+                        banned_edges.setdefault(path[i], set()).add(path[i + 1])
+                banned_nodes = np.zeros(n_nodes, dtype=bool)
+                banned_nodes[root[:-1]] = True
+
+                spur, _ = self._astar(root[-1], target, h, banned_nodes=banned_nodes, banned_edges=banned_edges)
+                if spur is None:
+                    continue
+                candidate = root[:-1] + spur
+                if tuple(candidate) not in seen:
+                    seen.add(tuple(candidate))
+                    heapq.heappush(candidates, (path_weight(candidate), candidate))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates)[1])
+
+        return [self._describe(nodes) for nodes in found]
+
+def load_career_graph():
+    """
+    Carrega o grafo de carreiras de app/model/ (recarregado se mudar)
+
+    Returns:
+        CareerGraph: Grafo compartilhado pelo catálogo, ou None se o arquivo
+            não existir ou tiver sido gerado de outro índice
+    """
+    path = get_model_path() / CAREER_GRAPH_FILE
+    try:
+        graph = get_catalog().get(path, CareerGraph.load)
+    except FileNotFoundError:
+        return None
+    return graph if _matches_serving_index(path, graph.header) else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Caminhos de transição de carreira")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Constrói e salva o grafo em app/model/")
+    build.add_argument('--k', type=int, default=10)
+    build.add_argument('--workers', type=int, default=1, help="Processos (0 = todos os núcleos)")
+    path = subparsers.add_parser('path', help="Caminhos entre duas ocupações")
+    path.add_argument('source')
+    path.add_argument('target')
+    path.add_argument('--paths', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        try:
+            index = load_index_artifact()
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            index = build_recommender_index()
+        if index.empty:
+            print("Dados não encontrados. Execute o notebook primeiro.", file=sys.stderr)
+            return 1
+        start = time.perf_counter()
+        graph = CareerGraph.from_index(index, k=args.k, workers=args.workers or os.cpu_count())
+        destination = get_model_path() / CAREER_GRAPH_FILE
+        graph.save(destination)
+        print(
+            f"Grafo ({len(graph.occupation_codes)} ocupações, {graph.n_edges} arestas) salvo em {destination} "
+            f"em {time.perf_counter() - start:.1f}s"
+        )
+        return 0
+
+    graph = load_career_graph()
+    if graph is None:
+        print("Grafo de carreiras não encontrado. Execute: python -m utils.career_paths build", file=sys.stderr)
+        return 1
+    paths = graph.k_shortest_paths(args.source, args.target, n_paths=args.paths)
+    if not paths:
+        print("Nenhum caminho encontrado.", file=sys.stderr)
+        return 1
+    for number, found in enumerate(paths, 1):
+        print(f"{number}. {' -> '.join(found['path'])} ({found['cost']} habilidades)")
+        for step in found['steps']:
+            print(f"   {step['from']} -> {step['to']}: {', '.join(step['skills_to_acquire']) or '-'}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
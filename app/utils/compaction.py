@@ -0,0 +1,288 @@
+"""
+Compactação dos segmentos delta em uma nova base
+
+Incorpora os segmentos pendentes (utils.segments) aos três arquivos de data/,
+publica um novo artefato do índice e remove apenas os segmentos incorporados;
+segmentos gravados durante a compactação ficam para a próxima. A matriz
+compactada mantém a ordem das linhas do SegmentedIndex (linhas vivas da base
+seguidas das ocupações incluídas/alteradas), de modo que as recomendações
+antes e depois da compactação são idênticas, inclusive nos empates.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.compaction run
+    python -m utils.compaction watch --interval 300 --min-segments 10
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .data_loader import (
+    MATRIX_FILE,
+    OCCUPATIONS_FILE,
+    SKILLS_FILE,
+    SparseSkillsMatrix,
+    _atomic_write,
+    get_data_path,
+    load_occupation_skills_matrix_sparse,
+    load_occupations_data,
+    load_skills_data,
+)
+from .index_artifact import publish_index_artifact
+from .ingest import write_matrix_csv
+from .recommender import build_recommender_index
+from .segments import apply_occupation_updates, fold_segments, get_deltas_path, load_segments
+
+LOCK_FILE = '.compaction.lock'
+# Idade a partir da qual uma trava é considerada abandonada (s)
+LOCK_TIMEOUT = 3600.0
+
+def _compact_matrix(base_matrix, upserts, affected):
+    """
+    Linhas da base não afetadas seguidas das ocupações incluídas/alteradas
+
+    A matriz é binária (pertencimento), como a gerada pelo notebook e as
+    linhas delta do SegmentedIndex: importância e nível dos segmentos não
+    entram nela, só em skills_processed.csv (ver _compact_skills).
+    """
+    keep = ~np.isin(base_matrix.occupation_codes.astype(str), list(affected))
+    skills = list(base_matrix.skills)
+    skill_to_col = {skill: col for col, skill in enumerate(skills)}
+    indptr, indices = [0], []
+    for entry in upserts.values():
+        cols = set()
+        for skill in entry['skills']:
+            if skill['skill'] not in skill_to_col:
+                skill_to_col[skill['skill']] = len(skills)
+                skills.append(skill['skill'])
+            cols.add(skill_to_col[skill['skill']])
+        indices.extend(sorted(cols))
+        indptr.append(len(indices))
+
+    delta = sp.csr_matrix(
+        (np.ones(len(indices), dtype=np.uint8), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(upserts), len(skills))
+    )
+    live = base_matrix.matrix[keep]
+    live = sp.csr_matrix((live.data, live.indices, live.indptr), shape=(live.shape[0], len(skills)))
+    return SparseSkillsMatrix(
+        sp.vstack([live, delta], format='csr'),
+        np.concatenate([base_matrix.occupation_codes[keep].astype(object), np.array(list(upserts), dtype=object)]),
+        skills
+    )
+
+def _compact_skills(skills_df, upserts, affected):
+    """
+    Tabela longa de habilidades com as linhas das ocupações afetadas substituídas
+
+    Importância e nível ausentes no segmento ficam vazios no CSV.
+    """
+    records = [
+        {'occupation_code': code, 'skill_name': skill['skill'],
+         'importance': skill.get('importance'), 'level': skill.get('level')}
+        for code, entry in upserts.items() for skill in entry['skills']
+    ]
+    kept = skills_df[~skills_df['occupation_code'].isin(affected)]
+    return pd.concat([kept, pd.DataFrame(records, columns=skills_df.columns)], ignore_index=True)
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _lock_is_stale(info, age, timeout=LOCK_TIMEOUT):
+    """
+    Indica se uma trava foi abandonada
+
+    A trava é abandonada se for mais antiga que timeout ou se o processo
+    que a criou (na mesma máquina) não existir mais.
+    """
+    if age > timeout:
+        return True
+    pid = info.get('pid')
+    if isinstance(pid, int) and info.get('host') == socket.gethostname():
+        return not _process_alive(pid)
+    return False
+
+def _read_lock(lock_path):
+    """Conteúdo da trava e sua idade (s); conteúdo vazio se ilegível"""
+    stat = lock_path.stat()
+    try:
+        info = json.loads(lock_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        info = {}
+    info = info if isinstance(info, dict) else {}
+    created_at = info.get('created_at', stat.st_mtime)
+    return info, time.time() - created_at
+
+def _acquire_lock(lock_path, timeout=LOCK_TIMEOUT):
+    """
+    Cria a trava de compactação com o PID, a máquina e o instante de criação
+
+    Uma trava abandonada (ver _lock_is_stale) é removida e a criação é
+    tentada novamente.
+
+    Returns:
+        bool: True se a trava foi obtida
+    """
+    for _ in range(2):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                info, age = _read_lock(lock_path)
+            except FileNotFoundError:
+                continue
+            if not _lock_is_stale(info, age, timeout):
+                return False
+            # Renomeia antes de apagar: só um processo consegue tomar a trava abandonada
+            stale_path = lock_path.with_name(f'{lock_path.name}.stale.{os.getpid()}.{threading.get_ident()}')
+            try:
+                os.rename(lock_path, stale_path)
+            except FileNotFoundError:
+                continue
+            print(f"Trava de compactação abandonada removida ({info or 'sem conteúdo'})")
+            stale_path.unlink(missing_ok=True)
+            continue
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'host': socket.gethostname(), 'created_at': time.time()}, f)
+        return True
+    return False
+
+def compact_segments(directory=None, publish=True):
+    """
+    Incorpora os segmentos delta à base e publica o novo índice
+
+    Um arquivo de trava no diretório dos segmentos impede compactações
+    simultâneas; se ele existir, nada é feito, a menos que esteja abandonado
+    (processo encerrado ou mais antigo que LOCK_TIMEOUT).
+
+    Args:
+        directory (Path, optional): Diretório dos segmentos
+        publish (bool): Publica o artefato do índice após reescrever data/
+
+    Returns:
+        dict: Segmentos incorporados, ocupações incluídas/alteradas e
+            retiradas, ou None se outra compactação estiver em andamento
+    """
+    directory = directory or get_deltas_path()
+    directory.mkdir(parents=True, exist_ok=True)
+    lock_path = directory / LOCK_FILE
+    if not _acquire_lock(lock_path):
+        print(f"Compactação em andamento ({lock_path})")
+        return None
+
+    try:
+        segments = load_segments(directory)
+        summary = {'segments': len(segments), 'upserted': 0, 'retired': 0}
+        if not segments:
+            return summary
+
+        upserts, retired = fold_segments(segments)
+        affected = set(upserts) | retired
+        data_path = get_data_path()
+        occupations_df = apply_occupation_updates(load_occupations_data(), upserts, retired)
+        skills_df = _compact_skills(load_skills_data(), upserts, affected)
+        sparse_matrix = _compact_matrix(load_occupation_skills_matrix_sparse(), upserts, affected)
+
+        _atomic_write(data_path / OCCUPATIONS_FILE, lambda tmp: occupations_df.to_csv(tmp, index=False))
+        _atomic_write(data_path / SKILLS_FILE, lambda tmp: skills_df.to_csv(tmp, index=False))
+        _atomic_write(data_path / MATRIX_FILE, lambda tmp: write_matrix_csv(tmp, sparse_matrix))
+
+        # Reaplicar os segmentos sobre a nova base é idempotente: removê-los só
+        # depois da publicação evita uma janela em que nenhum dos dois os contém
+        if publish:
+            publish_index_artifact(build_recommender_index())
+        for path, _ in segments:
+            path.unlink(missing_ok=True)
+
+        summary.update(upserted=len(upserts), retired=len(retired))
+        return summary
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+class BackgroundCompactor:
+    """
+    Compacta os segmentos periodicamente em uma thread daemon
+
+    Args:
+        interval (float): Intervalo entre verificações (s)
+        min_segments (int): Número mínimo de segmentos pendentes para compactar
+        directory (Path, optional): Diretório dos segmentos
+    """
+
+    def __init__(self, interval=300.0, min_segments=10, directory=None):
+        self.interval = interval
+        self.min_segments = min_segments
+        self.directory = directory
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='segment-compactor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self):
+        """Compacta se houver pelo menos min_segments segmentos pendentes"""
+        if len(load_segments(self.directory)) < self.min_segments:
+            return None
+        return compact_segments(self.directory)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                summary = self.run_once()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Falha na compactação: {e}")
+                continue
+            if summary:
+                print(f"Compactação: {summary}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compactação dos segmentos delta do índice")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('run', help="Compacta os segmentos pendentes")
+    watch = subparsers.add_parser('watch', help="Compacta periodicamente")
+    watch.add_argument('--interval', type=float, default=300.0)
+    watch.add_argument('--min-segments', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        summary = compact_segments()
+        if summary is None:
+            return 1
+        print(
+            f"{summary['segments']} segmentos incorporados: {summary['upserted']} ocupações "
+            f"incluídas/alteradas, {summary['retired']} retiradas"
+        )
+        return 0
+
+    compactor = BackgroundCompactor(interval=args.interval, min_segments=args.min_segments).start()
+    try:
+        compactor._thread.join()
+    except KeyboardInterrupt:
+        compactor.stop()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
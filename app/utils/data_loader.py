@@ -5,57 +5,693 @@ Módulo para carregar e processar dados do O*NET e BLS
 import pandas as pd
 import numpy as np
 import os
+import hashlib
+import importlib.util
+import json
+import threading
 from pathlib import Path
 
+import scipy.sparse as sp
+
+from .tracing import traced
+
+OCCUPATIONS_FILE = 'occupations_processed.csv'
+SKILLS_FILE = 'skills_processed.csv'
+MATRIX_FILE = 'occupation_skills_matrix.csv'
+CACHE_DIR = '.cache'
+CACHE_FORMAT_VERSION = 1
+# Até este tamanho o catálogo calcula o hash já na primeira carga (bytes)
+DIGEST_ON_LOAD_MAX_BYTES = 64 << 20
+# Variável de ambiente que aponta o app para outro diretório de dados (ex.: benchmarks)
+DATA_DIR_ENV = 'GS2_DATA_DIR'
+
+# Faixas das colunas derivadas de occupations_processed.csv (abertas nas pontas)
+SALARY_BINS = [-np.inf, 50000, 80000, 120000, np.inf]
+GROWTH_BINS = [-np.inf, 10, 20, 30, np.inf]
+CATEGORY_LABELS = ['Baixo', 'Médio', 'Alto', 'Muito Alto']
+FUTURE_JOB_GROWTH = 15
+
 def get_data_path():
-    """Retorna o caminho para o diretório de dados"""
-    return Path(__file__).parent.parent.parent / 'data'
+    """Retorna o caminho para o diretório de dados (ou o de GS2_DATA_DIR, se definida)"""
+    data_dir = os.environ.get(DATA_DIR_ENV)
+    return Path(data_dir) if data_dir else Path(__file__).parent.parent.parent / 'data'
+
+def _file_digest(path, chunk_size=1 << 20):
+    """Calcula o hash SHA-256 do conteúdo de um arquivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class DataCatalog:
+    """
+    Catálogo de dados compartilhado pelo processo
+    
+    Carrega cada arquivo de data/ uma única vez e serve todas as funções deste
+    módulo a partir da memória. A cada acesso compara mtime e tamanho do
+    arquivo (um único stat); se mudaram, recalcula o hash do conteúdo e só
+    recarrega quando o conteúdo de fato mudou. O hash de referência é
+    calculado na primeira carga para arquivos de até DIGEST_ON_LOAD_MAX_BYTES;
+    maiores só o têm a partir da primeira recarga. Estruturas derivadas (listas,
+    dicionários de consulta) ficam associadas à versão do arquivo e são
+    descartadas junto com ela.
+    
+    Os objetos retornados são compartilhados: não os modifique in-place.
+    Cada arquivo tem sua própria trava, de modo que arquivos diferentes
+    podem ser carregados ao mesmo tempo por threads distintas.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._file_locks = {}
+    
+    def get(self, path, loader):
+        """
+        Retorna o conteúdo carregado de um arquivo, recarregando se mudou
+        
+        Args:
+            path (Path): Caminho do arquivo
+            loader (callable): Função que recebe o caminho e carrega o arquivo
+            
+        Returns:
+            object: Resultado de loader(path)
+            
+        Raises:
+            FileNotFoundError: Se o arquivo não existir
+        """
+        return self._entry(Path(path), loader)['value']
+    
+    def derived(self, path, loader, name, build):
+        """
+        Retorna uma estrutura derivada do arquivo, construída uma vez por versão
+        
+        Args:
+            path (Path): Caminho do arquivo
+            loader (callable): Função que carrega o arquivo
+            name (str): Nome da estrutura derivada
+            build (callable): Função que recebe o conteúdo carregado e constrói
+                a estrutura
+            
+        Returns:
+            object: Resultado de build(loader(path))
+        """
+        with self._file_lock((Path(path), loader)):
+            entry = self._entry(Path(path), loader)
+            if name not in entry['derived']:
+                entry['derived'][name] = build(entry['value'])
+            return entry['derived'][name]
+    
+    def clear(self):
+        """Descarta todos os arquivos carregados"""
+        with self._lock:
+            self._entries.clear()
+    
+    def _file_lock(self, key):
+        with self._lock:
+            return self._file_locks.setdefault(key, threading.RLock())
+    
+    def _entry(self, path, loader):
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = (path, loader)
+        
+        with self._file_lock(key):
+            entry = self._entries.get(key)
+            if entry is not None and entry['signature'] == signature:
+                return entry
+            
+            # Arquivos grandes não são lidos duas vezes na primeira carga; o
+            # hash é calculado antes da carga, de modo que uma escrita no meio
+            # dela muda a assinatura e força a verificação no próximo acesso
+            digest = None
+            if entry is not None or stat.st_size <= DIGEST_ON_LOAD_MAX_BYTES:
+                digest = _file_digest(path)
+            if entry is not None and entry['digest'] == digest:
+                entry['signature'] = signature
+                return entry
+            
+            entry = {
+                'signature': signature,
+                'digest': digest,
+                'value': loader(path),
+                'derived': {}
+            }
+            self._entries[key] = entry
+            return entry
+
+_catalog = DataCatalog()
+
+def get_catalog():
+    """Retorna o catálogo de dados compartilhado pelo processo"""
+    return _catalog
+
+def get_cache_path():
+    """Retorna o diretório dos caches binários derivados dos CSVs"""
+    return get_data_path() / CACHE_DIR
+
+def _has_pyarrow():
+    return importlib.util.find_spec('pyarrow') is not None
+
+def _read_cache_manifest(source_path, manifest_path):
+    """
+    Lê o manifesto de um cache e verifica se ele corresponde ao CSV atual
+    
+    O CSV é a fonte da verdade: o cache vale enquanto mtime e tamanho do CSV
+    forem os registrados; se mudaram, vale apenas se o hash do conteúdo for
+    o mesmo (e o manifesto é atualizado com a nova assinatura).
+    
+    Returns:
+        dict: Manifesto válido, ou None se o cache estiver ausente ou obsoleto
+    """
+    try:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if manifest.get('format_version') != CACHE_FORMAT_VERSION:
+        return None
+    
+    stat = source_path.stat()
+    source = manifest.get('source', {})
+    if source.get('mtime_ns') == stat.st_mtime_ns and source.get('size') == stat.st_size:
+        return manifest
+    
+    if source.get('sha256') != _file_digest(source_path):
+        return None
+    
+    manifest['source'].update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    try:
+        _write_cache_manifest(manifest_path, manifest)
+    except OSError:
+        pass
+    return manifest
+
+def _write_cache_manifest(manifest_path, manifest):
+    _atomic_write(manifest_path, lambda tmp: tmp.write_text(json.dumps(manifest), encoding='utf-8'))
+
+def _new_cache_manifest(source_path, **extra):
+    stat = source_path.stat()
+    return {
+        'format_version': CACHE_FORMAT_VERSION,
+        'source': {
+            'name': source_path.name,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': _file_digest(source_path)
+        },
+        **extra
+    }
+
+def _atomic_write(path, write):
+    """Grava em arquivo temporário e renomeia, para leitores nunca verem arquivos parciais"""
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def _save_npy(path, values):
+    with open(path, 'wb') as f:
+        np.save(f, np.ascontiguousarray(values))
 
+def _load_table(csv_path):
+    """
+    Carrega um CSV tabular preferindo o cache Feather em data/.cache/
+    
+    Sem pyarrow instalado, lê o CSV diretamente.
+    """
+    if not _has_pyarrow():
+        return pd.read_csv(csv_path)
+    
+    cache_path = get_cache_path() / f'{csv_path.stem}.feather'
+    manifest_path = cache_path.with_name(cache_path.name + '.json')
+    
+    if cache_path.exists() and _read_cache_manifest(csv_path, manifest_path) is not None:
+        return pd.read_feather(cache_path)
+    
+    df = pd.read_csv(csv_path)
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        _atomic_write(cache_path, lambda tmp: df.to_feather(tmp))
+        _write_cache_manifest(manifest_path, _new_cache_manifest(csv_path))
+    except (OSError, ValueError, TypeError):
+        pass
+    return df
+
+def _load_matrix(csv_path):
+    """
+    Carrega a matriz ocupações x habilidades preferindo o cache .npy
+    
+    O array é aberto com mmap_mode='r', de forma que vários processos
+    (workers do Streamlit) compartilham a mesma cópia no page cache. Índice e
+    colunas ficam no manifesto JSON ao lado do .npy.
+    """
+    cache_path = get_cache_path() / f'{csv_path.stem}.npy'
+    manifest_path = cache_path.with_name(cache_path.name + '.json')
+    
+    manifest = None
+    if cache_path.exists():
+        manifest = _read_cache_manifest(csv_path, manifest_path)
+    
+    if manifest is None:
+        df = pd.read_csv(csv_path, index_col=0)
+        values = df.to_numpy()
+        if values.dtype == object:
+            return df
+        try:
+            cache_path.parent.mkdir(exist_ok=True)
+            _atomic_write(cache_path, lambda tmp: _save_npy(tmp, values))
+            manifest = _new_cache_manifest(
+                csv_path,
+                index_name=df.index.name,
+                index=df.index.tolist(),
+                columns=df.columns.tolist()
+            )
+            _write_cache_manifest(manifest_path, manifest)
+        except OSError:
+            return df
+    
+    values = np.load(cache_path, mmap_mode='r', allow_pickle=False)
+    return pd.DataFrame(
+        values,
+        index=pd.Index(manifest['index'], name=manifest['index_name']),
+        columns=manifest['columns'],
+        copy=False
+    )
+
+def add_derived_occupation_columns(occupations_df):
+    """
+    Calcula as colunas derivadas de salário, crescimento e empregos
+    
+    Args:
+        occupations_df (pd.DataFrame): Ocupações com median_salary,
+            projected_growth, num_jobs_2024 e num_jobs_2034
+        
+    Returns:
+        pd.DataFrame: Cópia com job_growth_absolute, salary_category,
+            growth_category e is_future_job
+    """
+    occupations_df = occupations_df.copy()
+    occupations_df['job_growth_absolute'] = occupations_df['num_jobs_2034'] - occupations_df['num_jobs_2024']
+    occupations_df['salary_category'] = pd.cut(
+        occupations_df['median_salary'], bins=SALARY_BINS, labels=CATEGORY_LABELS
+    )
+    occupations_df['growth_category'] = pd.cut(
+        occupations_df['projected_growth'], bins=GROWTH_BINS, labels=CATEGORY_LABELS
+    )
+    occupations_df['is_future_job'] = occupations_df['projected_growth'] > FUTURE_JOB_GROWTH
+    return occupations_df
+
+def apply_occupation_updates(occupations_df, upserts, retired):
+    """
+    Aplica inclusões, alterações e retiradas à tabela de ocupações
+    
+    Campos ausentes nos metadados de uma ocupação alterada são mantidos; as
+    colunas derivadas são recalculadas para as ocupações afetadas.
+    
+    Args:
+        occupations_df (pd.DataFrame): Tabela atual de ocupações
+        upserts (dict): Ver utils.segments.fold_segments
+        retired (set): Ver utils.segments.fold_segments
+    
+    Returns:
+        pd.DataFrame: Nova tabela (ocupações retiradas removidas)
+    """
+    occupations_df = occupations_df[~occupations_df['occupation_code'].isin(retired)]
+    if not upserts:
+        return occupations_df.reset_index(drop=True)
+    
+    current = occupations_df.set_index('occupation_code', drop=False)
+    current = current[~current.index.duplicated()]
+    records = []
+    for code, entry in upserts.items():
+        record = current.loc[code].to_dict() if code in current.index else {}
+        record.update(entry['metadata'])
+        record['occupation_code'] = code
+        records.append(record)
+    
+    updates = pd.DataFrame(records)
+    derived_inputs = ['median_salary', 'projected_growth', 'num_jobs_2024', 'num_jobs_2034']
+    if all(column in updates.columns for column in derived_inputs):
+        updates = add_derived_occupation_columns(updates)
+    
+    kept = occupations_df[~occupations_df['occupation_code'].isin(upserts)]
+    merged = pd.concat([kept, updates], ignore_index=True)
+    return merged[[*occupations_df.columns, *[c for c in merged.columns if c not in occupations_df.columns]]]
+
+@traced(memory=True)
 def load_occupations_data():
     """
     Carrega dados de ocupações processados
     
     Returns:
-        pd.DataFrame: DataFrame com informações de ocupações
+        pd.DataFrame: DataFrame com informações de ocupações (compartilhado
+            pelo catálogo; use .copy() antes de modificar)
     """
     data_path = get_data_path()
     try:
-        df = pd.read_csv(data_path / 'occupations_processed.csv')
-        return df
+        return _catalog.get(data_path / OCCUPATIONS_FILE, _load_table)
     except FileNotFoundError:
         print("Arquivo de ocupações não encontrado. Execute o notebook primeiro.")
         return pd.DataFrame()
 
+@traced(memory=True)
 def load_skills_data():
     """
     Carrega dados de habilidades processados
     
     Returns:
-        pd.DataFrame: DataFrame com informações de habilidades
+        pd.DataFrame: DataFrame com informações de habilidades (compartilhado
+            pelo catálogo; use .copy() antes de modificar)
     """
     data_path = get_data_path()
     try:
-        df = pd.read_csv(data_path / 'skills_processed.csv')
-        return df
+        return _catalog.get(data_path / SKILLS_FILE, _load_table)
     except FileNotFoundError:
         print("Arquivo de habilidades não encontrado. Execute o notebook primeiro.")
         return pd.DataFrame()
 
+@traced(memory=True)
 def load_occupation_skills_matrix():
     """
     Carrega matriz de habilidades por ocupação
     
     Returns:
-        pd.DataFrame: Matriz com ocupações x habilidades
+        pd.DataFrame: Matriz com ocupações x habilidades (compartilhada pelo
+            catálogo; use .copy() antes de modificar)
     """
     data_path = get_data_path()
     try:
-        df = pd.read_csv(data_path / 'occupation_skills_matrix.csv', index_col=0)
-        return df
+        return _catalog.get(data_path / MATRIX_FILE, _load_matrix)
     except FileNotFoundError:
         print("Matriz de habilidades não encontrada. Execute o notebook primeiro.")
         return pd.DataFrame()
 
+class SparseSkillsMatrix:
+    """
+    Matriz ocupações x habilidades em formato CSR
+    
+    Usa uint8 quando a matriz é binária (pertencimento) e float32 quando
+    contém pesos, de forma que memória e tempo de carga crescem com o número
+    de valores não nulos e não com ocupações x habilidades.
+    
+    Args:
+        matrix (sp.csr_matrix): Matriz esparsa ocupações x habilidades
+        occupation_codes (np.array): Códigos das ocupações (linhas)
+        skills (list): Nomes das habilidades (colunas)
+    """
+    
+    def __init__(self, matrix, occupation_codes, skills):
+        matrix = sp.csr_matrix(matrix)
+        matrix.eliminate_zeros()
+        self.matrix = matrix.astype(_compact_dtype(matrix.data), copy=False)
+        self.occupation_codes = np.asarray(occupation_codes)
+        self.skills = list(skills)
+    
+    @property
+    def shape(self):
+        return self.matrix.shape
+    
+    @property
+    def empty(self):
+        return 0 in self.matrix.shape
+    
+    @classmethod
+    def from_dataframe(cls, df):
+        """Converte uma matriz densa (DataFrame) para CSR"""
+        return cls(sp.csr_matrix(df.to_numpy()), df.index.to_numpy(), df.columns.tolist())
+    
+    def to_dataframe(self):
+        """Converte de volta para a matriz densa (DataFrame)"""
+        return pd.DataFrame(
+            self.matrix.toarray(),
+            index=pd.Index(self.occupation_codes, name='occupation_code'),
+            columns=self.skills
+        )
+    
+    def save(self, path):
+        """
+        Persiste a matriz em um único arquivo .npz (sem objetos pickle)
+        
+        Args:
+            path (Path): Caminho do arquivo de destino
+        """
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                data=self.matrix.data,
+                indices=self.matrix.indices,
+                indptr=self.matrix.indptr,
+                shape=np.asarray(self.matrix.shape, dtype=np.int64),
+                occupation_codes=self.occupation_codes.astype(str),
+                skills=np.asarray(self.skills, dtype=str)
+            )
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Carrega uma matriz persistida com save()
+        
+        Args:
+            path (Path): Caminho do arquivo .npz
+            
+        Returns:
+            SparseSkillsMatrix: Matriz carregada
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            matrix = sp.csr_matrix(
+                (npz['data'], npz['indices'], npz['indptr']),
+                shape=tuple(npz['shape'])
+            )
+            return cls(matrix, npz['occupation_codes'], npz['skills'].tolist())
+
+def _compact_dtype(values):
+    """Retorna uint8 para valores 0/1 e float32 para pesos"""
+    if values.size == 0 or np.isin(values, (0, 1)).all():
+        return np.uint8
+    return np.float32
+
+@traced(memory=True)
+def load_occupation_skills_matrix_sparse(chunksize=5000):
+    """
+    Carrega matriz de habilidades por ocupação em formato CSR
+    
+    Usa o cache .npz em data/.cache/ enquanto ele corresponder ao CSV; caso
+    contrário, converte o CSV em blocos de linhas (sem materializar a matriz
+    densa inteira) e persiste o resultado para as próximas cargas.
+    
+    Args:
+        chunksize (int): Número de linhas do CSV convertidas por bloco
+        
+    Returns:
+        SparseSkillsMatrix: Matriz ocupações x habilidades (vazia se ausente)
+    """
+    csv_path = get_data_path() / MATRIX_FILE
+    cache_path = get_cache_path() / f'{csv_path.stem}.csr.npz'
+    manifest_path = cache_path.with_name(cache_path.name + '.json')
+    
+    if csv_path.exists() and cache_path.exists() and _read_cache_manifest(csv_path, manifest_path):
+        return SparseSkillsMatrix.load(cache_path)
+    
+    try:
+        reader = pd.read_csv(csv_path, index_col=0, chunksize=chunksize)
+        blocks, codes, skills = [], [], []
+        for chunk in reader:
+            skills = chunk.columns.tolist()
+            codes.append(chunk.index.to_numpy())
+            values = chunk.to_numpy()
+            blocks.append(sp.csr_matrix(values.astype(_compact_dtype(values[values != 0]))))
+    except FileNotFoundError:
+        print("Matriz de habilidades não encontrada. Execute o notebook primeiro.")
+        return SparseSkillsMatrix(sp.csr_matrix((0, 0), dtype=np.uint8), np.empty(0, dtype=str), [])
+    
+    if blocks:
+        matrix = sp.vstack(blocks, format='csr')
+        occupation_codes = np.concatenate(codes)
+    else:
+        matrix = sp.csr_matrix((0, len(skills)), dtype=np.uint8)
+        occupation_codes = np.empty(0, dtype=str)
+    
+    sparse_matrix = SparseSkillsMatrix(matrix, occupation_codes, skills)
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        _atomic_write(cache_path, lambda tmp: sparse_matrix.save(tmp))
+        _write_cache_manifest(manifest_path, _new_cache_manifest(csv_path))
+    except OSError:
+        pass
+    return sparse_matrix
+
+class SkillAdjacency:
+    """
+    Listas de adjacência ocupação -> habilidades e habilidade -> ocupações em formato CSR
+    
+    As habilidades de cada ocupação ficam contíguas e ordenadas por
+    importância decrescente (empates na ordem do arquivo); a estrutura
+    transposta guarda as ocupações de cada habilidade. Consultas por
+    ocupação são fatias O(grau) e o número de ocupações de uma habilidade
+    é O(1).
+    
+    Args:
+        occupation_codes (np.array): Códigos das ocupações (ordem de aparição)
+        skills (list): Nomes das habilidades (ordem alfabética)
+        offsets (np.array): Início de cada ocupação em skill_ids (n_ocupações + 1)
+        skill_ids (np.array): Habilidades de cada ocupação, concatenadas
+        importance (np.array): Importância de cada par ocupação-habilidade
+        level (np.array): Nível de cada par ocupação-habilidade
+        skill_offsets (np.array): Início de cada habilidade em occupation_ids
+        occupation_ids (np.array): Ocupações de cada habilidade, concatenadas
+    """
+    
+    def __init__(self, occupation_codes, skills, offsets, skill_ids, importance, level,
+                 skill_offsets, occupation_ids):
+        self.occupation_codes = np.asarray(occupation_codes)
+        self.skills = list(skills)
+        self.offsets = offsets
+        self.skill_ids = skill_ids
+        self.importance = importance
+        self.level = level
+        self.skill_offsets = skill_offsets
+        self.occupation_ids = occupation_ids
+        self.code_to_row = {code: row for row, code in enumerate(self.occupation_codes.tolist())}
+        self.skill_to_id = {skill: skill_id for skill_id, skill in enumerate(self.skills)}
+    
+    @classmethod
+    def from_skills_frame(cls, skills_df):
+        """
+        Constrói as duas estruturas a partir da tabela longa de habilidades
+        
+        Args:
+            skills_df (pd.DataFrame): Tabela com occupation_code, skill_name e,
+                opcionalmente, importance e level; linhas sem ocupação ou sem
+                habilidade são ignoradas
+            
+        Returns:
+            SkillAdjacency: Estruturas construídas
+        """
+        # factorize dá -1 para nulos, o que quebraria o bincount dos offsets
+        skills_df = skills_df.dropna(subset=['occupation_code', 'skill_name'])
+        occupation_ids, occupation_codes = pd.factorize(skills_df['occupation_code'])
+        skill_ids, skills = pd.factorize(skills_df['skill_name'], sort=True)
+        n_pairs = len(skills_df)
+        importance = (
+            skills_df['importance'].to_numpy() if 'importance' in skills_df.columns
+            else np.zeros(n_pairs, dtype=np.int64)
+        )
+        level = (
+            skills_df['level'].to_numpy() if 'level' in skills_df.columns
+            else np.zeros(n_pairs, dtype=np.int64)
+        )
+        
+        # Ocupação -> habilidades: por ocupação, importância decrescente (lexsort é estável)
+        order = np.lexsort((-importance.astype(np.float64), occupation_ids))
+        offsets = np.zeros(len(occupation_codes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(occupation_ids, minlength=len(occupation_codes)), out=offsets[1:])
+        
+        # Habilidade -> ocupações: por habilidade, na ordem das ocupações
+        transposed = np.lexsort((occupation_ids, skill_ids))
+        skill_offsets = np.zeros(len(skills) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(skill_ids, minlength=len(skills)), out=skill_offsets[1:])
+        
+        return cls(
+            np.asarray(occupation_codes), skills.tolist(), offsets,
+            skill_ids[order].astype(np.int32), importance[order], level[order],
+            skill_offsets, occupation_ids[transposed].astype(np.int32)
+        )
+    
+    def skills_for_occupation(self, occupation_code):
+        """
+        Habilidades de uma ocupação, por importância decrescente
+        
+        Returns:
+            tuple: (ids das habilidades, importâncias, níveis) como fatias
+                dos arrays (sem cópia); vazias se a ocupação não existir
+        """
+        row = self.code_to_row.get(occupation_code)
+        if row is None:
+            return self.skill_ids[:0], self.importance[:0], self.level[:0]
+        start, stop = self.offsets[row], self.offsets[row + 1]
+        return self.skill_ids[start:stop], self.importance[start:stop], self.level[start:stop]
+    
+    def occupations_for_skill(self, skill):
+        """
+        Códigos das ocupações que exigem uma habilidade
+        
+        Returns:
+            np.array: Códigos das ocupações (vazio se a habilidade não existir)
+        """
+        skill_id = self.skill_to_id.get(skill)
+        if skill_id is None:
+            return self.occupation_codes[:0]
+        start, stop = self.skill_offsets[skill_id], self.skill_offsets[skill_id + 1]
+        return self.occupation_codes[self.occupation_ids[start:stop]]
+    
+    def occupation_count(self, skill):
+        """Número de ocupações que exigem uma habilidade, em O(1)"""
+        skill_id = self.skill_to_id.get(skill)
+        if skill_id is None:
+            return 0
+        return int(self.skill_offsets[skill_id + 1] - self.skill_offsets[skill_id])
+    
+    def skill_counts(self):
+        """
+        Número de ocupações por habilidade
+        
+        Returns:
+            pd.Series: Contagens indexadas pelo nome da habilidade, em ordem decrescente
+        """
+        counts = pd.Series(np.diff(self.skill_offsets), index=self.skills, name='count')
+        return counts.sort_values(ascending=False, kind='stable')
+
+def _derived_from_skills(name, build, default):
+    """Estrutura derivada de skills_processed.csv, ou default se ausente"""
+    try:
+        return _catalog.derived(get_data_path() / SKILLS_FILE, _load_table, name, build)
+    except FileNotFoundError:
+        print("Arquivo de habilidades não encontrado. Execute o notebook primeiro.")
+        return default
+
+def _build_occupation_details(occupations_df):
+    details = {}
+    for row in occupations_df.to_dict('records'):
+        details.setdefault(row['occupation_code'], row)
+    return details
+
+# Fonte das atualizações pendentes, registrada por utils.segments (que depende
+# deste módulo); sem ela, as consultas refletem apenas os arquivos de data/
+_pending_source = None
+
+def register_pending_updates(source):
+    """
+    Registra a fonte das inclusões/alterações e retiradas ainda não compactadas
+
+    Args:
+        source (callable): Função sem argumentos que retorna (upserts,
+            retired), como utils.segments.pending_updates
+    """
+    global _pending_source
+    _pending_source = source
+
+def _pending_updates():
+    """Inclusões/alterações e retiradas pendentes, ou nenhuma sem fonte registrada"""
+    if _pending_source is None:
+        return {}, set()
+    return _pending_source()
+
+def _segment_skills(entry):
+    """Habilidades de uma ocupação incluída por segmento, por importância decrescente"""
+    skills = [
+        {'skill': skill['skill'], 'level': skill.get('level'), 'importance': skill.get('importance')}
+        for skill in entry['skills']
+    ]
+    # Sem importância informada, a ordem do segmento é mantida (no fim)
+    return sorted(skills, key=lambda skill: (skill['importance'] is None, -(skill['importance'] or 0)))
+
+@traced()
 def get_all_skills():
     """
     Retorna lista de todas as habilidades disponíveis
@@ -63,11 +699,10 @@ def get_all_skills():
     Returns:
         list: Lista de habilidades
     """
-    skills_df = load_skills_data()
-    if not skills_df.empty:
-        return sorted(skills_df['skill_name'].unique().tolist())
-    return []
+    adjacency = get_skill_adjacency()
+    return list(adjacency.skills) if adjacency is not None else []
 
+@traced()
 def get_occupation_details(occupation_code):
     """
     Obtém detalhes de uma ocupação específica
@@ -78,18 +713,39 @@ def get_occupation_details(occupation_code):
     Returns:
         dict: Dicionário com detalhes da ocupação
     """
-    occupations_df = load_occupations_data()
-    
-    if occupations_df.empty:
+    try:
+        details = _catalog.derived(
+            get_data_path() / OCCUPATIONS_FILE, _load_table,
+            'details_by_code', _build_occupation_details
+        )
+    except FileNotFoundError:
+        print("Arquivo de ocupações não encontrado. Execute o notebook primeiro.")
         return {}
     
-    occupation = occupations_df[occupations_df['occupation_code'] == occupation_code]
-    
-    if occupation.empty:
+    # Segmentos delta pendentes valem como no índice em produção
+    upserts, retired = _pending_updates()
+    if occupation_code in retired:
         return {}
+    if occupation_code in upserts:
+        base = details.get(occupation_code)
+        base = pd.DataFrame([base]) if base is not None else pd.DataFrame({'occupation_code': []})
+        updated = apply_occupation_updates(base, {occupation_code: upserts[occupation_code]}, set())
+        return updated.iloc[-1].to_dict()
+    
+    return dict(details.get(occupation_code, {}))
+
+@traced(memory=True)
+def get_skill_adjacency():
+    """
+    Retorna as listas de adjacência de skills_processed.csv, construídas uma vez por versão
     
-    return occupation.iloc[0].to_dict()
+    Returns:
+        SkillAdjacency: Estruturas compartilhadas pelo catálogo, ou None se
+            o arquivo não existir
+    """
+    return _derived_from_skills('skill_adjacency', SkillAdjacency.from_skills_frame, None)
 
+@traced()
 def get_skills_for_occupation(occupation_code):
     """
     Retorna as habilidades necessárias para uma ocupação
@@ -98,22 +754,74 @@ def get_skills_for_occupation(occupation_code):
         occupation_code (str): Código da ocupação
         
     Returns:
-        list: Lista de tuplas (habilidade, nível)
+        list: Lista de dicionários (habilidade, nível, importância), por
+            importância decrescente
     """
-    skills_df = load_skills_data()
-    
-    if skills_df.empty:
+    upserts, retired = _pending_updates()
+    if occupation_code in retired:
         return []
+    if occupation_code in upserts:
+        return _segment_skills(upserts[occupation_code])
     
-    occupation_skills = skills_df[skills_df['occupation_code'] == occupation_code]
+    adjacency = get_skill_adjacency()
+    if adjacency is None:
+        return []
     
-    skills_list = []
-    for _, row in occupation_skills.iterrows():
-        skills_list.append({
-            'skill': row['skill_name'],
-            'level': row.get('level', 0),
-            'importance': row.get('importance', 0)
-        })
+    skill_ids, importance, level = adjacency.skills_for_occupation(occupation_code)
+    skills = adjacency.skills
+    # Importância/nível vazios no CSV (NaN) viram None
+    importance = [None if value != value else value for value in importance.tolist()]
+    level = [None if value != value else value for value in level.tolist()]
+    return [
+        {'skill': skills[skill_id], 'level': skill_level, 'importance': skill_importance}
+        for skill_id, skill_importance, skill_level in zip(skill_ids.tolist(), importance, level)
+    ]
+
+@traced()
+def get_occupations_for_skill(skill_name):
+    """
+    Retorna as ocupações que exigem uma habilidade
     
-    return sorted(skills_list, key=lambda x: x.get('importance', 0), reverse=True)
+    Args:
+        skill_name (str): Nome da habilidade
+        
+    Returns:
+        list: Códigos das ocupações
+    """
+    adjacency = get_skill_adjacency()
+    codes = adjacency.occupations_for_skill(skill_name).tolist() if adjacency is not None else []
+    upserts, retired = _pending_updates()
+    if upserts or retired:
+        codes = [code for code in codes if code not in retired and code not in upserts]
+        codes += [
+            code for code, entry in upserts.items()
+            if any(skill['skill'] == skill_name for skill in entry['skills'])
+        ]
+    return codes
 
+@traced()
+def get_skill_occupation_counts():
+    """
+    Retorna o número de ocupações que exigem cada habilidade
+    
+    Returns:
+        pd.Series: Contagens indexadas pelo nome da habilidade, em ordem decrescente
+    """
+    adjacency = get_skill_adjacency()
+    counts = adjacency.skill_counts() if adjacency is not None else pd.Series(dtype=np.int64, name='count')
+    upserts, retired = _pending_updates()
+    if not (upserts or retired):
+        return counts
+    
+    # Troca as habilidades da base das ocupações afetadas pelas dos segmentos
+    delta = {}
+    for code in set(upserts) | retired:
+        if adjacency is not None:
+            skill_ids, _, _ = adjacency.skills_for_occupation(code)
+            for skill_id in skill_ids.tolist():
+                delta[adjacency.skills[skill_id]] = delta.get(adjacency.skills[skill_id], 0) - 1
+        for skill in upserts.get(code, {'skills': []})['skills']:
+            delta[skill['skill']] = delta.get(skill['skill'], 0) + 1
+    counts = counts.add(pd.Series(delta, dtype=np.int64), fill_value=0).astype(np.int64)
+    counts = counts[counts > 0].rename('count')
+    return counts.sort_values(ascending=False, kind='stable')
@@ -0,0 +1,295 @@
+"""
+Avaliação offline da qualidade das recomendações em larga escala
+
+Os perfis sintéticos são gerados em blocos como matrizes esparsas e
+pontuados com um produto de matrizes por bloco (o mesmo top-k de
+recommend_batch), sem DataFrame por perfil. Cada bloco usa sua própria
+semente, de modo que o resultado não depende do número de processos.
+
+Modos de geração dos perfis:
+    random    habilidades sorteadas do vocabulário (como o
+              evaluate_recommendations do notebook)
+    holdout   habilidades de uma ocupação sorteada, com uma fração oculta;
+              as habilidades das ocupações recomendadas que o perfil não tem
+              são comparadas às ocultas (precision@k e recall@k), e
+              target_hit_rate indica se a ocupação de origem está no top-k
+
+As métricas por perfil são agregadas com média e intervalo de confiança
+(aproximação normal); coverage é a fração do catálogo recomendada ao menos
+uma vez.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.evaluation --profiles 1000000 --k 5 --workers 4
+    python -m utils.evaluation --mode holdout --holdout 0.3 --profiles 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.stats import norm
+
+from .index_artifact import load_index_artifact
+from .recommender import _top_k_batch, build_recommender_index
+
+RANDOM_METRICS = ('future_job_rate', 'avg_growth')
+HOLDOUT_METRICS = RANDOM_METRICS + ('precision', 'recall', 'target_hit_rate')
+
+class EvaluationContext:
+    """
+    Arrays usados na avaliação, extraídos uma vez do índice
+
+    Args:
+        index (RecommenderIndex): Índice com a matriz normalizada
+    """
+
+    def __init__(self, index):
+        self.matrix = index.matrix
+        # Matriz binária de pertencimento (ocupação requer habilidade)
+        self.binary = sp.csr_matrix(index.matrix, dtype=np.float32)
+        self.binary.data[:] = 1
+        self.binary.eliminate_zeros()
+        self.future = index._metadata_column('is_future_job')
+        self.growth = index._metadata_column('projected_growth')
+        # Ocupações com ao menos duas habilidades podem ser origem de perfis holdout
+        self.holdout_rows = np.flatnonzero(np.diff(self.binary.indptr) >= 2)
+        self.n_rows, self.n_skills = self.binary.shape
+        # Linhas removidas por segmentos delta (SegmentedIndex) não são recomendadas
+        live_rows = getattr(index, 'live_rows', None)
+        self.excluded = None if live_rows is None else ~live_rows
+        self.n_live = self.n_rows if live_rows is None else int(live_rows.sum())
+
+def random_profiles(rng, n_profiles, n_skills, skills_per_profile):
+    """
+    Sorteia perfis com skills_per_profile habilidades distintas
+
+    Returns:
+        sp.csr_matrix: Matriz binária perfis x habilidades
+    """
+    m = min(skills_per_profile, n_skills)
+    if n_skills <= 4096:
+        cols = np.argpartition(rng.random((n_profiles, n_skills)), m - 1, axis=1)[:, :m]
+    else:
+        # Vocabulário grande: sorteia com reposição e refaz só as linhas com repetição
+        cols = rng.integers(0, n_skills, size=(n_profiles, m))
+        while True:
+            ordered = np.sort(cols, axis=1)
+            repeated = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+            if len(repeated) == 0:
+                break
+            cols[repeated] = rng.integers(0, n_skills, size=(len(repeated), m))
+    indptr = np.arange(0, n_profiles * m + 1, m)
+    return sp.csr_matrix(
+        (np.ones(n_profiles * m, dtype=np.float32), cols.ravel(), indptr), shape=(n_profiles, n_skills)
+    )
+
+def holdout_profiles(rng, context, n_profiles, holdout=0.3):
+    """
+    Gera perfis a partir de ocupações sorteadas, ocultando parte das habilidades
+
+    Cada habilidade é oculta com probabilidade holdout; pelo menos uma fica
+    oculta e pelo menos uma visível.
+
+    Returns:
+        tuple: (observadas, ocultas, ocupações de origem)
+    """
+    targets = rng.choice(context.holdout_rows, size=n_profiles)
+    source = context.binary[targets]
+    counts = np.diff(source.indptr)
+    owner = np.repeat(np.arange(n_profiles), counts)
+    draws = rng.random(source.nnz)
+
+    hidden = draws < holdout
+    # Por perfil, o menor sorteio é sempre oculto e o maior sempre visível
+    order = np.lexsort((draws, owner))
+    first = source.indptr[:-1]
+    last = source.indptr[1:] - 1
+    hidden[order[first]] = True
+    hidden[order[last]] = False
+
+    def select(keep):
+        return sp.csr_matrix(
+            (source.data[keep], source.indices[keep], np.concatenate([[0], np.cumsum(np.bincount(owner[keep], minlength=n_profiles))])),
+            shape=source.shape
+        )
+
+    return select(~hidden), select(hidden), targets
+
+def _masked_mean(values, valid):
+    """Média por linha apenas nas posições válidas (NaN se nenhuma)"""
+    n_valid = valid.sum(axis=1)
+    totals = np.where(valid, values, 0).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(n_valid > 0, totals / n_valid, np.nan)
+
+def evaluate_chunk(context, chunk_id, n_profiles, k=5, mode='random', skills_per_profile=4, holdout=0.3, seed=0):
+    """
+    Gera e avalia um bloco de perfis
+
+    Returns:
+        dict: Soma, soma dos quadrados e contagem por métrica, e o número
+            de vezes que cada ocupação foi recomendada
+    """
+    rng = np.random.default_rng([seed, chunk_id])
+    if mode == 'holdout':
+        observed, hidden, targets = holdout_profiles(rng, context, n_profiles, holdout)
+    else:
+        observed = random_profiles(rng, n_profiles, context.n_skills, skills_per_profile)
+
+    k = min(k, context.n_live)
+    rows, _ = _top_k_batch(observed, context.matrix, k, context.excluded)
+
+    future, growth = context.future[rows], context.growth[rows]
+    metrics = {
+        'future_job_rate': _masked_mean(future, ~np.isnan(future)),
+        'avg_growth': _masked_mean(growth, ~np.isnan(growth)),
+    }
+
+    if mode == 'holdout':
+        selection = sp.csr_matrix(
+            (np.ones(rows.size, dtype=np.float32), rows.ravel(), np.arange(0, rows.size + 1, k)),
+            shape=(n_profiles, context.n_rows)
+        )
+        # Habilidades sugeridas: as das ocupações recomendadas que o perfil ainda não tem
+        suggested = (selection @ context.binary).sign()
+        suggested = suggested - suggested.multiply(observed)
+        suggested.eliminate_zeros()
+        n_suggested = suggested.getnnz(axis=1)
+        n_hidden = hidden.getnnz(axis=1)
+        n_correct = np.asarray(suggested.multiply(hidden).sum(axis=1)).ravel()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            metrics['precision'] = np.where(n_suggested > 0, n_correct / n_suggested, np.nan)
+            metrics['recall'] = n_correct / n_hidden
+        metrics['target_hit_rate'] = (rows == targets[:, None]).any(axis=1).astype(np.float64)
+
+    result = {'recommended': np.bincount(rows.ravel(), minlength=context.n_rows)}
+    for name, values in metrics.items():
+        values = values[~np.isnan(values)]
+        result[name] = (float(values.sum()), float(np.square(values).sum()), len(values))
+    return result
+
+def merge_results(results):
+    """Soma os agregados de vários blocos"""
+    merged = {}
+    for result in results:
+        for name, value in result.items():
+            if name == 'recommended':
+                merged[name] = merged[name] + value if name in merged else value.copy()
+            else:
+                previous = merged.get(name, (0.0, 0.0, 0))
+                merged[name] = tuple(a + b for a, b in zip(previous, value))
+    return merged
+
+def summarize(merged, confidence=0.95):
+    """
+    Converte os agregados em médias com intervalo de confiança
+
+    Returns:
+        pd.DataFrame: metric, mean, ci_low, ci_high e n
+    """
+    z = norm.ppf(0.5 + confidence / 2)
+    rows = []
+    for name, value in merged.items():
+        if name == 'recommended':
+            continue
+        total, total_sq, n = value
+        mean = total / n if n else np.nan
+        variance = max(total_sq / n - mean ** 2, 0) * n / (n - 1) if n > 1 else np.nan
+        half_width = z * np.sqrt(variance / n) if n > 1 else np.nan
+        rows.append({'metric': name, 'mean': mean, 'ci_low': mean - half_width, 'ci_high': mean + half_width, 'n': n})
+
+    recommended = merged['recommended']
+    rows.append({
+        'metric': 'coverage', 'mean': float(np.count_nonzero(recommended)) / len(recommended),
+        'ci_low': np.nan, 'ci_high': np.nan, 'n': len(recommended)
+    })
+    return pd.DataFrame(rows)
+
+_worker_context = None
+
+def _init_worker(context):
+    global _worker_context
+    _worker_context = context
+
+def _evaluate_worker(args):
+    return evaluate_chunk(_worker_context, *args[:2], **args[2])
+
+def evaluate(index, n_profiles=100000, k=5, mode='random', skills_per_profile=4, holdout=0.3,
+             chunk_size=8192, workers=1, seed=0, confidence=0.95):
+    """
+    Avalia a qualidade das recomendações sobre perfis sintéticos
+
+    Args:
+        index (RecommenderIndex): Índice avaliado
+        n_profiles (int): Número de perfis
+        k (int): Tamanho do top-k
+        mode (str): 'random' ou 'holdout'
+        skills_per_profile (int): Habilidades por perfil no modo random
+        holdout (float): Fração de habilidades ocultas no modo holdout
+        chunk_size (int): Perfis por bloco (limita a memória a chunk_size x ocupações scores)
+        workers (int): Processos; 1 avalia no processo atual
+        seed (int): Semente base (cada bloco usa [seed, bloco])
+        confidence (float): Nível dos intervalos de confiança
+
+    Returns:
+        pd.DataFrame: Métricas com média, intervalo de confiança e n
+    """
+    if mode not in ('random', 'holdout'):
+        raise ValueError(f"Modo desconhecido: {mode}")
+
+    context = EvaluationContext(index)
+    options = {'k': k, 'mode': mode, 'skills_per_profile': skills_per_profile, 'holdout': holdout, 'seed': seed}
+    tasks = [
+        (chunk_id, min(chunk_size, n_profiles - start), options)
+        for chunk_id, start in enumerate(range(0, n_profiles, chunk_size))
+    ]
+
+    if workers > 1:
+        # Com fork, o contexto é herdado pelos processos sem ser serializado
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+            results = list(pool.map(_evaluate_worker, tasks))
+    else:
+        results = [evaluate_chunk(context, chunk_id, size, **opts) for chunk_id, size, opts in tasks]
+
+    return summarize(merge_results(results), confidence=confidence)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Avaliação offline das recomendações")
+    parser.add_argument('--profiles', type=int, default=100000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--mode', choices=['random', 'holdout'], default='random')
+    parser.add_argument('--skills-per-profile', type=int, default=4)
+    parser.add_argument('--holdout', type=float, default=0.3)
+    parser.add_argument('--chunk-size', type=int, default=8192)
+    parser.add_argument('--workers', type=int, default=1, help="Processos (0 = todos os núcleos)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--confidence', type=float, default=0.95)
+    args = parser.parse_args(argv)
+
+    try:
+        index = load_index_artifact()
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        index = build_recommender_index()
+    if index.empty:
+        print("Dados não encontrados. Execute o notebook primeiro.", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    summary = evaluate(
+        index, n_profiles=args.profiles, k=args.k, mode=args.mode,
+        skills_per_profile=args.skills_per_profile, holdout=args.holdout, chunk_size=args.chunk_size,
+        workers=args.workers or os.cpu_count(), seed=args.seed, confidence=args.confidence
+    )
+    elapsed = time.perf_counter() - start
+    print(summary.to_string(index=False, float_format=lambda value: f'{value:.4f}'))
+    print(f"{args.profiles} perfis em {elapsed:.1f}s ({args.profiles / elapsed:,.0f} perfis/s)")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Índice de consultas sobre as ocupações para a página "Explorar Dados"
+
+As colunas numéricas são mantidas como permutações ordenadas, de modo que um
+filtro de faixa vira uma busca binária e um intervalo da permutação; flags
+booleanas viram máscaras pré-calculadas. As ordens decrescentes usadas em
+tabelas e rankings são calculadas uma vez, e só a página visível da tabela é
+materializada como DataFrame.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .data_loader import OCCUPATIONS_FILE, _load_table, get_catalog, get_data_path
+
+NUMERIC_COLUMNS = ('median_salary', 'projected_growth')
+FLAG_COLUMNS = ('is_future_job',)
+
+class OccupationQueryIndex:
+    """
+    Estruturas de consulta pré-calculadas sobre occupations_processed.csv
+
+    Args:
+        occupations_df (pd.DataFrame): DataFrame com informações das ocupações
+        max_cached_queries (int): Número de seleções de filtros guardadas
+    """
+
+    def __init__(self, occupations_df, max_cached_queries=128):
+        self.occupations_df = occupations_df
+        self.n_rows = len(occupations_df)
+        self.max_cached_queries = max_cached_queries
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Por coluna: linhas em ordem crescente de valor e os valores ordenados
+        self._ascending = {}
+        # Por coluna: linhas em ordem decrescente (empates pela ordem das linhas, NaN no fim)
+        self._descending = {}
+        self._values = {}
+        for column in NUMERIC_COLUMNS:
+            if column not in occupations_df.columns:
+                continue
+            values = occupations_df[column].to_numpy(dtype=np.float64)
+            valid = np.flatnonzero(~np.isnan(values))
+            ascending = valid[np.argsort(values[valid], kind='stable')]
+            self._values[column] = values
+            self._ascending[column] = (ascending, values[ascending])
+            descending = valid[np.argsort(-values[valid], kind='stable')]
+            self._descending[column] = np.concatenate([descending, np.flatnonzero(np.isnan(values))])
+
+        self._flags = {
+            column: occupations_df[column].to_numpy(dtype=bool)
+            for column in FLAG_COLUMNS if column in occupations_df.columns
+        }
+
+    def column_range(self, column):
+        """
+        Retorna o menor e o maior valor de uma coluna numérica
+
+        Returns:
+            tuple: (mínimo, máximo), ou (0, 0) se a coluna estiver vazia
+        """
+        _, values = self._ascending[column]
+        if len(values) == 0:
+            return 0, 0
+        return values[0], values[-1]
+
+    def range_mask(self, column, low=None, high=None):
+        """
+        Máscara das linhas com low <= valor <= high, por busca binária
+
+        Args:
+            column (str): Coluna numérica
+            low (float, optional): Limite inferior (inclusive)
+            high (float, optional): Limite superior (inclusive)
+
+        Returns:
+            np.array: Máscara booleana na ordem das linhas do DataFrame
+        """
+        order, values = self._ascending[column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[order[start:stop]] = True
+        return mask
+
+    def select(self, min_growth=None, salary_range=None, future_only=False):
+        """
+        Seleciona as ocupações que satisfazem os filtros
+
+        O resultado de cada combinação de filtros é guardado (LRU), de modo
+        que repetir um valor de slider não recalcula nada.
+
+        Args:
+            min_growth (float, optional): Crescimento projetado mínimo (%)
+            salary_range (tuple, optional): (mínimo, máximo) de salário anual
+            future_only (bool): Apenas profissões do futuro
+
+        Returns:
+            np.array: Máscara booleana (somente leitura) das linhas selecionadas
+        """
+        salary_range = tuple(salary_range) if salary_range is not None else None
+        key = (min_growth, salary_range, bool(future_only))
+        with self._lock:
+            mask = self._selections.get(key)
+            if mask is not None:
+                self._selections.move_to_end(key)
+                return mask
+
+        mask = np.ones(self.n_rows, dtype=bool)
+        if min_growth is not None:
+            mask &= self.range_mask('projected_growth', low=min_growth)
+        if salary_range is not None:
+            mask &= self.range_mask('median_salary', *salary_range)
+        if future_only:
+            mask &= self._flags['is_future_job']
+
+        mask.flags.writeable = False
+        with self._lock:
+            self._selections[key] = mask
+            if len(self._selections) > self.max_cached_queries:
+                self._selections.popitem(last=False)
+        return mask
+
+    def top_rows(self, mask, column, n=None):
+        """
+        Linhas selecionadas em ordem decrescente de uma coluna
+
+        Equivale a ``df[mask].nlargest(n, column)`` (empates pela ordem das
+        linhas), sem copiar o DataFrame.
+
+        Args:
+            mask (np.array): Máscara das linhas selecionadas (ver select)
+            column (str): Coluna numérica usada na ordenação
+            n (int, optional): Número de linhas (padrão: todas)
+
+        Returns:
+            np.array: Posições das linhas no DataFrame
+        """
+        order = self._descending[column]
+        rows = order[mask[order]]
+        return rows if n is None else rows[:n]
+
+    def frame(self, rows, columns=None):
+        """
+        Materializa apenas as linhas informadas como DataFrame
+
+        Args:
+            rows (np.array): Posições das linhas
+            columns (list, optional): Colunas a incluir
+
+        Returns:
+            pd.DataFrame: Cópia pequena com as linhas pedidas
+        """
+        # Linhas primeiro: só a fatia pedida é copiada, nunca a tabela inteira
+        df = self.occupations_df.iloc[rows]
+        return df if columns is None else df[list(columns)]
+
+    def page(self, rows, page, page_size=50, columns=None):
+        """
+        Retorna uma página de linhas já ordenadas
+
+        Args:
+            rows (np.array): Posições das linhas na ordem de exibição
+            page (int): Número da página (a partir de 1)
+            page_size (int): Linhas por página
+            columns (list, optional): Colunas a incluir
+
+        Returns:
+            pd.DataFrame: Linhas da página
+        """
+        start = (max(page, 1) - 1) * page_size
+        return self.frame(rows[start:start + page_size], columns)
+
+    def values(self, mask, column):
+        """
+        Valores de uma coluna numérica nas linhas selecionadas
+
+        Returns:
+            np.array: Valores float64 (sem cópia do DataFrame)
+        """
+        return self._values[column][mask]
+
+def get_occupation_query_index():
+    """
+    Retorna o índice de consultas das ocupações, construído uma vez por versão do CSV
+
+    Returns:
+        OccupationQueryIndex: Índice compartilhado pelo catálogo de dados
+    """
+    try:
+        return get_catalog().derived(
+            get_data_path() / OCCUPATIONS_FILE, _load_table, 'occupation_query_index', OccupationQueryIndex
+        )
+    except FileNotFoundError:
+        print("Arquivo de ocupações não encontrado. Execute o notebook primeiro.")
+        return OccupationQueryIndex(pd.DataFrame(columns=[*NUMERIC_COLUMNS, *FLAG_COLUMNS]))
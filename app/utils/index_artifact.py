@@ -0,0 +1,318 @@
+"""
+Artefato versionado do índice de recomendação e troca atômica em produção
+
+O artefato é um único arquivo .npz em app/model/ lido com
+``allow_pickle=False``: um cabeçalho JSON (versão do esquema, skills_list,
+hash do conteúdo e hash do CSV de origem) e os arrays do índice normalizado.
+Publicar grava em um arquivo temporário e renomeia (os.replace), e o
+ServingIndex detecta o novo arquivo e troca o índice em memória sem reiniciar
+o app.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.index_artifact publish
+    python -m utils.index_artifact verify
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy.sparse as sp
+
+from .data_loader import MATRIX_FILE, _file_digest, get_data_path, load_occupations_data
+from .recommender import RecommenderIndex, build_recommender_index, get_model_path
+from .segments import SegmentedIndex, get_deltas_path, load_segments, segments_signature
+
+ARTIFACT_FILE = 'recommender_index.npz'
+SCHEMA_VERSION = 1
+
+def get_artifact_path():
+    """Retorna o caminho do artefato do índice em app/model/"""
+    return get_model_path() / ARTIFACT_FILE
+
+def _index_arrays(index):
+    """Arrays que compõem o artefato, em ordem fixa"""
+    arrays = {
+        'occupation_codes': index.occupation_codes.astype(str),
+        'skills': np.asarray(index.skills, dtype=str),
+    }
+    if index.is_sparse:
+        arrays['matrix_data'] = index.matrix.data
+        arrays['matrix_indices'] = index.matrix.indices
+        arrays['matrix_indptr'] = index.matrix.indptr
+    else:
+        arrays['matrix'] = index.matrix
+    return arrays
+
+def _content_hash(arrays):
+    """Hash SHA-256 de nomes, tipos, formatos e bytes dos arrays"""
+    digest = hashlib.sha256()
+    for name in sorted(arrays):
+        array = np.ascontiguousarray(arrays[name])
+        digest.update(f'{name}:{array.dtype.str}:{array.shape}'.encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+def publish_index_artifact(index, path=None):
+    """
+    Publica o índice como artefato versionado, de forma atômica
+
+    Args:
+        index (RecommenderIndex): Índice a publicar
+        path (Path, optional): Destino (padrão: app/model/recommender_index.npz)
+
+    Returns:
+        dict: Cabeçalho gravado
+    """
+    path = path or get_artifact_path()
+    arrays = _index_arrays(index)
+    source_path = get_data_path() / MATRIX_FILE
+
+    header = {
+        'schema_version': SCHEMA_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'storage': 'csr' if index.is_sparse else 'dense',
+        'shape': list(index.matrix.shape),
+        'n_occupations': int(index.matrix.shape[0]),
+        'n_skills': len(index.skills),
+        'skills_list': list(index.skills),
+        'content_hash': _content_hash(arrays),
+        'source_sha256': _file_digest(source_path) if source_path.exists() else None,
+    }
+    header_bytes = np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, header=header_bytes, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return header
+
+def read_index_artifact(path=None):
+    """
+    Lê cabeçalho e arrays do artefato, sem desserializar objetos pickle
+
+    Args:
+        path (Path, optional): Caminho do artefato
+
+    Returns:
+        tuple: (cabeçalho, dicionário de arrays)
+    """
+    path = path or get_artifact_path()
+    with np.load(path, allow_pickle=False) as npz:
+        header = json.loads(npz['header'].tobytes().decode('utf-8'))
+        arrays = {name: npz[name] for name in npz.files if name != 'header'}
+    return header, arrays
+
+def validate_index_artifact(header, arrays):
+    """
+    Valida o artefato contra o esquema, o próprio conteúdo e os dados atuais
+
+    Args:
+        header (dict): Cabeçalho do artefato
+        arrays (dict): Arrays do artefato
+
+    Raises:
+        ValueError: Se a versão do esquema for desconhecida, o conteúdo não
+            corresponder ao hash, ou o artefato não corresponder aos dados
+    """
+    if header.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(
+            f"Versão de esquema {header.get('schema_version')} não suportada "
+            f"(esperada {SCHEMA_VERSION})"
+        )
+
+    if _content_hash(arrays) != header.get('content_hash'):
+        raise ValueError("Conteúdo do artefato não corresponde ao hash do cabeçalho")
+
+    skills = arrays['skills'].tolist()
+    if skills != header.get('skills_list') or len(skills) != header.get('n_skills'):
+        raise ValueError("skills_list do cabeçalho não corresponde às colunas do artefato")
+
+    source_path = get_data_path() / MATRIX_FILE
+    if source_path.exists() and header.get('source_sha256') != _file_digest(source_path):
+        raise ValueError(f"Artefato desatualizado em relação a {MATRIX_FILE}; publique novamente")
+
+    model_info_path = get_model_path() / 'model_info.json'
+    if model_info_path.exists():
+        with open(model_info_path, encoding='utf-8') as f:
+            model_info = json.load(f)
+        if model_info.get('skills_list', skills) != skills:
+            print("Aviso: skills_list de model_info.json difere do artefato do índice.")
+
+def load_index_artifact(path=None, occupations_df=None, validate=True):
+    """
+    Carrega o índice a partir do artefato publicado
+
+    Args:
+        path (Path, optional): Caminho do artefato
+        occupations_df (pd.DataFrame, optional): Metadados das ocupações
+            (padrão: occupations_processed.csv)
+        validate (bool): Valida o artefato antes de usá-lo
+
+    Returns:
+        RecommenderIndex: Índice pronto para consultas
+
+    Raises:
+        FileNotFoundError: Se o artefato não existir
+        ValueError: Se o artefato for inválido
+    """
+    header, arrays = read_index_artifact(path)
+    if validate:
+        validate_index_artifact(header, arrays)
+
+    if header['storage'] == 'csr':
+        matrix = sp.csr_matrix(
+            (arrays['matrix_data'], arrays['matrix_indices'], arrays['matrix_indptr']),
+            shape=tuple(header['shape'])
+        )
+    else:
+        matrix = arrays['matrix']
+
+    if occupations_df is None:
+        occupations_df = load_occupations_data()
+
+    index = RecommenderIndex.from_normalized(
+        matrix, arrays['occupation_codes'], arrays['skills'].tolist(), occupations_df
+    )
+    index.header = header
+    return index
+
+class ServingIndex:
+    """
+    Índice em produção com troca atômica quando um novo artefato é publicado
+
+    No máximo a cada check_interval segundos, get() compara a assinatura do
+    arquivo (mtime, tamanho, inode). Se mudou, o novo artefato é carregado e
+    validado fora do caminho das consultas e a referência é trocada de uma
+    vez: consultas em andamento continuam com o índice anterior. Artefatos
+    inválidos são ignorados, mantendo o índice atual. Sem artefato válido, o
+    índice é construído a partir dos CSVs.
+
+    Segmentos delta (utils.segments) pendentes são combinados com o índice
+    base; quando apenas os segmentos mudam, o índice base em memória é
+    reutilizado e só a parte delta é reconstruída.
+
+    Args:
+        path (Path, optional): Caminho do artefato
+        check_interval (float): Intervalo mínimo entre verificações (s)
+        deltas_path (Path, optional): Diretório dos segmentos delta
+    """
+
+    def __init__(self, path=None, check_interval=1.0, deltas_path=None):
+        self.path = path or get_artifact_path()
+        self.check_interval = check_interval
+        self.deltas_path = deltas_path or get_deltas_path()
+        self._lock = threading.Lock()
+        self._index = None
+        self._base = None
+        self._signature = None
+        self._segments_signature = None
+        self._last_check = float('-inf')
+
+    def get(self):
+        """
+        Retorna o índice atual, trocando-o se houver um novo artefato
+
+        Returns:
+            RecommenderIndex: Índice em uso
+        """
+        now = time.monotonic()
+        if self._index is None or now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self._refresh()
+        return self._index
+
+    def _file_signature(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _refresh(self):
+        signature = self._file_signature()
+        deltas_signature = segments_signature(self.deltas_path)
+        if self._index is not None and (signature, deltas_signature) == (self._signature, self._segments_signature):
+            return
+
+        with self._lock:
+            if self._index is not None and (signature, deltas_signature) == (self._signature, self._segments_signature):
+                return
+
+            base = None
+            if signature != self._signature or self._base is None:
+                if signature is not None:
+                    try:
+                        base = load_index_artifact(self.path)
+                    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+                        print(f"Artefato do índice ignorado: {e}")
+
+                if base is None and self._base is None:
+                    base = build_recommender_index()
+
+            base = base or self._base
+            segments = load_segments(self.deltas_path) if deltas_signature else []
+            self._index = SegmentedIndex(base, segments) if segments and not base.empty else base
+            self._base = base
+            self._signature = signature
+            self._segments_signature = deltas_signature
+
+_serving_index = None
+_serving_lock = threading.Lock()
+
+def get_serving_index():
+    """
+    Retorna o índice em produção compartilhado pelo processo
+
+    Returns:
+        RecommenderIndex: Índice atual (trocado automaticamente a cada
+            novo artefato publicado)
+    """
+    global _serving_index
+    if _serving_index is None:
+        with _serving_lock:
+            if _serving_index is None:
+                _serving_index = ServingIndex()
+    return _serving_index.get()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Artefato versionado do índice de recomendação")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    publish = subparsers.add_parser('publish', help="Constrói o índice a partir dos CSVs e publica")
+    publish.add_argument('--backend', choices=['dense', 'sparse'], default='dense')
+    subparsers.add_parser('verify', help="Valida o artefato publicado contra os dados")
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        index = build_recommender_index(backend=args.backend)
+        if index.empty:
+            print("Dados não encontrados. Execute o notebook primeiro.", file=sys.stderr)
+            return 1
+        header = publish_index_artifact(index)
+        print(f"Artefato publicado em {get_artifact_path()} ({header['content_hash'][:12]})")
+        return 0
+
+    try:
+        header, arrays = read_index_artifact()
+        validate_index_artifact(header, arrays)
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        print(f"Artefato inválido: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps({key: value for key, value in header.items() if key != 'skills_list'}, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,445 @@
+"""
+Ingestão dos arquivos brutos do O*NET e do BLS nos artefatos de data/
+
+Lê os arquivos do O*NET (texto separado por tabulação: Skills, Knowledge,
+Abilities e Technology Skills) em blocos de linhas, acumulando apenas os
+pares ocupação-habilidade retidos, e monta a matriz ocupações x habilidades
+como CSR a partir desses pares, sem pivot_table denso. A matriz densa só
+existe em blocos de linhas, enquanto é gravada no CSV. Emite os mesmos três
+arquivos que o data_loader consome:
+
+    occupations_processed.csv      ocupações + projeções e salários do BLS
+    skills_processed.csv           tabela longa (ocupação, habilidade, importância, nível)
+    occupation_skills_matrix.csv   matriz binária ocupações x habilidades
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.ingest --onet-dir db_29_0_text --bls occupation.xlsx --publish
+"""
+
+import argparse
+import csv
+import importlib.util
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .data_loader import (
+    CACHE_DIR,
+    MATRIX_FILE,
+    OCCUPATIONS_FILE,
+    SKILLS_FILE,
+    SparseSkillsMatrix,
+    _atomic_write,
+    _new_cache_manifest,
+    _write_cache_manifest,
+    add_derived_occupation_columns,
+    get_data_path,
+)
+from . import index_artifact
+
+ONET_OCCUPATIONS_FILE = 'Occupation Data.txt'
+ONET_ELEMENT_FILES = ('Skills.txt', 'Knowledge.txt', 'Abilities.txt')
+ONET_TECHNOLOGY_FILE = 'Technology Skills.txt'
+
+def _read_onet(path, usecols, chunksize):
+    """Lê um arquivo de texto do O*NET em blocos de linhas"""
+    return pd.read_csv(
+        path, sep='\t', usecols=usecols, chunksize=chunksize,
+        dtype=str, keep_default_na=False, encoding='utf-8'
+    )
+
+def iter_element_ratings(path, chunksize=100000):
+    """
+    Percorre um arquivo de elementos do O*NET (Skills, Knowledge, Abilities)
+
+    Mantém apenas as escalas de importância (IM) e nível (LV) e descarta as
+    estimativas marcadas como suprimidas ou não relevantes.
+
+    Args:
+        path (Path): Caminho do arquivo .txt
+        chunksize (int): Linhas lidas por bloco
+
+    Yields:
+        pd.DataFrame: Blocos com occupation_code, skill_name, scale e value
+    """
+    header = pd.read_csv(path, sep='\t', nrows=0).columns
+    optional = [column for column in ('Recommend Suppress', 'Not Relevant') if column in header]
+    usecols = ['O*NET-SOC Code', 'Element Name', 'Scale ID', 'Data Value', *optional]
+
+    for chunk in _read_onet(path, usecols, chunksize):
+        keep = chunk['Scale ID'].isin(['IM', 'LV'])
+        for column in optional:
+            keep &= chunk[column] != 'Y'
+        chunk = chunk[keep]
+        yield pd.DataFrame({
+            'occupation_code': chunk['O*NET-SOC Code'].to_numpy(),
+            'skill_name': chunk['Element Name'].to_numpy(),
+            'scale': chunk['Scale ID'].to_numpy(),
+            'value': pd.to_numeric(chunk['Data Value'], errors='coerce').to_numpy(),
+        })
+
+def iter_technology_skills(path, chunksize=100000, column='Commodity Title'):
+    """
+    Percorre Technology Skills.txt do O*NET
+
+    O arquivo não tem escalas: tecnologias marcadas como "Hot Technology"
+    recebem importância 100 e as demais 50, sem nível.
+
+    Args:
+        path (Path): Caminho do arquivo .txt
+        chunksize (int): Linhas lidas por bloco
+        column (str): Coluna usada como nome da habilidade ('Commodity Title'
+            agrupa ferramentas em categorias; 'Example' mantém cada produto)
+
+    Yields:
+        pd.DataFrame: Blocos com occupation_code, skill_name, importance e level
+    """
+    header = pd.read_csv(path, sep='\t', nrows=0).columns
+    usecols = ['O*NET-SOC Code', column] + (['Hot Technology'] if 'Hot Technology' in header else [])
+
+    for chunk in _read_onet(path, usecols, chunksize):
+        hot = chunk['Hot Technology'].to_numpy() == 'Y' if 'Hot Technology' in chunk else False
+        yield pd.DataFrame({
+            'occupation_code': chunk['O*NET-SOC Code'].to_numpy(),
+            'skill_name': chunk[column].to_numpy(),
+            'importance': np.where(hot, 100, 50),
+            'level': np.nan,  # Technology Skills não tem nível
+        })
+
+class SkillPairAccumulator:
+    """
+    Acumula pares ocupação-habilidade vindos de vários arquivos em blocos
+
+    A memória cresce com o número de pares retidos (não com ocupações x
+    habilidades). Escalas IM e LV do mesmo par podem chegar em blocos
+    diferentes e são combinadas em finalize().
+
+    Args:
+        min_importance (float): Importância mínima (escala 1-5 do O*NET) para
+            reter um elemento de Skills/Knowledge/Abilities
+    """
+
+    def __init__(self, min_importance=3.0):
+        self.min_importance = min_importance
+        self._ratings = []
+        self._technology = []
+
+    def add_ratings(self, chunk):
+        """Adiciona um bloco de iter_element_ratings"""
+        self._ratings.append(
+            chunk.groupby(['occupation_code', 'skill_name', 'scale'], sort=False)['value'].max()
+        )
+        # Compacta periodicamente para limitar a memória a um valor por par e escala
+        if len(self._ratings) >= 16:
+            self._ratings = [pd.concat(self._ratings).groupby(level=[0, 1, 2], sort=False).max()]
+
+    def add_technology(self, chunk):
+        """Adiciona um bloco de iter_technology_skills"""
+        self._technology.append(
+            chunk.groupby(['occupation_code', 'skill_name'], sort=False)[['importance', 'level']].max()
+        )
+        if len(self._technology) >= 16:
+            self._technology = [pd.concat(self._technology).groupby(level=[0, 1], sort=False).max()]
+
+    def finalize(self):
+        """
+        Combina os pares acumulados na tabela longa de habilidades
+
+        A importância do O*NET (1 a 5) é convertida para 0 a 100 e o nível é
+        arredondado para inteiro, como nos arquivos atuais de data/. Nível
+        ausente fica vazio no CSV (como na compactação dos segmentos), em vez
+        de um 0 indistinguível de um valor real.
+
+        Returns:
+            pd.DataFrame: occupation_code, skill_name, importance, level
+        """
+        frames = []
+        if self._ratings:
+            ratings = pd.concat(self._ratings).groupby(level=[0, 1, 2], sort=False).max().unstack('scale')
+            ratings = ratings.reindex(columns=['IM', 'LV'])
+            ratings = ratings[ratings['IM'] >= self.min_importance]
+            frames.append(pd.DataFrame({
+                'importance': ((ratings['IM'] - 1) / 4 * 100).round().astype(np.int64),
+                'level': ratings['LV'].round(),
+            }))
+        if self._technology:
+            frames.append(pd.concat(self._technology).groupby(level=[0, 1], sort=False).max())
+
+        if not frames:
+            return pd.DataFrame(columns=['occupation_code', 'skill_name', 'importance', 'level'])
+
+        pairs = pd.concat(frames).groupby(level=[0, 1], sort=False).max()
+        pairs.index.names = ['occupation_code', 'skill_name']
+        pairs['level'] = pairs['level'].astype('Int64')
+        return pairs.reset_index().sort_values(
+            ['occupation_code', 'importance'], ascending=[True, False], kind='stable'
+        ).reset_index(drop=True)
+
+def _to_number(values):
+    """Converte valores da planilha ('>=239,200', '1,234.5') para números"""
+    cleaned = values.astype(str).str.replace(r'[^0-9.\-]', '', regex=True)
+    return pd.to_numeric(cleaned, errors='coerce')
+
+def _find_column(columns, *patterns):
+    """Primeira coluna cujo nome (minúsculo) contém todos os padrões"""
+    for column in columns:
+        name = re.sub(r'\s+', ' ', str(column)).lower()
+        if all(pattern in name for pattern in patterns):
+            return column
+    raise KeyError(f"Coluna não encontrada na planilha do BLS: {' + '.join(patterns)}")
+
+def _is_header(cells):
+    """Linha de cabeçalho da planilha do BLS: alguma célula menciona 'code'"""
+    return any('code' in str(cell).lower() for cell in cells)
+
+def _read_bls_csv(path):
+    """
+    Lê o CSV do BLS a partir da linha de cabeçalho
+
+    As linhas de título acima do cabeçalho têm menos campos que a tabela, o
+    que faz o parser do pandas falhar; por isso o cabeçalho é localizado
+    nas linhas brutas antes da leitura.
+    """
+    with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        header_row = next((row for row, cells in enumerate(csv.reader(f)) if _is_header(cells)), None)
+    if header_row is None:
+        raise KeyError("Cabeçalho (coluna de código) não encontrado na planilha do BLS")
+    table = pd.read_csv(path, skiprows=header_row, dtype=str, encoding='utf-8-sig', encoding_errors='replace')
+    table.columns = table.columns.astype(str)
+    return table
+
+def load_bls_projections(path):
+    """
+    Lê a planilha de projeções de emprego do BLS (tabela 1.2, .xlsx ou .csv)
+
+    Os nomes das colunas mudam a cada edição (anos no título), então são
+    localizados por padrões. Apenas linhas de ocupações detalhadas
+    ("Line item") são mantidas quando a coluna de tipo existe.
+
+    Args:
+        path (Path): Caminho da planilha
+
+    Returns:
+        pd.DataFrame: soc_code, median_salary, projected_growth,
+            num_jobs_2024 e num_jobs_2034 (ano base e ano da projeção)
+    """
+    path = Path(path)
+    if path.suffix.lower() in ('.xlsx', '.xls'):
+        if importlib.util.find_spec('openpyxl') is None:
+            raise ImportError("Leitura de .xlsx requer openpyxl (pip install openpyxl) ou exporte para .csv")
+        raw = pd.read_excel(path, header=None)
+        # O cabeçalho real vem depois das linhas de título da planilha
+        header_row = next((row for row in range(len(raw)) if _is_header(raw.iloc[row].tolist())), None)
+        if header_row is None:
+            raise KeyError("Cabeçalho (coluna de código) não encontrado na planilha do BLS")
+        table = raw.iloc[header_row + 1:].copy()
+        table.columns = raw.iloc[header_row].astype(str)
+    else:
+        table = _read_bls_csv(path)
+
+    code = _find_column(table.columns, 'code')
+    employment = [column for column in table.columns if re.match(r'\s*employment,?\s*\d{4}\s*$', column.lower())]
+    if len(employment) < 2:
+        raise KeyError("Colunas de emprego (ano base e projeção) não encontradas na planilha do BLS")
+    growth = _find_column(table.columns, 'employment change', 'percent')
+    wage = _find_column(table.columns, 'median', 'wage')
+
+    if any('type' in column.lower() for column in table.columns):
+        occupation_type = _find_column(table.columns, 'type')
+        table = table[table[occupation_type].astype(str).str.strip().str.lower() == 'line item']
+
+    projections = pd.DataFrame({
+        'soc_code': table[code].astype(str).str.strip(),
+        'median_salary': _to_number(table[wage]),
+        'projected_growth': _to_number(table[growth]),
+        # Planilha em milhares de empregos
+        'num_jobs_2024': _to_number(table[employment[0]]) * 1000,
+        'num_jobs_2034': _to_number(table[employment[1]]) * 1000,
+    })
+    projections = projections.dropna(subset=['median_salary', 'projected_growth', 'num_jobs_2024'])
+    projections[['num_jobs_2024', 'num_jobs_2034']] = projections[['num_jobs_2024', 'num_jobs_2034']].round().astype(np.int64)
+    return projections.drop_duplicates('soc_code').reset_index(drop=True)
+
+def build_occupations(onet_occupations, projections):
+    """
+    Junta títulos e descrições do O*NET às projeções do BLS
+
+    Códigos O*NET (15-1252.00) são associados ao código SOC do BLS (15-1252)
+    pelos 7 primeiros caracteres; ocupações sem projeção são descartadas.
+
+    Args:
+        onet_occupations (pd.DataFrame): occupation_code, occupation_title, description
+        projections (pd.DataFrame): Resultado de load_bls_projections
+
+    Returns:
+        pd.DataFrame: Tabela no formato de occupations_processed.csv
+    """
+    occupations = onet_occupations.assign(soc_code=onet_occupations['occupation_code'].str[:7])
+    occupations = occupations.merge(projections, on='soc_code', how='inner').drop(columns='soc_code')
+    return add_derived_occupation_columns(occupations)
+
+def build_skills_matrix(skills_df, occupation_codes):
+    """
+    Constrói a matriz binária ocupações x habilidades em CSR a partir dos pares
+
+    Args:
+        skills_df (pd.DataFrame): Tabela longa de habilidades
+        occupation_codes (list): Ocupações (linhas), em ordem
+
+    Returns:
+        SparseSkillsMatrix: Matriz uint8 com habilidades em ordem alfabética
+    """
+    skills = sorted(skills_df['skill_name'].unique().tolist())
+    rows = pd.Index(occupation_codes).get_indexer(skills_df['occupation_code'])
+    cols = pd.Index(skills).get_indexer(skills_df['skill_name'])
+    found = rows >= 0
+    matrix = sp.csr_matrix(
+        (np.ones(int(found.sum()), dtype=np.uint8), (rows[found], cols[found])),
+        shape=(len(occupation_codes), len(skills))
+    )
+    matrix.data[:] = 1  # Pares repetidos somam na conversão
+    return SparseSkillsMatrix(matrix, np.asarray(occupation_codes), skills)
+
+def write_matrix_csv(path, sparse_matrix, block_size=2000):
+    """
+    Grava a matriz no formato denso de occupation_skills_matrix.csv, em blocos
+
+    Apenas block_size linhas densas existem na memória por vez.
+
+    Args:
+        path (Path): Caminho do CSV
+        sparse_matrix (SparseSkillsMatrix): Matriz a gravar
+        block_size (int): Linhas convertidas para densas por bloco
+    """
+    matrix = sparse_matrix.matrix
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for start in range(0, max(matrix.shape[0], 1), block_size):
+            block = pd.DataFrame(
+                matrix[start:start + block_size].toarray().astype(np.int64),
+                index=pd.Index(sparse_matrix.occupation_codes[start:start + block_size], name='occupation_code'),
+                columns=sparse_matrix.skills
+            )
+            block.to_csv(f, header=start == 0)
+
+def write_data_files(output_dir, occupations, skills_df, sparse_matrix, matrix_csv=True):
+    """
+    Grava os três arquivos de dados de forma atômica e o cache CSR da matriz
+
+    Args:
+        output_dir (Path): Diretório de dados
+        occupations (pd.DataFrame): Tabela de ocupações
+        skills_df (pd.DataFrame): Tabela longa de habilidades
+        sparse_matrix (SparseSkillsMatrix): Matriz ocupações x habilidades
+        matrix_csv (bool): Grava occupation_skills_matrix.csv; sem ele, apenas
+            o cache CSR é gravado (para matrizes grandes demais para o CSV denso)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _atomic_write(output_dir / OCCUPATIONS_FILE, lambda tmp: occupations.to_csv(tmp, index=False))
+    _atomic_write(output_dir / SKILLS_FILE, lambda tmp: skills_df.to_csv(tmp, index=False))
+    if matrix_csv:
+        _atomic_write(output_dir / MATRIX_FILE, lambda tmp: write_matrix_csv(tmp, sparse_matrix))
+
+    # Deixa pronto o cache CSR usado por load_occupation_skills_matrix_sparse
+    cache_path = output_dir / CACHE_DIR / f'{Path(MATRIX_FILE).stem}.csr.npz'
+    cache_path.parent.mkdir(exist_ok=True)
+    _atomic_write(cache_path, lambda tmp: sparse_matrix.save(tmp))
+    if matrix_csv:
+        _write_cache_manifest(
+            cache_path.with_name(cache_path.name + '.json'), _new_cache_manifest(output_dir / MATRIX_FILE)
+        )
+
+def ingest(onet_dir, bls_path, output_dir=None, chunksize=100000, min_importance=3.0,
+           technology=True, technology_column='Commodity Title'):
+    """
+    Executa a ingestão completa e grava os três arquivos de data/
+
+    Args:
+        onet_dir (Path): Diretório com os arquivos de texto do O*NET
+        bls_path (Path): Planilha de projeções do BLS
+        output_dir (Path, optional): Destino (padrão: data/)
+        chunksize (int): Linhas lidas por bloco dos arquivos do O*NET
+        min_importance (float): Importância mínima (1-5) para reter um elemento
+        technology (bool): Inclui Technology Skills.txt
+        technology_column (str): Coluna de Technology Skills usada como habilidade
+
+    Returns:
+        dict: Número de ocupações, habilidades e pares gravados
+    """
+    onet_dir = Path(onet_dir)
+    output_dir = Path(output_dir) if output_dir else get_data_path()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    onet_occupations = pd.read_csv(
+        onet_dir / ONET_OCCUPATIONS_FILE, sep='\t', dtype=str, keep_default_na=False
+    ).rename(columns={'O*NET-SOC Code': 'occupation_code', 'Title': 'occupation_title', 'Description': 'description'})
+    occupations = build_occupations(
+        onet_occupations[['occupation_code', 'occupation_title', 'description']],
+        load_bls_projections(bls_path)
+    )
+
+    accumulator = SkillPairAccumulator(min_importance=min_importance)
+    for name in ONET_ELEMENT_FILES:
+        if (onet_dir / name).exists():
+            for chunk in iter_element_ratings(onet_dir / name, chunksize=chunksize):
+                accumulator.add_ratings(chunk)
+    if technology and (onet_dir / ONET_TECHNOLOGY_FILE).exists():
+        for chunk in iter_technology_skills(onet_dir / ONET_TECHNOLOGY_FILE, chunksize, technology_column):
+            accumulator.add_technology(chunk)
+
+    skills_df = accumulator.finalize()
+    skills_df = skills_df[skills_df['occupation_code'].isin(occupations['occupation_code'])]
+    occupations = occupations[occupations['occupation_code'].isin(skills_df['occupation_code'])]
+    occupations = occupations.reset_index(drop=True)
+    sparse_matrix = build_skills_matrix(skills_df, occupations['occupation_code'].tolist())
+
+    write_data_files(output_dir, occupations, skills_df, sparse_matrix)
+
+    return {
+        'occupations': len(occupations),
+        'skills': len(sparse_matrix.skills),
+        'pairs': int(sparse_matrix.matrix.nnz),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestão dos arquivos do O*NET e do BLS")
+    parser.add_argument('--onet-dir', required=True, help="Diretório com os .txt do O*NET")
+    parser.add_argument('--bls', required=True, help="Planilha de projeções do BLS (.xlsx ou .csv)")
+    parser.add_argument('--output-dir', default=None, help="Destino dos CSVs (padrão: data/)")
+    parser.add_argument('--chunksize', type=int, default=100000)
+    parser.add_argument('--min-importance', type=float, default=3.0)
+    parser.add_argument('--no-technology', action='store_true', help="Ignora Technology Skills.txt")
+    parser.add_argument('--technology-column', default='Commodity Title', choices=['Commodity Title', 'Example'])
+    parser.add_argument('--publish', action='store_true',
+                        help="Publica o índice de recomendação ao final (só com o destino padrão)")
+    args = parser.parse_args(argv)
+    if args.publish and args.output_dir:
+        # O artefato é publicado a partir de data/ (ou GS2_DATA_DIR), não de --output-dir
+        parser.error("--publish não pode ser usado com --output-dir; publique com GS2_DATA_DIR apontando para o destino")
+
+    try:
+        summary = ingest(
+            args.onet_dir, args.bls, output_dir=args.output_dir, chunksize=args.chunksize,
+            min_importance=args.min_importance, technology=not args.no_technology,
+            technology_column=args.technology_column
+        )
+    except (OSError, KeyError, ImportError, pd.errors.ParserError) as e:
+        print(f"Falha na ingestão: {e}", file=sys.stderr)
+        return 1
+
+    print(
+        f"{summary['occupations']} ocupações, {summary['skills']} habilidades, "
+        f"{summary['pairs']} pares ocupação-habilidade"
+    )
+
+    if args.publish:
+        return index_artifact.main(['publish'])
+    print("Publique o índice com: python -m utils.index_artifact publish")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
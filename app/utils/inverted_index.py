@@ -0,0 +1,205 @@
+"""
+Busca exata por índice invertido (listas de ocorrência por habilidade)
+
+Para perfis esparsos (poucas habilidades), apenas as ocupações que
+compartilham alguma habilidade com o usuário podem ter score positivo. As
+listas de ocorrência das habilidades da consulta são percorridas termo a
+termo, da maior para a menor contribuição máxima possível, no estilo
+MaxScore: quando a soma das contribuições máximas dos termos restantes fica
+abaixo do k-ésimo score parcial, nenhuma ocupação nova pode entrar no top-k e
+a admissão de candidatos termina. Os candidatos são então pontuados de forma
+exata com o mesmo produto da busca por força bruta, e o ranking é idêntico ao
+da busca densa (inclusive empates e ocupações com score zero).
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.inverted_index benchmark --queries 1000 --k 10
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .ann import sample_queries
+from .recommender import _top_k_indices, build_recommender_index
+
+# Folga para erros de arredondamento ao comparar somas parciais em float32
+_BOUND_EPS = 1e-5
+
+class InvertedSkillIndex:
+    """
+    Listas de ocorrência (habilidade -> ocupações) da matriz normalizada
+
+    Args:
+        matrix (np.array | sp.csr_matrix): Matriz ocupações x habilidades
+            normalizada (ex.: ``RecommenderIndex.matrix``)
+    """
+
+    def __init__(self, matrix):
+        postings = sp.csc_matrix(matrix, dtype=np.float32)
+        postings.sort_indices()
+        self.shape = matrix.shape
+        self.offsets = postings.indptr.astype(np.int64)
+        self.rows = postings.indices.astype(np.int64)
+        self.weights = postings.data
+        # Maior peso de cada habilidade: limite superior da sua contribuição
+        self.max_weights = np.zeros(matrix.shape[1], dtype=np.float32)
+        nonempty = np.flatnonzero(np.diff(self.offsets))
+        if len(nonempty):
+            self.max_weights[nonempty] = np.maximum.reduceat(self.weights, self.offsets[nonempty])
+        self._matrix = matrix
+        self._scratch = threading.local()
+
+    def _accumulators(self):
+        """Acumuladores por thread (scores parciais e marcas de candidato), reutilizados entre consultas"""
+        scratch = self._scratch
+        if not hasattr(scratch, 'scores'):
+            scratch.scores = np.zeros(self.shape[0], dtype=np.float32)
+            scratch.seen = np.zeros(self.shape[0], dtype=bool)
+        return scratch.scores, scratch.seen
+
+    def candidates(self, query_vector, k):
+        """
+        Gera os candidatos ao top-k com admissão limitada (MaxScore)
+
+        Args:
+            query_vector (np.array): Vetor normalizado do usuário
+            k (int): Tamanho do top-k
+
+        Returns:
+            tuple: (linhas candidatas em ordem crescente, postings visitados
+                nesta consulta); toda ocupação fora das candidatas tem score
+                menor que o k-ésimo score entre elas
+        """
+        cols = np.flatnonzero(query_vector)
+        bounds = query_vector[cols] * self.max_weights[cols]
+        order = np.argsort(-bounds, kind='stable')
+        cols, bounds = cols[order], bounds[order]
+        # remaining[i]: maior contribuição possível dos termos i, i+1, ...
+        remaining = np.cumsum(bounds[::-1])[::-1]
+
+        accumulated, seen = self._accumulators()
+        admitted = []
+        n_candidates = 0
+        n_postings = 0
+        try:
+            for i, col in enumerate(cols):
+                if n_candidates >= k:
+                    partial = accumulated[np.concatenate(admitted)]
+                    threshold = np.partition(partial, n_candidates - k)[n_candidates - k]
+                    if remaining[i] < threshold * (1 - _BOUND_EPS):
+                        break
+
+                start, stop = self.offsets[col], self.offsets[col + 1]
+                n_postings += int(stop - start)
+                posting_rows = self.rows[start:stop]
+                # Cada linha aparece uma única vez por lista, então a soma indexada é exata
+                accumulated[posting_rows] += query_vector[col] * self.weights[start:stop]
+                new_rows = posting_rows[~seen[posting_rows]]
+                seen[new_rows] = True
+                admitted.append(new_rows)
+                n_candidates += len(new_rows)
+        finally:
+            rows = np.concatenate(admitted) if admitted else np.empty(0, dtype=np.int64)
+            accumulated[rows] = 0
+            # Toda linha acumulada foi admitida: limpar os candidatos zera os acumuladores
+            seen[rows] = False
+
+        return np.sort(rows), n_postings
+
+    def query(self, query_vector, k=10):
+        """
+        Busca exata das k ocupações mais similares
+
+        Args:
+            query_vector (np.array): Vetor normalizado do usuário
+            k (int): Número de ocupações a retornar
+
+        Returns:
+            tuple: (linhas, scores) em ordem decrescente de similaridade, com
+                empates pela ordem das linhas
+        """
+        n_rows = self.shape[0]
+        k = min(k, n_rows)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows, _ = self.candidates(query_vector, k)
+        scores = np.asarray(self._matrix[rows] @ query_vector, dtype=np.float32).ravel()
+        positive = scores > 0
+        rows, scores = rows[positive], scores[positive]
+        top = _top_k_indices(scores, k)
+        rows, scores = rows[top], scores[top]
+
+        if len(rows) < k:
+            # Completa com as primeiras ocupações de score zero, como na busca densa
+            padding = np.ones(n_rows, dtype=bool)
+            padding[rows] = False
+            zero_rows = np.flatnonzero(padding)[:k - len(rows)]
+            rows = np.concatenate([rows, zero_rows])
+            scores = np.concatenate([scores, np.zeros(len(zero_rows), dtype=np.float32)])
+        return rows, scores
+
+def benchmark(recommender_index, inverted_index, queries, k=10):
+    """
+    Compara latência e ranking da busca invertida com a força bruta
+
+    Args:
+        recommender_index (RecommenderIndex): Índice exato
+        inverted_index (InvertedSkillIndex): Índice invertido da mesma matriz
+        queries (list): Lista de listas de habilidades
+        k (int): Tamanho do top-k
+
+    Returns:
+        pd.DataFrame: Latências médias (ms), postings visitados por consulta e
+            número de rankings diferentes da força bruta
+    """
+    vectors = [recommender_index.user_vector(query) for query in queries]
+
+    start = time.perf_counter()
+    exact = []
+    for vector in vectors:
+        scores = recommender_index.matrix @ vector
+        exact.append(_top_k_indices(scores, k))
+    exact_ms = (time.perf_counter() - start) * 1000 / len(vectors)
+
+    start = time.perf_counter()
+    inverted = [inverted_index.query(vector, k=k)[0] for vector in vectors]
+    inverted_ms = (time.perf_counter() - start) * 1000 / len(vectors)
+    # Contados fora da medição, por consulta (o índice é compartilhado entre threads)
+    n_postings = sum(inverted_index.candidates(vector, min(k, inverted_index.shape[0]))[1] for vector in vectors)
+
+    mismatches = sum(not np.array_equal(a, b) for a, b in zip(exact, inverted))
+    return pd.DataFrame([{
+        'exact_ms': exact_ms,
+        'inverted_ms': inverted_ms,
+        'avg_postings': n_postings / len(vectors),
+        'n_occupations': recommender_index.matrix.shape[0],
+        'mismatches': mismatches,
+    }])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca exata por índice invertido")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench = subparsers.add_parser('benchmark', help="Compara com a força bruta")
+    bench.add_argument('--queries', type=int, default=1000)
+    bench.add_argument('--k', type=int, default=10)
+    bench.add_argument('--backend', choices=['dense', 'sparse'], default='dense')
+    args = parser.parse_args(argv)
+
+    recommender_index = build_recommender_index(backend=args.backend)
+    if recommender_index.empty:
+        print("Dados não encontrados. Execute o notebook primeiro.", file=sys.stderr)
+        return 1
+
+    inverted_index = InvertedSkillIndex(recommender_index.matrix)
+    queries = sample_queries(recommender_index.skills, n_queries=args.queries)
+    print(benchmark(recommender_index, inverted_index, queries, k=args.k).to_string(index=False))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
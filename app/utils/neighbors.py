@@ -0,0 +1,163 @@
+"""
+Cálculo offline da tabela de ocupações similares ("carreiras próximas")
+
+A similaridade do cosseno entre todas as ocupações é calculada em blocos de
+linhas (bloco x ocupações scores por vez, em vez da matriz N x N inteira) e,
+de cada bloco, só os k vizinhos mais próximos são guardados. Os blocos podem
+ser distribuídos entre processos. O resultado é gravado como
+NeighborTable (índices int32 e similaridades float16) ao lado do artefato do
+índice, em app/model/, e servido por recommender.get_similar_occupations.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.neighbors build --k 10 --workers 0
+    python -m utils.neighbors show 15-1252.00
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import scipy.sparse as sp
+
+from .index_artifact import load_index_artifact
+from .recommender import (
+    NEIGHBORS_FILE,
+    NeighborTable,
+    _top_k_rows,
+    build_recommender_index,
+    get_model_path,
+    get_similar_occupations,
+)
+
+# Limite de células (float32) da matriz de similaridades de um bloco
+MAX_BLOCK_CELLS = 1 << 25
+
+def neighbor_block(matrix, candidates, start, stop, k):
+    """
+    Vizinhos mais próximos das linhas [start, stop)
+
+    Args:
+        matrix (np.array | sp.csr_matrix): Matriz normalizada (L2)
+        candidates (np.array): Máscara das linhas que podem ser vizinhas
+        start (int): Primeira linha do bloco
+        stop (int): Linha final do bloco (exclusiva)
+        k (int): Número de vizinhos
+
+    Returns:
+        tuple: (índices int32, similaridades float16), bloco x k; -1 e 0 onde
+            não há vizinho
+    """
+    if sp.issparse(matrix):
+        # Esparsa x densa (bloco transposto) é mais rápido que o produto esparso x esparso
+        similarities = (matrix @ matrix[start:stop].T.toarray()).T
+    else:
+        similarities = matrix[start:stop] @ matrix.T
+    similarities = np.ascontiguousarray(similarities, dtype=np.float32)
+    similarities[:, ~candidates] = -np.inf
+    similarities[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+    rows, scores = _top_k_rows(similarities, min(k, similarities.shape[1]))
+    missing = np.isneginf(scores)
+    rows[missing] = -1
+    scores[missing] = 0
+    return rows.astype(np.int32), scores.astype(np.float16)
+
+_worker_state = None
+
+def _init_worker(matrix, candidates, k):
+    global _worker_state
+    _worker_state = (matrix, candidates, k)
+
+def _neighbor_worker(bounds):
+    matrix, candidates, k = _worker_state
+    return neighbor_block(matrix, candidates, *bounds, k)
+
+def compute_neighbor_table(index, k=10, block_size=None, workers=1):
+    """
+    Calcula os k vizinhos de cada ocupação do índice
+
+    Apenas ocupações com metadados podem ser vizinhas; uma ocupação nunca é
+    vizinha de si mesma.
+
+    Args:
+        index (RecommenderIndex): Índice de recomendação
+        k (int): Número de vizinhos por ocupação
+        block_size (int, optional): Linhas por bloco (padrão: o maior bloco
+            com até MAX_BLOCK_CELLS similaridades)
+        workers (int): Processos; 1 calcula no processo atual
+
+    Returns:
+        NeighborTable: Tabela com índices int32 e similaridades float16
+    """
+    matrix = index.matrix
+    n_rows = matrix.shape[0]
+    candidates = index.metadata_rows >= 0
+    block_size = block_size or max(1, MAX_BLOCK_CELLS // max(n_rows, 1))
+    blocks = [(start, min(start + block_size, n_rows)) for start in range(0, n_rows, block_size)]
+
+    if workers > 1 and len(blocks) > 1:
+        # Com fork, a matriz é herdada pelos processos sem ser serializada
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(matrix, candidates, k)
+        ) as pool:
+            results = list(pool.map(_neighbor_worker, blocks))
+    else:
+        results = [neighbor_block(matrix, candidates, start, stop, k) for start, stop in blocks]
+
+    k = min(k, n_rows)
+    neighbors = np.concatenate([rows for rows, _ in results]) if results else np.empty((0, k), dtype=np.int32)
+    similarities = np.concatenate([scores for _, scores in results]) if results else np.empty((0, k), dtype=np.float16)
+    header = {
+        'k': int(neighbors.shape[1]),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'n_occupations': int(n_rows),
+        'index_content_hash': getattr(index, 'header', {}).get('content_hash'),
+    }
+    return NeighborTable(index.occupation_codes, neighbors, similarities, header=header)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tabela de ocupações similares")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="Calcula e salva a tabela em app/model/")
+    build.add_argument('--k', type=int, default=10)
+    build.add_argument('--block-size', type=int, default=None)
+    build.add_argument('--workers', type=int, default=1, help="Processos (0 = todos os núcleos)")
+    show = subparsers.add_parser('show', help="Mostra as ocupações similares a uma ocupação")
+    show.add_argument('occupation_code')
+    show.add_argument('--top', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == 'show':
+        similar = get_similar_occupations(args.occupation_code, top_n=args.top)
+        if not similar:
+            print("Ocupação sem vizinhos na tabela. Execute: python -m utils.neighbors build", file=sys.stderr)
+            return 1
+        for entry in similar:
+            print(f"{entry['occupation_code']}  {entry['similarity']:.1f}%")
+        return 0
+
+    try:
+        index = load_index_artifact()
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        index = build_recommender_index()
+    if index.empty:
+        print("Dados não encontrados. Execute o notebook primeiro.", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    table = compute_neighbor_table(index, k=args.k, block_size=args.block_size, workers=args.workers or os.cpu_count())
+    path = get_model_path() / NEIGHBORS_FILE
+    table.save(path)
+    print(
+        f"Tabela de vizinhos ({len(table.occupation_codes)} ocupações, k={table.k}) salva em {path} "
+        f"em {time.perf_counter() - start:.1f}s"
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,10 +4,22 @@ Módulo para sistema de recomendação de profissões
 
 import pandas as pd
 import numpy as np
-import joblib
+import scipy.sparse as sp
+import json
 from pathlib import Path
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.neighbors import NearestNeighbors
+
+from .data_loader import (
+    SparseSkillsMatrix,
+    get_catalog,
+    load_occupation_skills_matrix,
+    load_occupation_skills_matrix_sparse,
+    _atomic_write,
+    load_occupations_data
+)
+from .tracing import span, traced
+from .vocabulary import SkillVocabulary, load_skill_aliases
+
+NEIGHBORS_FILE = 'occupation_neighbors.npz'
 
 def get_model_path():
     """Retorna o caminho para o diretório de modelos"""
@@ -20,6 +32,8 @@ def load_model():
     Returns:
         object: Modelo carregado
     """
+    import joblib  # importado sob demanda: o app não precisa dele na inicialização
+    
     model_path = get_model_path()
     try:
         model = joblib.load(model_path / 'model.pkl')
@@ -35,6 +49,8 @@ def load_preprocessor():
     Returns:
         object: Pré-processador carregado
     """
+    import joblib
+    
     model_path = get_model_path()
     try:
         preprocessor = joblib.load(model_path / 'preprocessor.pkl')
@@ -43,53 +59,404 @@ def load_preprocessor():
         print("Pré-processador não encontrado. Execute o notebook primeiro.")
         return None
 
+@traced()
 def create_user_skills_vector(selected_skills, all_skills):
     """
     Cria vetor de habilidades do usuário
     
     Args:
         selected_skills (list): Lista de habilidades selecionadas pelo usuário
-        all_skills (list): Lista de todas as habilidades disponíveis
+        all_skills (list | SkillVocabulary): Todas as habilidades disponíveis;
+            com um vocabulário, sinônimos e grafias equivalentes são aceitos
         
     Returns:
         np.array: Vetor binário de habilidades
     """
+    if not isinstance(all_skills, SkillVocabulary):
+        all_skills = SkillVocabulary(all_skills)
     skills_vector = np.zeros(len(all_skills))
-    
-    for skill in selected_skills:
-        if skill in all_skills:
-            idx = all_skills.index(skill)
-            skills_vector[idx] = 1
+    skills_vector[all_skills.ids(selected_skills)] = 1
     
     return skills_vector
 
+@traced()
 def calculate_similarity(user_vector, occupation_matrix):
     """
     Calcula similaridade entre vetor do usuário e ocupações
     
     Args:
         user_vector (np.array): Vetor de habilidades do usuário
-        occupation_matrix (pd.DataFrame): Matriz de ocupações x habilidades
+        occupation_matrix (pd.DataFrame | SparseSkillsMatrix): Matriz de
+            ocupações x habilidades, densa ou esparsa
         
     Returns:
         pd.Series: Série com scores de similaridade por ocupação
     """
+    # scikit-learn (~1s de importação) só é carregado por esta função legada
+    from sklearn.metrics.pairwise import cosine_similarity
+    
     # Reshape para 2D se necessário
     if len(user_vector.shape) == 1:
         user_vector = user_vector.reshape(1, -1)
     
-    # Calcula similaridade do cosseno
-    similarities = cosine_similarity(user_vector, occupation_matrix.values)
+    # Calcula similaridade do cosseno (produtos esparsos para matrizes CSR)
+    if isinstance(occupation_matrix, SparseSkillsMatrix):
+        similarities = cosine_similarity(user_vector, occupation_matrix.matrix)
+        occupation_index = pd.Index(occupation_matrix.occupation_codes, name='occupation_code')
+    else:
+        similarities = cosine_similarity(user_vector, occupation_matrix.values)
+        occupation_index = occupation_matrix.index
     
     # Cria série com índices das ocupações
     similarity_scores = pd.Series(
         similarities[0], 
-        index=occupation_matrix.index
+        index=occupation_index
     )
     
     return similarity_scores
 
-def get_recommendations(selected_skills, occupation_skills_matrix, occupations_df, top_n=10):
+@traced('recommender.top_k')
+def _top_k_indices(scores, k):
+    """
+    Seleciona os índices dos k maiores scores com argpartition
+    
+    Empates são resolvidos pela ordem das linhas, como em ``Series.nlargest``.
+    
+    Args:
+        scores (np.array): Vetor de scores
+        k (int): Número de índices a retornar
+        
+    Returns:
+        np.array: Índices ordenados por score decrescente
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    
+    if k >= n:
+        candidates = np.arange(n)
+    else:
+        partition = np.argpartition(-scores, k - 1)[:k]
+        # Inclui empates com o k-ésimo score para manter a ordem estável
+        candidates = np.flatnonzero(scores >= scores[partition].min())
+    
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order[:k]]
+
+class RecommenderIndex:
+    """
+    Índice pré-computado para recomendações de profissões
+    
+    Construído uma única vez a partir da matriz ocupações x habilidades e do
+    DataFrame de ocupações. Mantém a matriz normalizada (L2) em float32
+    contígua, o mapa habilidade -> coluna e o mapa ocupação -> linha de
+    metadados, de forma que cada consulta custa um produto matriz-vetor e um
+    ``argpartition``.
+    
+    Com uma SparseSkillsMatrix, a matriz normalizada é mantida em CSR float32
+    e as consultas usam produtos esparsos, com os mesmos resultados.
+    
+    Args:
+        occupation_skills_matrix (pd.DataFrame | SparseSkillsMatrix): Matriz
+            ocupações x habilidades, densa ou esparsa
+        occupations_df (pd.DataFrame): DataFrame com informações das ocupações
+    """
+    
+    def __init__(self, occupation_skills_matrix, occupations_df):
+        if isinstance(occupation_skills_matrix, SparseSkillsMatrix):
+            occupation_codes = occupation_skills_matrix.occupation_codes
+            skills = occupation_skills_matrix.skills
+            matrix = occupation_skills_matrix.matrix.astype(np.float32)
+            norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float32)).ravel()
+            norms[norms == 0] = 1
+            matrix = sp.csr_matrix(sp.diags(1 / norms) @ matrix, dtype=np.float32)
+        else:
+            occupation_codes = occupation_skills_matrix.index.to_numpy()
+            skills = occupation_skills_matrix.columns
+            matrix = occupation_skills_matrix.to_numpy(dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            matrix = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+        
+        self._set_structures(matrix, occupation_codes, skills, occupations_df)
+    
+    @classmethod
+    def from_normalized(cls, matrix, occupation_codes, skills, occupations_df):
+        """
+        Cria o índice a partir de uma matriz já normalizada (L2)
+        
+        Usado ao carregar artefatos persistidos, sem renormalizar a matriz.
+        
+        Args:
+            matrix (np.array | sp.csr_matrix): Matriz normalizada float32
+            occupation_codes (np.array): Códigos das ocupações (linhas)
+            skills (list): Nomes das habilidades (colunas)
+            occupations_df (pd.DataFrame): DataFrame com informações das ocupações
+            
+        Returns:
+            RecommenderIndex: Índice pronto para consultas
+        """
+        index = cls.__new__(cls)
+        if sp.issparse(matrix):
+            matrix = sp.csr_matrix(matrix, dtype=np.float32)
+        else:
+            matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        index._set_structures(matrix, occupation_codes, skills, occupations_df)
+        return index
+    
+    def _set_structures(self, matrix, occupation_codes, skills, occupations_df):
+        self.matrix = matrix
+        self.occupation_codes = np.asarray(occupation_codes)
+        self.skills = list(skills)
+        # Mapa de ids compartilhado com os vetorizadores (sinônimos resolvidos sob demanda)
+        self.vocabulary = SkillVocabulary(self.skills, aliases=load_skill_aliases())
+        self.skill_to_col = self.vocabulary.skill_to_id
+        
+        # Linha de metadados de cada ocupação da matriz (-1 se ausente)
+        self.occupations_df = occupations_df.reset_index(drop=True)
+        if 'occupation_code' in self.occupations_df.columns:
+            code_to_row = pd.Series(
+                np.arange(len(self.occupations_df)),
+                index=self.occupations_df['occupation_code']
+            )
+            code_to_row = code_to_row[~code_to_row.index.duplicated()]
+            self.metadata_rows = (
+                code_to_row.reindex(self.occupation_codes).fillna(-1).to_numpy(dtype=np.int64, copy=True)
+            )
+        else:
+            self.metadata_rows = np.full(len(self.occupation_codes), -1, dtype=np.int64)
+        
+        # Colunas ordenadas e máscaras de filtros, construídas sob demanda
+        self._sorted_columns = {}
+        self._filter_masks = {}
+    
+    def _metadata_column(self, column):
+        """Valores de uma coluna de metadados na ordem das linhas da matriz (NaN se ausente)"""
+        values = np.full(len(self.occupation_codes), np.nan)
+        found = self.metadata_rows >= 0
+        if column in self.occupations_df.columns:
+            values[found] = self.occupations_df[column].to_numpy(dtype=np.float64)[self.metadata_rows[found]]
+        return values
+    
+    def _sorted_column(self, column):
+        """Permutação das linhas que ordena a coluna (sem NaN) e os valores ordenados"""
+        if column not in self._sorted_columns:
+            values = self._metadata_column(column)
+            rows = np.flatnonzero(~np.isnan(values))
+            order = rows[np.argsort(values[rows], kind='stable')]
+            self._sorted_columns[column] = (order, values[order])
+        return self._sorted_columns[column]
+    
+    def filter_mask(self, min_salary=None, min_growth=None, future_only=False):
+        """
+        Máscara das ocupações que satisfazem os filtros
+        
+        Os mínimos são resolvidos por busca binária nas colunas ordenadas e as
+        máscaras são guardadas por combinação de filtros.
+        
+        Args:
+            min_salary (float, optional): Salário anual mínimo
+            min_growth (float, optional): Crescimento projetado mínimo (%)
+            future_only (bool): Apenas profissões do futuro
+            
+        Returns:
+            np.array: Máscara booleana na ordem das linhas da matriz, ou None
+                se nenhum filtro for informado
+        """
+        if min_salary is None and min_growth is None and not future_only:
+            return None
+        
+        key = (min_salary, min_growth, bool(future_only))
+        mask = self._filter_masks.get(key)
+        if mask is not None:
+            return mask
+        
+        mask = self.metadata_rows >= 0
+        if future_only:
+            mask &= self._metadata_column('is_future_job') == 1
+        for column, minimum in (('median_salary', min_salary), ('projected_growth', min_growth)):
+            if minimum is not None:
+                order, values = self._sorted_column(column)
+                column_mask = np.zeros(len(mask), dtype=bool)
+                column_mask[order[np.searchsorted(values, minimum, side='left'):]] = True
+                mask &= column_mask
+        
+        mask.flags.writeable = False
+        if len(self._filter_masks) >= 256:
+            self._filter_masks.clear()
+        self._filter_masks[key] = mask
+        return mask
+    
+    @property
+    def empty(self):
+        """Indica se o índice não possui ocupações ou habilidades"""
+        return 0 in self.matrix.shape or self.occupations_df.empty
+    
+    @property
+    def is_sparse(self):
+        """Indica se a matriz normalizada está em formato CSR"""
+        return sp.issparse(self.matrix)
+    
+    @traced('recommender.user_vector')
+    def user_vector(self, selected_skills):
+        """
+        Cria o vetor normalizado de habilidades do usuário
+        
+        Args:
+            selected_skills (list): Lista de habilidades selecionadas
+            
+        Returns:
+            np.array: Vetor float32 com norma L2 unitária (ou nulo)
+        """
+        vector = np.zeros(len(self.skills), dtype=np.float32)
+        cols = self.vocabulary.ids(selected_skills)
+        if cols:
+            vector[cols] = 1
+            vector /= np.sqrt(np.float32(np.count_nonzero(vector)))
+        return vector
+    
+    @traced('recommender.similarity')
+    def scores(self, selected_skills):
+        """
+        Calcula a similaridade do cosseno com todas as ocupações
+        
+        Args:
+            selected_skills (list): Lista de habilidades selecionadas
+            
+        Returns:
+            np.array: Scores de similaridade na ordem das linhas da matriz
+        """
+        return self.matrix @ self.user_vector(selected_skills)
+    
+    def recommend(self, selected_skills, top_n=10, ann_index=None, n_probes=2,
+                  min_salary=None, min_growth=None, future_only=False, inverted_index=None):
+        """
+        Obtém as top_n recomendações para as habilidades selecionadas
+        
+        Com filtros, apenas as ocupações que os satisfazem entram na seleção
+        do top-k, de modo que são retornadas top_n ocupações qualificadas
+        (ou todas, se houver menos).
+        
+        Args:
+            selected_skills (list): Lista de habilidades selecionadas
+            top_n (int): Número de recomendações a retornar
+            ann_index (LSHIndex, optional): Índice aproximado (utils.ann). Quando
+                informado, substitui a busca exata por força bruta (ignorado
+                quando há filtros)
+            n_probes (int): Buckets vizinhos visitados por tabela do índice
+                aproximado; valores maiores aumentam recall e latência
+            min_salary (float, optional): Salário anual mínimo
+            min_growth (float, optional): Crescimento projetado mínimo (%)
+            future_only (bool): Apenas profissões do futuro
+            inverted_index (InvertedSkillIndex, optional): Índice invertido
+                (utils.inverted_index). Quando informado, pontua apenas as
+                ocupações que compartilham habilidades com o usuário, com o
+                mesmo ranking da força bruta (ignorado quando há filtros)
+            
+        Returns:
+            pd.DataFrame: DataFrame com as top_n recomendações
+        """
+        if self.empty:
+            return pd.DataFrame()
+        
+        mask = self.filter_mask(min_salary=min_salary, min_growth=min_growth, future_only=future_only)
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            vector = self.user_vector(selected_skills)
+            with span('recommender.similarity'):
+                scores = self.matrix[candidates] @ vector
+            top = _top_k_indices(scores, top_n)
+            return self._join_metadata(candidates[top], scores[top])
+        
+        if inverted_index is not None:
+            top_rows, top_scores = inverted_index.query(self.user_vector(selected_skills), k=top_n)
+            return self._join_metadata(top_rows, top_scores)
+        
+        if ann_index is not None:
+            top_rows, top_scores = ann_index.query(
+                self.user_vector(selected_skills), k=top_n, n_probes=n_probes
+            )
+            return self._join_metadata(top_rows, top_scores)
+        
+        scores = self.scores(selected_skills)
+        top_rows = _top_k_indices(scores, top_n)
+        return self._join_metadata(top_rows, scores[top_rows])
+    
+    def recommend_batch(self, profiles, top_n=10, as_records=False):
+        """
+        Obtém recomendações para vários perfis com um único produto de matrizes
+        
+        Args:
+            profiles (list): Lista de listas de habilidades, uma por usuário
+            top_n (int | list): Número de recomendações (um valor para todos
+                ou um por perfil)
+            as_records (bool): Retorna listas de dicionários em vez de
+                DataFrames, evitando o custo do pandas por perfil
+            
+        Returns:
+            list: Um DataFrame (ou lista de dicionários) de recomendações por perfil
+        """
+        top_ns = [top_n] * len(profiles) if np.isscalar(top_n) else list(top_n)
+        join = self._join_records if as_records else self._join_metadata
+        if self.empty or not profiles:
+            return [join(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in profiles]
+        
+        user_matrix = create_user_skills_matrix(profiles, self.vocabulary)
+        k = min(max(top_ns), self.matrix.shape[0])
+        rows, scores = _top_k_batch(user_matrix, self.matrix, k)
+        # O top-k de cada perfil é prefixo do top-max(k), com a mesma ordem de empates
+        return [
+            join(profile_rows[:n], profile_scores[:n])
+            for profile_rows, profile_scores, n in zip(rows, scores, top_ns)
+        ]
+    
+    @traced('recommender.join_metadata')
+    def _join_records(self, rows, scores):
+        """Como _join_metadata, mas retorna uma lista de dicionários"""
+        if not hasattr(self, '_metadata_records'):
+            self._metadata_records = self.occupations_df.to_dict('records')
+        
+        records = []
+        for metadata_row, score in zip(self.metadata_rows[rows].tolist(), scores.tolist()):
+            if metadata_row >= 0:
+                record = dict(self._metadata_records[metadata_row])
+                record['similarity_score'] = score * 100  # Converte para porcentagem
+                records.append(record)
+        return records
+    
+    @traced('recommender.join_metadata')
+    def _join_metadata(self, rows, scores):
+        """Junta os metadados das ocupações aos scores das linhas informadas"""
+        metadata_rows = self.metadata_rows[rows]
+        found = metadata_rows >= 0
+        
+        recommendations = self.occupations_df.iloc[metadata_rows[found]].reset_index(drop=True)
+        recommendations['similarity_score'] = scores[found].astype(np.float64) * 100  # Converte para porcentagem
+        return recommendations
+
+def build_recommender_index(backend='dense'):
+    """
+    Constrói o índice de recomendação a partir dos arquivos de dados
+    
+    Args:
+        backend (str): 'dense' para a matriz densa ou 'sparse' para CSR
+        
+    Returns:
+        RecommenderIndex: Índice construído a partir de occupation_skills_matrix.csv
+            e occupations_processed.csv
+    """
+    if backend == 'sparse':
+        matrix = load_occupation_skills_matrix_sparse()
+    elif backend == 'dense':
+        matrix = load_occupation_skills_matrix()
+    else:
+        raise ValueError(f"Backend desconhecido: {backend}")
+    
+    return RecommenderIndex(matrix, load_occupations_data())
+
+def get_recommendations(selected_skills, occupation_skills_matrix, occupations_df, top_n=10, index=None,
+                        ann_index=None, n_probes=2, min_salary=None, min_growth=None, future_only=False,
+                        inverted_index=None):
     """
     Obtém recomendações de profissões baseadas nas habilidades do usuário
     
@@ -98,38 +465,148 @@ def get_recommendations(selected_skills, occupation_skills_matrix, occupations_d
         occupation_skills_matrix (pd.DataFrame): Matriz ocupações x habilidades
         occupations_df (pd.DataFrame): DataFrame com informações das ocupações
         top_n (int): Número de recomendações a retornar
+        index (RecommenderIndex, optional): Índice pré-construído. Quando
+            omitido, é construído a partir da matriz e das ocupações
+        ann_index (LSHIndex, optional): Índice aproximado associado à matriz do
+            índice (ver utils.ann.load_ann_index). Quando omitido, a busca é exata
+        n_probes (int): Ajuste de recall x latência da busca aproximada
+        min_salary (float, optional): Salário anual mínimo
+        min_growth (float, optional): Crescimento projetado mínimo (%)
+        future_only (bool): Apenas profissões do futuro
+        inverted_index (InvertedSkillIndex, optional): Índice invertido da
+            matriz do índice (ver utils.inverted_index); ranking idêntico ao exato
         
     Returns:
-        pd.DataFrame: DataFrame com as top_n recomendações
+        pd.DataFrame: DataFrame com as top_n recomendações que satisfazem os filtros
     """
-    if occupation_skills_matrix.empty or occupations_df.empty:
-        return pd.DataFrame()
+    if index is None:
+        if occupation_skills_matrix.empty or occupations_df.empty:
+            return pd.DataFrame()
+        index = RecommenderIndex(occupation_skills_matrix, occupations_df)
     
-    # Obtém lista de todas as habilidades
-    all_skills = occupation_skills_matrix.columns.tolist()
+    return index.recommend(
+        selected_skills, top_n=top_n, ann_index=ann_index, n_probes=n_probes,
+        min_salary=min_salary, min_growth=min_growth, future_only=future_only,
+        inverted_index=inverted_index
+    )
+
+def create_user_skills_matrix(profiles, vocabulary):
+    """
+    Cria matriz esparsa usuários x habilidades a partir de vários perfis
     
-    # Cria vetor de habilidades do usuário
-    user_vector = create_user_skills_vector(selected_skills, all_skills)
+    As habilidades são resolvidas pelo vocabulário do índice (nomes,
+    sinônimos e grafias equivalentes), como na consulta individual.
     
-    # Calcula similaridade
-    similarity_scores = calculate_similarity(user_vector, occupation_skills_matrix)
+    Args:
+        profiles (list): Lista de listas de habilidades, uma por usuário
+        vocabulary (SkillVocabulary): Vocabulário do índice (``index.vocabulary``)
+        
+    Returns:
+        sp.csr_matrix: Matriz binária float32 (n_usuários x n_habilidades)
+        
+    Raises:
+        TypeError: Se vocabulary não for um SkillVocabulary (um mapa
+            habilidade -> coluna ignoraria os sinônimos)
+    """
+    if not isinstance(vocabulary, SkillVocabulary):
+        raise TypeError("vocabulary deve ser o SkillVocabulary do índice (index.vocabulary)")
+    indptr = [0]
+    indices = []
+    for skills in profiles:
+        indices.extend(sorted(vocabulary.ids(skills)))
+        indptr.append(len(indices))
     
-    # Ordena por similaridade
-    top_occupations = similarity_scores.nlargest(top_n)
+    data = np.ones(len(indices), dtype=np.float32)
+    return sp.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(profiles), len(vocabulary))
+    )
+
+def get_recommendations_batch(user_skills_matrix, index, top_n=10, chunk_size=1024):
+    """
+    Obtém recomendações para vários usuários de uma só vez
     
-    # Prepara DataFrame de resultados
-    recommendations = []
-    for occupation_code, similarity in top_occupations.items():
-        occupation_info = occupations_df[
-            occupations_df['occupation_code'] == occupation_code
-        ]
+    Os perfis são processados em blocos de chunk_size linhas, com um único
+    produto matriz esparsa x matriz densa por bloco, o que mantém o uso de
+    memória limitado a chunk_size x n_ocupações scores.
+    
+    Args:
+        user_skills_matrix (sp.spmatrix): Matriz usuários x habilidades, com as
+            colunas na ordem de ``index.skills``
+        index (RecommenderIndex): Índice de recomendação pré-construído
+        top_n (int): Número de recomendações por usuário
+        chunk_size (int): Número de usuários pontuados por bloco
         
-        if not occupation_info.empty:
-            occupation_data = occupation_info.iloc[0].to_dict()
-            occupation_data['similarity_score'] = similarity * 100  # Converte para porcentagem
-            recommendations.append(occupation_data)
+    Returns:
+        tuple: (códigos, scores) como arrays n_usuários x top_n, com os scores
+            de similaridade em porcentagem e ordenados de forma decrescente
+    """
+    user_skills_matrix = sp.csr_matrix(user_skills_matrix, dtype=np.float32)
+    n_users = user_skills_matrix.shape[0]
+    # Linhas removidas por segmentos delta (SegmentedIndex) nunca são recomendadas
+    live_rows = getattr(index, 'live_rows', None)
+    excluded = None if live_rows is None else ~live_rows
+    n_live = index.matrix.shape[0] if live_rows is None else int(live_rows.sum())
+    k = min(top_n, n_live)
     
-    return pd.DataFrame(recommendations)
+    codes = np.empty((n_users, k), dtype=index.occupation_codes.dtype)
+    scores = np.empty((n_users, k), dtype=np.float32)
+    
+    for start in range(0, n_users, chunk_size):
+        stop = min(start + chunk_size, n_users)
+        chunk_rows, chunk_scores = _top_k_batch(user_skills_matrix[start:stop], index.matrix, k, excluded)
+        codes[start:stop] = index.occupation_codes[chunk_rows]
+        scores[start:stop] = chunk_scores * 100  # Converte para porcentagem
+    
+    return codes, scores
+
+@traced('recommender.top_k_batch')
+def _top_k_batch(user_chunk, occupation_matrix, k, excluded=None):
+    """
+    Pontua um bloco de usuários e retorna linhas e scores dos k melhores
+    
+    Linhas marcadas em excluded (máscara booleana) recebem score -inf.
+    """
+    # Normaliza os perfis (L2) antes do produto com a matriz já normalizada
+    norms = np.sqrt(np.asarray(user_chunk.multiply(user_chunk).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    user_chunk = sp.diags(1 / norms.astype(np.float32)) @ user_chunk
+    
+    similarities = user_chunk @ occupation_matrix.T
+    if sp.issparse(similarities):
+        similarities = similarities.toarray()
+    similarities = np.asarray(similarities, dtype=np.float32)
+    if excluded is not None:
+        similarities[:, excluded] = -np.inf
+    return _top_k_rows(similarities, k)
+
+def _top_k_rows(similarities, k):
+    """
+    Linhas e scores dos k maiores valores de cada linha de uma matriz densa
+    
+    Empates são resolvidos pela ordem das colunas, como em _top_k_indices.
+    """
+    if k == 0:
+        return np.empty((similarities.shape[0], 0), dtype=np.int64), similarities[:, :0]
+    
+    if k < similarities.shape[1]:
+        # k-ésimo maior score de cada linha; empates nesse limite são
+        # resolvidos pela ordem das linhas, como na consulta individual
+        kth = -np.partition(-similarities, k - 1, axis=1)[:, k - 1:k]
+        above = similarities > kth
+        ties = similarities == kth
+        n_ties = k - above.sum(axis=1, keepdims=True)
+        selected = above | (ties & (np.cumsum(ties, axis=1) <= n_ties))
+        candidates = np.nonzero(selected)[1].reshape(-1, k)
+    else:
+        candidates = np.broadcast_to(np.arange(similarities.shape[1]), similarities.shape).copy()
+    
+    candidate_scores = np.take_along_axis(similarities, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return (
+        np.take_along_axis(candidates, order, axis=1),
+        np.take_along_axis(candidate_scores, order, axis=1)
+    )
 
 def filter_future_jobs(recommendations_df, growth_threshold=5):
     """
@@ -167,3 +644,153 @@ def calculate_match_percentage(user_skills, occupation_skills):
     
     return (intersection / union) * 100
 
+class NeighborTable:
+    """
+    Tabela pré-calculada das ocupações mais similares a cada ocupação
+    
+    Gerada offline por utils.neighbors. Cada linha guarda os índices (int32)
+    e as similaridades do cosseno (float16) das k ocupações mais próximas,
+    em ordem decrescente; posições sem vizinho têm índice -1. A consulta
+    por código é um acesso a dicionário seguido de uma fatia.
+    
+    Args:
+        occupation_codes (np.array): Códigos das ocupações (linhas)
+        neighbors (np.array): Matriz int32 ocupações x k de índices de linha
+        similarities (np.array): Matriz float16 ocupações x k
+        header (dict, optional): Metadados (k, data, hash do índice de origem)
+    """
+    
+    def __init__(self, occupation_codes, neighbors, similarities, header=None):
+        self.occupation_codes = np.asarray(occupation_codes).astype(str)
+        self.neighbors = np.ascontiguousarray(neighbors, dtype=np.int32)
+        self.similarities = np.ascontiguousarray(similarities, dtype=np.float16)
+        self.header = header or {}
+        # Códigos repetidos (linhas delta) apontam para a última ocorrência
+        self.code_to_row = {code: row for row, code in enumerate(self.occupation_codes.tolist())}
+    
+    @property
+    def k(self):
+        return self.neighbors.shape[1]
+    
+    def lookup(self, occupation_code, top_n=None):
+        """
+        Vizinhos de uma ocupação
+        
+        Args:
+            occupation_code (str): Código da ocupação
+            top_n (int, optional): Número máximo de vizinhos (padrão: k)
+            
+        Returns:
+            tuple: (códigos, similaridades float16), vazios se a ocupação
+                não estiver na tabela
+        """
+        row = self.code_to_row.get(occupation_code)
+        if row is None:
+            return self.occupation_codes[:0], np.empty(0, dtype=np.float16)
+        neighbors = self.neighbors[row, :top_n]
+        valid = neighbors >= 0
+        return self.occupation_codes[neighbors[valid]], self.similarities[row, :top_n][valid]
+    
+    def save(self, path):
+        """
+        Persiste a tabela em um arquivo .npz (sem objetos pickle), de forma atômica
+        
+        Args:
+            path (Path): Caminho do arquivo de destino
+        """
+        def write(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                np.savez(
+                    f,
+                    header=np.frombuffer(json.dumps(self.header).encode('utf-8'), dtype=np.uint8),
+                    occupation_codes=self.occupation_codes,
+                    neighbors=self.neighbors,
+                    similarities=self.similarities
+                )
+        _atomic_write(Path(path), write)
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Carrega uma tabela persistida com save()
+        
+        Args:
+            path (Path): Caminho do arquivo .npz
+            
+        Returns:
+            NeighborTable: Tabela carregada
+        """
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(
+                npz['occupation_codes'], npz['neighbors'], npz['similarities'],
+                header=json.loads(npz['header'].tobytes().decode('utf-8'))
+            )
+
+_stale_warnings = set()
+
+def _matches_serving_index(path, header):
+    """
+    Indica se um artefato derivado foi gerado do índice base em produção
+    
+    Compara o index_content_hash do cabeçalho com o content_hash do índice
+    base (sem os segmentos delta, como nos builds offline). Artefatos sem
+    hash no cabeçalho são aceitos. A divergência é avisada uma vez por
+    arquivo e hash.
+    
+    Args:
+        path (Path): Caminho do artefato (usado no aviso)
+        header (dict): Cabeçalho do artefato
+        
+    Returns:
+        bool: False se o artefato foi gerado de outro índice
+    """
+    expected_hash = header.get('index_content_hash')
+    if not expected_hash:
+        return True
+    # Importado sob demanda: index_artifact importa este módulo
+    from .index_artifact import get_serving_index
+    index = get_serving_index()
+    serving_hash = getattr(getattr(index, 'base', index), 'header', {}).get('content_hash')
+    if serving_hash == expected_hash:
+        return True
+    if (str(path), expected_hash) not in _stale_warnings:
+        _stale_warnings.add((str(path), expected_hash))
+        print(f"{path.name} foi gerado de outro índice ({expected_hash[:12]}) e será ignorado; gere-o novamente.")
+    return False
+
+def load_neighbor_table():
+    """
+    Carrega a tabela de ocupações similares de app/model/ (recarregada se mudar)
+    
+    Returns:
+        NeighborTable: Tabela compartilhada pelo catálogo, ou None se o
+            arquivo não existir ou tiver sido gerado de outro índice
+    """
+    path = get_model_path() / NEIGHBORS_FILE
+    try:
+        table = get_catalog().get(path, NeighborTable.load)
+    except FileNotFoundError:
+        return None
+    return table if _matches_serving_index(path, table.header) else None
+
+@traced('recommender.similar_occupations')
+def get_similar_occupations(occupation_code, top_n=5):
+    """
+    Ocupações mais similares a uma ocupação, lidas da tabela pré-calculada
+    
+    Args:
+        occupation_code (str): Código da ocupação
+        top_n (int): Número máximo de ocupações
+        
+    Returns:
+        list: Dicionários com occupation_code e similarity (0-100), do mais
+            similar para o menos similar; vazia sem tabela
+    """
+    table = load_neighbor_table()
+    if table is None:
+        return []
+    codes, similarities = table.lookup(occupation_code, top_n)
+    return [
+        {'occupation_code': code, 'similarity': float(similarity) * 100}
+        for code, similarity in zip(codes.tolist(), similarities.tolist())
+    ]
@@ -0,0 +1,294 @@
+"""
+Cache de resultados de recomendação compartilhado entre sessões
+
+As recomendações são chaveadas pelo conjunto canônico (frozenset) dos ids das
+habilidades selecionadas, pelo top_n e pela versão do índice. O cache em
+memória é limitado por número de entradas e por bytes com remoção LRU e pode
+ter uma camada em disco que sobrevive a reinícios. Com filtros de salário ou
+de profissões do futuro, o cache guarda o ranking completo e os filtros são
+aplicados sobre ele, sem recalcular a similaridade.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from .recommender import _top_k_indices
+
+class RecommendationCache:
+    """
+    Cache LRU de rankings (linhas e scores) com camada opcional em disco
+
+    Args:
+        max_entries (int): Número máximo de entradas em memória
+        max_bytes (int): Tamanho máximo (bytes dos arrays) em memória
+        disk_path (Path, optional): Diretório da camada em disco
+        max_disk_bytes (int): Tamanho máximo da camada em disco
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=64 << 20, disk_path=None, max_disk_bytes=256 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_path = Path(disk_path) if disk_path else None
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_path is not None:
+            self.disk_path.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(skill_ids, top_n, version):
+        """
+        Cria a chave canônica de uma consulta
+
+        Args:
+            skill_ids (iterable): Colunas das habilidades selecionadas
+            top_n (int | None): Tamanho do ranking (None = ranking completo)
+            version (str): Versão do índice que produziu o ranking
+
+        Returns:
+            tuple: (frozenset dos ids, top_n, versão)
+        """
+        return (frozenset(int(skill_id) for skill_id in skill_ids), top_n, version)
+
+    def get(self, key):
+        """
+        Busca um ranking no cache (memória, depois disco)
+
+        Returns:
+            tuple: (linhas, scores), ou None se ausente
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, value)
+        return value
+
+    def put(self, key, rows, scores):
+        """
+        Armazena um ranking em memória e, se configurado, em disco
+
+        Returns:
+            tuple: (linhas, scores) como armazenados (somente leitura)
+        """
+        value = (
+            np.ascontiguousarray(rows, dtype=np.int32),
+            np.ascontiguousarray(scores, dtype=np.float32)
+        )
+        for array in value:
+            array.flags.writeable = False
+
+        with self._lock:
+            self._insert(key, value)
+        self._write_disk(key, value)
+        return value
+
+    def clear(self):
+        """Esvazia a camada em memória"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Contadores do cache
+
+        Returns:
+            dict: Acertos, faltas, remoções, entradas, bytes e taxa de acerto
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def _insert(self, key, value):
+        size = value[0].nbytes + value[1].nbytes
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[0].nbytes + previous[1].nbytes
+        self._entries[key] = value
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted[0].nbytes + evicted[1].nbytes
+            self.evictions += 1
+
+    def _disk_file(self, key):
+        skill_ids, top_n, version = key
+        raw = f"{version}|{top_n}|{','.join(map(str, sorted(skill_ids)))}"
+        return self.disk_path / f"{hashlib.sha256(raw.encode()).hexdigest()}.npz"
+
+    def _read_disk(self, key):
+        if self.disk_path is None:
+            return None
+        path = self._disk_file(key)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                value = (npz['rows'], npz['scores'])
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        for array in value:
+            array.flags.writeable = False
+        return value
+
+    def _write_disk(self, key, value):
+        if self.disk_path is None:
+            return
+        path = self._disk_file(key)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.savez(f, rows=value[0], scores=value[1])
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except OSError:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def _prune_disk(self):
+        """Remove os arquivos menos usados quando a camada em disco excede o limite"""
+        files = [(f.stat(), f) for f in self.disk_path.glob('*.npz')]
+        total = sum(stat.st_size for stat, _ in files)
+        if total <= self.max_disk_bytes:
+            return
+        for stat, f in sorted(files, key=lambda item: item[0].st_mtime):
+            if total <= self.max_disk_bytes * 0.9:
+                break
+            try:
+                f.unlink()
+                total -= stat.st_size
+            except OSError:
+                pass
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_recommendation_cache(**kwargs):
+    """
+    Retorna o cache compartilhado pelo processo
+
+    Na primeira chamada, kwargs configuram o cache (ver RecommendationCache).
+
+    Returns:
+        RecommendationCache: Cache compartilhado
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RecommendationCache(**kwargs)
+    return _cache
+
+def _hash_matrix(digest, matrix):
+    if sp.issparse(matrix):
+        matrix = sp.csr_matrix(matrix)
+        for array in (matrix.indptr, matrix.indices, matrix.data):
+            digest.update(np.ascontiguousarray(array).tobytes())
+    else:
+        digest.update(np.ascontiguousarray(matrix).tobytes())
+    digest.update(repr(matrix.shape).encode())
+
+def index_version(index):
+    """
+    Identifica a versão de um índice para chavear resultados
+
+    Sem cabeçalho de artefato (índice construído em memória), a versão é um
+    hash da matriz, dos códigos e das habilidades, calculado uma vez por
+    índice. Assim a camada em disco nunca serve resultados de outro índice,
+    mesmo após reinícios.
+
+    Returns:
+        str: Hash do conteúdo do índice
+    """
+    header = getattr(index, 'header', None)
+    if header and header.get('content_hash'):
+        return header['content_hash']
+
+    version = index.__dict__.get('_content_version')
+    if version is None:
+        digest = hashlib.sha256()
+        digest.update('\x1f'.join(map(str, index.occupation_codes.tolist())).encode())
+        digest.update('\x1e'.join(index.skills).encode())
+        _hash_matrix(digest, index.matrix)
+        version = index._content_version = f'mem-{digest.hexdigest()}'
+    return version
+
+def get_cached_recommendations(selected_skills, index, top_n=10, future_only=False, min_salary=0,
+                               min_growth=None, cache=None):
+    """
+    Obtém recomendações usando o cache de resultados
+
+    Sem filtros, o cache guarda o top_n da consulta. Com filtros, guarda o
+    ranking completo e retorna as top_n ocupações que satisfazem os filtros,
+    selecionadas pela máscara do índice (RecommenderIndex.filter_mask).
+
+    Args:
+        selected_skills (list): Lista de habilidades selecionadas
+        index (RecommenderIndex): Índice de recomendação
+        top_n (int): Número de recomendações a retornar
+        future_only (bool): Apenas profissões do futuro
+        min_salary (float): Salário anual mínimo (0 = sem filtro)
+        min_growth (float, optional): Crescimento projetado mínimo (%)
+        cache (RecommendationCache, optional): Cache a usar (padrão: compartilhado)
+
+    Returns:
+        pd.DataFrame: DataFrame com as recomendações
+    """
+    cache = cache or get_recommendation_cache()
+    if index.empty:
+        return index.recommend(selected_skills, top_n=top_n)
+
+    mask = index.filter_mask(
+        min_salary=min_salary if min_salary > 0 else None,
+        min_growth=min_growth,
+        future_only=future_only
+    )
+    skill_ids = index.vocabulary.ids(selected_skills)
+    key = cache.make_key(skill_ids, None if mask is not None else top_n, index_version(index))
+
+    cached = cache.get(key)
+    if cached is None:
+        scores = index.scores(selected_skills)
+        if mask is not None:
+            rows = np.argsort(-scores, kind='stable')
+        else:
+            rows = _top_k_indices(scores, top_n)
+        cached = cache.put(key, rows, scores[rows])
+
+    rows, scores = cached
+    if mask is not None:
+        keep = mask[rows]
+        rows, scores = rows[keep][:top_n], scores[keep][:top_n]
+
+    return index._join_metadata(rows, scores)
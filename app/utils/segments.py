@@ -0,0 +1,444 @@
+"""
+Atualizações incrementais do índice com segmentos delta
+
+Inclusões, alterações e retiradas de ocupações são gravadas como pequenos
+segmentos JSON numerados em app/model/deltas/, sem reescrever data/ nem o
+artefato do índice. O SegmentedIndex combina o índice base com os segmentos
+na consulta: as linhas da base alteradas ou retiradas são marcadas como
+removidas e as ocupações incluídas/alteradas formam uma pequena matriz delta,
+a única normalizada novamente. A compactação (utils.compaction) incorpora os
+segmentos em uma nova base e os remove.
+
+Aplicar um segmento é idempotente: reaplicá-lo sobre uma base que já o
+contém produz as mesmas recomendações.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.segments upsert 15-1252.00 --skills "Programming,Cloud Computing"
+    python -m utils.segments retire 43-9199.01
+    python -m utils.segments list
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .data_loader import apply_occupation_updates, register_pending_updates
+from .recommender import RecommenderIndex, _top_k_indices, create_user_skills_matrix, get_model_path
+from .result_cache import index_version
+from .tracing import traced
+
+DELTAS_DIR = 'deltas'
+SEGMENT_SCHEMA_VERSION = 1
+
+def get_deltas_path():
+    """Retorna o diretório dos segmentos delta em app/model/"""
+    return get_model_path() / DELTAS_DIR
+
+def _segment_seq(path):
+    return int(path.stem.split('-')[1])
+
+def list_segments(directory=None):
+    """
+    Lista os arquivos de segmento em ordem de aplicação
+
+    Returns:
+        list: Caminhos dos segmentos, do mais antigo ao mais recente
+    """
+    directory = directory or get_deltas_path()
+    if not directory.exists():
+        return []
+    return sorted(directory.glob('segment-*.json'), key=_segment_seq)
+
+def segments_signature(directory=None):
+    """Assinatura (nome, mtime, tamanho) dos segmentos, para detectar mudanças"""
+    signature = []
+    for path in list_segments(directory):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+def _normalize_skills(skills):
+    """
+    Aceita nomes de habilidades ou dicionários como os de get_skills_for_occupation
+
+    Importância e nível não informados ficam None (vazios após a compactação),
+    em vez de um 0 indistinguível de um valor real.
+    """
+    normalized = []
+    for skill in skills:
+        if isinstance(skill, str):
+            skill = {'skill': skill}
+        normalized.append({
+            'skill': skill['skill'],
+            'importance': skill.get('importance'),
+            'level': skill.get('level'),
+        })
+    return normalized
+
+def write_delta_segment(upserts=None, retire=(), directory=None):
+    """
+    Grava um segmento delta de forma atômica
+
+    Args:
+        upserts (dict, optional): Código da ocupação -> {'skills': lista de
+            habilidades (nomes ou dicionários com skill, importance e level),
+            'metadata': campos de occupations_processed.csv (opcional)}
+        retire (iterable): Códigos das ocupações a retirar
+        directory (Path, optional): Diretório dos segmentos
+
+    Returns:
+        Path: Caminho do segmento gravado
+    """
+    directory = directory or get_deltas_path()
+    directory.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'schema_version': SEGMENT_SCHEMA_VERSION,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'upserts': [
+            {
+                'occupation_code': code,
+                'skills': _normalize_skills(entry.get('skills', [])),
+                'metadata': entry.get('metadata') or {},
+            }
+            for code, entry in (upserts or {}).items()
+        ],
+        'retired': list(retire),
+    }
+
+    tmp_path = directory / f'.segment.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        # os.link falha se o número já existir: escritores concorrentes nunca se sobrescrevem
+        while True:
+            existing = list_segments(directory)
+            seq = _segment_seq(existing[-1]) + 1 if existing else 1
+            path = directory / f'segment-{seq:08d}.json'
+            try:
+                os.link(tmp_path, path)
+                return path
+            except FileExistsError:
+                continue
+    finally:
+        tmp_path.unlink()
+
+def upsert_occupation(occupation_code, skills, metadata=None, directory=None):
+    """
+    Inclui ou altera uma ocupação (habilidades e, opcionalmente, metadados)
+
+    Args:
+        occupation_code (str): Código da ocupação
+        skills (list): Habilidades (nomes ou dicionários skill/importance/level)
+        metadata (dict, optional): Campos de occupations_processed.csv a
+            incluir ou alterar (ex.: occupation_title, median_salary)
+        directory (Path, optional): Diretório dos segmentos
+
+    Returns:
+        Path: Caminho do segmento gravado
+    """
+    return write_delta_segment(
+        upserts={occupation_code: {'skills': skills, 'metadata': metadata}}, directory=directory
+    )
+
+def retire_occupation(occupation_code, directory=None):
+    """
+    Retira uma ocupação das recomendações
+
+    Returns:
+        Path: Caminho do segmento gravado
+    """
+    return write_delta_segment(retire=[occupation_code], directory=directory)
+
+def load_segments(directory=None):
+    """
+    Lê os segmentos delta válidos, em ordem de aplicação
+
+    Segmentos ilegíveis ou de esquema desconhecido são ignorados com aviso.
+
+    Returns:
+        list: Tuplas (caminho, conteúdo)
+    """
+    segments = []
+    for path in list_segments(directory):
+        try:
+            with open(path, encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Segmento delta ignorado ({path.name}): {e}")
+            continue
+        if payload.get('schema_version') != SEGMENT_SCHEMA_VERSION:
+            print(f"Segmento delta ignorado ({path.name}): esquema {payload.get('schema_version')}")
+            continue
+        segments.append((path, payload))
+    return segments
+
+def fold_segments(segments):
+    """
+    Combina os segmentos em um único estado
+
+    Args:
+        segments (list): Resultado de load_segments
+
+    Returns:
+        tuple: (upserts, retired) — upserts é um dicionário código ->
+            {'skills', 'metadata'} na ordem da última alteração de cada
+            código, e retired o conjunto de códigos retirados
+    """
+    upserts = {}
+    retired = set()
+    for _, payload in segments:
+        for entry in payload.get('upserts', []):
+            code = entry['occupation_code']
+            previous = upserts.pop(code, None)
+            metadata = dict(previous['metadata']) if previous else {}
+            metadata.update(entry.get('metadata') or {})
+            upserts[code] = {'skills': entry.get('skills', []), 'metadata': metadata}
+            retired.discard(code)
+        for code in payload.get('retired', []):
+            upserts.pop(code, None)
+            retired.add(code)
+    return upserts, retired
+
+# Intervalo mínimo entre verificações dos segmentos pendentes (s), como em ServingIndex
+PENDING_CHECK_INTERVAL = 1.0
+
+_pending = {}
+_pending_lock = threading.Lock()
+
+def pending_updates(directory=None):
+    """
+    Estado combinado dos segmentos pendentes (ainda não compactados)
+
+    A assinatura dos segmentos é verificada no máximo a cada
+    PENDING_CHECK_INTERVAL segundos e os arquivos só são relidos quando ela
+    muda; entre verificações, a chamada custa uma leitura de dicionário.
+    Registrado no data_loader para que as consultas por ocupação e por
+    habilidade enxerguem as mesmas ocupações que o índice em produção.
+
+    Returns:
+        tuple: (upserts, retired), como em fold_segments
+    """
+    cached = _pending.get(directory)
+    if cached is not None and time.monotonic() - cached[0] < PENDING_CHECK_INTERVAL:
+        return cached[2]
+    with _pending_lock:
+        cached = _pending.get(directory)
+        if cached is not None and time.monotonic() - cached[0] < PENDING_CHECK_INTERVAL:
+            return cached[2]
+        signature = segments_signature(directory)
+        if cached is not None and cached[1] == signature:
+            state = cached[2]
+        else:
+            state = fold_segments(load_segments(directory)) if signature else ({}, set())
+        _pending[directory] = (time.monotonic(), signature, state)
+        return state
+
+register_pending_updates(pending_updates)
+
+class SegmentedIndex(RecommenderIndex):
+    """
+    Índice base combinado com segmentos delta
+
+    As linhas são as da base seguidas das ocupações incluídas/alteradas
+    (matriz delta normalizada); linhas da base alteradas ou retiradas ficam
+    sem metadados e com score -inf. Novas habilidades estendem o vocabulário
+    após as colunas da base. As consultas do índice usam ``base.matrix`` e
+    ``delta_matrix`` separadamente e combinam os resultados, com empates
+    resolvidos pela ordem das linhas; ``matrix`` (a matriz combinada, com as
+    linhas removidas zeradas) é montada sob demanda para quem a lê
+    diretamente.
+
+    Args:
+        base (RecommenderIndex): Índice base (artefato publicado)
+        segments (list): Resultado de load_segments
+    """
+
+    def __init__(self, base, segments):
+        upserts, retired = fold_segments(segments)
+        self.base = base
+        self.n_base_rows = base.matrix.shape[0]
+        self.n_base_skills = len(base.skills)
+
+        skills = list(base.skills)
+        skill_to_col = dict(base.skill_to_col)
+        indptr, indices = [0], []
+        for entry in upserts.values():
+            cols = set()
+            for skill in entry['skills']:
+                if skill['skill'] not in skill_to_col:
+                    skill_to_col[skill['skill']] = len(skills)
+                    skills.append(skill['skill'])
+                cols.add(skill_to_col[skill['skill']])
+            indices.extend(sorted(cols))
+            indptr.append(len(indices))
+
+        # Apenas as linhas delta são normalizadas (L2); a matriz da base é reutilizada
+        counts = np.diff(indptr)
+        data = np.repeat(1 / np.sqrt(np.maximum(counts, 1)), counts).astype(np.float32)
+        self.delta_matrix = sp.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(upserts), len(skills))
+        )
+
+        affected = set(upserts) | retired
+        self.tombstones = np.fromiter(
+            (code in affected for code in base.occupation_codes.tolist()), dtype=bool, count=self.n_base_rows
+        )
+        occupation_codes = np.concatenate([base.occupation_codes.astype(object), np.array(list(upserts), dtype=object)])
+        occupations_df = apply_occupation_updates(base.occupations_df, upserts, retired)
+
+        self._set_structures(None, occupation_codes, skills, occupations_df)
+        self.metadata_rows[:self.n_base_rows][self.tombstones] = -1
+        # Linhas consultáveis: base sem as removidas, seguida das linhas delta
+        self.live_rows = np.concatenate([~self.tombstones, np.ones(len(upserts), dtype=bool)])
+
+        digest = hashlib.sha256(index_version(base).encode())
+        for path, payload in segments:
+            digest.update(path.name.encode())
+            digest.update(json.dumps(payload, sort_keys=True).encode())
+        self.header = dict(getattr(base, 'header', {}), content_hash=digest.hexdigest(), n_segments=len(segments))
+
+    @property
+    def matrix(self):
+        """
+        Matriz combinada no formato da base (densa ou CSR), montada na primeira leitura
+
+        Linhas da base (as removidas zeradas, com o vocabulário estendido)
+        seguidas das linhas delta, na ordem de ``occupation_codes``. Usada
+        por get_recommendations_batch, pela avaliação e pelos artefatos
+        derivados; as linhas removidas devem ser excluídas com ``live_rows``.
+        """
+        if self._matrix is None:
+            base = sp.csr_matrix(self.base.matrix, dtype=np.float32)
+            base = sp.csr_matrix(sp.diags((~self.tombstones).astype(np.float32)) @ base)
+            base.eliminate_zeros()
+            base = sp.csr_matrix((base.data, base.indices, base.indptr), shape=(base.shape[0], len(self.skills)))
+            combined = sp.vstack([base, self.delta_matrix], format='csr', dtype=np.float32)
+            self._matrix = combined if self.base.is_sparse else np.ascontiguousarray(combined.toarray())
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, value):
+        # _set_structures recebe None: a matriz combinada é montada sob demanda
+        self._matrix = value
+
+    @property
+    def empty(self):
+        return len(self.occupation_codes) == 0 or self.occupations_df.empty
+
+    @property
+    def is_sparse(self):
+        return self.base.is_sparse
+
+    @traced('recommender.similarity')
+    def scores(self, selected_skills):
+        """
+        Calcula a similaridade do cosseno com todas as ocupações (base + delta)
+
+        Returns:
+            np.array: Scores na ordem das linhas (-inf nas linhas removidas)
+        """
+        vector = self.user_vector(selected_skills)
+        base_scores = np.asarray(self.base.matrix @ vector[:self.n_base_skills], dtype=np.float32)
+        base_scores[self.tombstones] = -np.inf
+        delta_scores = np.asarray(self.delta_matrix @ vector, dtype=np.float32)
+        return np.concatenate([base_scores, delta_scores])
+
+    def recommend(self, selected_skills, top_n=10, ann_index=None, n_probes=2,
+                  min_salary=None, min_growth=None, future_only=False, inverted_index=None):
+        """
+        Obtém as top_n recomendações combinando base e segmentos
+
+        Índices auxiliares (ann_index, inverted_index) são construídos sobre a
+        base e não são usados aqui.
+        """
+        if self.empty:
+            return pd.DataFrame()
+
+        scores = self.scores(selected_skills)
+        mask = self.filter_mask(min_salary=min_salary, min_growth=min_growth, future_only=future_only)
+        if mask is None:
+            mask = self.live_rows
+        candidates = np.flatnonzero(mask)
+        top = _top_k_indices(scores[candidates], top_n)
+        return self._join_metadata(candidates[top], scores[candidates[top]])
+
+    def recommend_batch(self, profiles, top_n=10, as_records=False, chunk_size=1024):
+        """
+        Versão em lote de recommend, com um produto de matrizes para a base
+        e outro para a matriz delta por bloco de chunk_size perfis
+        """
+        top_ns = [top_n] * len(profiles) if np.isscalar(top_n) else list(top_n)
+        join = self._join_records if as_records else self._join_metadata
+        if self.empty or not profiles:
+            return [join(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in profiles]
+
+        user_matrix = create_user_skills_matrix(profiles, self.vocabulary)
+        # Normaliza cada perfil pelo total de habilidades, inclusive as que só existem nos segmentos
+        norms = np.sqrt(np.asarray(user_matrix.sum(axis=1), dtype=np.float32)).ravel()
+        norms[norms == 0] = 1
+        user_matrix = sp.csr_matrix(sp.diags(1 / norms) @ user_matrix, dtype=np.float32)
+
+        n_live = int(self.live_rows.sum())
+        results = []
+        for start in range(0, len(profiles), chunk_size):
+            chunk = user_matrix[start:start + chunk_size]
+            base_scores = chunk[:, :self.n_base_skills] @ self.base.matrix.T
+            if sp.issparse(base_scores):
+                base_scores = base_scores.toarray()
+            base_scores = np.asarray(base_scores, dtype=np.float32)
+            base_scores[:, self.tombstones] = -np.inf
+            delta_scores = np.asarray((chunk @ self.delta_matrix.T).toarray(), dtype=np.float32)
+            similarities = np.hstack([base_scores, delta_scores])
+            for row_scores, n in zip(similarities, top_ns[start:start + chunk_size]):
+                top = _top_k_indices(row_scores, min(n, n_live))
+                results.append(join(top, row_scores[top]))
+        return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Segmentos delta do índice de recomendação")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    upsert = subparsers.add_parser('upsert', help="Inclui ou altera uma ocupação")
+    upsert.add_argument('occupation_code')
+    upsert.add_argument('--skills', required=True, help="Habilidades separadas por vírgula")
+    upsert.add_argument('--metadata', default='{}', help="Campos da ocupação em JSON")
+
+    retire = subparsers.add_parser('retire', help="Retira uma ocupação")
+    retire.add_argument('occupation_code')
+
+    subparsers.add_parser('list', help="Lista os segmentos pendentes")
+    args = parser.parse_args(argv)
+
+    if args.command == 'upsert':
+        skills = [skill.strip() for skill in args.skills.split(',') if skill.strip()]
+        try:
+            metadata = json.loads(args.metadata)
+        except ValueError as e:
+            print(f"Metadados inválidos: {e}", file=sys.stderr)
+            return 1
+        print(f"Segmento gravado: {upsert_occupation(args.occupation_code, skills, metadata)}")
+    elif args.command == 'retire':
+        print(f"Segmento gravado: {retire_occupation(args.occupation_code)}")
+    else:
+        segments = load_segments()
+        upserts, retired = fold_segments(segments)
+        print(f"{len(segments)} segmentos: {len(upserts)} ocupações incluídas/alteradas, {len(retired)} retiradas")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,445 @@
+"""
+Serviço HTTP/JSON de recomendações com micro-batching (somente biblioteca padrão)
+
+Endpoints:
+    POST /recommendations               {"skills": [...], "top_n": 10}
+    GET  /occupations/<código>          detalhes da ocupação
+    GET  /occupations/<código>/skills   habilidades da ocupação
+    GET  /occupations/<código>/similar  ocupações similares (tabela pré-calculada)
+    GET  /occupations/<código>/paths/<alvo>  caminhos de transição de carreira
+    GET  /skills?q=<prefixo>&limit=10   autocompletar habilidades (nomes e sinônimos)
+    GET  /health                        estado do serviço e do micro-batching
+    GET  /metrics                       spans medidos, no formato do Prometheus
+
+Pedidos de recomendação que chegam dentro de uma janela de poucos
+milissegundos são agrupados e pontuados com um único produto de matrizes
+contra a matriz de ocupações. As demais consultas que podem bloquear
+(recarga do índice, leitura de arquivos, busca de caminhos) rodam no pool
+de threads, para não parar o loop nem o micro-batching das outras conexões.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.service serve --port 8000 --window-ms 3 --trace
+    python -m utils.service bench --port 8000 --concurrency 64 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import traceback
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from .career_paths import load_career_graph
+from .data_loader import get_occupation_details, get_skills_for_occupation
+from .index_artifact import get_serving_index
+from .recommender import get_similar_occupations
+from .tracing import enable_tracing, prometheus_text, span
+from .warmup import warm_up
+
+MAX_BODY_BYTES = 1 << 20
+
+class MicroBatcher:
+    """
+    Agrupa pedidos concorrentes de recomendação em lotes
+
+    O primeiro pedido de um lote abre uma janela de window_ms; todos os
+    pedidos que chegarem nela (até max_batch) são pontuados juntos com
+    RecommenderIndex.recommend_batch, em uma thread para não bloquear o loop.
+
+    Args:
+        get_index (callable): Retorna o RecommenderIndex atual
+        window_ms (float): Janela de agrupamento em milissegundos
+        max_batch (int): Tamanho máximo de um lote
+    """
+
+    def __init__(self, get_index, window_ms=3.0, max_batch=256):
+        self.get_index = get_index
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.n_requests = 0
+        self.n_batches = 0
+        self._queue = None
+        self._worker = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+    async def recommend(self, skills, top_n=10):
+        """
+        Enfileira um pedido e aguarda o resultado do lote
+
+        Args:
+            skills (list): Habilidades do usuário
+            top_n (int): Número de recomendações
+
+        Returns:
+            list: Recomendações do pedido (uma lista de dicionários)
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((skills, top_n, future))
+        return await future
+
+    def _recommend_batch(self, profiles, top_ns):
+        with span('service.recommend_batch'):
+            return self.get_index().recommend_batch(profiles, top_ns, as_records=True)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            profiles = [skills for skills, _, _ in batch]
+            top_ns = [top_n for _, top_n, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    None, self._recommend_batch, profiles, top_ns
+                )
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.n_batches += 1
+            self.n_requests += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+async def _in_thread(function, *args):
+    """Executa uma chamada bloqueante no pool de threads padrão do loop"""
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+def _response(status, payload, keep_alive=True):
+    if isinstance(payload, str):
+        # Texto puro: formato de exposição do Prometheus
+        body = payload.encode('utf-8')
+        content_type = 'text/plain; version=0.0.4; charset=utf-8'
+    else:
+        body = json.dumps(payload, default=_json_default, ensure_ascii=False).encode('utf-8')
+        content_type = 'application/json; charset=utf-8'
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+class RecommendationService:
+    """
+    Servidor HTTP/1.1 assíncrono mínimo sobre asyncio.start_server
+
+    Args:
+        host (str): Endereço de escuta
+        port (int): Porta de escuta
+        window_ms (float): Janela de micro-batching em milissegundos
+        max_batch (int): Tamanho máximo de um lote
+    """
+
+    def __init__(self, host='127.0.0.1', port=8000, window_ms=3.0, max_batch=256):
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(get_serving_index, window_ms=window_ms, max_batch=max_batch)
+        self._server = None
+        self._connections = set()
+
+    async def start(self):
+        # Carrega índice e dados (em paralelo) antes de aceitar conexões
+        await _in_thread(warm_up)
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        self._server.close()
+        # Conexões keep-alive abertas são encerradas em vez de esperadas
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    writer.write(_response(400, {'error': 'Requisição inválida'}, keep_alive=False))
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    writer.write(_response(400, {'error': 'Content-Length inválido'}, keep_alive=False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(413, {'error': 'Corpo muito grande'}, keep_alive=False))
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = (
+                    headers.get('connection', '').lower() != 'close'
+                    and version.upper() == 'HTTP/1.1'
+                )
+                try:
+                    status, payload = await self._dispatch(method.upper(), target, body)
+                except Exception:
+                    print(f"Erro em {method} {target}:", file=sys.stderr)
+                    traceback.print_exc()
+                    status, payload = 500, {'error': 'Erro interno'}
+                writer.write(_response(status, payload, keep_alive=keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Parada do serviço: a conexão é encerrada sem propagar o
+            # cancelamento, que o callback de start_server registraria como erro
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, method, target, body):
+        parts = [unquote(part) for part in urlsplit(target).path.strip('/').split('/') if part]
+
+        if method == 'POST' and parts == ['recommendations']:
+            try:
+                request = json.loads(body or b'{}')
+                skills = request.get('skills', [])
+                top_n = int(request.get('top_n', 10))
+                if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+                    raise ValueError
+            except (ValueError, TypeError, AttributeError):
+                return 400, {'error': "Corpo deve ser JSON com 'skills' (lista) e 'top_n' (int)"}
+            recommendations = await self.batcher.recommend(skills, max(top_n, 0))
+            return 200, {'recommendations': recommendations}
+
+        if method == 'GET' and len(parts) == 2 and parts[0] == 'occupations':
+            details = await _in_thread(get_occupation_details, parts[1])
+            if not details:
+                return 404, {'error': 'Ocupação não encontrada'}
+            return 200, details
+
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'occupations' and parts[2] == 'skills':
+            skills = await _in_thread(get_skills_for_occupation, parts[1])
+            return 200, {'occupation_code': parts[1], 'skills': skills}
+
+        if method == 'GET' and len(parts) == 3 and parts[0] == 'occupations' and parts[2] == 'similar':
+            similar = await _in_thread(get_similar_occupations, parts[1], 10)
+            return 200, {'occupation_code': parts[1], 'similar': similar}
+
+        if method == 'GET' and len(parts) == 4 and parts[0] == 'occupations' and parts[2] == 'paths':
+            career_graph = await _in_thread(load_career_graph)
+            if career_graph is None:
+                return 503, {'error': 'Grafo de carreiras não publicado'}
+            paths = await _in_thread(career_graph.k_shortest_paths, parts[1], parts[3])
+            return 200, {'from': parts[1], 'to': parts[3], 'paths': paths}
+
+        if method == 'GET' and parts == ['skills']:
+            query = parse_qs(urlsplit(target).query)
+            try:
+                limit = int(query.get('limit', ['10'])[0])
+            except ValueError:
+                return 400, {'error': "'limit' deve ser inteiro"}
+            prefix = query.get('q', [''])[0]
+            index = await _in_thread(get_serving_index)
+            return 200, {'q': prefix, 'skills': index.vocabulary.complete(prefix, limit=max(limit, 0))}
+
+        if method == 'GET' and parts == ['health']:
+            batcher = self.batcher
+            return 200, {
+                'status': 'ok',
+                'requests': batcher.n_requests,
+                'batches': batcher.n_batches,
+                'avg_batch_size': batcher.n_requests / batcher.n_batches if batcher.n_batches else 0.0,
+            }
+
+        if method == 'GET' and parts == ['metrics']:
+            return 200, prometheus_text()
+
+        return 404, {'error': 'Rota não encontrada'}
+
+async def request_json(reader, writer, method, path, payload=None):
+    """
+    Cliente mínimo: envia uma requisição em uma conexão keep-alive
+
+    Args:
+        reader (asyncio.StreamReader): Leitor da conexão
+        writer (asyncio.StreamWriter): Escritor da conexão
+        method (str): Método HTTP
+        path (str): Caminho da requisição
+        payload (dict, optional): Corpo JSON
+
+    Returns:
+        tuple: (status HTTP, corpo JSON decodificado)
+    """
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1')
+        + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def run_benchmark(host, port, skills, concurrency=64, n_requests=5000, top_n=10):
+    """
+    Gera carga concorrente contra o serviço e mede vazão e latência
+
+    Args:
+        host (str): Endereço do serviço
+        port (int): Porta do serviço
+        skills (list): Vocabulário usado para sortear perfis
+        concurrency (int): Conexões simultâneas
+        n_requests (int): Total de requisições
+        top_n (int): Recomendações por requisição
+
+    Returns:
+        dict: Vazão (req/s) e latências p50/p99 (ms)
+    """
+    latencies = []
+    remaining = iter(range(n_requests))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in remaining:
+                profile = random.sample(skills, min(len(skills), random.randint(3, 8)))
+                start = time.perf_counter()
+                status, _ = await request_json(
+                    reader, writer, 'POST', '/recommendations', {'skills': profile, 'top_n': top_n}
+                )
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise RuntimeError(f"Status inesperado: {status}")
+        finally:
+            writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'throughput_rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP de recomendações")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help="Inicia o serviço")
+    serve.add_argument('--window-ms', type=float, default=3.0, help="Janela de micro-batching")
+    serve.add_argument('--max-batch', type=int, default=256)
+    serve.add_argument('--trace', action='store_true', help="Mede os spans (expostos em /metrics)")
+    serve.add_argument('--trace-log', action='store_true', help="Também emite um log JSON por span")
+    serve.add_argument('--trace-memory', action='store_true',
+                       help="Também mede a memória das cargas (tracemalloc; deixa o serviço mais lento)")
+
+    bench = subparsers.add_parser('bench', help="Gera carga contra um serviço em execução")
+    bench.add_argument('--concurrency', type=int, default=64)
+    bench.add_argument('--requests', type=int, default=5000)
+    bench.add_argument('--top-n', type=int, default=10)
+
+    for subparser in (serve, bench):
+        subparser.add_argument('--host', default='127.0.0.1')
+        subparser.add_argument('--port', type=int, default=8000)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        if args.trace or args.trace_log or args.trace_memory:
+            enable_tracing(log=True if args.trace_log else None, memory=args.trace_memory)
+
+        async def serve_forever():
+            service = RecommendationService(
+                args.host, args.port, window_ms=args.window_ms, max_batch=args.max_batch
+            )
+            await service.start()
+            print(f"Serviço de recomendações em http://{service.host}:{service.port}")
+            try:
+                await service.serve_forever()
+            finally:
+                await service.stop()
+
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    report = asyncio.run(run_benchmark(
+        args.host, args.port, get_serving_index().skills,
+        concurrency=args.concurrency, n_requests=args.requests, top_n=args.top_n
+    ))
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Lacunas de habilidades do usuário em relação a todas as ocupações
+
+Para um conjunto de habilidades selecionadas, calcula de uma vez, para todas
+as ocupações, as habilidades atendidas e faltantes (contagens e máscaras
+esparsas) e a porcentagem de match. As contagens vêm do BitsetSkillIndex
+(utils.bitset): AND bit a bit e popcount sobre o padrão binário da matriz
+do índice.
+
+Adicionar uma habilidade j ao perfil é uma atualização de posto 1 do vetor
+de similaridades. Com u o vetor binário do usuário (m habilidades) e A a
+matriz normalizada, s = A u / sqrt(m) e
+
+    s'(j) = s * sqrt(m / (m + 1)) + A[:, j] / sqrt(m + 1)
+
+de modo que todas as habilidades candidatas são pontuadas com um único
+produto esparso, sem recalcular a similaridade habilidade a habilidade.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .bitset import BitsetSkillIndex
+from .tracing import traced
+
+def occupation_matrix(index):
+    """
+    Matriz normalizada de um índice em CSR, na ordem das suas linhas
+
+    Para um SegmentedIndex, é a matriz combinada (linhas da base removidas
+    zeradas, seguidas das linhas delta).
+
+    Args:
+        index (RecommenderIndex): Índice de recomendação
+
+    Returns:
+        sp.csr_matrix: Cópia float32 da matriz, ocupações x habilidades
+    """
+    return sp.csr_matrix(index.matrix, dtype=np.float32, copy=True)
+
+class SkillGapEngine:
+    """
+    Lacunas e simulações de "adicionar habilidade" para todas as ocupações
+
+    Construído uma vez por índice; cada consulta custa produtos esparsos
+    sobre a matriz (sem laços por ocupação ou por habilidade).
+
+    Args:
+        index (RecommenderIndex): Índice de recomendação
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.skills = index.skills
+        self.matrix = occupation_matrix(index)
+        self.matrix.sort_indices()
+        self.binary = self.matrix.copy()
+        self.binary.data[:] = 1
+        self.row_counts = np.diff(self.matrix.indptr)
+        self.bitset = BitsetSkillIndex.from_index(index)
+        # Ocupações com metadados (exclui as linhas removidas por segmentos)
+        self.live_rows = index.metadata_rows >= 0
+
+    def user_mask(self, selected_skills):
+        """Vetor booleano das habilidades selecionadas (desconhecidas são ignoradas)"""
+        mask = np.zeros(len(self.skills), dtype=bool)
+        mask[self.index.vocabulary.ids(selected_skills)] = True
+        return mask
+
+    def counts(self, selected_skills):
+        """
+        Habilidades atendidas e faltantes de todas as ocupações
+
+        Returns:
+            tuple: (atendidas, faltantes, porcentagem de match) por linha do índice
+        """
+        query_bits, _ = self.bitset.pack_query(selected_skills)
+        matched = self.bitset.intersection_counts(query_bits)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            match_percentage = np.where(self.row_counts > 0, matched / self.row_counts * 100, 0.0)
+        return matched, self.row_counts - matched, match_percentage
+
+    def masks(self, selected_skills, rows=None):
+        """
+        Máscaras esparsas das habilidades atendidas e faltantes
+
+        Args:
+            selected_skills (list): Habilidades do usuário
+            rows (np.array, optional): Linhas do índice (padrão: todas)
+
+        Returns:
+            tuple: (atendidas, faltantes), matrizes CSR booleanas linhas x habilidades
+        """
+        binary = self.binary if rows is None else self.binary[rows]
+        matched = sp.csr_matrix(binary.multiply(self.user_mask(selected_skills)[None, :]), dtype=bool)
+        matched.eliminate_zeros()
+        missing = sp.csr_matrix(binary, dtype=bool) - matched
+        missing.eliminate_zeros()
+        return matched, missing
+
+    def scores(self, selected_skills):
+        """Similaridade do cosseno com todas as ocupações (0 nas linhas removidas)"""
+        mask = self.user_mask(selected_skills)
+        n_selected = np.count_nonzero(mask)
+        if n_selected == 0:
+            return np.zeros(self.matrix.shape[0], dtype=np.float32)
+        return (self.matrix @ mask.astype(np.float32)) / np.float32(np.sqrt(n_selected))
+
+    def rank_one_update(self, selected_skills, skill, scores=None):
+        """
+        Similaridades após adicionar uma habilidade, sem recalcular o produto
+
+        Args:
+            selected_skills (list): Habilidades do usuário
+            skill (str): Habilidade adicionada
+            scores (np.array, optional): Resultado de scores() já calculado
+
+        Returns:
+            np.array: Novas similaridades na ordem das linhas do índice
+        """
+        mask = self.user_mask(selected_skills)
+        scores = self.scores(selected_skills) if scores is None else scores
+        col = self.index.vocabulary.resolve(skill)
+        if col is None or mask[col]:
+            return scores
+        m = np.count_nonzero(mask)
+        column = self.matrix[:, col].toarray().ravel()
+        return scores * np.float32(np.sqrt(m / (m + 1))) + column / np.float32(np.sqrt(m + 1))
+
+    def skill_gains(self, selected_skills, k=10, scores=None):
+        """
+        Ganho de cada habilidade candidata sobre as k ocupações mais similares
+
+        O ganho de j é a variação média da similaridade das k ocupações
+        atuais mais similares ao adicionar j (atualização de posto 1),
+        calculada para todas as habilidades com um produto esparso.
+
+        Args:
+            selected_skills (list): Habilidades do usuário
+            k (int): Número de ocupações consideradas
+            scores (np.array, optional): Resultado de scores() já calculado
+
+        Returns:
+            np.array: Ganho por coluna (-inf nas habilidades que o usuário já tem)
+        """
+        mask = self.user_mask(selected_skills)
+        scores = self.scores(selected_skills) if scores is None else scores
+        live = np.flatnonzero(self.live_rows)
+        k = min(k, len(live))
+        gains = np.full(len(self.skills), -np.inf)
+        if k == 0:
+            return gains
+
+        top = live[np.argpartition(-scores[live], k - 1)[:k]] if k < len(live) else live
+        m = np.count_nonzero(mask)
+        # s'(j)[top] - s[top] = (sqrt(m / (m + 1)) - 1) * s[top] + A[top, j] / sqrt(m + 1)
+        column_means = np.asarray(self.matrix[top].mean(axis=0)).ravel()
+        gains[:] = (np.sqrt(m / (m + 1)) - 1) * scores[top].mean() + column_means / np.sqrt(m + 1)
+        gains[mask] = -np.inf
+        return gains
+
+    @traced('skill_gap.report')
+    def report(self, selected_skills, rows=None, k=10):
+        """
+        Relatório de lacunas por ocupação
+
+        A melhor próxima habilidade de uma ocupação é, entre as que faltam,
+        a de maior peso na ocupação (maior aumento do seu score); empates
+        são resolvidos pelo ganho sobre as k ocupações mais similares
+        (skill_gains) e depois pela ordem das colunas.
+
+        Args:
+            selected_skills (list): Habilidades do usuário
+            rows (np.array, optional): Linhas do índice (padrão: todas as
+                ocupações com metadados)
+            k (int): Ocupações consideradas no ganho de desempate
+
+        Returns:
+            pd.DataFrame: occupation_code, matched_count, missing_count,
+                match_percentage, similarity_score, best_next_skill e
+                score_after (similaridade após adicioná-la), scores em %
+        """
+        rows = np.flatnonzero(self.live_rows) if rows is None else np.asarray(rows, dtype=np.int64)
+        scores = self.scores(selected_skills)
+        matched_counts, missing_counts, match_percentage = self.counts(selected_skills)
+        mask = self.user_mask(selected_skills)
+        gains = self.skill_gains(selected_skills, k=k, scores=scores)
+
+        # Pesos das habilidades faltantes das linhas pedidas
+        weights = self.matrix[rows]
+        weights = sp.csr_matrix(weights.multiply((~mask)[None, :]))
+        weights.eliminate_zeros()
+        owner = np.repeat(np.arange(len(rows)), np.diff(weights.indptr))
+        best_col = np.full(len(rows), -1, dtype=np.int64)
+        best_weight = np.zeros(len(rows), dtype=np.float32)
+        if weights.nnz:
+            # Último de cada linha após ordenar por (linha, peso, ganho, -coluna)
+            order = np.lexsort((-weights.indices, gains[weights.indices], weights.data, owner))
+            last = order[np.flatnonzero(np.diff(np.append(owner[order], -1)) != 0)]
+            best_col[owner[last]] = weights.indices[last]
+            best_weight[owner[last]] = weights.data[last]
+
+        m = np.count_nonzero(mask)
+        score_after = scores[rows] * np.sqrt(m / (m + 1)) + best_weight / np.sqrt(m + 1)
+        skills = np.asarray(self.skills + [None], dtype=object)
+        return pd.DataFrame({
+            'occupation_code': self.index.occupation_codes[rows],
+            'matched_count': matched_counts[rows],
+            'missing_count': missing_counts[rows],
+            'match_percentage': match_percentage[rows],
+            'similarity_score': scores[rows] * 100,
+            'best_next_skill': skills[best_col],
+            'score_after': np.where(best_col >= 0, score_after * 100, scores[rows] * 100),
+        })
+
+    def occupation_gap(self, selected_skills, occupation_code, k=10):
+        """
+        Lacunas de uma ocupação, com os nomes das habilidades
+
+        Returns:
+            dict: matched e missing (listas na ordem das colunas),
+                match_percentage, best_next_skill e score_after, ou None se a
+                ocupação não estiver no índice
+        """
+        rows = np.flatnonzero(self.index.occupation_codes == occupation_code)
+        if len(rows) == 0:
+            return None
+        row = rows[-1]  # linhas delta substituem as da base
+        matched, missing = self.masks(selected_skills, rows=[row])
+        summary = self.report(selected_skills, rows=[row], k=k).iloc[0]
+        return {
+            'matched': [self.skills[col] for col in matched.indices],
+            'missing': [self.skills[col] for col in missing.indices],
+            'match_percentage': float(summary['match_percentage']),
+            'best_next_skill': summary['best_next_skill'],
+            'score_after': float(summary['score_after']),
+        }
+
+def get_skill_gap_engine(index):
+    """
+    Motor de lacunas associado ao índice (construído na primeira chamada)
+
+    Args:
+        index (RecommenderIndex): Índice de recomendação
+
+    Returns:
+        SkillGapEngine: Motor guardado no próprio índice
+    """
+    engine = index.__dict__.get('_skill_gap_engine')
+    if engine is None:
+        engine = index._skill_gap_engine = SkillGapEngine(index)
+    return engine
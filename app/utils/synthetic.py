@@ -0,0 +1,160 @@
+"""
+Gerador de dados sintéticos no formato de data/
+
+Produz occupations_processed.csv, skills_processed.csv e
+occupation_skills_matrix.csv com o mesmo esquema dos arquivos reais, em
+qualquer escala (de 20 x 38 a 1M x 30k). A esparsidade imita a do O*NET:
+cada ocupação tem algumas dezenas de habilidades (log-normal) e a
+popularidade das habilidades segue uma lei de potência (Zipf), de modo que
+poucas habilidades aparecem em muitas ocupações.
+
+O CSV denso da matriz cresce com ocupações x habilidades; acima de
+max_dense_cells células apenas o cache CSR (data/.cache/) é gravado.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.synthetic --occupations 100000 --skills 5000 --output /tmp/gs2-100k
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from .data_loader import SparseSkillsMatrix, add_derived_occupation_columns
+from .ingest import write_data_files
+
+MAX_DENSE_CELLS = 50_000_000
+
+def synthetic_occupation_codes(n_occupations):
+    """Códigos únicos no formato SOC do O*NET (ex.: 11-0001.01)"""
+    ids = np.arange(n_occupations)
+    return [
+        f'{11 + major:02d}-{minor:04d}.{suffix:02d}'
+        for major, minor, suffix in zip((ids // 100000).tolist(), (ids % 100000 // 10).tolist(), (ids % 10).tolist())
+    ]
+
+def generate_occupations(n_occupations, seed=0):
+    """
+    Gera a tabela de ocupações com salários, crescimento e empregos plausíveis
+
+    Returns:
+        pd.DataFrame: Mesmas colunas de occupations_processed.csv
+    """
+    rng = np.random.default_rng(seed)
+    codes = synthetic_occupation_codes(n_occupations)
+    growth = np.round(rng.normal(5, 8, n_occupations), 1)
+    jobs_2024 = np.round(rng.lognormal(10, 1.5, n_occupations)).astype(np.int64) * 10
+    occupations = pd.DataFrame({
+        'occupation_code': codes,
+        'occupation_title': [f'Synthetic Occupation {i}' for i in range(n_occupations)],
+        'description': 'Synthetic occupation generated for benchmarks',
+        'median_salary': np.round(rng.lognormal(np.log(65000), 0.4, n_occupations), -1).astype(np.int64),
+        'projected_growth': growth,
+        'num_jobs_2024': jobs_2024,
+        'num_jobs_2034': np.round(jobs_2024 * (1 + growth / 100)).astype(np.int64),
+    })
+    return add_derived_occupation_columns(occupations)
+
+def generate_skill_pairs(n_occupations, n_skills, mean_skills=30, zipf_exponent=1.0, seed=0):
+    """
+    Sorteia os pares ocupação-habilidade
+
+    Args:
+        n_occupations (int): Número de ocupações
+        n_skills (int): Tamanho do vocabulário de habilidades
+        mean_skills (float): Mediana de habilidades por ocupação
+        zipf_exponent (float): Expoente da popularidade das habilidades
+        seed (int): Semente do gerador
+
+    Returns:
+        tuple: (linhas, colunas) dos pares, sem repetição, ordenados por linha
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.clip(
+        np.round(rng.lognormal(np.log(mean_skills), 0.5, n_occupations)), 1, n_skills
+    ).astype(np.int64)
+    popularity = 1 / np.power(np.arange(n_skills) + 10.0, zipf_exponent)
+    cumulative = np.cumsum(popularity / popularity.sum())
+
+    rows = np.repeat(np.arange(n_occupations, dtype=np.int64), counts)
+    # Embaralha o vocabulário para que as habilidades populares não sejam as primeiras em ordem alfabética
+    cols = rng.permutation(n_skills)[np.minimum(np.searchsorted(cumulative, rng.random(len(rows))), n_skills - 1)]
+    pairs = np.unique(rows * n_skills + cols)
+    return pairs // n_skills, pairs % n_skills
+
+def generate_dataset(n_occupations, n_skills, mean_skills=30, seed=0):
+    """
+    Gera os três conjuntos de dados em memória
+
+    Returns:
+        tuple: (ocupações, tabela longa de habilidades, SparseSkillsMatrix)
+    """
+    rng = np.random.default_rng(seed + 1)
+    occupations = generate_occupations(n_occupations, seed=seed)
+    rows, cols = generate_skill_pairs(n_occupations, n_skills, mean_skills=mean_skills, seed=seed)
+
+    width = len(str(n_skills - 1))
+    skills = [f'Skill {i:0{width}d}' for i in range(n_skills)]
+    codes = np.asarray(occupations['occupation_code'], dtype=object)
+    skills_df = pd.DataFrame({
+        'occupation_code': codes[rows],
+        'skill_name': np.asarray(skills, dtype=object)[cols],
+        'importance': rng.integers(50, 101, len(rows)),
+        'level': rng.integers(1, 8, len(rows)),
+    })
+    matrix = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.uint8), (rows, cols)), shape=(n_occupations, n_skills)
+    )
+    return occupations, skills_df, SparseSkillsMatrix(matrix, codes, skills)
+
+def write_synthetic_dataset(output_dir, n_occupations, n_skills, mean_skills=30, seed=0,
+                            max_dense_cells=MAX_DENSE_CELLS):
+    """
+    Gera e grava um conjunto de dados sintético no formato de data/
+
+    Args:
+        output_dir (Path): Diretório de destino
+        n_occupations (int): Número de ocupações
+        n_skills (int): Tamanho do vocabulário de habilidades
+        mean_skills (float): Mediana de habilidades por ocupação
+        seed (int): Semente do gerador
+        max_dense_cells (int): Acima deste número de células, o CSV denso da
+            matriz não é gravado (apenas o cache CSR)
+
+    Returns:
+        dict: Ocupações, habilidades, pares e se o CSV denso foi gravado
+    """
+    occupations, skills_df, sparse_matrix = generate_dataset(n_occupations, n_skills, mean_skills, seed)
+    matrix_csv = n_occupations * n_skills <= max_dense_cells
+    write_data_files(output_dir, occupations, skills_df, sparse_matrix, matrix_csv=matrix_csv)
+    return {
+        'occupations': n_occupations,
+        'skills': n_skills,
+        'pairs': int(sparse_matrix.matrix.nnz),
+        'matrix_csv': matrix_csv,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos no formato de data/")
+    parser.add_argument('--occupations', type=int, required=True)
+    parser.add_argument('--skills', type=int, required=True)
+    parser.add_argument('--mean-skills', type=float, default=30)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True, help="Diretório de destino")
+    parser.add_argument('--max-dense-cells', type=int, default=MAX_DENSE_CELLS)
+    args = parser.parse_args(argv)
+
+    summary = write_synthetic_dataset(
+        args.output, args.occupations, args.skills, mean_skills=args.mean_skills, seed=args.seed,
+        max_dense_cells=args.max_dense_cells
+    )
+    print(
+        f"{summary['occupations']} ocupações, {summary['skills']} habilidades, {summary['pairs']} pares"
+        + ("" if summary['matrix_csv'] else " (matriz apenas em CSR)")
+    )
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
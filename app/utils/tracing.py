@@ -0,0 +1,272 @@
+"""
+Medição de tempo dos caminhos quentes (spans) com histogramas
+
+Spans envolvem trechos de código (``with span('nome')``) ou funções
+(``@traced('nome')``) e são agregados em histogramas de latência por nome.
+Os resultados podem ser lidos como tabela (painel de diagnóstico do app),
+como logs JSON (um por span) ou no formato texto do Prometheus. Spans
+marcados com ``memory=True`` registram também a memória alocada
+(tracemalloc), usada para medir os artefatos carregados.
+
+Desligado (padrão), um span custa uma verificação de flag. Para ligar ao
+iniciar o processo, defina GS2_TRACING=1 (ou GS2_TRACING=log para também
+emitir os logs JSON). A medição de memória é uma opção à parte
+(GS2_TRACING_MEMORY=1): o tracemalloc deixa todo o processo bem mais lento
+(cerca de 2,5x em get_recommendations).
+"""
+
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+TRACING_ENV = 'GS2_TRACING'
+TRACING_MEMORY_ENV = 'GS2_TRACING_MEMORY'
+# Limites superiores dos buckets dos histogramas, em milissegundos
+BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+logger = logging.getLogger('gs2.tracing')
+
+_enabled = False
+_log_spans = False
+_memory_started = False
+_histograms = {}
+_memory = {}
+_lock = threading.Lock()
+_null_span = nullcontext()
+
+class SpanHistogram:
+    """Contagens por bucket, soma e máximo das durações de um span"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def quantile(self, q):
+        """Estimativa do quantil q pelo limite superior do bucket que o contém"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+def enable_tracing(enabled=True, log=None, memory=False):
+    """
+    Liga ou desliga a medição
+
+    Args:
+        enabled (bool): Liga a medição dos spans
+        log (bool, optional): Emite um log JSON por span (logger
+            'gs2.tracing'); None mantém a configuração atual
+        memory (bool): Inicia o tracemalloc para os spans com memory=True.
+            Afeta todo o processo e deixa todas as chamadas mais lentas; use
+            só para diagnóstico de memória
+    """
+    global _enabled, _log_spans, _memory_started
+    _log_spans = enabled and (_log_spans if log is None else log)
+    if _log_spans and not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    if enabled and memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _memory_started = True
+    elif not (enabled and memory) and _memory_started:
+        # Só para o tracemalloc iniciado aqui (não o de python -X tracemalloc)
+        tracemalloc.stop()
+        _memory_started = False
+    _enabled = enabled
+
+def tracing_enabled():
+    """Indica se a medição está ligada"""
+    return _enabled
+
+def memory_tracing_enabled():
+    """Indica se a memória dos spans está sendo medida (tracemalloc ligado)"""
+    return _enabled and tracemalloc.is_tracing()
+
+def reset_tracing():
+    """Descarta os histogramas e as medições de memória"""
+    with _lock:
+        _histograms.clear()
+        _memory.clear()
+
+def record_span(name, duration_ms, **fields):
+    """Registra uma duração já medida no histograma do span"""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = SpanHistogram()
+        histogram.observe(duration_ms)
+    if _log_spans:
+        logger.info(json.dumps({'span': name, 'duration_ms': round(duration_ms, 4), 'ts': time.time(), **fields}))
+
+@contextmanager
+def _timed_span(name, memory):
+    memory = memory and tracemalloc.is_tracing()
+    if memory:
+        allocated_before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        if memory:
+            allocated = tracemalloc.get_traced_memory()[0] - allocated_before
+            # Cargas repetidas (catálogo em cache) alocam ~0: mantém a maior medição
+            with _lock:
+                _memory[name] = max(_memory.get(name, 0), allocated)
+            record_span(name, duration_ms, allocated_bytes=allocated)
+        else:
+            record_span(name, duration_ms)
+
+def span(name, memory=False):
+    """
+    Mede o bloco ``with`` como um span
+
+    Args:
+        name (str): Nome do span (ex.: 'recommender.top_k')
+        memory (bool): Registra também a memória alocada no bloco
+
+    Returns:
+        Gerenciador de contexto (nulo se a medição estiver desligada)
+    """
+    if not _enabled:
+        return _null_span
+    return _timed_span(name, memory)
+
+def traced(name=None, memory=False):
+    """
+    Decorador que mede cada chamada da função como um span
+
+    Args:
+        name (str, optional): Nome do span (padrão: módulo.função)
+        memory (bool): Registra também a memória alocada na chamada
+    """
+    def decorator(func):
+        span_name = name or f'{func.__module__.rsplit(".", 1)[-1]}.{func.__name__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            if memory:
+                with _timed_span(span_name, memory):
+                    return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_span(span_name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+def span_summary():
+    """
+    Resumo dos histogramas
+
+    Returns:
+        pd.DataFrame: Chamadas, total, média, p50/p99 (estimados pelos
+            buckets) e máximo, em ms, por span (maior tempo total primeiro)
+    """
+    with _lock:
+        rows = [
+            {
+                'span': name,
+                'count': histogram.count,
+                'total_ms': histogram.total_ms,
+                'mean_ms': histogram.total_ms / histogram.count,
+                'p50_ms': histogram.quantile(0.5),
+                'p99_ms': histogram.quantile(0.99),
+                'max_ms': histogram.max_ms,
+            }
+            for name, histogram in _histograms.items()
+        ]
+    columns = ['span', 'count', 'total_ms', 'mean_ms', 'p50_ms', 'p99_ms', 'max_ms']
+    return pd.DataFrame(rows, columns=columns).sort_values('total_ms', ascending=False, ignore_index=True)
+
+def memory_summary(top=10):
+    """
+    Memória alocada pelos spans com memory=True e maiores alocações atuais
+
+    Args:
+        top (int): Número de arquivos de origem listados no snapshot
+
+    Returns:
+        tuple: (DataFrame span -> MB alocados, DataFrame arquivo -> MB do
+            snapshot tracemalloc; vazio se o tracemalloc estiver desligado)
+    """
+    with _lock:
+        spans = pd.DataFrame(
+            [{'span': name, 'allocated_mb': size / (1 << 20)} for name, size in _memory.items()],
+            columns=['span', 'allocated_mb']
+        )
+    snapshot = pd.DataFrame(columns=['file', 'size_mb', 'blocks'])
+    if tracemalloc.is_tracing():
+        statistics = tracemalloc.take_snapshot().statistics('filename')[:top]
+        snapshot = pd.DataFrame(
+            [
+                {'file': stat.traceback[0].filename, 'size_mb': stat.size / (1 << 20), 'blocks': stat.count}
+                for stat in statistics
+            ],
+            columns=['file', 'size_mb', 'blocks']
+        )
+    return spans.sort_values('allocated_mb', ascending=False, ignore_index=True), snapshot
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text():
+    """
+    Histogramas e memória no formato texto de exposição do Prometheus
+
+    Returns:
+        str: Métricas gs2_span_duration_seconds (histograma) e
+            gs2_span_allocated_bytes (gauge)
+    """
+    lines = [
+        '# HELP gs2_span_duration_seconds Duração dos spans medidos',
+        '# TYPE gs2_span_duration_seconds histogram',
+    ]
+    with _lock:
+        for name, histogram in sorted(_histograms.items()):
+            label = _label(name)
+            cumulative = 0
+            for bound, count in zip(BUCKETS_MS, histogram.counts):
+                cumulative += count
+                lines.append(f'gs2_span_duration_seconds_bucket{{span="{label}",le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'gs2_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'gs2_span_duration_seconds_sum{{span="{label}"}} {histogram.total_ms / 1000:.9g}')
+            lines.append(f'gs2_span_duration_seconds_count{{span="{label}"}} {histogram.count}')
+
+        lines.append('# HELP gs2_span_allocated_bytes Memória alocada pelos spans de carga (tracemalloc)')
+        lines.append('# TYPE gs2_span_allocated_bytes gauge')
+        for name, size in sorted(_memory.items()):
+            lines.append(f'gs2_span_allocated_bytes{{span="{_label(name)}"}} {size}')
+    return '\n'.join(lines) + '\n'
+
+if os.environ.get(TRACING_ENV, '').lower() not in ('', '0', 'false'):
+    enable_tracing(
+        log=os.environ[TRACING_ENV].lower() == 'log',
+        memory=os.environ.get(TRACING_MEMORY_ENV, '').lower() not in ('', '0', 'false')
+    )
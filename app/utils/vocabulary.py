@@ -0,0 +1,257 @@
+"""
+Vocabulário de habilidades: mapa de ids, sinônimos e busca por prefixo
+
+O mapa nome -> coluna (dict) é o mesmo usado pelos vetorizadores do índice,
+de modo que cada habilidade é resolvida em O(1). Nomes que não batem
+exatamente são normalizados (caixa, acentos, pontuação e espaços) e
+procurados entre os nomes e os sinônimos normalizados.
+
+A busca por prefixo usa dois arrays ordenados de chaves normalizadas: o
+nome completo (ou sinônimo) e cada sufixo que começa numa palavra ("learn"
+encontra "Machine Learning"). Uma consulta é uma busca binária e uma
+varredura de no máximo ``limit`` habilidades distintas, em microssegundos
+mesmo para dezenas de milhares de habilidades.
+
+Sinônimos adicionais podem ser declarados em data/skill_aliases.csv, com as
+colunas alias e skill.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_left
+from operator import itemgetter
+
+from .data_loader import _load_table, get_catalog, get_data_path
+
+ALIASES_FILE = 'skill_aliases.csv'
+
+# Sinônimos padrão (inclusive em português) das habilidades do conjunto de dados
+DEFAULT_ALIASES = {
+    'AI': 'AI/Deep Learning',
+    'Artificial Intelligence': 'AI/Deep Learning',
+    'Deep Learning': 'AI/Deep Learning',
+    'Inteligência Artificial': 'AI/Deep Learning',
+    'ML': 'Machine Learning',
+    'Aprendizado de Máquina': 'Machine Learning',
+    'Coding': 'Programming',
+    'Software Development': 'Programming',
+    'Programação': 'Programming',
+    'Agile': 'Agile Methodologies',
+    'Scrum': 'Agile Methodologies',
+    'Metodologias Ágeis': 'Agile Methodologies',
+    'Cloud': 'Cloud Computing',
+    'Computação em Nuvem': 'Cloud Computing',
+    'Information Security': 'Cybersecurity',
+    'Segurança da Informação': 'Cybersecurity',
+    'Databases': 'Database Management',
+    'SQL': 'Database Management',
+    'Banco de Dados': 'Database Management',
+    'Data Visualisation': 'Data Visualization',
+    'Visualização de Dados': 'Data Visualization',
+    'Análise de Dados': 'Data Analysis',
+    'Statistics': 'Statistical Analysis',
+    'Estatística': 'Statistical Analysis',
+    'Human Resources': 'HR Management',
+    'Recursos Humanos': 'HR Management',
+    'Health Care': 'Healthcare Knowledge',
+    'Liderança': 'Leadership',
+    'Comunicação': 'Communication',
+    'Criatividade': 'Creativity',
+    'Adaptabilidade': 'Adaptability',
+    'Pensamento Crítico': 'Critical Thinking',
+    'Resolução de Problemas': 'Problem Solving',
+    'Trabalho em Equipe': 'Teamwork',
+    'Gestão de Projetos': 'Project Management',
+    'Gestão do Tempo': 'Time Management',
+    'Atendimento ao Cliente': 'Customer Service',
+    'Vendas': 'Sales',
+    'Pesquisa': 'Research',
+    'Redação Técnica': 'Technical Writing',
+    'Energia Renovável': 'Renewable Energy',
+    'Sustentabilidade': 'Sustainability',
+    'Colaboração Remota': 'Remote Collaboration',
+    'Desenvolvimento Web': 'Web Development',
+    'Desenvolvimento Mobile': 'Mobile Development',
+    'Edição de Vídeo': 'Video Editing',
+    'Modelagem 3D': '3D Modeling',
+    'Animação': 'Animation',
+}
+
+_SEPARATORS = re.compile(r'[^0-9a-z+#]+')
+
+def normalize_skill(name):
+    """
+    Chave normalizada de um nome de habilidade
+
+    Remove acentos, ignora caixa e troca pontuação e espaços por um único
+    espaço ("AI/Deep  Learning" -> "ai deep learning"); + e # são mantidos
+    para distinguir nomes como C, C++ e C#.
+
+    Args:
+        name (str): Nome da habilidade
+
+    Returns:
+        str: Chave normalizada
+    """
+    text = str(name)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _SEPARATORS.sub(' ', text.casefold()).strip()
+
+class SkillVocabulary:
+    """
+    Mapa de ids das habilidades com sinônimos e índice de prefixos
+
+    O id de uma habilidade é a sua posição em skills (a coluna da matriz de
+    ocupações). As estruturas normalizadas são construídas na primeira
+    consulta que precisar delas.
+
+    Args:
+        skills (list): Nomes canônicos das habilidades, na ordem das colunas
+        aliases (dict, optional): Sinônimo -> nome canônico; sinônimos de
+            habilidades fora do vocabulário são ignorados
+    """
+
+    def __init__(self, skills, aliases=None):
+        self.skills = list(skills)
+        self.skill_to_id = {skill: skill_id for skill_id, skill in enumerate(self.skills)}
+        self.aliases = dict(aliases or {})
+        self._keys = None
+        self._prefix_index = None
+
+    def __len__(self):
+        return len(self.skills)
+
+    def __contains__(self, name):
+        return self.resolve(name) is not None
+
+    def _key_to_id(self):
+        """Chave normalizada -> id (nomes canônicos têm precedência sobre sinônimos)"""
+        if self._keys is None:
+            keys = {}
+            for skill_id, skill in enumerate(self.skills):
+                keys.setdefault(normalize_skill(skill), skill_id)
+            for alias, skill in self.aliases.items():
+                skill_id = self.skill_to_id.get(skill)
+                if skill_id is not None:
+                    keys.setdefault(normalize_skill(alias), skill_id)
+            keys.pop('', None)
+            self._keys = keys
+        return self._keys
+
+    def resolve(self, name):
+        """
+        Id de uma habilidade pelo nome, sinônimo ou grafia equivalente
+
+        Args:
+            name (str): Nome informado
+
+        Returns:
+            int: Id da habilidade, ou None se desconhecida
+        """
+        skill_id = self.skill_to_id.get(name)
+        if skill_id is None:
+            skill_id = self._key_to_id().get(normalize_skill(name))
+        return skill_id
+
+    def ids(self, names):
+        """
+        Ids distintos das habilidades reconhecidas, na ordem informada
+
+        Args:
+            names (list): Nomes informados (desconhecidos são ignorados)
+
+        Returns:
+            list: Ids das habilidades
+        """
+        resolved = (self.resolve(name) for name in names)
+        return list(dict.fromkeys(skill_id for skill_id in resolved if skill_id is not None))
+
+    def canonical(self, name):
+        """Nome canônico de uma habilidade, ou None se desconhecida"""
+        skill_id = self.resolve(name)
+        return None if skill_id is None else self.skills[skill_id]
+
+    def split(self, names):
+        """
+        Separa os nomes informados em reconhecidos e desconhecidos
+
+        Returns:
+            tuple: (nomes canônicos distintos, nomes desconhecidos)
+        """
+        known, unknown = [], []
+        for name in names:
+            skill_id = self.resolve(name)
+            if skill_id is None:
+                unknown.append(name)
+            else:
+                known.append(self.skills[skill_id])
+        return list(dict.fromkeys(known)), unknown
+
+    def _prefixes(self):
+        """Arrays ordenados (chave, id) dos nomes completos e dos sufixos por palavra"""
+        if self._prefix_index is None:
+            full, words = [], []
+            for key, skill_id in self._key_to_id().items():
+                full.append((key, skill_id))
+                start = key.find(' ')
+                while start >= 0:
+                    words.append((key[start + 1:], skill_id))
+                    start = key.find(' ', start + 1)
+            full.sort(key=itemgetter(0))
+            words.sort(key=itemgetter(0))
+            self._prefix_index = tuple(
+                ([key for key, _ in entries], [skill_id for _, skill_id in entries])
+                for entries in (full, words)
+            )
+        return self._prefix_index
+
+    def build_indexes(self):
+        """Constrói agora as chaves normalizadas e o índice de prefixos (aquecimento)"""
+        self._prefixes()
+        return self
+
+    def complete(self, prefix, limit=10):
+        """
+        Habilidades cujo nome ou sinônimo começa com o prefixo
+
+        Os nomes que começam com o prefixo vêm antes dos que só têm uma
+        palavra começando com ele; dentro de cada grupo, ordem alfabética
+        das chaves normalizadas.
+
+        Args:
+            prefix (str): Texto digitado
+            limit (int): Número máximo de habilidades
+
+        Returns:
+            list: Nomes canônicos distintos
+        """
+        key = normalize_skill(prefix)
+        if not key:
+            return []
+        found = {}
+        for keys, skill_ids in self._prefixes():
+            position = bisect_left(keys, key)
+            while position < len(keys) and len(found) < limit and keys[position].startswith(key):
+                found.setdefault(skill_ids[position], None)
+                position += 1
+            if len(found) >= limit:
+                break
+        return [self.skills[skill_id] for skill_id in found]
+
+def load_skill_aliases():
+    """
+    Sinônimos de habilidades: os padrões e os de data/skill_aliases.csv
+
+    Returns:
+        dict: Sinônimo -> nome canônico (o arquivo tem precedência)
+    """
+    aliases = dict(DEFAULT_ALIASES)
+    try:
+        table = get_catalog().get(get_data_path() / ALIASES_FILE, _load_table)
+    except FileNotFoundError:
+        return aliases
+    if {'alias', 'skill'}.issubset(table.columns):
+        aliases.update(zip(table['alias'].astype(str), table['skill'].astype(str)))
+    return aliases
@@ -0,0 +1,142 @@
+"""
+Aquecimento do processo: carrega os artefatos e pré-constrói os índices
+
+Chamado uma vez por processo (réplica do app, serviço HTTP ou o próprio
+CLI em um health check), antes do primeiro usuário. Os artefatos
+independentes são carregados em paralelo num pool de threads (a leitura de
+arquivos e boa parte do NumPy/pandas liberam o GIL) e, em seguida, as
+estruturas que dependem do índice de recomendação (vocabulário, lacunas de
+habilidades) são construídas. Cada tarefa é medida por um span
+``warmup.<nome>``; falhas são relatadas e não interrompem as demais.
+
+Uso (a partir do diretório ``app/``):
+    python -m utils.warmup --workers 4
+    python -m utils.warmup --cold-start   # mede em um processo novo, importações inclusive
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .career_paths import load_career_graph
+from .data_loader import get_skill_adjacency, load_occupations_data
+from .explore import get_occupation_query_index
+from .index_artifact import get_serving_index
+from .recommender import load_neighbor_table
+from .skill_gap import get_skill_gap_engine
+from .tracing import span
+
+# Artefatos independentes, carregados em paralelo
+LOAD_TASKS = {
+    'serving_index': get_serving_index,
+    'occupations': load_occupations_data,
+    'skill_adjacency': get_skill_adjacency,
+    'occupation_query_index': get_occupation_query_index,
+    'neighbor_table': load_neighbor_table,
+    'career_graph': load_career_graph,
+}
+
+# Estruturas construídas sobre o índice de recomendação já carregado
+INDEX_TASKS = {
+    'skill_vocabulary': lambda index: index.vocabulary.build_indexes(),
+    'skill_gap_engine': get_skill_gap_engine,
+}
+
+def _run_task(name, function, *args):
+    start = time.perf_counter()
+    try:
+        with span(f'warmup.{name}'):
+            function(*args)
+    except Exception as e:  # o aquecimento nunca derruba o processo
+        print(f"Aquecimento de {name} falhou: {e}", file=sys.stderr)
+        return None
+    return time.perf_counter() - start
+
+def warm_up(workers=4):
+    """
+    Carrega os artefatos e pré-constrói os índices do processo
+
+    Args:
+        workers (int): Threads do pool; 1 executa em sequência
+
+    Returns:
+        dict: Segundos por tarefa (None nas que falharam) e o total em 'total'
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='warmup') as pool:
+        futures = {name: pool.submit(_run_task, name, function) for name, function in LOAD_TASKS.items()}
+        timings = {name: future.result() for name, future in futures.items()}
+
+        if timings['serving_index'] is not None:
+            index = get_serving_index()
+            futures = {name: pool.submit(_run_task, name, function, index) for name, function in INDEX_TASKS.items()}
+            timings.update({name: future.result() for name, future in futures.items()})
+
+    timings['total'] = time.perf_counter() - start
+    return timings
+
+_started = None
+_started_lock = threading.Lock()
+
+def start_warm_up(workers=4):
+    """
+    Inicia warm_up em uma thread de fundo (uma única vez por processo)
+
+    As páginas continuam respondendo durante o aquecimento; quem precisar
+    de um artefato ainda em carga espera apenas por ele (as cargas são
+    compartilhadas pelo catálogo e pelo índice em produção).
+
+    Returns:
+        threading.Thread: Thread do aquecimento
+    """
+    global _started
+    with _started_lock:
+        if _started is None:
+            _started = threading.Thread(target=warm_up, kwargs={'workers': workers}, name='warmup', daemon=True)
+            _started.start()
+    return _started
+
+def measure_cold_start(workers=4):
+    """
+    Mede o aquecimento em um processo Python novo, importações inclusive
+
+    Returns:
+        dict: 'imports' (s), os tempos de warm_up e 'total' desde o início
+            do processo filho
+    """
+    script = (
+        "import json, time\n"
+        "start = time.perf_counter()\n"
+        "from utils import warmup\n"
+        "imports = time.perf_counter() - start\n"
+        f"timings = warmup.warm_up(workers={int(workers)})\n"
+        "print(json.dumps({'imports': imports, **timings, 'total': time.perf_counter() - start}))\n"
+    )
+    app_dir = Path(__file__).parent.parent
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(app_dir), os.environ.get('PYTHONPATH')])))
+    result = subprocess.run(
+        [sys.executable, '-c', script], cwd=app_dir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Aquecimento dos artefatos e índices")
+    parser.add_argument('--workers', type=int, default=4, help="Threads (0 = todos os núcleos)")
+    parser.add_argument('--cold-start', action='store_true', help="Mede em um processo novo, importações inclusive")
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count()
+    timings = measure_cold_start(workers) if args.cold_start else warm_up(workers)
+    for name, seconds in timings.items():
+        print(f"{name:<24} {'falhou' if seconds is None else f'{seconds * 1000:9.1f} ms'}")
+    failed = [name for name, seconds in timings.items() if seconds is None]
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())